@@ -8,7 +8,7 @@ class BankTransfersConfig(AppConfig):
 # bank_transfers/admin.py
 from django.contrib import admin
 from .models import (
-    BankAccount, Beneficiary, Transfer, TransferTemplate, TransferBatch,
+    BankAccount, Beneficiary, Transfer, TransferTemplate, TransferBatch, BatchExportArtifact,
     NavConfiguration, Invoice, InvoiceLineItem, InvoiceSyncLog,
     FeatureTemplate, CompanyFeature, Company, CompanyUser, UserProfile,
     ExchangeRate, ExchangeRateSyncLog,
@@ -44,6 +44,12 @@ class TransferBatchAdmin(admin.ModelAdmin):
     list_display = ['name', 'created_at', 'xml_generated_at']
     filter_horizontal = ['transfers']
 
+@admin.register(BatchExportArtifact)
+class BatchExportArtifactAdmin(admin.ModelAdmin):
+    list_display = ['batch', 'batch_format', 'file_size', 'created_at']
+    list_filter = ['batch_format', 'created_at']
+    readonly_fields = ['batch', 'batch_format', 'content_key', 'file_path', 'file_size', 'file_hash', 'created_at', 'updated_at']
+
 
 # NAV Invoice Synchronization Admin
 
@@ -249,6 +255,7 @@ class CompanyFeatureAdmin(admin.ModelAdmin):
         updated = queryset.filter(feature_template__is_system_critical=False).update(
             is_enabled=True
         )
+        self._invalidate_feature_cache(queryset)
         self.message_user(request, f'{updated} features enabled.')
         
         # Count system critical features that couldn't be modified
@@ -275,6 +282,7 @@ class CompanyFeatureAdmin(admin.ModelAdmin):
             return
         
         updated = queryset.update(is_enabled=False, enabled_at=None)
+        self._invalidate_feature_cache(queryset)
         self.message_user(request, f'{updated} features disabled.')
     disable_features.short_description = "Disable selected features"
     
@@ -283,6 +291,12 @@ class CompanyFeatureAdmin(admin.ModelAdmin):
         updated = queryset.update(config_data=None)
         self.message_user(request, f'Configuration reset for {updated} features.')
     reset_feature_config.short_description = "Reset feature configuration"
+
+    def _invalidate_feature_cache(self, queryset):
+        """Bulk updates bypass the CompanyFeature signals"""
+        from .permissions import FeatureChecker
+        for company_id in set(queryset.values_list('company_id', flat=True)):
+            FeatureChecker.invalidate_company(company_id)
     
     def save_model(self, request, obj, form, change):
         """Set enabled_by when enabling a feature"""
@@ -12,6 +12,9 @@ class BankTransfersConfig(AppConfig):
     name = 'bank_transfers'
 
     def ready(self):
+        # Cache invalidation signal handlers
+        from . import signals  # noqa: F401
+
         # Only start schedulers on Railway (production) and avoid starting multiple times
         railway_env = os.environ.get('RAILWAY_ENVIRONMENT_NAME')
         if (railway_env == 'production' and
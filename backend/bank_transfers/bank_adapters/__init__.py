@@ -10,6 +10,7 @@ from .base import (
     NormalizedTransaction,
     StatementMetadata,
     BankStatementParseError,
+    LineClassifier,
 )
 from .factory import BankAdapterFactory
 from .granit_adapter import GranitBankAdapter
@@ -23,6 +24,7 @@ __all__ = [
     'NormalizedTransaction',
     'StatementMetadata',
     'BankStatementParseError',
+    'LineClassifier',
     'BankAdapterFactory',
     'GranitBankAdapter',
     'RevolutAdapter',
@@ -4,8 +4,9 @@ Abstract base class for bank statement adapters.
 All bank-specific parsers must implement this interface for multi-bank support.
 """
 
+import re
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from decimal import Decimal
 from datetime import date
@@ -104,6 +105,60 @@ class StatementMetadata:
     raw_metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+class LineClassifier:
+    """
+    Classify statement text lines with precompiled patterns.
+
+    PDF adapters walk statements line by line and used to run several inline
+    re.match/re.search calls per line to decide what a line is. A LineClassifier
+    compiles all regex line kinds into one alternation of named groups once (at
+    module import), so each line is classified with a single regex call.
+
+    Regex patterns are matched at the start of the line; when several match, the
+    kind listed first wins. Patterns must not contain capturing groups (use
+    (?:...) instead). Plain substrings that may appear anywhere in a line (e.g.
+    summary markers) are passed as markers and checked with the `in` operator,
+    which is cheaper than an unanchored regex search.
+
+    Example:
+        KH_LINES = LineClassifier(
+            {'transaction_start': r'\d{4}\.\d{2}\.\d{2}'},
+            markers={'summary': ('Könyvelt nyitóegyenleg', 'Jóváírás összesen')},
+        )
+        KH_LINES.classify('2025.09.03 2025.09.03 Azonnali ...')  # 'transaction_start'
+        KH_LINES.classify('Ref.: BNK25246BJHLCKHJ')               # None
+    """
+
+    def __init__(
+        self,
+        patterns: Dict[str, str],
+        markers: Optional[Dict[str, tuple]] = None,
+        flags: int = 0
+    ):
+        for kind, pattern in patterns.items():
+            if re.compile(pattern, flags).groups:
+                raise ValueError(f"Line pattern '{kind}' must not contain capturing groups")
+
+        self.pattern = re.compile(
+            '|'.join(f'(?P<{kind}>{pattern})' for kind, pattern in patterns.items()),
+            flags
+        )
+        self.markers = list((markers or {}).items())
+        self.kinds = tuple(patterns) + tuple(kind for kind, _ in self.markers)
+
+    def classify(self, line: str) -> Optional[str]:
+        """Return the kind of the line, or None if nothing matches."""
+        match = self.pattern.match(line)
+        if match:
+            return match.lastgroup
+
+        for kind, substrings in self.markers:
+            for substring in substrings:
+                if substring in line:
+                    return kind
+        return None
+
+
 class BankStatementParseError(Exception):
     """Raised when PDF parsing fails"""
     pass
@@ -128,6 +183,10 @@ class BankStatementAdapter(ABC):
     BANK_NAME: str = None  # e.g., 'GRÁNIT Bank Nyrt.'
     BANK_BIC: str = None   # e.g., 'GNBAHUHB'
 
+    # Optional page progress hook: called as progress_callback(pages_done, pages_total).
+    # Set by the caller (e.g. background statement processing) before parse().
+    progress_callback: Optional[Callable[[int, int], None]] = None
+
     @classmethod
     @abstractmethod
     def detect(cls, pdf_bytes: bytes, filename: str) -> bool:
@@ -210,6 +269,19 @@ class BankStatementAdapter(ABC):
             raise NotImplementedError(f"{cls.__name__} must define BANK_BIC")
         return cls.BANK_BIC
 
+    def _report_page_progress(self, pages_done: int, pages_total: int) -> None:
+        """
+        Report page extraction progress to the registered progress_callback.
+
+        Progress reporting must never break parsing, so callback errors are logged and ignored.
+        """
+        if not self.progress_callback:
+            return
+        try:
+            self.progress_callback(pages_done, pages_total)
+        except Exception as e:
+            logger.warning(f"Page progress callback failed: {e}")
+
     def _clean_amount(self, amount_str: str) -> Decimal:
         """
         Clean and parse amount string to Decimal.
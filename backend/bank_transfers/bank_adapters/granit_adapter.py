@@ -26,10 +26,59 @@ from .base import (
     NormalizedTransaction,
     StatementMetadata,
     BankStatementParseError,
+    LineClassifier,
 )
 
 logger = logging.getLogger(__name__)
 
+# Transaction header: starts with a date and ends with an amount. Amounts with
+# space-separated thousands always qualify; other amounts only if the line is not
+# a detail line such as "2025.01.14 Előjegyzett jutalék: -723".
+GRANIT_LINE_CLASSIFIER = LineClassifier({
+    'transaction_header': (
+        r'(?=\d{4}\.\d{2}\.\d{2}\s)'
+        r'(?:.*\s[\d\-]+\s\d{3}$'
+        r'|(?!.*(?:jutalék|Beérkezés|Előjegyzett|Eredeti|Értéknap|Kártya):).*\s[\d\-]+$)'
+    ),
+})
+
+GRANIT_FIRST_LINE_RE = re.compile(r'^([\d.]+)\s+(.+?)\s+([\d\s\-,]+)$')
+GRANIT_AMOUNT_STRIP_RE = re.compile(r'[^\d.\-]')
+
+# Statement header (metadata) patterns
+GRANIT_ACCOUNT_RE = re.compile(r'Számlaszám:\s*([\d\-]+)')
+GRANIT_IBAN_RE = re.compile(r'IBAN\s+szám[:\s]+(HU[\d\s\n]+)')
+GRANIT_PERIOD_RE = re.compile(r'Könyvelés dátuma:\s*([\d.]+)\s*-\s*([\d.]+)')
+GRANIT_STATEMENT_NUMBER_RE = re.compile(r'Kivonatszám/számla sorszáma:\s*([^\n]+)')
+GRANIT_OPENING_BALANCE_RE = re.compile(r'Utolsó kivonat egyenlege:\s*([\d\s\-,]+)')
+GRANIT_CLOSING_BALANCE_RE = re.compile(r'Záró egyenleg:\s*([\d\s\-,]+)')
+
+# Transaction block detail patterns
+GRANIT_CARD_RE = re.compile(r'Kártya:\s*([\d*]+)')
+GRANIT_MERCHANT_RE = re.compile(r'Hely:\s*([^\n]+)')
+GRANIT_VALUE_DATE_RE = re.compile(r'Értéknap:\s*([\d.]+)')
+GRANIT_PAYMENT_ID_RE = re.compile(r'Fizetési azonosító:\s*([A-Z0-9]+)')
+GRANIT_TRANSACTION_ID_RE = re.compile(r'Tranzakció azonosító:\s*([A-Z0-9]+)')
+GRANIT_PARTNER_ID_RE = re.compile(r'Partnerek közti .*?azonosító:\s*([^\n]+)')
+GRANIT_TYPE_CODE_RE = re.compile(r'Tranzakció típus:\s*([\d\-]+)')
+GRANIT_FEE_RE = re.compile(r'Előjegyzett jutalék:\s*([\d\s\-,]+)')
+GRANIT_PAYER_IBAN_NAME_RE = re.compile(r'Fizető fél:\s*(HU\d{26})\s*,\s*([^\n]+)')
+GRANIT_PAYER_IBAN_THEN_NAME_RE = re.compile(
+    r'Fizető fél:\s*(HU\d{26})\s*\n(.+?)(?:,\s*Fizető fél BIC:|\nFizető fél BIC:|$)',
+    re.DOTALL
+)
+GRANIT_PAYER_NAME_RE = re.compile(r'Fizető fél:\s*(.+?)(?:\nFizető fél IBAN:|$)', re.DOTALL)
+GRANIT_IBAN_PREFIX_RE = re.compile(r'^HU\d{26}')
+GRANIT_PAYER_IBAN_RE = re.compile(r'Fizető fél IBAN:\s*(HU\d{26})')
+GRANIT_PAYER_BIC_RE = re.compile(r'Fizető fél BIC:\s*([A-Z0-9]+)')
+GRANIT_BENEFICIARY_RE = re.compile(r'Kedvezményezett:\s*([^,\n]+)')
+GRANIT_BENEFICIARY_NAME_RE = re.compile(r'Kedvezményezett neve:\s*([^\n]+)')
+GRANIT_BENEFICIARY_IBAN_RE = re.compile(r'Kedvezményezett IBAN:\s*(HU\d{26})')
+GRANIT_BENEFICIARY_BIC_RE = re.compile(r'Kedvezményezett BIC:\s*([A-Z0-9]+)')
+GRANIT_AZONOSITO_IBAN_RE = re.compile(r'Azonosító:\s*(HU\d{26})')
+GRANIT_REFERENCE_RE = re.compile(r'Közlemény:\s*([^\n]+)')
+GRANIT_UNSTRUCTURED_REFERENCE_RE = re.compile(r'Nem strukturált közlemény:\s*([^\n]+)')
+
 
 class GranitBankAdapter(BankStatementAdapter):
     """
@@ -69,10 +118,12 @@ class GranitBankAdapter(BankStatementAdapter):
             with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
                 # Extract all text from all pages
                 full_text = ""
-                for page in pdf.pages:
+                page_count = len(pdf.pages)
+                for page_num, page in enumerate(pdf.pages, start=1):
                     page_text = page.extract_text()
                     if page_text:
                         full_text += page_text + "\n"
+                    self._report_page_progress(page_num, page_count)
 
                 if not full_text.strip():
                     raise BankStatementParseError("PDF contains no extractable text")
@@ -101,11 +152,11 @@ class GranitBankAdapter(BankStatementAdapter):
         metadata = {}
 
         # Account number
-        if m := re.search(r'Számlaszám:\s*([\d\-]+)', text):
+        if m := GRANIT_ACCOUNT_RE.search(text):
             metadata['account_number'] = m.group(1)
 
         # IBAN - capture HU + digits, then clean to exactly 28 chars
-        if m := re.search(r'IBAN\s+szám[:\s]+(HU[\d\s\n]+)', text):
+        if m := GRANIT_IBAN_RE.search(text):
             # Extract only HU + 26 digits (28 chars total)
             iban_raw = m.group(1)
             iban_clean = ''.join(c for c in iban_raw if c.isalnum())  # Remove spaces/newlines
@@ -113,20 +164,20 @@ class GranitBankAdapter(BankStatementAdapter):
                 metadata['account_iban'] = iban_clean
 
         # Statement period
-        if m := re.search(r'Könyvelés dátuma:\s*([\d.]+)\s*-\s*([\d.]+)', text):
+        if m := GRANIT_PERIOD_RE.search(text):
             metadata['period_from'] = self._parse_date(m.group(1))
             metadata['period_to'] = self._parse_date(m.group(2))
 
         # Statement number
-        if m := re.search(r'Kivonatszám/számla sorszáma:\s*([^\n]+)', text):
+        if m := GRANIT_STATEMENT_NUMBER_RE.search(text):
             metadata['statement_number'] = m.group(1).strip()
 
         # Opening balance
-        if m := re.search(r'Utolsó kivonat egyenlege:\s*([\d\s\-,]+)', text):
+        if m := GRANIT_OPENING_BALANCE_RE.search(text):
             metadata['opening_balance'] = self._clean_amount(m.group(1))
 
         # Closing balance (may not be present)
-        if m := re.search(r'Záró egyenleg:\s*([\d\s\-,]+)', text):
+        if m := GRANIT_CLOSING_BALANCE_RE.search(text):
             metadata['closing_balance'] = self._clean_amount(m.group(1))
 
         return StatementMetadata(
@@ -175,23 +226,12 @@ class GranitBankAdapter(BankStatementAdapter):
         # Find all transaction start indices (lines with date + space-separated amount at end)
         # Format: "2025.01.14 Description... -361 250" or "2025.01.14 Description... 10 260"
         # NOT: "2025.01.14 Előjegyzett jutalék: -723" (detail line, no space in amount)
-        transaction_starts = []
-        for i, line in enumerate(lines):
-            line_stripped = line.strip()
-            # Must start with date (any year)
-            if not re.match(r'^\d{4}\.\d{2}\.\d{2}\s+', line_stripped):
-                continue
-
-            # Check if line ends with space-separated amount (e.g., "-361 250" or "10 260")
-            # Transaction amounts in GRÁNIT statements have spaces for thousands separator
-            # Detail lines like "Előjegyzett jutalék: -723" don't have spaces in the amount
-            if re.search(r'\s[\d\-]+\s\d{3}$', line_stripped):  # Space-separated thousands
-                transaction_starts.append(i)
-            elif re.search(r'\s[\d\-]+$', line_stripped):  # Could be small amount without thousands
-                # Further validation: must have meaningful description (not just metadata)
-                # Skip lines like "Előjegyzett jutalék:", "Beérkezés dátuma:", etc.
-                if not re.search(r'(jutalék|Beérkezés|Előjegyzett|Eredeti|Értéknap|Kártya):', line_stripped):
-                    transaction_starts.append(i)
+        # Transaction amounts in GRÁNIT statements have spaces for thousands separator,
+        # detail lines like "Előjegyzett jutalék: -723" are rejected by the classifier
+        transaction_starts = [
+            i for i, line in enumerate(lines)
+            if GRANIT_LINE_CLASSIFIER.classify(line.strip()) == 'transaction_header'
+        ]
 
         logger.info(f"Found {len(transaction_starts)} transaction headers (lines with amounts)")
 
@@ -233,7 +273,7 @@ class GranitBankAdapter(BankStatementAdapter):
         # The amount at the end has space separators (e.g., "-7 500 000")
         # Transaction IDs are long continuous digit strings without spaces in amounts
         # Pattern: date + description + optional_transaction_id + amount_with_spaces
-        date_match = re.match(r'^([\d.]+)\s+(.+?)\s+([\d\s\-,]+)$', first_line)
+        date_match = GRANIT_FIRST_LINE_RE.match(first_line)
         if not date_match:
             logger.warning(f"Could not parse first line: {first_line}")
             return None
@@ -319,13 +359,13 @@ class GranitBankAdapter(BankStatementAdapter):
             fields['short_description'] = 'POS vásárlás'
 
             # Extract card number
-            if m := re.search(r'Kártya:\s*([\d*]+)', block_text):
+            if m := GRANIT_CARD_RE.search(block_text):
                 fields['card_number'] = m.group(1)
 
             # Extract merchant
             # Pattern: Hely: 00227731:AMZN Mktp DE*MK1FV4U15BANK
             # Capture everything after "Hely:" until newline
-            if m := re.search(r'Hely:\s*([^\n]+)', block_text):
+            if m := GRANIT_MERCHANT_RE.search(block_text):
                 merchant_full = m.group(1).strip()
 
                 # Check if there's a colon with NO space after it (location code:merchant format)
@@ -393,27 +433,27 @@ class GranitBankAdapter(BankStatementAdapter):
         """Extract all transfer-related fields from multi-line block."""
 
         # Value date
-        if m := re.search(r'Értéknap:\s*([\d.]+)', block_text):
+        if m := GRANIT_VALUE_DATE_RE.search(block_text):
             fields['value_date'] = self._parse_date(m.group(1))
 
         # Payment ID
-        if m := re.search(r'Fizetési azonosító:\s*([A-Z0-9]+)', block_text):
+        if m := GRANIT_PAYMENT_ID_RE.search(block_text):
             fields['payment_id'] = m.group(1)
 
         # Transaction ID
-        if m := re.search(r'Tranzakció azonosító:\s*([A-Z0-9]+)', block_text):
+        if m := GRANIT_TRANSACTION_ID_RE.search(block_text):
             fields['transaction_id'] = m.group(1)
 
         # Partner ID
-        if m := re.search(r'Partnerek közti .*?azonosító:\s*([^\n]+)', block_text):
+        if m := GRANIT_PARTNER_ID_RE.search(block_text):
             fields['partner_id'] = m.group(1).strip()
 
         # Transaction type code
-        if m := re.search(r'Tranzakció típus:\s*([\d\-]+)', block_text):
+        if m := GRANIT_TYPE_CODE_RE.search(block_text):
             fields['transaction_type_code'] = m.group(1)
 
         # Fee amount
-        if m := re.search(r'Előjegyzett jutalék:\s*([\d\s\-,]+)', block_text):
+        if m := GRANIT_FEE_RE.search(block_text):
             fields['fee_amount'] = self._clean_amount(m.group(1))
 
         # Payer extraction - handles multiple formats:
@@ -422,11 +462,11 @@ class GranitBankAdapter(BankStatementAdapter):
         # Format 3: "Fizető fél: HU12304000010000000071947848\nUri-Zanyi Gáz..." (IBAN on line 1, name on line 2+)
 
         # Check for Format 2: IBAN followed by comma and name on same line
-        if m := re.search(r'Fizető fél:\s*(HU\d{26})\s*,\s*([^\n]+)', block_text):
+        if m := GRANIT_PAYER_IBAN_NAME_RE.search(block_text):
             fields['payer_iban'] = m.group(1)
             fields['payer_name'] = m.group(2).strip()
         # Check for Format 3: IBAN on line 1, name on subsequent lines
-        elif m := re.search(r'Fizető fél:\s*(HU\d{26})\s*\n(.+?)(?:,\s*Fizető fél BIC:|\nFizető fél BIC:|$)', block_text, re.DOTALL):
+        elif m := GRANIT_PAYER_IBAN_THEN_NAME_RE.search(block_text):
             fields['payer_iban'] = m.group(1)
             # Extract and clean multi-line name
             name_text = m.group(2).strip()
@@ -463,10 +503,10 @@ class GranitBankAdapter(BankStatementAdapter):
                             payer_name = payer_name + ' ' + line
                 fields['payer_name'] = payer_name
         # Check for Format 1: Name only (no IBAN) - may span multiple lines
-        elif m := re.search(r'Fizető fél:\s*(.+?)(?:\nFizető fél IBAN:|$)', block_text, re.DOTALL):
+        elif m := GRANIT_PAYER_NAME_RE.search(block_text):
             potential_payer = m.group(1).strip()
             # Only treat as name if it's NOT an IBAN (already handled by Format 3 above)
-            if not re.match(r'^HU\d{26}', potential_payer):
+            if not GRANIT_IBAN_PREFIX_RE.match(potential_payer):
                 # Stop at any other field that might follow
                 if '\n' in potential_payer:
                     # Take only lines that are part of the name (before next field)
@@ -503,38 +543,38 @@ class GranitBankAdapter(BankStatementAdapter):
                 fields['payer_name'] = payer_name
 
         # Payer IBAN (separate line) - HU + exactly 26 digits
-        if m := re.search(r'Fizető fél IBAN:\s*(HU\d{26})', block_text):
+        if m := GRANIT_PAYER_IBAN_RE.search(block_text):
             fields['payer_iban'] = m.group(1)
 
         # Payer BIC
-        if m := re.search(r'Fizető fél BIC:\s*([A-Z0-9]+)', block_text):
+        if m := GRANIT_PAYER_BIC_RE.search(block_text):
             fields['payer_bic'] = m.group(1)
 
         # Beneficiary name
-        if m := re.search(r'Kedvezményezett:\s*([^,\n]+)', block_text):
+        if m := GRANIT_BENEFICIARY_RE.search(block_text):
             fields['beneficiary_name'] = m.group(1).strip()
 
         # Kedvezményezett neve (alternative format)
-        if m := re.search(r'Kedvezményezett neve:\s*([^\n]+)', block_text):
+        if m := GRANIT_BENEFICIARY_NAME_RE.search(block_text):
             fields['beneficiary_name'] = m.group(1).strip()
 
         # Beneficiary IBAN - HU + exactly 26 digits
-        if m := re.search(r'Kedvezményezett IBAN:\s*(HU\d{26})', block_text):
+        if m := GRANIT_BENEFICIARY_IBAN_RE.search(block_text):
             fields['beneficiary_iban'] = m.group(1)
 
         # Beneficiary BIC
-        if m := re.search(r'Kedvezményezett BIC:\s*([A-Z0-9]+)', block_text):
+        if m := GRANIT_BENEFICIARY_BIC_RE.search(block_text):
             fields['beneficiary_bic'] = m.group(1)
 
         # Azonosító (could be beneficiary IBAN on separate line) - HU + exactly 26 digits
         if 'beneficiary_iban' not in fields:
-            if m := re.search(r'Azonosító:\s*(HU\d{26})', block_text):
+            if m := GRANIT_AZONOSITO_IBAN_RE.search(block_text):
                 fields['beneficiary_iban'] = m.group(1)
 
         # Reference (Közlemény) - with fallback to Nem strukturált közlemény
-        if m := re.search(r'Közlemény:\s*([^\n]+)', block_text):
+        if m := GRANIT_REFERENCE_RE.search(block_text):
             fields['reference'] = m.group(1).strip()
-        elif m := re.search(r'Nem strukturált közlemény:\s*([^\n]+)', block_text):
+        elif m := GRANIT_UNSTRUCTURED_REFERENCE_RE.search(block_text):
             fields['reference'] = m.group(1).strip()
 
     def _parse_date(self, date_str: str) -> date:
@@ -548,7 +588,7 @@ class GranitBankAdapter(BankStatementAdapter):
     def _clean_amount(self, amount_str: str) -> Decimal:
         """Convert Hungarian number format to Decimal."""
         cleaned = amount_str.replace(' ', '').replace(',', '.')
-        cleaned = re.sub(r'[^\d.\-]', '', cleaned)
+        cleaned = GRANIT_AMOUNT_STRIP_RE.sub('', cleaned)
         try:
             return Decimal(cleaned)
         except:
@@ -24,10 +24,43 @@ from .base import (
     NormalizedTransaction,
     StatementMetadata,
     BankStatementParseError,
+    LineClassifier,
 )
 
 logger = logging.getLogger(__name__)
 
+# Line kinds on transaction pages (one regex call per line)
+KH_LINE_CLASSIFIER = LineClassifier(
+    {'transaction_start': r'\d{4}\.\d{2}\.\d{2}'},
+    markers={'summary': ('Könyvelt nyitóegyenleg', 'Jóváírás összesen')},
+)
+
+# Transaction block patterns, compiled once per process
+KH_FIRST_LINE_RE = re.compile(
+    r'^(\d{4}\.\d{2}\.\d{2})\s+(\d{4}\.\d{2}\.\d{2})\s+(.+?)\s+(-\s*[\d\s]+|[\d\s]+)$'
+)
+KH_ORIGINAL_EUR_RE = re.compile(r'Eredeti összeg:\s*([\d\s.,]+)\s+EUR')
+KH_REF_RE = re.compile(r'Ref\.:\s*(\S+)')
+KH_SZLA_RE = re.compile(
+    r'Szla\.:\s*([A-Z]{2}\d+[\d\s]*)[,\s]+(.*?)(?=\s+(?:Közl\.|Hiv\.|Tr\. azon\.|Árf\.|$))',
+    re.DOTALL
+)
+KH_KOZL_RE = re.compile(r'Közl\.:\s*([^Hiv:Tr\.Árf:]+)')
+KH_HIV_RE = re.compile(r'Hiv\.:\s*(\d+)')
+KH_TR_RE = re.compile(r'Tr\. azon\.:\s*(\S+)')
+KH_ARF_RE = re.compile(r'Árf\.:\s*([\d.,]+)\s+HUF/(\w+)')
+KH_ORIGINAL_AMOUNT_RE = re.compile(r'Eredeti összeg:\s*([\d\s.,]+)\s+(\w+)')
+
+# Statement metadata patterns (page 2 header, last page summary)
+KH_ACCOUNT_RE = re.compile(r'Számlaszám:\s*([\d-]+)')
+KH_IBAN_RE = re.compile(r'Nemzetközi számlaszám \(IBAN\):\s*(HU\d{2}[\d\s]+)')
+KH_PERIOD_RE = re.compile(r'Időszak:\s*(\d{4}\.\d{2}\.\d{2})-(\d{4}\.\d{2}\.\d{2})')
+KH_STATEMENT_NUMBER_RE = re.compile(r'Kivonat sorszám:\s*(\S+)')
+KH_OPENING_BALANCE_RE = re.compile(r'Könyvelt nyitóegyenleg:\s*([\d\s-]+)')
+KH_CLOSING_BALANCE_RE = re.compile(r'Könyvelt záróegyenleg:\s*([\d\s-]+)')
+KH_CREDIT_TOTAL_RE = re.compile(r'Jóváírás összesen:\s*([\d\s]+)')
+KH_DEBIT_TOTAL_RE = re.compile(r'Terhelés összesen:\s*-?\s*([\d\s]+)')
+
 
 class KHBankAdapter(BankStatementAdapter):
     """
@@ -123,17 +156,17 @@ class KHBankAdapter(BankStatementAdapter):
         text = pdf.pages[1].extract_text()
 
         # Account number
-        account_match = re.search(r'Számlaszám:\s*([\d-]+)', text)
+        account_match = KH_ACCOUNT_RE.search(text)
         if not account_match:
             raise BankStatementParseError("Could not find account number")
         account_number = self._clean_account_number(account_match.group(1))
 
         # IBAN
-        iban_match = re.search(r'Nemzetközi számlaszám \(IBAN\):\s*(HU\d{2}[\d\s]+)', text)
+        iban_match = KH_IBAN_RE.search(text)
         account_iban = self._clean_iban(iban_match.group(1)) if iban_match else ''
 
         # Statement period
-        period_match = re.search(r'Időszak:\s*(\d{4}\.\d{2}\.\d{2})-(\d{4}\.\d{2}\.\d{2})', text)
+        period_match = KH_PERIOD_RE.search(text)
         if not period_match:
             raise BankStatementParseError("Could not find statement period")
 
@@ -141,18 +174,18 @@ class KHBankAdapter(BankStatementAdapter):
         period_to = self._parse_date(period_match.group(2))
 
         # Statement number
-        statement_match = re.search(r'Kivonat sorszám:\s*(\S+)', text)
+        statement_match = KH_STATEMENT_NUMBER_RE.search(text)
         statement_number = statement_match.group(1) if statement_match else ''
 
         # Opening/Closing balances (from last page)
         last_page_text = pdf.pages[-1].extract_text()
 
-        opening_match = re.search(r'Könyvelt nyitóegyenleg:\s*([\d\s-]+)', last_page_text)
+        opening_match = KH_OPENING_BALANCE_RE.search(last_page_text)
         if not opening_match:
             raise BankStatementParseError("Could not find opening balance")
         opening_balance = self._clean_amount(opening_match.group(1))
 
-        closing_match = re.search(r'Könyvelt záróegyenleg:\s*([\d\s-]+)', last_page_text)
+        closing_match = KH_CLOSING_BALANCE_RE.search(last_page_text)
         if not closing_match:
             raise BankStatementParseError("Could not find closing balance")
 
@@ -166,8 +199,8 @@ class KHBankAdapter(BankStatementAdapter):
             logger.warning(f"Closing balance looks corrupted: {closing_balance}, calculating from totals")
 
             # Try to extract credit and debit totals
-            credit_match = re.search(r'Jóváírás összesen:\s*([\d\s]+)', last_page_text)
-            debit_match = re.search(r'Terhelés összesen:\s*-?\s*([\d\s]+)', last_page_text)
+            credit_match = KH_CREDIT_TOTAL_RE.search(last_page_text)
+            debit_match = KH_DEBIT_TOTAL_RE.search(last_page_text)
 
             if credit_match and debit_match:
                 total_credits = self._clean_amount(credit_match.group(1))
@@ -207,8 +240,10 @@ class KHBankAdapter(BankStatementAdapter):
         transactions = []
 
         # Extract text from all pages except first (cover page)
+        page_count = len(pdf.pages)
         for page_num, page in enumerate(pdf.pages[1:], start=2):
             text = page.extract_text()
+            self._report_page_progress(page_num, page_count)
             if not text:
                 continue
 
@@ -221,7 +256,7 @@ class KHBankAdapter(BankStatementAdapter):
                 line = lines[i].strip()
 
                 # Check if line starts with date (transaction start)
-                if re.match(r'^\d{4}\.\d{2}\.\d{2}', line):
+                if KH_LINE_CLASSIFIER.classify(line) == 'transaction_start':
                     # Collect this transaction and all following lines until next transaction
                     trans_lines = [line]
                     i += 1
@@ -230,9 +265,7 @@ class KHBankAdapter(BankStatementAdapter):
                     while i < len(lines):
                         next_line = lines[i].strip()
                         # Stop if we hit next transaction or balance summary
-                        if re.match(r'^\d{4}\.\d{2}\.\d{2}', next_line) or \
-                           'Könyvelt nyitóegyenleg' in next_line or \
-                           'Jóváírás összesen' in next_line:
+                        if KH_LINE_CLASSIFIER.classify(next_line):
                             break
                         if next_line:  # Skip empty lines
                             trans_lines.append(next_line)
@@ -268,10 +301,7 @@ class KHBankAdapter(BankStatementAdapter):
 
         # Parse first line: dates, type, amount
         # Pattern: YYYY.MM.DD YYYY.MM.DD Type [- Amount | Amount]
-        match = re.match(
-            r'^(\d{4}\.\d{2}\.\d{2})\s+(\d{4}\.\d{2}\.\d{2})\s+(.+?)\s+(-\s*[\d\s]+|[\d\s]+)$',
-            first_line
-        )
+        match = KH_FIRST_LINE_RE.match(first_line)
 
         if not match:
             logger.warning(f"Could not parse transaction first line: {first_line}")
@@ -294,7 +324,7 @@ class KHBankAdapter(BankStatementAdapter):
         # Check for foreign currency in text
         if 'EUR' in full_text:
             # Extract original amount for SEPA/foreign transactions
-            orig_match = re.search(r'Eredeti összeg:\s*([\d\s.,]+)\s+EUR', full_text)
+            orig_match = KH_ORIGINAL_EUR_RE.search(full_text)
             if orig_match:
                 # This is a multi-currency transaction
                 pass  # We'll handle this below
@@ -342,14 +372,14 @@ class KHBankAdapter(BankStatementAdapter):
         - Eredeti összeg: 14100.00 EUR (original amount in foreign currency)
         """
         # Transaction ID
-        ref_match = re.search(r'Ref\.:\s*(\S+)', text)
+        ref_match = KH_REF_RE.search(text)
         if ref_match:
             transaction.transaction_id = ref_match.group(1)
 
         # Beneficiary/Payer IBAN and name
         # Pattern: Szla.: HU... Name (may be multi-line)
         # Extract everything between IBAN and next keyword (Közl/Hiv/Tr/Árf)
-        szla_match = re.search(r'Szla\.:\s*([A-Z]{2}\d+[\d\s]*)[,\s]+(.*?)(?=\s+(?:Közl\.|Hiv\.|Tr\. azon\.|Árf\.|$))', text, re.DOTALL)
+        szla_match = KH_SZLA_RE.search(text)
         if szla_match:
             iban = self._clean_iban(szla_match.group(1))
             # Name may span multiple lines - clean it up
@@ -373,22 +403,22 @@ class KHBankAdapter(BankStatementAdapter):
                     transaction.payer_account_number = self._iban_to_account(iban)
 
         # Reference (Közlemény)
-        kozl_match = re.search(r'Közl\.:\s*([^Hiv:Tr\.Árf:]+)', text)
+        kozl_match = KH_KOZL_RE.search(text)
         if kozl_match:
             transaction.reference = kozl_match.group(1).strip()
 
         # Payment ID (Hivatkozási szám)
-        hiv_match = re.search(r'Hiv\.:\s*(\d+)', text)
+        hiv_match = KH_HIV_RE.search(text)
         if hiv_match:
             transaction.payment_id = hiv_match.group(1)
 
         # Transaction reference
-        tr_match = re.search(r'Tr\. azon\.:\s*(\S+)', text)
+        tr_match = KH_TR_RE.search(text)
         if tr_match:
             transaction.partner_id = tr_match.group(1)
 
         # Exchange rate and original amount (for foreign currency transactions)
-        arf_match = re.search(r'Árf\.:\s*([\d.,]+)\s+HUF/(\w+)', text)
+        arf_match = KH_ARF_RE.search(text)
         if arf_match:
             rate_str = arf_match.group(1).replace(',', '.')
             orig_currency = arf_match.group(2)
@@ -398,7 +428,9 @@ class KHBankAdapter(BankStatementAdapter):
                 pass
 
             # Extract original amount
-            orig_match = re.search(r'Eredeti összeg:\s*([\d\s.,]+)\s+' + orig_currency, text)
+            orig_match = next(
+                (m for m in KH_ORIGINAL_AMOUNT_RE.finditer(text) if m.group(2) == orig_currency), None
+            )
             if orig_match:
                 orig_amount_str = orig_match.group(1).replace(',', '.').replace(' ', '')
                 try:
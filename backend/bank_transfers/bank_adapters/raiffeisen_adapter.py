@@ -43,6 +43,69 @@ CHAR_FIXES = {
 }
 
 
+def _build_char_fix_table(fixes: Dict[str, str]) -> Dict[int, str]:
+    """
+    Build a str.translate table equivalent to applying the fixes one by one.
+
+    The replacements chain (e.g. '©' -> 'é' -> 'ö'), so each character is mapped
+    to the result of running it through all fixes in order.
+    """
+    table = {}
+    for bad_char in fixes:
+        fixed = bad_char
+        for old, new in fixes.items():
+            fixed = fixed.replace(old, new)
+        table[ord(bad_char)] = fixed
+    return table
+
+
+CHAR_FIX_TABLE = _build_char_fix_table(CHAR_FIXES)
+
+# Transaction block patterns, compiled once per process
+RAIFFEISEN_BLOCK_SPLIT_RE = re.compile(r'\n(?=\d{10}\s+\d{4}\.\d{2}\.\d{2}\.)')
+RAIFFEISEN_HEADER_RE = re.compile(r'(\d{10})\s+(\d{4}\.\d{2}\.\d{2}\.)\s+(.*?)\s+([\d\s.,\-]+)$')
+RAIFFEISEN_VALUE_DATE_RE = re.compile(r'(\d{4}\.\d{2}\.\d{2}\.)')
+RAIFFEISEN_CARD_NUMBER_RE = re.compile(r'(\d{6}X+\d{4})')
+ACRONYM_SPLIT_RE = re.compile(r'([A-Z]+)([A-Z][a-z])')
+CAMEL_CASE_SPLIT_RE = re.compile(r'([a-z])([A-Z])')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Transaction table section: PDF extraction may have encoding issues, so look for
+# "Kényvel©s" (or Könyvelés) and extract until the "összes" summary
+RAIFFEISEN_SECTION_RE = re.compile(
+    r'Kényvel©s.*?T©tel.*?azon\.(.*?)(?:összes|NYITÓ|Záró)', re.DOTALL | re.IGNORECASE
+)
+
+# Statement header (metadata) patterns; accented letters may come through
+# mis-encoded (see CHAR_FIXES)
+RAIFFEISEN_ACCOUNT_RE = re.compile(r'P©nzforgalmi\s*jelz[^\:]*:\s*([\d\s\-]+)')
+RAIFFEISEN_IBAN_RE = re.compile(r'IBAN:\s*(HU[\d\s]+)')
+RAIFFEISEN_PERIOD_RE = re.compile(r'T£rgyid[^\:]*:\s*.*?\s*-\s*([\d.]+)')
+RAIFFEISEN_STATEMENT_NUMBER_RE = re.compile(r'Kivonat\s*sorsz[^\:]*:\s*([^\n]+)')
+RAIFFEISEN_OPENING_BALANCE_RE = re.compile(r'Utols[ëö]\s*kivonat:\s*([\d.,]+)')
+RAIFFEISEN_CLOSING_BALANCE_RE = re.compile(r'Z[¶Á]R[øÓ]EGYENLEG:\s*([\d\s.,\-]+)')
+
+# Transaction detail patterns
+RAIFFEISEN_REFERENCE_RE = re.compile(r'Referencia:\s*([^\n]+)')
+RAIFFEISEN_KOZLEMENY_RE = re.compile(r'K[ézö]zlem[©é]ny:\s*([^\n]+)')
+RAIFFEISEN_PAYER_NAME_RE = re.compile(
+    r'[¶Á]tutal[ëó]\s*neve:\s*(.+?)(?:[¶Á]tutal[ëó]\s*sz[£á]mlasz[£á]ma:|Kedvezm[©é]nyezett|Referencia:|K[ézö]zlem[©é]ny:|$)',
+    re.DOTALL
+)
+RAIFFEISEN_PAYER_ACCOUNT_RE = re.compile(r'Átutaló\s+számlaszáma:\s*([^\n]+)')
+RAIFFEISEN_ACCOUNT_IBAN_RE = re.compile(r'\s*(HU[\d\s]+)')
+RAIFFEISEN_BENEFICIARY_NAME_RE = re.compile(
+    r'Kedvezm[©é]nyezett\s*neve:\s*(.+?)(?:Kedvezm[©é]nyezett\s*sz[£á]mlasz[£á]ma:|[¶Á]tutal[ëó]|Referencia:|K[ézö]zlem[©é]ny:|Elìjegyzett|$)',
+    re.DOTALL
+)
+RAIFFEISEN_BENEFICIARY_ACCOUNT_RE = re.compile(r'Kedvezményezett\s+számlaszáma:\s*([^\n]+)')
+# Label text left in front of a cleaned partner name
+RAIFFEISEN_PAYER_LABEL_RE = re.compile(r'^Átutaló\s*neve:\s*', re.IGNORECASE)
+RAIFFEISEN_BENEFICIARY_LABEL_RE = re.compile(r'^Kedvezményezett\s*neve:\s*', re.IGNORECASE)
+RAIFFEISEN_COUNTRY_CODE_RE = re.compile(r'Orsz£gkëd:\s*([A-Z]{2})')
+RAIFFEISEN_FEE_RE = re.compile(r'Előjegyzett\s+díj:\s*([\d\s.,]+)\s*HUF')
+
+
 class RaiffeisenBankAdapter(BankStatementAdapter):
     """
     Raiffeisen Bank Zrt. statement parser.
@@ -103,10 +166,12 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
 
             # Extract all text from all pages
             full_text = ""
-            for page in pdf_reader.pages:
+            page_count = len(pdf_reader.pages)
+            for page_num, page in enumerate(pdf_reader.pages, start=1):
                 page_text = page.extract_text()
                 if page_text:
                     full_text += page_text + "\n"
+                self._report_page_progress(page_num, page_count)
 
             if not full_text.strip():
                 raise BankStatementParseError("PDF contains no extractable text")
@@ -136,13 +201,13 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
 
         # Account number (Pénzforgalmi jelzőszám: 12042847 - 02101027 - 00100008)
         # Note: May appear as "P©nzforgalmi jelzìsz£m" due to encoding
-        if m := re.search(r'P©nzforgalmi\s*jelz[^\:]*:\s*([\d\s\-]+)', text):
+        if m := RAIFFEISEN_ACCOUNT_RE.search(text):
             account_raw = m.group(1).strip()
             metadata['account_number'] = account_raw.replace(' ', '')
 
         # IBAN (Nemzetközi bankszámlaszám IBAN: HU83 1204 2847 0210 1027 0010 0008)
         # Note: May appear as "Nemzetkézi banksz£mlasz£m IBAN" due to encoding
-        if m := re.search(r'IBAN:\s*(HU[\d\s]+)', text):
+        if m := RAIFFEISEN_IBAN_RE.search(text):
             iban_raw = m.group(1)
             iban_clean = ''.join(c for c in iban_raw if c.isalnum())
             if len(iban_clean) == 28 and iban_clean.startswith('HU'):
@@ -150,27 +215,27 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
 
         # Statement period (Tárgyidőszak: ... - 2025.12.31)
         # Note: May appear as "T£rgyidìszak" due to encoding
-        if m := re.search(r'T£rgyid[^\:]*:\s*.*?\s*-\s*([\d.]+)', text):
+        if m := RAIFFEISEN_PERIOD_RE.search(text):
             metadata['period_to'] = self._parse_date(m.group(1))
             # Period start might be missing, use opening balance date or first transaction date
             metadata['period_from'] = metadata['period_to']  # Will adjust later if needed
 
         # Statement number (Kivonat sorsz.: 2025/0000001)
         # Note: May appear as "Kivonat sorsz£m" due to encoding
-        if m := re.search(r'Kivonat\s*sorsz[^\:]*:\s*([^\n]+)', text):
+        if m := RAIFFEISEN_STATEMENT_NUMBER_RE.search(text):
             metadata['statement_number'] = m.group(1).strip()
 
         # Opening balance (Utolsó kivonat: 0000.00.00 indicates 0)
         # Note: May appear as "Utolsë kivonat" due to encoding
         metadata['opening_balance'] = Decimal('0.00')
-        if m := re.search(r'Utols[ëö]\s*kivonat:\s*([\d.,]+)', text):
+        if m := RAIFFEISEN_OPENING_BALANCE_RE.search(text):
             balance_str = m.group(1).strip()
             if balance_str != '0000.00.00':
                 metadata['opening_balance'] = self._clean_amount(balance_str)
 
         # Closing balance (ZÁRÓEGYENLEG: 2.369.738,31)
         # Note: May appear as "Z¶RøEGYENLEG" due to encoding
-        if m := re.search(r'Z[¶Á]R[øÓ]EGYENLEG:\s*([\d\s.,\-]+)', text):
+        if m := RAIFFEISEN_CLOSING_BALANCE_RE.search(text):
             metadata['closing_balance'] = self._clean_amount(m.group(1))
 
         return StatementMetadata(
@@ -198,11 +263,7 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
         transactions = []
 
         # Find the transactions section (starts after "Könyvelés" header)
-        # Note: PDF extraction may have encoding issues, so use flexible pattern
-        # Pattern: Look for "Kényvel©s" (or Könyvelés) and extract until "összes" summary
-        section_pattern = r'Kényvel©s.*?T©tel.*?azon\.(.*?)(?:összes|NYITÓ|Záró)'
-
-        section_match = re.search(section_pattern, text, re.DOTALL | re.IGNORECASE)
+        section_match = RAIFFEISEN_SECTION_RE.search(text)
         if not section_match:
             logger.warning("Could not find transaction section in statement")
             return transactions
@@ -211,7 +272,7 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
 
         # Split by transaction ID pattern (10 digits at start of line)
         # Transaction ID pattern: 5365333444 2025.12.05. ...
-        tx_blocks = re.split(r'\n(?=\d{10}\s+\d{4}\.\d{2}\.\d{2}\.)', transaction_text)
+        tx_blocks = RAIFFEISEN_BLOCK_SPLIT_RE.split(transaction_text)
 
         for block in tx_blocks:
             block = block.strip()
@@ -246,10 +307,7 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
         first_line = lines[0].strip()
 
         # Pattern: [TX_ID] [BOOKING_DATE] [TYPE] [DEBIT or CREDIT]
-        header_match = re.match(
-            r'(\d{10})\s+(\d{4}\.\d{2}\.\d{2}\.)\s+(.*?)\s+([\d\s.,\-]+)$',
-            first_line
-        )
+        header_match = RAIFFEISEN_HEADER_RE.match(first_line)
 
         if not header_match:
             logger.debug(f"Could not parse transaction header: {first_line}")
@@ -277,7 +335,7 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
         value_date = booking_date  # Default to booking date
         if len(lines) > 1:
             second_line = lines[1].strip()
-            if value_date_match := re.match(r'(\d{4}\.\d{2}\.\d{2}\.)', second_line):
+            if value_date_match := RAIFFEISEN_VALUE_DATE_RE.match(second_line):
                 value_date = self._parse_date(value_date_match.group(1)) or booking_date
 
         # Extract details from remaining lines
@@ -342,18 +400,18 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
         details = {}
 
         # Referencia (bank reference number)
-        if m := re.search(r'Referencia:\s*([^\n]+)', details_text):
+        if m := RAIFFEISEN_REFERENCE_RE.search(details_text):
             details['reference'] = self._clean_text(m.group(1).strip())
 
         # Közlemény (payment reference - CRITICAL for invoice matching)
         # Note: May appear as "Kézlem©ny" due to encoding
-        if m := re.search(r'K[ézö]zlem[©é]ny:\s*([^\n]+)', details_text):
+        if m := RAIFFEISEN_KOZLEMENY_RE.search(details_text):
             details['kozlemeny'] = self._clean_text(m.group(1).strip())
 
         # Átutaló details (for incoming transfers)
         # Note: May appear as "¶tutalë" or "¶tutalëneve:" (no spaces) due to encoding
         # Company names may span multiple lines (e.g., "Danubius Expert Consulting Z\nrt.")
-        if m := re.search(r'[¶Á]tutal[ëó]\s*neve:\s*(.+?)(?:[¶Á]tutal[ëó]\s*sz[£á]mlasz[£á]ma:|Kedvezm[©é]nyezett|Referencia:|K[ézö]zlem[©é]ny:|$)', details_text, re.DOTALL):
+        if m := RAIFFEISEN_PAYER_NAME_RE.search(details_text):
             payer_name = m.group(1).strip()
 
             # Handle multi-line names: join lines intelligently
@@ -370,30 +428,30 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
 
             # Add spaces to CamelCase names (PyPDF2 already preserves word spacing for all-caps)
             # Handle acronyms: "ITCardigan" -> "IT Cardigan"
-            payer_name = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', payer_name)
+            payer_name = ACRONYM_SPLIT_RE.sub(r'\1 \2', payer_name)
             # Then handle regular camelCase: "DanubiusExpert" -> "Danubius Expert"
-            payer_name = re.sub(r'([a-z])([A-Z])', r'\1 \2', payer_name)
+            payer_name = CAMEL_CASE_SPLIT_RE.sub(r'\1 \2', payer_name)
             # Clean up double spaces
-            payer_name = re.sub(r'\s+', ' ', payer_name).strip()
+            payer_name = WHITESPACE_RE.sub(' ', payer_name).strip()
 
             # Clean encoding issues
             payer_name = self._clean_text(payer_name)
             # Remove any label text that might be included after cleaning
-            payer_name = re.sub(r'^Átutaló\s*neve:\s*', '', payer_name, flags=re.IGNORECASE).strip()
+            payer_name = RAIFFEISEN_PAYER_LABEL_RE.sub('', payer_name).strip()
             details['atutalo_neve'] = payer_name
             details['partner_name'] = payer_name  # For display
 
-        if m := re.search(r'Átutaló\s+számlaszáma:\s*([^\n]+)', details_text):
+        if m := RAIFFEISEN_PAYER_ACCOUNT_RE.search(details_text):
             # Account number might span multiple lines
             account_start = m.end()
             account_text = details_text[account_start:account_start+100]
-            if account_match := re.match(r'\s*(HU[\d\s]+)', account_text):
+            if account_match := RAIFFEISEN_ACCOUNT_IBAN_RE.match(account_text):
                 details['atutalo_szamlaszama'] = self._clean_iban(account_match.group(1))
 
         # Kedvezményezett details (for outgoing transfers)
         # Note: May appear as "Kedvezm©nyezettneve:" (no spaces) due to encoding
         # Company names may span multiple lines (e.g., "Danubius Expert Consulting Z\nrt.")
-        if m := re.search(r'Kedvezm[©é]nyezett\s*neve:\s*(.+?)(?:Kedvezm[©é]nyezett\s*sz[£á]mlasz[£á]ma:|[¶Á]tutal[ëó]|Referencia:|K[ézö]zlem[©é]ny:|Elìjegyzett|$)', details_text, re.DOTALL):
+        if m := RAIFFEISEN_BENEFICIARY_NAME_RE.search(details_text):
             beneficiary_name = m.group(1).strip()
 
             # Handle multi-line names: join lines intelligently
@@ -410,28 +468,28 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
 
             # Add spaces to CamelCase names (PyPDF2 already preserves word spacing for all-caps)
             # Handle acronyms: "ITCardigan" -> "IT Cardigan"
-            beneficiary_name = re.sub(r'([A-Z]+)([A-Z][a-z])', r'\1 \2', beneficiary_name)
+            beneficiary_name = ACRONYM_SPLIT_RE.sub(r'\1 \2', beneficiary_name)
             # Then handle regular camelCase: "DanubiusExpert" -> "Danubius Expert"
-            beneficiary_name = re.sub(r'([a-z])([A-Z])', r'\1 \2', beneficiary_name)
+            beneficiary_name = CAMEL_CASE_SPLIT_RE.sub(r'\1 \2', beneficiary_name)
             # Clean up double spaces
-            beneficiary_name = re.sub(r'\s+', ' ', beneficiary_name).strip()
+            beneficiary_name = WHITESPACE_RE.sub(' ', beneficiary_name).strip()
 
             # Clean encoding issues
             beneficiary_name = self._clean_text(beneficiary_name)
             # Remove any label text that might be included after cleaning
-            beneficiary_name = re.sub(r'^Kedvezményezett\s*neve:\s*', '', beneficiary_name, flags=re.IGNORECASE).strip()
+            beneficiary_name = RAIFFEISEN_BENEFICIARY_LABEL_RE.sub('', beneficiary_name).strip()
             details['kedvezmenyezett_neve'] = beneficiary_name
             details['partner_name'] = beneficiary_name  # For display
 
-        if m := re.search(r'Kedvezményezett\s+számlaszáma:\s*([^\n]+)', details_text):
+        if m := RAIFFEISEN_BENEFICIARY_ACCOUNT_RE.search(details_text):
             account_start = m.end()
             account_text = details_text[account_start:account_start+100]
-            if account_match := re.match(r'\s*(HU[\d\s]+)', account_text):
+            if account_match := RAIFFEISEN_ACCOUNT_IBAN_RE.match(account_text):
                 details['kedvezmenyezett_szamlaszama'] = self._clean_iban(account_match.group(1))
 
         # Card transaction details
         # Check for card number pattern (e.g., "402115XXXXXX1446")
-        card_number_match = re.search(r'(\d{6}X+\d{4})', details_text)
+        card_number_match = RAIFFEISEN_CARD_NUMBER_RE.search(details_text)
 
         if card_number_match:
             # This is a card transaction
@@ -444,7 +502,7 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
                 if 'Referencia' in line and i + 1 < len(lines):
                     merchant_line = lines[i + 1].strip()
                     # Skip if it's a card number line or other transaction field
-                    if merchant_line and not merchant_line.startswith(('HU', 'Orsz£gkëd', 'Kedvezm', '¶tutal', 'Átutal')) and not re.match(r'\d{6}X+\d{4}', merchant_line):
+                    if merchant_line and not merchant_line.startswith(('HU', 'Orsz£gkëd', 'Kedvezm', '¶tutal', 'Átutal')) and not RAIFFEISEN_CARD_NUMBER_RE.match(merchant_line):
                         # This is the merchant name
                         details['merchant_name'] = merchant_line
                         # CRITICAL: Also set as reference for UI display (matches Gránit behavior)
@@ -452,11 +510,11 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
                         break
 
             # Country code
-            if m := re.search(r'Orsz£gkëd:\s*([A-Z]{2})', details_text):
+            if m := RAIFFEISEN_COUNTRY_CODE_RE.search(details_text):
                 details['merchant_location'] = m.group(1)
 
         # Előjegyzett díj (pre-booked fee)
-        if m := re.search(r'Előjegyzett\s+díj:\s*([\d\s.,]+)\s*HUF', details_text):
+        if m := RAIFFEISEN_FEE_RE.search(details_text):
             details['fee_amount'] = self._clean_amount(m.group(1))
 
         return details
@@ -503,11 +561,7 @@ class RaiffeisenBankAdapter(BankStatementAdapter):
         if not text:
             return ''
 
-        cleaned = text
-        for bad_char, good_char in CHAR_FIXES.items():
-            cleaned = cleaned.replace(bad_char, good_char)
-
-        return cleaned
+        return text.translate(CHAR_FIX_TABLE)
 
     def _parse_date(self, date_str: str) -> Optional[date]:
         """
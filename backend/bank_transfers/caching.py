@@ -0,0 +1,111 @@
+"""
+Cache-aside helpers on top of Django's cache framework.
+
+Keys carry a version token per namespace (and per company or user for scoped
+data). Invalidation replaces the token instead of deleting keys, so it works the
+same on every backend (local memory, file, Redis) and old entries simply expire.
+
+    stats = cached_for_company(company.id, 'invoice_stats', compute_stats)
+    invalidate_company_namespace(company.id, 'invoice_stats')
+
+Invalidation is wired to model signals in signals.py.
+"""
+import uuid
+
+from django.core.cache import cache
+
+# Cache namespaces
+INVOICE_STATS = 'invoice_stats'
+EXCHANGE_RATES = 'exchange_rates'
+SUPPORTED_BANKS = 'supported_banks'
+BASE_TABLES = 'base_tables'
+FEATURES = 'features'
+COMPANY_CONTEXT = 'company_context'
+
+_MISSING = object()
+
+
+def _company_scope(company_id):
+    return f"company:{company_id}"
+
+
+def _user_scope(user_id):
+    return f"user:{user_id}"
+
+
+def _version_key(namespace, scope=None):
+    if scope is None:
+        return f"version:{namespace}"
+    return f"version:{scope}:{namespace}"
+
+
+def _current_version(namespace, scope=None):
+    return cache.get_or_set(_version_key(namespace, scope), lambda: uuid.uuid4().hex, None)
+
+
+def _build_key(namespace, scope, parts):
+    prefix = namespace if scope is None else f"{scope}:{namespace}"
+    suffix = ":".join(str(part) for part in parts)
+    return f"{prefix}:{_current_version(namespace, scope)}:{suffix}"
+
+
+def _get_or_compute(namespace, scope, parts, compute, timeout):
+    key = _build_key(namespace, scope, parts)
+    value = cache.get(key, _MISSING)
+    if value is _MISSING:
+        value = compute()
+        cache.set(key, value, cache.default_timeout if timeout is None else timeout)
+    return value
+
+
+def cached(namespace, compute, *parts, timeout=None):
+    """
+    Return the cached value for a global namespace, computing and storing it on a miss.
+
+    Args:
+        namespace: Cache namespace (invalidated together)
+        compute: Callable producing the value (must be picklable)
+        *parts: Extra key parts (e.g. currency list)
+        timeout: Seconds to keep the value (None: the backend's default TIMEOUT)
+    """
+    return _get_or_compute(namespace, None, parts, compute, timeout)
+
+
+def cached_for_company(company_id, namespace, compute, *parts, timeout=None):
+    """Company-scoped variant of cached(); keys never collide between companies"""
+    return _get_or_compute(namespace, _company_scope(company_id), parts, compute, timeout)
+
+
+def namespace_version(namespace):
+    """
+    Current version token of a global namespace.
+
+    Lets process-local structures (e.g. the exchange rate table) notice an
+    invalidation done through invalidate_namespace().
+    """
+    return _current_version(namespace)
+
+
+def company_namespace_version(company_id, namespace):
+    """Current version token of a company's namespace (see namespace_version())"""
+    return _current_version(namespace, _company_scope(company_id))
+
+
+def user_namespace_version(user_id, namespace):
+    """Current version token of a user's namespace (see namespace_version())"""
+    return _current_version(namespace, _user_scope(user_id))
+
+
+def invalidate_namespace(namespace):
+    """Invalidate every entry of a global namespace"""
+    cache.set(_version_key(namespace), uuid.uuid4().hex, None)
+
+
+def invalidate_company_namespace(company_id, namespace):
+    """Invalidate every entry of a company's namespace"""
+    cache.set(_version_key(namespace, _company_scope(company_id)), uuid.uuid4().hex, None)
+
+
+def invalidate_user_namespace(user_id, namespace):
+    """Invalidate every entry of a user's namespace"""
+    cache.set(_version_key(namespace, _user_scope(user_id)), uuid.uuid4().hex, None)
@@ -9,6 +9,7 @@ import django_filters
 from django.db import models
 from datetime import date
 from ..models import Invoice
+from ..search import search_invoices
 
 
 class InvoiceFilterSet(django_filters.FilterSet):
@@ -162,18 +163,11 @@ class InvoiceFilterSet(django_filters.FilterSet):
         - Supplier/customer names
         - Supplier/customer tax numbers
         - Original invoice number
-        """
-        if not value:
-            return queryset
 
-        return queryset.filter(
-            models.Q(nav_invoice_number__icontains=value) |
-            models.Q(supplier_name__icontains=value) |
-            models.Q(customer_name__icontains=value) |
-            models.Q(supplier_tax_number__icontains=value) |
-            models.Q(customer_tax_number__icontains=value) |
-            models.Q(original_invoice_number__icontains=value)
-        )
+        Case insensitive; numbers match by prefix, names by accent-folded
+        substring (see bank_transfers.search).
+        """
+        return search_invoices(queryset, value)
 
     def filter_hide_storno(self, queryset, name, value):
         """
@@ -101,6 +101,50 @@ class KHBankExporter:
         
         return "\n".join(lines)
     
+    def partition_transfers(self, transfers: List[Transfer]) -> List[List[Transfer]]:
+        """
+        Split transfers into chunks of at most max_transfers for separate files
+        
+        The input order is kept. Consecutive transfers with the same execution date
+        stay in one file unless the group itself is larger than the limit, so a
+        chunk boundary never falls inside a date group that would fit whole.
+        
+        Args:
+            transfers: Transfer objects ordered by order/execution_date
+            
+        Returns:
+            List of transfer chunks
+        """
+        chunks = []
+        current = []
+        
+        for group in self._execution_date_groups(transfers):
+            if len(current) + len(group) > self.max_transfers and current:
+                chunks.append(current)
+                current = []
+            
+            # Groups larger than the limit are split into full chunks
+            while len(group) > self.max_transfers:
+                chunks.append(group[:self.max_transfers])
+                group = group[self.max_transfers:]
+            current.extend(group)
+        
+        if current:
+            chunks.append(current)
+        
+        return chunks
+    
+    @staticmethod
+    def _execution_date_groups(transfers: List[Transfer]) -> List[List[Transfer]]:
+        """Group consecutive transfers sharing the same execution date"""
+        groups = []
+        for transfer in transfers:
+            if groups and groups[-1][-1].execution_date == transfer.execution_date:
+                groups[-1].append(transfer)
+            else:
+                groups.append([transfer])
+        return groups
+    
     def generate_kh_export_encoded(self, transfers: List[Transfer]) -> bytes:
         """
         Generate KH Bank .HUF.csv file content with ISO-8859-2 encoding
@@ -0,0 +1,59 @@
+"""
+Management command to process queued bank statement uploads.
+
+Usage:
+    python manage.py process_bank_statements
+    python manage.py process_bank_statements --company-id 1
+
+Statements uploaded via the async upload endpoint are normally processed by the
+in-process worker pool. This command picks up statements still waiting in
+UPLOADED status (e.g. after a server restart) and statements abandoned in
+PARSING/MATCHING for longer than BANK_STATEMENT_STALE_AFTER seconds, and
+processes them concurrently.
+"""
+
+from django.core.management.base import BaseCommand
+from bank_transfers.services.bank_statement_worker import claimable_statements, submit_statement
+
+
+class Command(BaseCommand):
+    help = 'Process bank statements waiting in UPLOADED status or abandoned while processing'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=int,
+            help='Only process statements of this company'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        statements = claimable_statements().order_by('uploaded_at')
+        if options.get('company_id'):
+            statements = statements.filter(company_id=options['company_id'])
+
+        statement_ids = list(statements.values_list('id', flat=True))
+        self.stdout.write(f"Found {len(statement_ids)} statements waiting for processing")
+
+        futures = [submit_statement(statement_id) for statement_id in statement_ids]
+
+        parsed_count = 0
+        for future in futures:
+            statement = future.result()
+            if statement is None:
+                continue
+
+            if statement.status == 'PARSED':
+                parsed_count += 1
+                self.stdout.write(
+                    f"Processed statement {statement.id}: "
+                    f"{statement.total_transactions} transactions, {statement.matched_count} matched"
+                )
+            else:
+                self.stdout.write(
+                    self.style.ERROR(f"Statement {statement.id} failed: {statement.parse_error}")
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\nSuccessfully processed {parsed_count}/{len(statement_ids)} statements")
+        )
@@ -0,0 +1,44 @@
+"""
+Management command to rebuild the materialised invoice statistics.
+
+Usage:
+    python manage.py rebuild_invoice_statistics
+    python manage.py rebuild_invoice_statistics --company-id 1
+
+The InvoiceStatistics buckets are kept up to date by signals when
+INVOICE_STATS_MATERIALIZED is enabled. Run this command after enabling the
+setting or after bulk changes that bypass model signals (e.g. raw SQL).
+"""
+
+from django.core.management.base import BaseCommand
+from bank_transfers.caching import INVOICE_STATS, invalidate_company_namespace
+from bank_transfers.models import Company
+from bank_transfers.services.invoice_statistics_service import InvoiceStatisticsService
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialised invoice statistics from the invoice table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--company-id',
+            type=int,
+            help='Only rebuild the statistics of this company'
+        )
+
+    def handle(self, *args, **options):
+        """Execute the command."""
+        companies = Company.objects.order_by('id')
+        if options.get('company_id'):
+            companies = companies.filter(id=options['company_id'])
+
+        rebuilt_count = 0
+        for company in companies:
+            rows = InvoiceStatisticsService.rebuild(company)
+            invalidate_company_namespace(company.id, INVOICE_STATS)
+            rebuilt_count += 1
+            self.stdout.write(f"Rebuilt {company.name}: {len(rows)} buckets")
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\nSuccessfully rebuilt statistics of {rebuilt_count} companies")
+        )
@@ -139,6 +139,7 @@ class Command(BaseCommand):
         self.stdout.write(f'  Invoices processed: {result["invoices_processed"]}')
         self.stdout.write(f'  Created: {result["invoices_created"]}')
         self.stdout.write(f'  Updated: {result["invoices_updated"]}')
+        self.stdout.write(f'  Unchanged: {result["invoices_unchanged"]}')
 
         if result['invoices_skipped'] > 0:
             self.stdout.write(
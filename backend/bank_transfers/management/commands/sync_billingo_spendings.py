@@ -4,13 +4,17 @@ Django management command to sync Billingo spendings from API.
 Usage:
     python manage.py sync_billingo_spendings
     python manage.py sync_billingo_spendings --company-id=1
+
+Incremental runs fetch spendings from the last sync date (high-water mark) minus
+an overlap window; full runs fetch everything and delete local spendings that no
+longer exist in Billingo. Pages are fetched concurrently and written in bulk,
+skipping spendings whose content hash has not changed.
 """
 
-import requests
 import logging
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, Iterable, List, Optional
 from django.core.management.base import BaseCommand
 from django.db import transaction
 from django.utils import timezone
@@ -20,6 +24,11 @@ from bank_transfers.models import (
     CompanyBillingoSettings,
     BillingoSpending
 )
+from bank_transfers.services.billingo_sync_service import (
+    BillingoSyncService,
+    BillingoRateLimiter,
+    BillingoNotFoundError
+)
 from bank_transfers.services.credential_manager import CredentialManager
 
 logger = logging.getLogger(__name__)
@@ -28,6 +37,10 @@ logger = logging.getLogger(__name__)
 class Command(BaseCommand):
     help = 'Sync Billingo spendings from API'
 
+    PER_PAGE = 100  # Max allowed by Billingo API
+    OVERLAP_DAYS = 30  # Re-fetched window before the last sync date
+    BULK_BATCH_SIZE = 500
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--company-id',
@@ -80,202 +93,118 @@ class Command(BaseCommand):
         try:
             settings = company.billingo_settings.first()
             if not settings or not settings.is_active:
-                return {
-                    'created': 0,
-                    'updated': 0,
-                    'skipped': 0,
-                    'error': 'No active Billingo settings'
-                }
+                return self._empty_result('No active Billingo settings')
 
             # Get decrypted API key
             if not settings.api_key:
-                return {
-                    'created': 0,
-                    'updated': 0,
-                    'skipped': 0,
-                    'error': 'No API key configured'
-                }
+                return self._empty_result('No API key configured')
 
             credential_manager = CredentialManager()
             api_key = credential_manager.decrypt_credential(settings.api_key)
 
-            # Delete existing spendings for full sync
-            if full_sync:
-                deleted_count = BillingoSpending.objects.filter(company=company).count()
-                BillingoSpending.objects.filter(company=company).delete()
-                self.stdout.write(self.style.WARNING(
-                    f"Full sync: Deleted {deleted_count} existing spendings for {company.name}"
-                ))
-
-            # Determine start date for partial sync
+            # Determine start date for partial sync from the high-water mark
             start_date = None
             if not full_sync:
-                from datetime import timedelta
-                # Use last sync date minus 30 days for overlap window
                 if settings.last_billingo_spending_sync_date:
-                    start_date = settings.last_billingo_spending_sync_date - timedelta(days=30)
+                    start_date = settings.last_billingo_spending_sync_date - timedelta(days=self.OVERLAP_DAYS)
                 else:
                     # First sync: get last 30 days
-                    start_date = date.today() - timedelta(days=30)
+                    start_date = date.today() - timedelta(days=self.OVERLAP_DAYS)
 
             # Fetch spendings from Billingo API
             spendings = self.fetch_spendings_from_api(api_key, start_date=start_date)
+            if spendings is None:
+                # Endpoint not available for this account - nothing to reconcile against
+                return self._empty_result(None)
+
+            result = self.upsert_spendings(company, spendings)
 
-            if not spendings:
-                return {
-                    'created': 0,
-                    'updated': 0,
-                    'skipped': 0,
-                    'error': None
-                }
-
-            # Store spendings in database
-            created = 0
-            updated = 0
-            skipped = 0
-
-            for spending_data in spendings:
-                try:
-                    spending_id = spending_data.get('id')
-
-                    # Check if spending already exists
-                    existing = BillingoSpending.objects.filter(
-                        id=spending_id,
-                        company=company
-                    ).first()
-
-                    spending_obj = self.create_or_update_spending(
-                        spending_data,
-                        company,
-                        existing
-                    )
-
-                    if existing:
-                        updated += 1
-                    else:
-                        created += 1
-
-                except Exception as e:
-                    logger.error(f"Error processing spending {spending_data.get('id')}: {e}")
-                    skipped += 1
+            # Full sync saw every upstream spending: drop local rows missing upstream
+            if full_sync:
+                result['deleted'] = self.reconcile_spendings(
+                    company, {spending_data.get('id') for spending_data in spendings}
+                )
+                if result['deleted']:
+                    self.stdout.write(self.style.WARNING(
+                        f"Full sync: Deleted {result['deleted']} spendings removed from Billingo for {company.name}"
+                    ))
 
             # Update last sync date
             settings.last_billingo_spending_sync_date = date.today()
             settings.save(update_fields=['last_billingo_spending_sync_date'])
 
-            return {
-                'created': created,
-                'updated': updated,
-                'skipped': skipped,
-                'error': None
-            }
+            return result
 
         except Exception as e:
             logger.error(f"Error syncing spendings for company {company.name}: {e}", exc_info=True)
-            return {
-                'created': 0,
-                'updated': 0,
-                'skipped': 0,
-                'error': str(e)
-            }
-
-    def fetch_spendings_from_api(self, api_key: str, start_date: Optional[date] = None) -> list:
+            return self._empty_result(str(e))
+
+    @staticmethod
+    def _empty_result(error: Optional[str]) -> Dict:
+        return {
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'deleted': 0,
+            'skipped': 0,
+            'error': error
+        }
+
+    def fetch_spendings_from_api(self, api_key: str, start_date: Optional[date] = None) -> Optional[List[Dict]]:
         """Fetch spendings from Billingo API with pagination.
 
+        The first page tells the number of pages; the remaining pages are fetched
+        concurrently over one pooled session.
+
         Args:
             api_key: Billingo API key
             start_date: Optional start date for filtering (partial sync)
                        If None, fetches all spendings (full sync)
-        """
-        base_url = "https://api.billingo.hu/v3"
-        headers = {
-            "X-API-KEY": api_key,
-            "Accept": "application/json"
-        }
 
-        all_spendings = []
-        page = 1
-        per_page = 100  # Max allowed by Billingo API
+        Returns:
+            List of spending dicts, or None if the spendings endpoint is not
+            available for the account (404).
 
-        while True:
-            try:
-                # Build query parameters
-                params = {
-                    'page': page,
-                    'per_page': per_page
-                }
-
-                # Add start_date filter for partial sync
-                if start_date:
-                    params['start_date'] = start_date.strftime('%Y-%m-%d')
-                    self.stdout.write(f"Fetching spendings from {start_date} onwards (partial sync)")
-                else:
-                    self.stdout.write("Fetching ALL spendings (full sync)")
-
-                # Log the outgoing request
-                url = f"{base_url}/spendings"
-                logger.info(f"Billingo API Request: GET {url}")
-                logger.info(f"Billingo API Params: {params}")
-                logger.debug(f"Billingo API Headers: {dict(headers) | {'X-API-KEY': '***REDACTED***'}}")
-
-                response = requests.get(
-                    url,
-                    headers=headers,
-                    params=params,
-                    timeout=30
-                )
+        Raises:
+            BillingoAPIError: If a page cannot be fetched (no partial results are
+                returned, so a full sync never reconciles against an incomplete list)
+        """
+        service = BillingoSyncService()
+        rate_limiter = BillingoRateLimiter(service.MIN_REQUEST_INTERVAL)
 
-                # Log the response
-                logger.info(f"Billingo API Response: Status {response.status_code}, Page {page}")
+        params = {'per_page': self.PER_PAGE}
+        if start_date:
+            params['start_date'] = start_date.strftime('%Y-%m-%d')
+            self.stdout.write(f"Fetching spendings from {start_date} onwards (partial sync)")
+        else:
+            self.stdout.write("Fetching ALL spendings (full sync)")
 
-                if response.status_code == 404:
-                    # Endpoint might not exist or no data
-                    self.stdout.write(self.style.WARNING(
-                        "Spendings endpoint returned 404 (might not be available or no data)"
-                    ))
-                    break
-
-                response.raise_for_status()
-                data = response.json()
-
-                # Handle pagination
-                if isinstance(data, dict) and 'data' in data:
-                    spendings = data['data']
-                    all_spendings.extend(spendings)
-
-                    # Check if there are more pages
-                    if len(spendings) < per_page:
-                        break
-                    page += 1
-                elif isinstance(data, list):
-                    all_spendings.extend(data)
-                    break
-                else:
-                    break
+        with service.create_session(api_key) as session:
+            def fetch_page(page):
+                logger.info(f"Billingo API Request: GET /spendings page {page}, params: {params}")
+                return service.get_json(session, rate_limiter, '/spendings', {**params, 'page': page})
 
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 404:
-                    self.stdout.write(self.style.WARNING(
-                        "Spendings endpoint not found (might not be available for this account)"
-                    ))
-                else:
-                    logger.error(f"HTTP error fetching spendings: {e}")
-                break
-            except Exception as e:
-                logger.error(f"Error fetching spendings from API: {e}")
-                break
+            try:
+                data = fetch_page(1)
+            except BillingoNotFoundError:
+                self.stdout.write(self.style.WARNING(
+                    "Spendings endpoint returned 404 (might not be available or no data)"
+                ))
+                return None
+
+            if isinstance(data, list):
+                all_spendings = data
+            else:
+                all_spendings = list(data.get('data', []))
+                last_page = data.get('last_page', 1)
+                for page_data in service.fetch_pages_concurrently(fetch_page, range(2, last_page + 1)):
+                    all_spendings.extend(page_data.get('data', []))
 
         self.stdout.write(f"Fetched {len(all_spendings)} spendings from Billingo API")
         return all_spendings
 
-    @transaction.atomic
-    def create_or_update_spending(
-        self,
-        data: Dict,
-        company: Company,
-        existing: Optional[BillingoSpending] = None
-    ) -> BillingoSpending:
-        """Create or update a BillingoSpending record."""
+    def spending_fields(self, data: Dict) -> Dict:
+        """BillingoSpending field values from the API payload of a spending."""
 
         # Parse dates
         def parse_date(date_str):
@@ -286,9 +215,7 @@ class Command(BaseCommand):
             except:
                 return None
 
-        spending_data = {
-            'id': data['id'],
-            'company': company,
+        return {
             'organization_id': data.get('organization_id', 0),
             'category': data.get('category', 'other'),
             'paid_at': parse_date(data.get('paid_at')),
@@ -311,16 +238,80 @@ class Command(BaseCommand):
             'partner_account_number': data.get('partner_account_number'),
             'comment': data.get('comment', ''),
             'is_created_by_nav': data.get('is_created_by_nav', False),
+            'content_hash': BillingoSyncService.content_hash(data),
         }
 
-        if existing:
-            for key, value in spending_data.items():
-                if key not in ['id', 'company']:  # Don't update PK or company FK
-                    setattr(existing, key, value)
-            existing.save()
-            return existing
-        else:
-            return BillingoSpending.objects.create(**spending_data)
+    def upsert_spendings(self, company: Company, spendings: List[Dict]) -> Dict:
+        """
+        Insert new and update changed spendings with bulk queries.
+
+        Spendings whose content hash matches the stored one are left untouched.
+        """
+        result = self._empty_result(None)
+
+        prepared = {}
+        for spending_data in spendings:
+            try:
+                prepared[spending_data['id']] = self.spending_fields(spending_data)
+            except Exception as e:
+                logger.error(f"Error processing spending {spending_data.get('id')}: {e}")
+                result['skipped'] += 1
+
+        stored = {}
+        ids = list(prepared)
+        for offset in range(0, len(ids), self.BULK_BATCH_SIZE):
+            stored.update({
+                spending_id: (company_id, content_hash)
+                for spending_id, company_id, content_hash in BillingoSpending.objects.filter(
+                    id__in=ids[offset:offset + self.BULK_BATCH_SIZE]
+                ).values_list('id', 'company_id', 'content_hash')
+            })
+
+        to_create = []
+        to_update = []
+        for spending_id, fields in prepared.items():
+            if spending_id not in stored:
+                to_create.append(BillingoSpending(id=spending_id, company=company, **fields))
+                continue
+
+            stored_company_id, stored_hash = stored[spending_id]
+            if stored_company_id != company.id:
+                logger.error(f"Error processing spending {spending_id}: belongs to another company")
+                result['skipped'] += 1
+            elif stored_hash == fields['content_hash']:
+                result['unchanged'] += 1
+            else:
+                to_update.append(BillingoSpending(id=spending_id, company=company, **fields))
+
+        now = timezone.now()
+        for spending in to_update:
+            # bulk_update() does not run auto_now
+            spending.updated_at = now
+
+        with transaction.atomic():
+            BillingoSpending.objects.bulk_create(to_create, batch_size=self.BULK_BATCH_SIZE)
+            if to_update:
+                BillingoSpending.objects.bulk_update(
+                    to_update,
+                    list(prepared[to_update[0].id]) + ['updated_at'],
+                    batch_size=self.BULK_BATCH_SIZE
+                )
+
+        result['created'] = len(to_create)
+        result['updated'] = len(to_update)
+        return result
+
+    def reconcile_spendings(self, company: Company, upstream_ids: Iterable[int]) -> int:
+        """Delete local spendings of the company that are no longer in Billingo."""
+        local_ids = set(BillingoSpending.objects.filter(company=company).values_list('id', flat=True))
+        stale_ids = list(local_ids - set(upstream_ids))
+
+        deleted = 0
+        for offset in range(0, len(stale_ids), self.BULK_BATCH_SIZE):
+            deleted += BillingoSpending.objects.filter(
+                company=company, id__in=stale_ids[offset:offset + self.BULK_BATCH_SIZE]
+            ).delete()[0]
+        return deleted
 
     def print_results(self, result: Dict):
         """Print sync results."""
@@ -330,5 +321,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(
                 f"  Created: {result['created']}, "
                 f"Updated: {result['updated']}, "
+                f"Unchanged: {result['unchanged']}, "
+                f"Deleted: {result['deleted']}, "
                 f"Skipped: {result['skipped']}"
             ))
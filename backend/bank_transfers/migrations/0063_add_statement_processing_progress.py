@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0062_migrate_existing_matches'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatement',
+            name='pages_processed',
+            field=models.IntegerField(default=0, verbose_name='Feldolgozott oldalak'),
+        ),
+        migrations.AddField(
+            model_name='bankstatement',
+            name='pages_total',
+            field=models.IntegerField(default=0, verbose_name='Oldalak száma'),
+        ),
+        migrations.AddField(
+            model_name='bankstatement',
+            name='parse_completed_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Feldolgozás vége'),
+        ),
+        migrations.AddField(
+            model_name='bankstatement',
+            name='parse_started_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Feldolgozás kezdete'),
+        ),
+        migrations.AlterField(
+            model_name='bankstatement',
+            name='status',
+            field=models.CharField(choices=[('UPLOADED', 'Feltöltve'), ('PARSING', 'Feldolgozás alatt'), ('MATCHING', 'Párosítás alatt'), ('PARSED', 'Feldolgozva'), ('ERROR', 'Hiba')], db_index=True, default='UPLOADED', max_length=20, verbose_name='Státusz'),
+        ),
+        migrations.AlterField(
+            model_name='banktransaction',
+            name='match_method',
+            field=models.CharField(blank=True, choices=[('REFERENCE_EXACT', 'Közlemény alapján (pontos)'), ('AMOUNT_IBAN', 'Összeg + IBAN alapján'), ('FUZZY_NAME', 'Összeg + név hasonlóság alapján'), ('TRANSFER_EXACT', 'Átutalási köteg alapján'), ('REIMBURSEMENT_PAIR', 'Ellentételezés (személyes visszafizetés)'), ('MANUAL', 'Manuális párosítás'), ('SYSTEM_AUTO_CATEGORIZED', 'Automatikusan kategorizált (banki tranzakció)'), ('LEARNED_PATTERN', 'Ismétlődő minta alapján (tanult)')], max_length=50, verbose_name='Párosítás módja'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:07
+
+import hashlib
+import re
+from collections import Counter
+
+from django.db import migrations, models
+
+
+def backfill_transaction_fingerprints(apps, schema_editor):
+    """
+    Compute fingerprints for already imported transactions.
+
+    Mirrors transaction_fingerprints() in bank_statement_parser_service: the
+    occurrence counter follows import order (id) within each statement.
+    """
+    BankStatement = apps.get_model('bank_transfers', 'BankStatement')
+    BankTransaction = apps.get_model('bank_transfers', 'BankTransaction')
+
+    for statement in BankStatement.objects.all().only('id', 'account_number'):
+        account = re.sub(r'[^0-9A-Za-z]', '', statement.account_number or '').upper()
+        occurrences = Counter()
+        transactions = list(
+            BankTransaction.objects.filter(bank_statement_id=statement.id).order_by('id')
+        )
+        for transaction in transactions:
+            key = '|'.join([
+                account,
+                transaction.booking_date.isoformat(),
+                f'{transaction.amount:.2f}',
+                transaction.currency or '',
+                (transaction.transaction_id or transaction.reference or '').strip(),
+            ])
+            occurrences[key] += 1
+            transaction.fingerprint = hashlib.sha256(
+                f'{key}|{occurrences[key]}'.encode('utf-8')
+            ).hexdigest()
+        BankTransaction.objects.bulk_update(transactions, ['fingerprint'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0063_add_statement_processing_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankstatement',
+            name='incremental',
+            field=models.BooleanField(default=False, help_text='Csak a számlán még nem szereplő tranzakciók kerülnek importálásra', verbose_name='Inkrementális import'),
+        ),
+        migrations.AddField(
+            model_name='bankstatement',
+            name='skipped_duplicates',
+            field=models.IntegerField(default=0, verbose_name='Kihagyott (már importált) tranzakciók'),
+        ),
+        migrations.AddField(
+            model_name='banktransaction',
+            name='fingerprint',
+            field=models.CharField(blank=True, help_text='SHA256 of account, booking date, amount, currency and transaction ID/reference (used to skip already imported transactions)', max_length=64, verbose_name='Tranzakció ujjlenyomat'),
+        ),
+        migrations.AddIndex(
+            model_name='banktransaction',
+            index=models.Index(fields=['company', 'fingerprint'], name='bank_transf_company_9fe6c2_idx'),
+        ),
+        migrations.RunPython(
+            backfill_transaction_fingerprints,
+            reverse_code=migrations.RunPython.noop
+        ),
+    ]
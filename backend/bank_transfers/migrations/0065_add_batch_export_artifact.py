@@ -0,0 +1,34 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0064_add_transaction_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BatchExportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Létrehozva')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Módosítva')),
+                ('batch_format', models.CharField(choices=[('XML', 'SEPA XML'), ('KH_CSV', 'KH Bank CSV')], max_length=10, verbose_name='Fájlformátum')),
+                ('content_key', models.CharField(help_text='A köteg exportált adataiból számolt SHA256 hash', max_length=64, verbose_name='Tartalom kulcs')),
+                ('file_path', models.CharField(max_length=500, verbose_name='Fájl elérési út')),
+                ('file_size', models.IntegerField(verbose_name='Fájl méret (byte)')),
+                ('file_hash', models.CharField(max_length=64, verbose_name='Fájl hash (SHA256)')),
+                ('batch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='export_artifacts', to='bank_transfers.transferbatch', verbose_name='Utalási köteg')),
+            ],
+            options={
+                'verbose_name': 'Köteg export fájl',
+                'verbose_name_plural': 'Köteg export fájlok',
+                'ordering': ['-created_at'],
+                'unique_together': {('batch', 'batch_format', 'content_key')},
+            },
+        ),
+    ]
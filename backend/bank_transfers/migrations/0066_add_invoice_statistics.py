@@ -0,0 +1,35 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:34
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0065_add_batch_export_artifact'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Létrehozva')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Módosítva')),
+                ('invoice_direction', models.CharField(choices=[('INBOUND', 'Bejövő számla'), ('OUTBOUND', 'Kimenő számla')], max_length=10, verbose_name='Irány')),
+                ('currency_code', models.CharField(max_length=3, verbose_name='Pénznem')),
+                ('payment_status', models.CharField(choices=[('UNPAID', 'Fizetésre vár'), ('PREPARED', 'Előkészítve'), ('PAID', 'Kifizetve')], max_length=10, verbose_name='Fizetési állapot')),
+                ('invoice_count', models.IntegerField(default=0, verbose_name='Számlák száma')),
+                ('gross_amount', models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=18, verbose_name='Bruttó összeg')),
+                ('last_created_at', models.DateTimeField(blank=True, null=True, verbose_name='Utolsó számla rögzítése')),
+                ('company', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='invoice_statistics', to='bank_transfers.company', verbose_name='Cég')),
+            ],
+            options={
+                'verbose_name': 'Számla statisztika',
+                'verbose_name_plural': 'Számla statisztikák',
+                'unique_together': {('company', 'invoice_direction', 'currency_code', 'payment_status')},
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0066_add_invoice_statistics'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='banktransaction',
+            name='bank_transf_company_573d22_idx',
+        ),
+        migrations.AddIndex(
+            model_name='banktransaction',
+            index=models.Index(fields=['company', 'booking_date', 'id'], name='bank_transf_company_b798c3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['company', 'issue_date', 'id'], name='bank_transf_company_c8c56c_idx'),
+        ),
+    ]
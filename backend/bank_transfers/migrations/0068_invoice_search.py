@@ -0,0 +1,97 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:45
+
+import unicodedata
+
+from django.db import migrations, models
+
+# Frozen copy of bank_transfers.search as of this migration; later changes to
+# the app module must not change what the backfill writes.
+INVOICE_SEARCH_FIELDS = (
+    'nav_invoice_number',
+    'supplier_name',
+    'customer_name',
+    'supplier_tax_number',
+    'customer_tax_number',
+    'original_invoice_number',
+)
+
+
+def fold_search_text(value):
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def build_invoice_search_text(invoice):
+    return '\n'.join(fold_search_text(getattr(invoice, field)) for field in INVOICE_SEARCH_FIELDS)
+
+
+def populate_search_text(apps, schema_editor):
+    """
+    Fill Invoice.search_text for existing invoices.
+    """
+    Invoice = apps.get_model('bank_transfers', 'Invoice')
+
+    batch = []
+    for invoice in Invoice.objects.only('id', *INVOICE_SEARCH_FIELDS).iterator(chunk_size=2000):
+        invoice.search_text = build_invoice_search_text(invoice)
+        batch.append(invoice)
+        if len(batch) >= 2000:
+            Invoice.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    if batch:
+        Invoice.objects.bulk_update(batch, ['search_text'])
+
+
+# (index name, column) of the UPPER(column) prefix indexes for istartswith
+PREFIX_INDEXES = (
+    ('inv_number_prefix_idx', 'nav_invoice_number'),
+    ('inv_supplier_tax_prefix_idx', 'supplier_tax_number'),
+    ('inv_customer_tax_prefix_idx', 'customer_tax_number'),
+    ('inv_original_number_prefix_idx', 'original_invoice_number'),
+)
+
+
+def create_search_indexes(apps, schema_editor):
+    """
+    PostgreSQL only: trigram GIN index for LIKE '%term%' name searches (needs
+    pg_trgm) and prefix indexes for the istartswith number searches.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS inv_search_text_trgm_idx '
+        'ON bank_transfers_invoice USING gin (search_text gin_trgm_ops)'
+    )
+    for name, column in PREFIX_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name} '
+            f'ON bank_transfers_invoice (UPPER({column}::text) text_pattern_ops)'
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS inv_search_text_trgm_idx')
+    for name, _column in PREFIX_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0067_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='search_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Keresési szöveg'),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
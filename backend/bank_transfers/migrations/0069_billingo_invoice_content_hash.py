@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0068_invoice_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billingoinvoice',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='Az utoljára szinkronizált API válasz SHA-256 hash-e (változatlan számlák kihagyásához)', max_length=64, verbose_name='Tartalom hash'),
+        ),
+    ]
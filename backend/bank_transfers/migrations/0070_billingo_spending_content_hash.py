@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bank_transfers', '0069_billingo_invoice_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='billingospending',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='Az utoljára szinkronizált API válasz SHA-256 hash-e (változatlan költségek kihagyásához)', max_length=64, verbose_name='Tartalom hash'),
+        ),
+    ]
@@ -23,6 +23,7 @@ from .banking import (
     TemplateBeneficiary,
     Transfer,
     TransferBatch,
+    BatchExportArtifact,
 )
 
 # NAV invoice integration models
@@ -32,6 +33,7 @@ from .invoices import (
     Invoice,
     InvoiceLineItem,
     InvoiceSyncLog,
+    InvoiceStatistics,
     BankTransactionInvoiceMatch,
     TrustedPartner,
 )
@@ -83,12 +85,14 @@ __all__ = [
     'TemplateBeneficiary',
     'Transfer',
     'TransferBatch',
+    'BatchExportArtifact',
     # Invoice models
     'NavConfigurationManager',
     'NavConfiguration',
     'Invoice',
     'InvoiceLineItem',
     'InvoiceSyncLog',
+    'InvoiceStatistics',
     'BankTransactionInvoiceMatch',
     'TrustedPartner',
     # Exchange rate models
@@ -111,6 +111,7 @@ class BankStatement(CompanyOwnedTimestampedModel):
     STATUS_CHOICES = [
         ('UPLOADED', 'Feltöltve'),
         ('PARSING', 'Feldolgozás alatt'),
+        ('MATCHING', 'Párosítás alatt'),
         ('PARSED', 'Feldolgozva'),
         ('ERROR', 'Hiba'),
     ]
@@ -122,6 +123,37 @@ class BankStatement(CompanyOwnedTimestampedModel):
         verbose_name="Státusz"
     )
 
+    # Processing progress (updated while a background upload is being processed)
+    pages_total = models.IntegerField(
+        default=0,
+        verbose_name="Oldalak száma"
+    )
+    pages_processed = models.IntegerField(
+        default=0,
+        verbose_name="Feldolgozott oldalak"
+    )
+    parse_started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Feldolgozás kezdete"
+    )
+    parse_completed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Feldolgozás vége"
+    )
+
+    # Incremental import (overlapping statements)
+    incremental = models.BooleanField(
+        default=False,
+        verbose_name="Inkrementális import",
+        help_text="Csak a számlán még nem szereplő tranzakciók kerülnek importálásra"
+    )
+    skipped_duplicates = models.IntegerField(
+        default=0,
+        verbose_name="Kihagyott (már importált) tranzakciók"
+    )
+
     # Statistics
     total_transactions = models.IntegerField(
         default=0,
@@ -282,6 +314,13 @@ class BankTransaction(CompanyOwnedTimestampedModel):
         blank=True,
         verbose_name="Tranzakció azonosító"
     )
+    fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="Tranzakció ujjlenyomat",
+        help_text="SHA256 of account, booking date, amount, currency and transaction ID/reference "
+                  "(used to skip already imported transactions)"
+    )
 
     payer_name = models.CharField(
         max_length=300,
@@ -533,13 +572,14 @@ class BankTransaction(CompanyOwnedTimestampedModel):
         verbose_name_plural = "Banki tranzakciók"
         indexes = [
             models.Index(fields=['bank_statement', 'booking_date']),
-            models.Index(fields=['company', 'booking_date']),
+            models.Index(fields=['company', 'booking_date', 'id']),  # Keyset pagination
             models.Index(fields=['company', 'transaction_type', 'booking_date']),
             models.Index(fields=['amount', 'currency']),
             models.Index(fields=['matched_invoice']),
             models.Index(fields=['payment_id']),
             models.Index(fields=['reference']),
             models.Index(fields=['is_extra_cost', 'extra_cost_category']),
+            models.Index(fields=['company', 'fingerprint']),
         ]
         ordering = ['-booking_date', '-value_date']
 
@@ -211,3 +211,29 @@ class TransferBatch(CompanyOwnedTimestampedModel):
     def xml_filename(self):
         """Legacy property for backwards compatibility"""
         return self.filename
+
+
+class BatchExportArtifact(TimestampedModel):
+    """
+    Generated export file (SEPA XML or KH CSV) of a transfer batch.
+
+    Artifacts are immutable and keyed by a hash of the export-relevant transfer
+    data, so repeat downloads are served from storage and any change to the
+    batch produces a new artifact. Earlier artifacts are kept as an audit copy
+    of what was downloaded for the bank.
+    """
+    batch = models.ForeignKey(TransferBatch, on_delete=models.CASCADE, related_name='export_artifacts', verbose_name="Utalási köteg")
+    batch_format = models.CharField(max_length=10, choices=TransferBatch.BATCH_FORMAT_CHOICES, verbose_name="Fájlformátum")
+    content_key = models.CharField(max_length=64, verbose_name="Tartalom kulcs", help_text="A köteg exportált adataiból számolt SHA256 hash")
+    file_path = models.CharField(max_length=500, verbose_name="Fájl elérési út")
+    file_size = models.IntegerField(verbose_name="Fájl méret (byte)")
+    file_hash = models.CharField(max_length=64, verbose_name="Fájl hash (SHA256)")
+
+    class Meta:
+        verbose_name = "Köteg export fájl"
+        verbose_name_plural = "Köteg export fájlok"
+        ordering = ['-created_at']
+        unique_together = [('batch', 'batch_format', 'content_key')]
+
+    def __str__(self):
+        return f"{self.batch.name} - {self.batch_format} ({self.content_key[:8]})"
@@ -238,6 +238,12 @@ class BillingoInvoice(TimestampedModel):
         auto_now=True,
         verbose_name="Utoljára módosítva"
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="Tartalom hash",
+        help_text="Az utoljára szinkronizált API válasz SHA-256 hash-e (változatlan számlák kihagyásához)"
+    )
 
     class Meta:
         verbose_name = "Billingo számla"
@@ -601,6 +607,12 @@ class BillingoSpending(TimestampedModel):
         verbose_name="NAV által létrehozva",
         help_text="True if spending was created from NAV import"
     )
+    content_hash = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="Tartalom hash",
+        help_text="Az utoljára szinkronizált API válasz SHA-256 hash-e (változatlan költségek kihagyásához)"
+    )
 
     class Meta:
         verbose_name = "Billingo költség"
@@ -8,6 +8,7 @@ from django.db import models
 from django.contrib.auth.models import User
 from decimal import Decimal
 from ..base_models import TimestampedModel
+from ..search import INVOICE_SEARCH_FIELDS, build_invoice_search_text
 from .company import Company
 
 
@@ -304,6 +305,9 @@ class Invoice(TimestampedModel):
     
     # Sync metadata
     sync_status = models.CharField(max_length=10, choices=SYNC_STATUS_CHOICES, default='SUCCESS')
+
+    # Denormalised, accent-folded search fields (see bank_transfers.search)
+    search_text = models.TextField(blank=True, default='', editable=False, verbose_name="Keresési szöveg")
     
     class Meta:
         verbose_name = "Számla"
@@ -312,11 +316,20 @@ class Invoice(TimestampedModel):
         unique_together = ['company', 'nav_invoice_number', 'invoice_direction']
         indexes = [
             models.Index(fields=['company', 'invoice_direction']),
+            models.Index(fields=['company', 'issue_date', 'id']),  # Keyset pagination
             models.Index(fields=['issue_date']),
             models.Index(fields=['supplier_tax_number']),
             models.Index(fields=['customer_tax_number']),
             models.Index(fields=['nav_invoice_number']),
+            # Search indexes (trigram, UPPER prefix) are PostgreSQL-only, see migration 0068
         ]
+
+    def save(self, *args, **kwargs):
+        self.search_text = build_invoice_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & set(INVOICE_SEARCH_FIELDS):
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
     
     @property
     def is_active(self):
@@ -376,6 +389,47 @@ class Invoice(TimestampedModel):
     def __str__(self):
         return f"{self.nav_invoice_number} - {self.supplier_name} ({self.invoice_direction})"
 
+    # Fields that determine the invoice's InvoiceStatistics bucket
+    STATISTICS_FIELDS = ('company_id', 'invoice_direction', 'currency_code', 'payment_status', 'invoice_gross_amount')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded bucket so statistics can be updated incrementally on save
+        if all(field in field_names for field in cls.STATISTICS_FIELDS):
+            instance._statistics_state = instance.statistics_state()
+        return instance
+
+    def statistics_state(self):
+        """Current (company, direction, currency, payment status, gross amount) of the invoice"""
+        return tuple(getattr(self, field) for field in self.STATISTICS_FIELDS)
+
+
+class InvoiceStatistics(TimestampedModel):
+    """
+    Materialised invoice counters per company.
+
+    One row per (direction, currency, payment status) bucket, maintained
+    incrementally on invoice save/delete and payment status changes when
+    INVOICE_STATS_MATERIALIZED is enabled, so the statistics endpoint reads a
+    handful of rows instead of scanning the invoice table.
+    """
+    company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='invoice_statistics', verbose_name="Cég")
+    invoice_direction = models.CharField(max_length=10, choices=Invoice.DIRECTION_CHOICES, verbose_name="Irány")
+    currency_code = models.CharField(max_length=3, verbose_name="Pénznem")
+    payment_status = models.CharField(max_length=10, choices=Invoice.PAYMENT_STATUS_CHOICES, verbose_name="Fizetési állapot")
+    invoice_count = models.IntegerField(default=0, verbose_name="Számlák száma")
+    gross_amount = models.DecimalField(max_digits=18, decimal_places=2, default=Decimal('0'), verbose_name="Bruttó összeg")
+    last_created_at = models.DateTimeField(null=True, blank=True, verbose_name="Utolsó számla rögzítése")
+
+    class Meta:
+        verbose_name = "Számla statisztika"
+        verbose_name_plural = "Számla statisztikák"
+        unique_together = ['company', 'invoice_direction', 'currency_code', 'payment_status']
+
+    def __str__(self):
+        return f"{self.company.name} - {self.invoice_direction} {self.currency_code} {self.payment_status}: {self.invoice_count}"
+
 
 class InvoiceLineItem(TimestampedModel):
     """
@@ -1,7 +1,16 @@
 """
 Custom pagination classes for bank_transfers app.
 """
+import base64
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError as RequestValidationError
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 class StandardResultsSetPagination(PageNumberPagination):
@@ -17,4 +26,124 @@ class StandardResultsSetPagination(PageNumberPagination):
         """
         Return paginated response with metadata for frontend pagination controls.
         """
-        return super().get_paginated_response(data)
\ No newline at end of file
+        return super().get_paginated_response(data)
+
+
+class KeysetPagination(StandardResultsSetPagination):
+    """
+    Page number pagination with an optional keyset (cursor) mode.
+
+    ?pagination=cursor switches to keyset pagination on the view's keyset_fields,
+    e.g. ('booking_date', 'id'). Pages are selected with a WHERE on the last seen
+    (date, id) pair instead of COUNT(*) + OFFSET, so deep pages cost the same as
+    the first one. The response has no 'count'; follow 'next' / 'previous'.
+
+    In cursor mode only ordering by the first keyset field is supported
+    (?ordering=booking_date for ascending, -booking_date or none for descending);
+    any other ?ordering is rejected with 400 rather than silently ignored.
+    """
+    mode_query_param = 'pagination'
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_mode = (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.fields = tuple(view.keyset_fields)
+        ordering = request.query_params.get('ordering')
+        if ordering not in (None, '', self.fields[0], '-' + self.fields[0]):
+            raise RequestValidationError({
+                'ordering': f"Cursor pagination only supports ordering by {self.fields[0]} or -{self.fields[0]}"
+            })
+        self.descending = ordering != self.fields[0]
+        page_size = self.get_page_size(request)
+        position, reverse = self._decode_cursor(request, queryset)
+
+        # Walking backwards flips both the comparison and the ordering
+        descending = self.descending != reverse
+        prefix = '-' if descending else ''
+        queryset = queryset.order_by(*(prefix + field for field in self.fields))
+        if position is not None:
+            queryset = queryset.filter(self._after(position, descending))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        # A backward page always has the rows it came from after it
+        has_next = reverse or has_more
+        has_previous = has_more if reverse else position is not None
+        self.next_position = self._position(results[-1]) if results and has_next else None
+        self.previous_position = self._position(results[0]) if results and has_previous else None
+        return results
+
+    def get_page_number(self, request, paginator):
+        # Kept so an out-of-range page can be told apart from an empty result
+        # without counting again (Paginator.count is cached)
+        self.django_paginator = paginator
+        return super().get_page_number(request, paginator)
+
+    def is_empty_result(self):
+        """True if the last page-number request ran against an empty queryset"""
+        paginator = getattr(self, 'django_paginator', None)
+        return paginator is not None and not self.keyset_mode and paginator.count == 0
+
+    def get_paginated_response(self, data):
+        if not self.keyset_mode:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ('next', self._link(self.next_position, reverse=False)),
+            ('previous', self._link(self.previous_position, reverse=True)),
+            ('results', data),
+        ]))
+
+    def _after(self, position, descending):
+        """Rows strictly after `position` in the keyset ordering: (a, b) > (x, y)"""
+        lookup = 'lt' if descending else 'gt'
+        condition = Q()
+        for i, field in enumerate(self.fields):
+            equal = {name: position[j] for j, name in enumerate(self.fields[:i])}
+            condition |= Q(**equal, **{f'{field}__{lookup}': position[i]})
+        return condition
+
+    def _position(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _link(self, position, reverse):
+        if position is None:
+            return None
+        payload = {'p': [value.isoformat() if hasattr(value, 'isoformat') else value for value in position]}
+        if reverse:
+            payload['r'] = 1
+        token = base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii')
+        url = remove_query_param(self.base_url, self.mode_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def _decode_cursor(self, request, queryset):
+        """Return the (position, reverse) encoded in ?cursor=, or (None, False) for the first page"""
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8'))
+            values = payload['p']
+            if len(values) != len(self.fields):
+                raise ValueError('cursor length')
+            position = [
+                queryset.model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError, UnicodeError):
+            raise NotFound('Invalid cursor')
+
+        return position, bool(payload.get('r'))
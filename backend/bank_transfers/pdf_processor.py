@@ -1,13 +1,17 @@
 """
 PDF Transaction Processor
 Extracts transaction data from Hungarian payment PDFs (NAV tax and salary documents)
+
+Each PDF is opened and its text extracted exactly once; the text is shared by
+company name detection, PDF type detection and the parse_*_pdf routines.
 """
 
 import pdfplumber
 import re
 from decimal import Decimal
 from datetime import datetime
-from typing import Dict, List, Any, Tuple, Optional
+from io import BytesIO
+from typing import Dict, List, Any, Tuple, Optional, Union
 from django.core.files.uploadedfile import UploadedFile
 
 from .models import Beneficiary, TransferTemplate, TemplateBeneficiary
@@ -18,6 +22,93 @@ from .hungarian_account_validator import (
 )
 
 
+def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
+    """
+    Extract the text of all pages of a PDF.
+    """
+    with pdfplumber.open(BytesIO(pdf_bytes)) as pdf:
+        page_texts = []
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                page_texts.append(page_text + "\n")
+    return "".join(page_texts)
+
+
+def _clean_identifier(value: Optional[str]) -> str:
+    """Remove dashes and spaces from an account or VAT number"""
+    return value.replace('-', '').replace(' ', '') if value else ''
+
+
+class BeneficiaryLookupIndex:
+    """
+    In-memory lookup of a company's beneficiaries by account number and VAT number.
+
+    Built with a single query once per PDF import, so resolving a transaction is a
+    few dictionary lookups instead of several queries and full-table scans. The
+    lookup order mirrors the matching rules: stored value equal to the cleaned
+    input, stored value equal to the raw input, then cleaned values on both sides
+    (including the 2x8 / 3x8 trailing-zero variants for accounts). For duplicate
+    keys the first beneficiary in default ordering (name) wins, like .first().
+    """
+
+    def __init__(self, beneficiaries):
+        self.by_account = {}
+        self.by_clean_account = {}
+        self.by_vat = {}
+        self.by_clean_vat = {}
+
+        for beneficiary in beneficiaries:
+            if beneficiary.account_number is not None:
+                self.by_account.setdefault(beneficiary.account_number, beneficiary)
+                self.by_clean_account.setdefault(_clean_identifier(beneficiary.account_number), beneficiary)
+            if beneficiary.vat_number is not None:
+                self.by_vat.setdefault(beneficiary.vat_number, beneficiary)
+                if beneficiary.vat_number:
+                    self.by_clean_vat.setdefault(_clean_identifier(beneficiary.vat_number), beneficiary)
+
+    @classmethod
+    def for_company(cls, company) -> 'BeneficiaryLookupIndex':
+        """Load all beneficiaries of the company into a new index"""
+        return cls(Beneficiary.objects.filter(company=company))
+
+    def find_by_account(self, account_number: str) -> Optional[Beneficiary]:
+        """Find beneficiary by account number (any formatting, 2x8 or 3x8)"""
+        clean_account = _clean_identifier(account_number)
+
+        beneficiary = (
+            self.by_account.get(clean_account)
+            or self.by_account.get(account_number)
+            or self.by_clean_account.get(clean_account)
+        )
+
+        # Hungarian banking rule: 3x8 format with trailing zeros = 2x8 format
+        # Example: 66000169-11088406-00000000 = 66000169-11088406
+        if not beneficiary and len(clean_account) == 24 and clean_account[16:24] == '00000000':
+            short_account = clean_account[:16]
+            beneficiary = (
+                self.by_clean_account.get(short_account)
+                or self.by_account.get(f"{short_account[:8]}-{short_account[8:16]}")
+            )
+        # Reverse check: if we have 2x8 format, check for 3x8 with trailing zeros
+        elif not beneficiary and len(clean_account) == 16:
+            beneficiary = (
+                self.by_clean_account.get(clean_account + '00000000')
+                or self.by_account.get(f"{clean_account[:8]}-{clean_account[8:16]}-00000000")
+            )
+
+        return beneficiary
+
+    def find_by_vat(self, vat_number: str) -> Optional[Beneficiary]:
+        """Find beneficiary by VAT number (any formatting)"""
+        clean_vat = _clean_identifier(vat_number)
+        return (
+            self.by_vat.get(clean_vat)
+            or self.by_vat.get(vat_number)
+            or self.by_clean_vat.get(clean_vat)
+        )
+
+
 class PDFTransactionProcessor:
     """Process Hungarian payment PDFs and extract transaction data"""
     
@@ -125,23 +216,19 @@ class PDFTransactionProcessor:
         company_names = []
         company_tax_ids = []
         
-        # Step 1: Extract data from all PDFs
-        for pdf_file in pdf_files:
+        # Step 1: Extract data from all PDFs (text is extracted once per PDF, in parallel)
+        pdf_texts = self.extract_pdf_texts(pdf_files)
+        for pdf_file, text in zip(pdf_files, pdf_texts):
             try:
-                # First extract raw text to get company name
-                with pdfplumber.open(pdf_file) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-                
+                if isinstance(text, Exception):
+                    raise text
+
                 # Extract company name from text
                 company_name = self.extract_company_name_from_text(text)
                 if company_name and company_name != "Ismeretlen cég":
                     company_names.append(company_name)
                 
-                pdf_data = self.extract_pdf_data(pdf_file)
+                pdf_data = self.extract_pdf_data(pdf_file, text=text)
                 transactions = pdf_data['transactions']  # transactions are already parsed in extract_pdf_data
                 all_transactions.extend(transactions)
                 
@@ -173,8 +260,11 @@ class PDFTransactionProcessor:
         else:
             most_common_company = None
         
-        # Step 2: Match beneficiaries and consolidate transactions
-        all_transactions, consolidation_msgs = self.match_and_consolidate_beneficiaries(all_transactions, company)
+        # Step 2: Match beneficiaries and consolidate transactions (one beneficiary query per import)
+        beneficiary_index = BeneficiaryLookupIndex.for_company(company)
+        all_transactions, consolidation_msgs = self.match_and_consolidate_beneficiaries(
+            all_transactions, company, beneficiary_index
+        )
         consolidations.extend(consolidation_msgs)
         
         # Step 3: Try to find existing template with matching beneficiaries (if not explicitly updating one)
@@ -216,15 +306,37 @@ class PDFTransactionProcessor:
             'total_amount': sum(t['amount'] for t in all_transactions)
         }
     
-    def extract_pdf_data(self, pdf_file: UploadedFile) -> Dict[str, Any]:
-        """Extract raw text and identify PDF type"""
+    def extract_pdf_texts(self, pdf_files: List[UploadedFile]) -> List[Union[str, Exception]]:
+        """
+        Extract the text of every PDF.
+
+        Args:
+            pdf_files: List of uploaded PDF files
+
+        Returns:
+            Text per file in input order, or the exception raised for that file
+        """
+        texts = []
+        for pdf_file in pdf_files:
+            try:
+                pdf_file.seek(0)
+                texts.append(extract_text_from_pdf_bytes(pdf_file.read()))
+            except Exception as e:
+                texts.append(e)
+        return texts
+
+    def extract_pdf_data(self, pdf_file: UploadedFile, text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Extract raw text and identify PDF type
+
+        Args:
+            pdf_file: Uploaded PDF file
+            text: Already extracted text of the PDF (the file is not read again)
+        """
         try:
-            with pdfplumber.open(pdf_file) as pdf:
-                text = ""
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+            if text is None:
+                pdf_file.seek(0)
+                text = extract_text_from_pdf_bytes(pdf_file.read())
             
             # Detect PDF type based on content - order matters (most specific first)
             if "Adó és járulék befizetések" in text:
@@ -632,8 +744,16 @@ class PDFTransactionProcessor:
             'company_tax_id': company_tax_id
         }
     
-    def match_and_consolidate_beneficiaries(self, transactions: List[Dict], company=None) -> Tuple[List[Dict], List[str]]:
+    def match_and_consolidate_beneficiaries(
+        self,
+        transactions: List[Dict],
+        company=None,
+        beneficiary_index: Optional[BeneficiaryLookupIndex] = None
+    ) -> Tuple[List[Dict], List[str]]:
         """Match transactions to existing beneficiaries and consolidate duplicates"""
+        if beneficiary_index is None:
+            beneficiary_index = BeneficiaryLookupIndex.for_company(company)
+
         consolidations = []
         matched_transactions = []
         
@@ -655,10 +775,10 @@ class PDFTransactionProcessor:
             # Try to match existing beneficiary
             if 'vat_number' in trans_group[0]:
                 # VAT-based matching
-                beneficiary = self.find_matching_beneficiary_by_vat(identifier, name, company)
+                beneficiary = self.find_matching_beneficiary_by_vat(identifier, name, company, beneficiary_index)
             else:
                 # Account-based matching (existing logic)
-                beneficiary = self.find_matching_beneficiary(identifier, name, company)
+                beneficiary = self.find_matching_beneficiary(identifier, name, company, beneficiary_index)
             
             if len(trans_group) > 1:
                 # Consolidate multiple transactions to same beneficiary
@@ -743,104 +863,41 @@ class PDFTransactionProcessor:
         
         return matched_transactions, consolidations
     
-    def find_matching_beneficiary(self, account_number: str, name: str = None, company=None) -> Optional[Beneficiary]:
-        """Find existing beneficiary by account number or name"""
-        # Clean account number for matching (remove dashes and spaces)
-        clean_account = account_number.replace('-', '').replace(' ', '')
-        
-        # Try exact full account match first (most reliable)
-        beneficiary = Beneficiary.objects.filter(
-            account_number=clean_account,
-            company=company
-        ).first()
-        
-        # Try with original format (with dashes)
-        if not beneficiary:
-            beneficiary = Beneficiary.objects.filter(
-                account_number=account_number,
-                company=company
-            ).first()
-        
-        # Try to match by cleaning both sides for comparison
-        if not beneficiary:
-            for b in Beneficiary.objects.filter(company=company):
-                db_clean = b.account_number.replace('-', '').replace(' ', '')
-                if db_clean == clean_account:
-                    beneficiary = b
-                    break
-        
-        # Hungarian banking rule: 3x8 format with trailing zeros = 2x8 format
-        # Example: 66000169-11088406-00000000 = 66000169-11088406
-        if not beneficiary and len(clean_account) == 24:
-            # Check if third block is all zeros
-            if clean_account[16:24] == '00000000':
-                short_account = clean_account[:16]  # First 16 digits (2x8 format)
-                
-                # Try to find beneficiary with 2x8 format
-                for b in Beneficiary.objects.filter(company=company):
-                    db_clean = b.account_number.replace('-', '').replace(' ', '')
-                    if db_clean == short_account:
-                        beneficiary = b
-                        break
-                        
-                # Also try formatted versions
-                if not beneficiary:
-                    formatted_short = f"{short_account[:8]}-{short_account[8:16]}"
-                    beneficiary = Beneficiary.objects.filter(
-                        account_number=formatted_short,
-                        company=company
-                    ).first()
-        
-        # Reverse check: if we have 2x8 format, check for 3x8 with trailing zeros
-        elif not beneficiary and len(clean_account) == 16:
-            extended_account = clean_account + '00000000'  # Add trailing zeros
-            
-            for b in Beneficiary.objects.filter(company=company):
-                db_clean = b.account_number.replace('-', '').replace(' ', '')
-                if db_clean == extended_account:
-                    beneficiary = b
-                    break
-                    
-            # Also try formatted version
-            if not beneficiary:
-                formatted_extended = f"{clean_account[:8]}-{clean_account[8:16]}-00000000"
-                beneficiary = Beneficiary.objects.filter(
-                    account_number=formatted_extended,
-                    company=company
-                ).first()
-        
+    def find_matching_beneficiary(
+        self,
+        account_number: str,
+        name: str = None,
+        company=None,
+        beneficiary_index: Optional[BeneficiaryLookupIndex] = None
+    ) -> Optional[Beneficiary]:
+        """
+        Find existing beneficiary by account number
+
+        Matches exact, differently formatted and 2x8 / 3x8 (trailing zeros) variants.
+        Pass a prebuilt beneficiary_index when resolving many transactions.
+        """
+        if beneficiary_index is None:
+            beneficiary_index = BeneficiaryLookupIndex.for_company(company)
+
         # Only match by exact account number - no name-based fallback
         # This prevents different people with same names from being consolidated
-        return beneficiary  # Returns None if no match found
+        return beneficiary_index.find_by_account(account_number)  # Returns None if no match found
     
-    def find_matching_beneficiary_by_vat(self, vat_number: str, name: str = None, company=None) -> Optional[Beneficiary]:
+    def find_matching_beneficiary_by_vat(
+        self,
+        vat_number: str,
+        name: str = None,
+        company=None,
+        beneficiary_index: Optional[BeneficiaryLookupIndex] = None
+    ) -> Optional[Beneficiary]:
         """Find existing beneficiary by VAT number"""
         if not vat_number or not company:
             return None
-        
-        # Clean VAT number for matching (remove spaces and dashes)
-        clean_vat = vat_number.replace('-', '').replace(' ', '')
-        
-        # Try exact VAT number match first
-        beneficiary = Beneficiary.objects.filter(
-            vat_number=clean_vat,
-            company=company
-        ).first()
-        
-        # Try with original format (in case it's stored with dashes)
-        if not beneficiary:
-            beneficiary = Beneficiary.objects.filter(
-                vat_number=vat_number,
-                company=company
-            ).first()
-        
-        # Try to match by cleaning both sides for comparison
-        if not beneficiary:
-            for b in Beneficiary.objects.filter(company=company).exclude(vat_number__isnull=True).exclude(vat_number=''):
-                db_clean_vat = b.vat_number.replace('-', '').replace(' ', '') if b.vat_number else ''
-                if db_clean_vat == clean_vat:
-                    beneficiary = b
-                    break
+
+        if beneficiary_index is None:
+            beneficiary_index = BeneficiaryLookupIndex.for_company(company)
+
+        beneficiary = beneficiary_index.find_by_vat(vat_number)
         
         # Log the match result for debugging
         if beneficiary:
@@ -1,12 +1,17 @@
 from rest_framework import permissions
 from .models import CompanyUser, UserProfile, CompanyFeature, FeatureTemplate
 from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, IntegerField, Subquery, Value, When
 from django.http import JsonResponse
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 from rest_framework import status
 import logging
 
+from . import caching
+
 logger = logging.getLogger(__name__)
 
 
@@ -18,29 +23,89 @@ class FeatureNotEnabledException(Exception):
         super().__init__(f"Feature '{feature_code}' not enabled for company '{company_name}'")
 
 
+class FeatureSnapshot:
+    """
+    Feature flags of one company, loaded with two queries and checked with set lookups.
+
+    enabled holds the explicitly enabled feature codes (in the order returned by
+    get_enabled_features_for_company); implicit holds system critical features that
+    have no CompanyFeature row and are therefore treated as enabled.
+    """
+
+    def __init__(self, enabled, implicit):
+        self.enabled = tuple(enabled)
+        self.implicit = frozenset(implicit)
+        self._enabled_set = frozenset(self.enabled)
+
+    def is_enabled(self, feature_code):
+        return feature_code in self._enabled_set or feature_code in self.implicit
+
+
 class FeatureChecker:
-    """Central service for checking feature enablement"""
-    
+    """
+    Central service for checking feature enablement
+
+    Feature flags are read from a per-company FeatureSnapshot. The snapshot is kept
+    on the company instance for the rest of the request and in Django's cache under
+    the company's FEATURES namespace version (caching.py); saving or deleting a
+    CompanyFeature/FeatureTemplate bumps the version (see signals.py), so stale
+    snapshots are never read again.
+    """
+
+    CACHE_PREFIX = caching.FEATURES
+    SNAPSHOT_ATTR = '_feature_snapshot'
+
+    @staticmethod
+    def invalidate_company(company_id):
+        """Drop cached feature snapshots of a company"""
+        caching.invalidate_company_namespace(company_id, caching.FEATURES)
+
+    @staticmethod
+    def invalidate_all():
+        """Drop cached feature snapshots of every company (feature templates changed)"""
+        caching.invalidate_namespace(caching.FEATURES)
+
+    @staticmethod
+    def load_snapshot(company):
+        """Build a FeatureSnapshot from the database"""
+        configured = list(
+            CompanyFeature.objects.filter(company=company).values_list(
+                'feature_template__feature_code', 'is_enabled'
+            )
+        )
+        configured_codes = {code for code, _ in configured}
+        implicit = set(
+            FeatureTemplate.objects.filter(is_system_critical=True).exclude(
+                feature_code__in=configured_codes
+            ).values_list('feature_code', flat=True)
+        )
+        return FeatureSnapshot([code for code, is_enabled in configured if is_enabled], implicit)
+
+    @staticmethod
+    def get_snapshot(company):
+        """Return the feature snapshot of a company (request, then shared cache, then database)"""
+        snapshot = getattr(company, FeatureChecker.SNAPSHOT_ATTR, None)
+        if snapshot is not None:
+            return snapshot
+
+        cache_key = "{prefix}:company:{company_id}:{company_version}:{template_version}".format(
+            prefix=FeatureChecker.CACHE_PREFIX,
+            company_id=company.pk,
+            company_version=caching.company_namespace_version(company.pk, caching.FEATURES),
+            template_version=caching.namespace_version(caching.FEATURES),
+        )
+        snapshot = cache.get(cache_key)
+        if snapshot is None:
+            snapshot = FeatureChecker.load_snapshot(company)
+            cache.set(cache_key, snapshot, getattr(settings, 'FEATURE_CACHE_TIMEOUT', 300))
+
+        setattr(company, FeatureChecker.SNAPSHOT_ATTR, snapshot)
+        return snapshot
+
     @staticmethod
     def is_feature_enabled(company, feature_code):
         """Check if a feature is enabled for the company"""
-        try:
-            company_feature = CompanyFeature.objects.select_related('feature_template').get(
-                company=company,
-                feature_template__feature_code=feature_code
-            )
-            return company_feature.is_enabled
-        except CompanyFeature.DoesNotExist:
-            # Feature doesn't exist for company - check if it's system critical
-            try:
-                feature_template = FeatureTemplate.objects.get(feature_code=feature_code)
-                if feature_template.is_system_critical:
-                    logger.warning(f"System critical feature {feature_code} not found for company {company.name}")
-                    return True  # System critical features are assumed enabled if not explicitly disabled
-                return False
-            except FeatureTemplate.DoesNotExist:
-                logger.error(f"Feature template {feature_code} does not exist")
-                return False
+        return FeatureChecker.get_snapshot(company).is_enabled(feature_code)
     
     @staticmethod
     def check_feature_or_raise(company, feature_code):
@@ -73,14 +138,124 @@ class FeatureChecker:
     @staticmethod
     def get_enabled_features_for_company(company):
         """Get all enabled features for a company"""
-        return list(
-            CompanyFeature.objects.filter(
-                company=company,
-                is_enabled=True
-            ).select_related('feature_template').values_list(
-                'feature_template__feature_code', flat=True
+        return list(FeatureChecker.get_snapshot(company).enabled)
+
+
+class CompanyContext:
+    """Active company membership of the requesting user (company, role, allowed features)"""
+
+    def __init__(self, membership):
+        self.membership = membership
+        self.company = membership.company
+        self.role = membership.role
+        self.allowed_features = frozenset(membership.get_allowed_features())
+
+    def allows_feature(self, feature_code):
+        """Whether the user's role (and custom permissions) allow the feature"""
+        return '*' in self.allowed_features or feature_code in self.allowed_features
+
+
+class CompanyContextResolver:
+    """
+    Resolve request.company and the user's membership with a single query.
+
+    The membership (with its company) is selected in one query that prefers the
+    X-Company-ID header, then the profile's last active company, then the first
+    membership. The result is stored on the request for the other permission
+    classes and cached for a short time per (user, company); membership, profile
+    and company changes bump the user's COMPANY_CONTEXT namespace version
+    (caching.py, see signals.py).
+    """
+
+    CACHE_PREFIX = caching.COMPANY_CONTEXT
+
+    # Which company the selected membership matched
+    MATCH_REQUESTED = 0
+    MATCH_LAST_ACTIVE = 1
+    MATCH_FIRST = 2
+
+    @staticmethod
+    def invalidate_user(user_id):
+        """Drop cached company contexts of a user"""
+        caching.invalidate_user_namespace(user_id, caching.COMPANY_CONTEXT)
+
+    @staticmethod
+    def _requested_company_id(request):
+        company = getattr(request, 'company', None)
+        if company:
+            return company.pk
+        try:
+            return int(request.META.get('HTTP_X_COMPANY_ID'))
+        except (ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def resolve(request):
+        """
+        Return the CompanyContext of the request (or None) and set request.company.
+
+        If request.company is already set, only a membership of that company is accepted.
+        """
+        if not request.user or not request.user.is_authenticated:
+            return None
+
+        context = getattr(request, '_company_context', None)
+        company = getattr(request, 'company', None)
+        if context is not None and (not company or context.company.pk == company.pk):
+            return context
+
+        exact = bool(company)
+        company_id = CompanyContextResolver._requested_company_id(request)
+        user_id = request.user.pk
+
+        version = caching.user_namespace_version(user_id, caching.COMPANY_CONTEXT)
+        cache_key = f"{CompanyContextResolver.CACHE_PREFIX}:{user_id}:{version}:{company_id or 'default'}:{int(exact)}"
+
+        membership = cache.get(cache_key)
+        if membership is None:
+            membership = CompanyContextResolver._load_membership(request.user, company_id, exact)
+            if membership is not None:
+                cache.set(cache_key, membership, getattr(settings, 'COMPANY_CONTEXT_CACHE_TIMEOUT', 30))
+
+        if membership is None:
+            if not exact:
+                request.company = None
+            return None
+
+        context = CompanyContext(membership)
+        request._company_context = context
+        if not exact:
+            request.company = context.company
+        return context
+
+    @staticmethod
+    def _load_membership(user, company_id, exact):
+        """Select the active membership (with company) for the request in one query"""
+        memberships = CompanyUser.objects.filter(user=user, is_active=True).select_related('company')
+
+        if exact:
+            return memberships.filter(company_id=company_id).first()
+
+        last_active_company = UserProfile.objects.filter(user=user).values('last_active_company_id')[:1]
+        priority_rules = [When(company_id=Subquery(last_active_company), then=Value(CompanyContextResolver.MATCH_LAST_ACTIVE))]
+        if company_id is not None:
+            priority_rules.insert(0, When(company_id=company_id, then=Value(CompanyContextResolver.MATCH_REQUESTED)))
+
+        membership = memberships.annotate(
+            context_priority=Case(
+                *priority_rules,
+                default=Value(CompanyContextResolver.MATCH_FIRST),
+                output_field=IntegerField()
+            )
+        ).order_by('context_priority', *CompanyUser._meta.ordering).first()
+
+        if membership is not None and membership.context_priority == CompanyContextResolver.MATCH_FIRST:
+            # No usable header or last active company - remember the fallback on the profile
+            UserProfile.objects.update_or_create(
+                user=user, defaults={'last_active_company': membership.company}
             )
-        )
+
+        return membership
 
 
 def require_feature_api(feature_code):
@@ -199,16 +374,10 @@ class RequireBeneficiaryManagement(FeatureBasedPermission):
             return False
         
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user, 
-                company=request.company,
-                is_active=True
-            )
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             return False
+        user_allowed_features = context.allowed_features
         
         # Check for write operations vs read operations
         if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
@@ -243,16 +412,10 @@ class RequireTransferManagement(FeatureBasedPermission):
             return False
         
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user, 
-                company=request.company,
-                is_active=True
-            )
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             return False
+        user_allowed_features = context.allowed_features
         
         # Check for write operations vs read operations
         if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
@@ -294,16 +457,10 @@ class RequireBatchManagement(FeatureBasedPermission):
             return False
         
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user, 
-                company=request.company,
-                is_active=True
-            )
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             return False
+        user_allowed_features = context.allowed_features
         
         # Check for write operations vs read operations
         if request.method in ['POST', 'PUT', 'PATCH', 'DELETE']:
@@ -338,16 +495,10 @@ class RequireNavSync(FeatureBasedPermission):
             return False
         
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user, 
-                company=request.company,
-                is_active=True
-            )
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             return False
+        user_allowed_features = context.allowed_features
         
         # NAV_SYNC feature required
         required_feature = 'NAV_SYNC'
@@ -366,16 +517,10 @@ class RequireExportFeatures(FeatureBasedPermission):
             return False
 
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user,
-                company=request.company,
-                is_active=True
-            )
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             return False
+        user_allowed_features = context.allowed_features
 
         # For export endpoints, require at least one export feature
         export_features = ['EXPORT_XML_SEPA', 'EXPORT_CSV_KH', 'EXPORT_CSV_CUSTOM']
@@ -409,18 +554,12 @@ class RequireBankStatementImport(FeatureBasedPermission):
             return False
 
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user,
-                company=request.company,
-                is_active=True
-            )
-            user_role = company_user.role
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             logger.warning(f"User {request.user.username} has no role in company {request.company}")
             return False
+        user_role = context.role
+        user_allowed_features = context.allowed_features
 
         # Check if BANK_STATEMENT_IMPORT feature is enabled for company AND user has permission
         required_feature = 'BANK_STATEMENT_IMPORT'
@@ -467,18 +606,12 @@ class RequireBillingoSync(FeatureBasedPermission):
             return False
 
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user,
-                company=request.company,
-                is_active=True
-            )
-            user_role = company_user.role
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             logger.warning(f"User {request.user.username} has no role in company {request.company}")
             return False
+        user_role = context.role
+        user_allowed_features = context.allowed_features
 
         # Check if BILLINGO_SYNC feature is enabled for company
         if not FeatureChecker.is_feature_enabled(request.company, 'BILLINGO_SYNC'):
@@ -524,18 +657,12 @@ class RequireBaseTables(FeatureBasedPermission):
             return False
 
         # Get user's company membership and allowed features
-        try:
-            from .models import CompanyUser
-            company_user = CompanyUser.objects.get(
-                user=request.user,
-                company=request.company,
-                is_active=True
-            )
-            user_role = company_user.role
-            user_allowed_features = company_user.get_allowed_features()
-        except CompanyUser.DoesNotExist:
+        context = CompanyContextResolver.resolve(request)
+        if context is None:
             logger.warning(f"User {request.user.username} has no role in company {request.company}")
             return False
+        user_role = context.role
+        user_allowed_features = context.allowed_features
 
         # Check if BASE_TABLES feature is enabled for company
         if not FeatureChecker.is_feature_enabled(request.company, 'BASE_TABLES'):
@@ -559,72 +686,16 @@ class IsCompanyMember(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
 
-        # Set company context if not already set
-        if not hasattr(request, 'company') or not request.company:
-            self._set_company_context(request)
-
-        # Get company from request context
-        company = getattr(request, 'company', None)
-        if not company:
-            return False
+        # Set company context and check that the user is an active member
+        return self._get_company_context(request) is not None
 
-        # Check if user is a member of this company
-        return CompanyUser.objects.filter(
-            user=request.user,
-            company=company,
-            is_active=True
-        ).exists()
+    def _get_company_context(self, request):
+        """Resolve request.company and the user's membership (shared by all permission classes)"""
+        return CompanyContextResolver.resolve(request)
 
     def _set_company_context(self, request):
         """Set request.company based on X-Company-ID header or user profile"""
-        # Get company from header
-        company_id = request.META.get('HTTP_X_COMPANY_ID')
-
-        if company_id:
-            try:
-                company_id = int(company_id)
-                # Verify user has access to this company
-                membership = CompanyUser.objects.filter(
-                    user=request.user,
-                    company_id=company_id,
-                    is_active=True
-                ).select_related('company').first()
-
-                if membership:
-                    request.company = membership.company
-                    return
-            except (ValueError, TypeError):
-                pass
-
-        # Fallback to user's last active company
-        try:
-            profile = UserProfile.objects.select_related('last_active_company').get(user=request.user)
-            if profile.last_active_company:
-                # Verify user still has access to this company
-                if CompanyUser.objects.filter(
-                    user=request.user,
-                    company=profile.last_active_company,
-                    is_active=True
-                ).exists():
-                    request.company = profile.last_active_company
-                    return
-        except UserProfile.DoesNotExist:
-            pass
-
-        # Find first available company for user
-        membership = CompanyUser.objects.filter(
-            user=request.user,
-            is_active=True
-        ).select_related('company').first()
-
-        if membership:
-            request.company = membership.company
-            # Update user profile
-            profile, created = UserProfile.objects.get_or_create(user=request.user)
-            profile.last_active_company = membership.company
-            profile.save()
-        else:
-            request.company = None
+        CompanyContextResolver.resolve(request)
 
 
 class IsCompanyAdmin(IsCompanyMember):
@@ -637,22 +708,9 @@ class IsCompanyAdmin(IsCompanyMember):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        # Set company context if not already set
-        if not hasattr(request, 'company') or not request.company:
-            self._set_company_context(request)
-        
-        # Get company from request context
-        company = getattr(request, 'company', None)
-        if not company:
-            return False
-        
         # Check if user is an admin of this company
-        return CompanyUser.objects.filter(
-            user=request.user,
-            company=company,
-            role='ADMIN',
-            is_active=True
-        ).exists()
+        context = self._get_company_context(request)
+        return context is not None and context.role == 'ADMIN'
 
 
 class IsCompanyAdminOrReadOnly(IsCompanyMember):
@@ -665,23 +723,9 @@ class IsCompanyAdminOrReadOnly(IsCompanyMember):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        # Set company context if not already set
-        if not hasattr(request, 'company') or not request.company:
-            self._set_company_context(request)
-        
-        # Get company from request context
-        company = getattr(request, 'company', None)
-        if not company:
-            return False
-        
         # Check if user is a member of this company
-        membership = CompanyUser.objects.filter(
-            user=request.user,
-            company=company,
-            is_active=True
-        ).first()
-        
-        if not membership:
+        context = self._get_company_context(request)
+        if context is None:
             return False
         
         # Allow read operations for all members
@@ -689,5 +733,4 @@ class IsCompanyAdminOrReadOnly(IsCompanyMember):
             return True
         
         # Allow write operations only for admins
-        return membership.role == 'ADMIN'
-
+        return context.role == 'ADMIN'
@@ -0,0 +1,91 @@
+"""
+Invoice search
+
+Invoices keep a denormalised, accent-folded `search_text` column holding the
+searchable fields (invoice numbers, partner names, tax numbers). A search term
+is served by one of two index-backed predicates:
+
+- Number terms (a digit and no whitespace, e.g. '12345678' or 'INV-2025/'):
+  case-insensitive prefix match on the tax and invoice number columns, served
+  on PostgreSQL by the UPPER(...) text_pattern_ops indexes of migration 0068
+- Name terms: substring match on search_text, served on PostgreSQL by the
+  pg_trgm GIN index of migration 0068 (plain LIKE on SQLite)
+
+Name terms shorter than a trigram cannot use the GIN index; they still match
+with an icontains on the same column (a sequential scan, acceptable for these
+rare searches).
+
+    folded = fold_search_text('Kovács Kft.')   # 'kovacs kft.'
+    invoices = search_invoices(Invoice.objects.filter(company=company), 'kovacs')
+"""
+import re
+import unicodedata
+
+from django.db.models import Q
+
+# Invoice fields concatenated into Invoice.search_text
+INVOICE_SEARCH_FIELDS = (
+    'nav_invoice_number',
+    'supplier_name',
+    'customer_name',
+    'supplier_tax_number',
+    'customer_tax_number',
+    'original_invoice_number',
+)
+
+# Number columns matched by prefix; each has a prefix index (migration 0068)
+INVOICE_NUMBER_FIELDS = (
+    'nav_invoice_number',
+    'supplier_tax_number',
+    'customer_tax_number',
+    'original_invoice_number',
+)
+
+# Shortest term served by the trigram index
+TRIGRAM_MIN_LENGTH = 3
+
+# Fields are joined with a character a search term never contains,
+# so a term cannot match across two fields
+_FIELD_SEPARATOR = '\n'
+
+_NUMBER_TERM = re.compile(r'^(?=\S*\d)\S+$')
+
+
+def fold_search_text(value):
+    """Lower-case and strip accents (Á -> a, ő -> o) for accent-insensitive matching"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(value))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def build_invoice_search_text(invoice):
+    """Folded search_text value of an invoice (or any object with the search fields)"""
+    return _FIELD_SEPARATOR.join(
+        fold_search_text(getattr(invoice, field)) for field in INVOICE_SEARCH_FIELDS
+    )
+
+
+def search_invoices(queryset, value):
+    """
+    Filter invoices matching `value` (case insensitive).
+
+    Number terms match the start of a tax or invoice number; other terms match
+    anywhere in the accent-folded search fields. Name terms shorter than
+    TRIGRAM_MIN_LENGTH are not served by the trigram index.
+    """
+    value = (value or '').strip()
+    if not value:
+        return queryset
+
+    if _NUMBER_TERM.match(value):
+        prefix = Q()
+        for field in INVOICE_NUMBER_FIELDS:
+            prefix |= Q(**{f'{field}__istartswith': value})
+        return queryset.filter(prefix)
+
+    term = fold_search_text(value).replace(_FIELD_SEPARATOR, ' ')
+    if len(term) < TRIGRAM_MIN_LENGTH:
+        return queryset.filter(search_text__icontains=term)
+
+    return queryset.filter(search_text__contains=term)
@@ -57,6 +57,8 @@ from .bank_statements import (
     BankStatementListSerializer,
     BankStatementDetailSerializer,
     BankStatementUploadSerializer,
+    BankStatementAsyncUploadSerializer,
+    BankStatementProgressSerializer,
     OtherCostSerializer,
     SupportedBanksSerializer,
 )
@@ -121,6 +123,8 @@ __all__ = [
     'BankStatementListSerializer',
     'BankStatementDetailSerializer',
     'BankStatementUploadSerializer',
+    'BankStatementAsyncUploadSerializer',
+    'BankStatementProgressSerializer',
     'OtherCostSerializer',
     'SupportedBanksSerializer',
 
@@ -13,6 +13,7 @@ Supports multiple banks: GRÁNIT, Revolut, MagNet, K&H
 """
 
 from rest_framework import serializers
+from django.db.models import Prefetch
 from decimal import Decimal
 from ..models import (
     BankStatement, BankTransaction, BankTransactionInvoiceMatch, OtherCost
@@ -57,6 +58,9 @@ class BankTransactionSerializer(serializers.ModelSerializer):
 
     Provides full transaction details with nested invoice match information.
     Supports both single invoice matches and batch invoice matches.
+
+    Querysets should be passed through setup_eager_loading() - otherwise every
+    row triggers extra queries for its statement, matches, batch and other cost.
     """
     statement_details = serializers.SerializerMethodField()
     matched_invoice_details = serializers.SerializerMethodField()
@@ -89,6 +93,29 @@ class BankTransactionSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['created_at', 'updated_at']
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load every relation used by the serializer in a fixed number of queries"""
+        return queryset.select_related(
+            'bank_statement',
+            'matched_invoice',
+            'matched_reimbursement',
+            'other_cost_detail',
+        ).prefetch_related(
+            Prefetch(
+                'invoice_matches',
+                queryset=BankTransactionInvoiceMatch.objects.select_related('invoice')
+            ),
+            'matched_transfer__transferbatch_set',
+        )
+
+    @staticmethod
+    def _invoice_matches(obj):
+        """Invoice matches of the transaction (prefetched by setup_eager_loading)"""
+        if 'invoice_matches' in getattr(obj, '_prefetched_objects_cache', {}):
+            return obj.invoice_matches.all()
+        return obj.invoice_matches.select_related('invoice').all()
+
     def get_statement_details(self, obj):
         """Return basic statement info"""
         if obj.bank_statement:
@@ -119,7 +146,7 @@ class BankTransactionSerializer(serializers.ModelSerializer):
 
     def get_matched_invoices_details(self, obj):
         """Return list of all matched invoices with metadata (batch matching support)"""
-        matches = obj.invoice_matches.select_related('invoice').all()
+        matches = self._invoice_matches(obj)
         if not matches:
             return []
 
@@ -141,21 +168,22 @@ class BankTransactionSerializer(serializers.ModelSerializer):
 
     def get_is_batch_match(self, obj):
         """Return True if transaction is matched to multiple invoices"""
-        return obj.is_batch_match
+        # Same as BankTransaction.is_batch_match, counted from the prefetched matches
+        return len(self._invoice_matches(obj)) > 1
 
     def get_total_matched_amount(self, obj):
         """Return sum of all matched invoice amounts"""
-        total = obj.total_matched_amount
+        total = sum(match.invoice.invoice_gross_amount for match in self._invoice_matches(obj))
         return str(total) if total else None
 
     def get_matched_transfer_batch(self, obj):
         """Return batch ID for matched transfer"""
-        if obj.matched_transfer:
-            # Get the first batch that contains this transfer
+        if obj.matched_transfer_id:
+            # Get the first batch that contains this transfer (default batch ordering)
             # In most cases, a transfer belongs to only one batch
-            batch = obj.matched_transfer.transferbatch_set.first()
-            if batch:
-                return batch.id
+            batches = obj.matched_transfer.transferbatch_set.all()
+            if batches:
+                return batches[0].id
         return None
 
     def get_matched_reimbursement_details(self, obj):
@@ -219,7 +247,8 @@ class BankStatementListSerializer(serializers.ModelSerializer):
             'opening_balance', 'closing_balance',
             'file_name', 'file_size', 'file_hash',
             'uploaded_by', 'uploaded_by_name', 'uploaded_at',
-            'status', 'parse_error',
+            'status', 'parse_error', 'pages_total', 'pages_processed',
+            'incremental', 'skipped_duplicates',
             'total_transactions', 'credit_count', 'debit_count',
             'total_credits', 'total_debits', 'matched_count', 'matched_percentage',
             'created_at', 'updated_at'
@@ -260,6 +289,8 @@ class BankStatementDetailSerializer(serializers.ModelSerializer):
             'file_name', 'file_size', 'file_hash', 'file_path',
             'uploaded_by', 'uploaded_by_name', 'uploaded_at',
             'status', 'parse_error', 'parse_warnings',
+            'pages_total', 'pages_processed', 'parse_started_at', 'parse_completed_at',
+            'incremental', 'skipped_duplicates',
             'total_transactions', 'credit_count', 'debit_count',
             'total_credits', 'total_debits', 'matched_count', 'matched_percentage',
             'transactions',
@@ -314,6 +345,11 @@ class BankStatementUploadSerializer(serializers.Serializer):
         required=True,
         help_text="Bank statement PDF file"
     )
+    incremental = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Only import transactions not yet present for the account (overlapping statements)"
+    )
 
     def validate_file(self, value):
         """Validate uploaded file - accepts PDF, CSV, and XML formats"""
@@ -336,6 +372,52 @@ class BankStatementUploadSerializer(serializers.Serializer):
         return value
 
 
+class BankStatementAsyncUploadSerializer(serializers.Serializer):
+    """
+    Serializer for background (async) bank statement upload.
+
+    Accepts one or more files; each file is validated like a single upload.
+    """
+    files = serializers.ListField(
+        child=serializers.FileField(),
+        allow_empty=False,
+        help_text="Bank statement files (PDF, CSV or XML)"
+    )
+    incremental = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Only import transactions not yet present for the account (overlapping statements)"
+    )
+
+    def validate_files(self, value):
+        """Validate every uploaded file with the single-upload rules"""
+        file_validator = BankStatementUploadSerializer()
+        return [file_validator.validate_file(uploaded_file) for uploaded_file in value]
+
+
+class BankStatementProgressSerializer(serializers.ModelSerializer):
+    """
+    Serializer for background processing progress of a bank statement.
+
+    Lightweight payload intended for polling while status is UPLOADED/PARSING/MATCHING.
+    """
+    is_finished = serializers.SerializerMethodField()
+
+    class Meta:
+        model = BankStatement
+        fields = [
+            'id', 'file_name', 'bank_code', 'status', 'is_finished',
+            'pages_total', 'pages_processed',
+            'total_transactions', 'skipped_duplicates', 'matched_count',
+            'parse_error', 'parse_started_at', 'parse_completed_at'
+        ]
+        read_only_fields = fields
+
+    def get_is_finished(self, obj):
+        """Processing is finished once the statement is PARSED or ERROR"""
+        return obj.status in ('PARSED', 'ERROR')
+
+
 class OtherCostSerializer(serializers.ModelSerializer):
     """
     Serializer for other cost records.
@@ -17,6 +17,23 @@ from ..models import (
 )
 
 
+class ValidityPeriodMixin:
+    """
+    is_valid from the `valid_today` annotation of the list views (see
+    services/validity_index.py), computed per object otherwise.
+    """
+
+    def get_is_valid(self, obj):
+        """Check if the record is currently valid"""
+        annotated = getattr(obj, 'valid_today', None)
+        return obj.is_valid() if annotated is None else annotated
+
+    def update(self, instance, validated_data):
+        # The annotation describes the dates before the update
+        instance.__dict__.pop('valid_today', None)
+        return super().update(instance, validated_data)
+
+
 class SupplierCategorySerializer(serializers.ModelSerializer):
     """
     Serializer for SupplierCategory (Beszállító kategória) model.
@@ -63,7 +80,7 @@ class SupplierTypeSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
-class SupplierSerializer(serializers.ModelSerializer):
+class SupplierSerializer(ValidityPeriodMixin, serializers.ModelSerializer):
     """
     Serializer for Supplier (Beszállító) model.
 
@@ -84,10 +101,6 @@ class SupplierSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'company', 'company_name', 'category_name', 'type_name', 'created_at', 'updated_at']
 
-    def get_is_valid(self, obj):
-        """Check if supplier record is currently valid"""
-        return obj.is_valid()
-
     def validate_partner_name(self, value):
         """Validate partner name is not empty"""
         if not value or not value.strip():
@@ -107,7 +120,7 @@ class SupplierSerializer(serializers.ModelSerializer):
         return data
 
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(ValidityPeriodMixin, serializers.ModelSerializer):
     """
     Serializer for Customer (Vevő) model.
 
@@ -125,10 +138,6 @@ class CustomerSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'company', 'company_name', 'created_at', 'updated_at']
 
-    def get_is_valid(self, obj):
-        """Check if customer record is currently valid"""
-        return obj.is_valid()
-
     def validate_customer_name(self, value):
         """Validate customer name is not empty"""
         if not value or not value.strip():
@@ -148,7 +157,7 @@ class CustomerSerializer(serializers.ModelSerializer):
         return data
 
 
-class ProductPriceSerializer(serializers.ModelSerializer):
+class ProductPriceSerializer(ValidityPeriodMixin, serializers.ModelSerializer):
     """
     Serializer for ProductPrice (CONMED árak) model.
 
@@ -171,10 +180,6 @@ class ProductPriceSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'company', 'company_name', 'created_at', 'updated_at']
 
-    def get_is_valid(self, obj):
-        """Check if product price record is currently valid"""
-        return obj.is_valid()
-
     def validate_product_value(self, value):
         """Validate product code is not empty"""
         if not value or not value.strip():
@@ -7,15 +7,28 @@ This service handles the complete PDF parsing workflow:
 3. PDF parsing
 4. Transaction storage
 5. Invoice matching
+
+Uploads can be processed synchronously (parse_and_save) or stored and queued
+for background processing (enqueue, see bank_statement_worker), in which case
+the statement moves through UPLOADED → PARSING → MATCHING → PARSED (or ERROR).
+
+Every transaction gets a fingerprint (account, booking date, amount, currency,
+transaction ID/reference). In incremental mode only transactions whose
+fingerprint is not yet present are imported, so overlapping exports (e.g. daily
+re-downloads) insert and match just the new rows.
 """
 
 import hashlib
 import logging
-from typing import Dict, Any, Optional
+import re
+from collections import Counter
+from typing import Dict, Any, List, Optional
 from decimal import Decimal
 from datetime import datetime, date
 from django.db import transaction as db_transaction
 from django.utils import timezone
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import UploadedFile
 
 from ..models import BankStatement, BankTransaction, Company
@@ -29,6 +42,10 @@ from ..schemas.bank_statement import (
 logger = logging.getLogger(__name__)
 
 
+class StatementClaimLost(Exception):
+    """The statement was reclaimed by another worker while this run processed it"""
+
+
 def sanitize_raw_data(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Convert raw_data to JSON-serializable format.
@@ -61,6 +78,42 @@ def sanitize_raw_data(data: Dict[str, Any]) -> Dict[str, Any]:
     return sanitized
 
 
+def transaction_fingerprints(account_number: str, transactions) -> List[str]:
+    """
+    Compute import fingerprints for transactions of one statement.
+
+    The key is account number, booking date, amount, currency and transaction ID
+    (falling back to reference). Identical keys within the same file (e.g. two
+    equal card payments on the same day) get an occurrence counter, so they are
+    not collapsed into one transaction.
+
+    Args:
+        account_number: Statement account number (formatting is ignored)
+        transactions: NormalizedTransaction or BankTransaction objects in statement order
+
+    Returns:
+        SHA256 hex digests, one per transaction
+    """
+    account = re.sub(r'[^0-9A-Za-z]', '', account_number or '').upper()
+    occurrences = Counter()
+    fingerprints = []
+
+    for transaction in transactions:
+        key = '|'.join([
+            account,
+            transaction.booking_date.isoformat(),
+            f'{Decimal(transaction.amount):.2f}',
+            transaction.currency or '',
+            (transaction.transaction_id or transaction.reference or '').strip(),
+        ])
+        occurrences[key] += 1
+        fingerprints.append(
+            hashlib.sha256(f'{key}|{occurrences[key]}'.encode('utf-8')).hexdigest()
+        )
+
+    return fingerprints
+
+
 class BankStatementParserService:
     """
     Service for parsing bank statement PDFs and creating transactions.
@@ -74,12 +127,13 @@ class BankStatementParserService:
         self.company = company
         self.user = user
 
-    def parse_and_save(self, uploaded_file: UploadedFile) -> BankStatement:
+    def parse_and_save(self, uploaded_file: UploadedFile, incremental: bool = False) -> BankStatement:
         """
         Parse uploaded PDF and save statement with transactions.
 
         Args:
             uploaded_file: Django UploadedFile instance
+            incremental: Only import transactions not yet present for the account
 
         Returns:
             BankStatement instance
@@ -92,6 +146,88 @@ class BankStatementParserService:
         pdf_bytes = uploaded_file.read()
         uploaded_file.seek(0)  # Reset for potential re-reading
 
+        # Created already claimed, so the background worker never picks it up
+        statement, adapter = self._create_statement(uploaded_file, pdf_bytes, incremental, claimed=True)
+        self._process_statement(statement, adapter, pdf_bytes)
+
+        return statement
+
+    def enqueue(self, uploaded_file: UploadedFile, incremental: bool = False) -> BankStatement:
+        """
+        Store uploaded file and queue it for background processing.
+
+        Duplicate detection and bank detection run immediately so the caller gets
+        instant feedback; parsing and matching run on the background worker.
+
+        Args:
+            uploaded_file: Django UploadedFile instance
+            incremental: Only import transactions not yet present for the account
+
+        Returns:
+            BankStatement instance in UPLOADED status
+
+        Raises:
+            BankStatementParseError: If the bank cannot be detected
+            ValueError: If file already exists
+        """
+        from .bank_statement_worker import submit_statement
+
+        pdf_bytes = uploaded_file.read()
+        uploaded_file.seek(0)
+
+        statement, _adapter = self._create_statement(uploaded_file, pdf_bytes, incremental)
+
+        # Persist the original file so the worker can read it back
+        statement.file_path = default_storage.save(statement.file_path, ContentFile(pdf_bytes))
+        statement.save(update_fields=['file_path'])
+
+        # Only hand over to the worker once the statement row is committed
+        statement_id = statement.id
+        db_transaction.on_commit(lambda: submit_statement(statement_id))
+
+        logger.info(f"Queued statement {statement.id} ({statement.file_name}) for background processing")
+        return statement
+
+    def process_stored_statement(self, statement: BankStatement) -> BankStatement:
+        """
+        Parse and match a previously enqueued statement from its stored file.
+
+        Args:
+            statement: BankStatement created by enqueue() and claimed by the worker
+                (PARSING status, parse_started_at set)
+
+        Returns:
+            BankStatement instance
+
+        Raises:
+            BankStatementParseError: If the stored file cannot be parsed
+        """
+        adapter = BankAdapterFactory.get_adapter_by_bank_code(statement.bank_code)
+
+        try:
+            if adapter is None:
+                raise BankStatementParseError(f"No adapter found for bank code: {statement.bank_code}")
+            with default_storage.open(statement.file_path, 'rb') as stored_file:
+                pdf_bytes = stored_file.read()
+        except Exception as e:
+            self._mark_error(statement, e)
+            raise BankStatementParseError(f"Parsing failed: {e}") from e
+
+        self._process_statement(statement, adapter, pdf_bytes)
+        return statement
+
+    def _create_statement(
+        self, uploaded_file: UploadedFile, pdf_bytes: bytes, incremental: bool = False, claimed: bool = False
+    ):
+        """
+        Run duplicate and bank detection and create the statement record.
+
+        The record is UPLOADED (waiting for the worker), or PARSING with
+        parse_started_at set if `claimed` (processed by the caller).
+
+        Returns:
+            Tuple of (BankStatement, adapter instance)
+        """
         # Calculate file hash for duplicate detection
         file_hash = self._calculate_hash(pdf_bytes)
 
@@ -106,7 +242,6 @@ class BankStatementParserService:
             logger.error(f"Bank detection failed: {e}")
             raise
 
-        # Create statement record with UPLOADED status
         statement = BankStatement(
             company=self.company,
             bank_code=adapter.get_bank_code(),
@@ -118,7 +253,9 @@ class BankStatementParserService:
             file_path=f"bank_statements/{self.company.id}/{file_hash[:8]}/{uploaded_file.name}",
             uploaded_by=self.user,
             uploaded_at=timezone.now(),
-            status='UPLOADED',
+            status='PARSING' if claimed else 'UPLOADED',
+            parse_started_at=timezone.now() if claimed else None,
+            incremental=incremental,
             account_number='',  # Will be updated after parsing
             opening_balance=Decimal('0.00'),  # Will be updated after parsing
             statement_period_from=timezone.now().date(),  # Will be updated after parsing
@@ -126,20 +263,26 @@ class BankStatementParserService:
         )
         statement.save()
 
-        # Parse PDF in transaction
+        return statement, adapter
+
+    def _process_statement(self, statement: BankStatement, adapter, pdf_bytes: bytes):
+        """Parse statement, marking it as ERROR if anything fails."""
         try:
-            with db_transaction.atomic():
-                self._parse_statement(statement, adapter, pdf_bytes)
+            self._parse_statement(statement, adapter, pdf_bytes)
 
+        except StatementClaimLost:
+            # The statement belongs to the worker that reclaimed it
+            raise
         except Exception as e:
-            # Mark as ERROR and save error message
-            statement.status = 'ERROR'
-            statement.parse_error = str(e)
-            statement.save()
-            logger.error(f"Parsing failed for statement {statement.id}: {e}", exc_info=True)
+            self._mark_error(statement, e)
             raise BankStatementParseError(f"Parsing failed: {e}") from e
 
-        return statement
+    def _mark_error(self, statement: BankStatement, error: Exception):
+        """Mark statement as ERROR and save error message"""
+        statement.status = 'ERROR'
+        statement.parse_error = str(error)
+        statement.save()
+        logger.error(f"Parsing failed for statement {statement.id}: {error}", exc_info=True)
 
     def parse_statement_with_output(
         self,
@@ -180,7 +323,7 @@ class BankStatementParserService:
                 closing_balance=statement.closing_balance,
                 total_transactions=statement.total_transactions,
                 transactions_created=statement.total_transactions,
-                duplicates_skipped=0,  # Could be enhanced to track this
+                duplicates_skipped=statement.skipped_duplicates,
                 auto_matched=statement.matched_count or 0,
                 errors=[],
                 warnings=[]
@@ -232,22 +375,46 @@ class BankStatementParserService:
         """
         Parse PDF and create transactions.
 
+        The adapter runs outside the database transaction so page progress updates
+        are visible to progress polling while a large statement is being parsed.
+        Transactions and statistics are saved atomically (together with the
+        MATCHING status). Matching runs after that commit: if it fails the
+        transactions are kept and the statement is marked PARSED with a warning
+        in parse_warnings; transactions can be matched again one by one (rematch).
+
+        The statement must already be claimed (PARSING, parse_started_at set).
+        Both saves check the claim, so a run whose statement was reclaimed as
+        stale raises StatementClaimLost instead of saving its transactions twice.
+
         Args:
             statement: BankStatement instance
             adapter: Bank adapter instance
             pdf_bytes: PDF file bytes
         """
-        # Update status
-        statement.status = 'PARSING'
-        statement.parse_started_at = timezone.now()
-        statement.save()
-
         # Parse PDF
+        adapter.progress_callback = lambda done, total: self._update_page_progress(statement, done, total)
         try:
             result = adapter.parse(pdf_bytes)
         except Exception as e:
             raise BankStatementParseError(f"Adapter parse failed: {e}") from e
 
+        # CSV/XML adapters have no pages - count the file as a single page
+        if not statement.pages_total:
+            self._update_page_progress(statement, 1, 1)
+
+        with db_transaction.atomic():
+            created_count = self._save_parse_result(statement, result)
+
+        # Run automatic transaction matching to NAV invoices
+        self._match_statement(statement, created_count)
+
+    def _save_parse_result(self, statement: BankStatement, result: Dict[str, Any]) -> int:
+        """
+        Store parsed metadata, transactions and statistics.
+
+        Returns:
+            Number of transactions created
+        """
         # Extract metadata and transactions
         metadata = result.get('metadata')
         transactions_data = result.get('transactions', [])
@@ -255,6 +422,8 @@ class BankStatementParserService:
         if not metadata:
             raise BankStatementParseError("No metadata found in parse result")
 
+        self._check_claim(statement)
+
         # Update statement with metadata
         statement.account_number = metadata.account_number
         statement.account_iban = metadata.account_iban
@@ -279,10 +448,17 @@ class BankStatementParserService:
                 f"{statement.statement_period_from} - {statement.statement_period_to}"
             )
 
+        fingerprints = transaction_fingerprints(statement.account_number, transactions_data)
+
+        # Incremental import: skip transactions already imported for this account
+        existing_fingerprints = self._existing_fingerprints(fingerprints) if statement.incremental else set()
+
         # Create transactions
         created_count = 0
-        for trans_data in transactions_data:
-            self._create_transaction(statement, trans_data)
+        for trans_data, fingerprint in zip(transactions_data, fingerprints):
+            if fingerprint in existing_fingerprints:
+                continue
+            self._create_transaction(statement, trans_data, fingerprint)
             created_count += 1
 
         # Calculate credit/debit statistics
@@ -299,12 +475,12 @@ class BankStatementParserService:
 
         # Update statement with statistics
         statement.total_transactions = created_count
+        statement.skipped_duplicates = len(transactions_data) - created_count
         statement.credit_count = transaction_stats['credit_count'] or 0
         statement.debit_count = transaction_stats['debit_count'] or 0
         statement.total_credits = transaction_stats['total_credits'] or Decimal('0.00')
         statement.total_debits = abs(transaction_stats['total_debits'] or Decimal('0.00'))
-        statement.status = 'PARSED'
-        statement.parse_completed_at = timezone.now()
+        statement.status = 'MATCHING'
         statement.save()
 
         logger.info(
@@ -312,17 +488,39 @@ class BankStatementParserService:
             f"{created_count} transactions for {statement.bank_name} "
             f"{statement.account_number}"
         )
+        if statement.incremental:
+            logger.info(
+                f"Incremental import for statement {statement.id}: "
+                f"{statement.skipped_duplicates} already imported transactions skipped"
+            )
 
-        # Run automatic transaction matching to NAV invoices
+        return created_count
+
+    def _existing_fingerprints(self, fingerprints: List[str], chunk_size: int = 500) -> set:
+        """Return the fingerprints already imported for this company"""
+        existing = set()
+        for start in range(0, len(fingerprints), chunk_size):
+            existing.update(
+                BankTransaction.objects.filter(
+                    company=self.company,
+                    fingerprint__in=fingerprints[start:start + chunk_size]
+                ).values_list('fingerprint', flat=True)
+            )
+        return existing
+
+    def _match_statement(self, statement: BankStatement, created_count: int):
+        """Run automatic matching and mark the statement as PARSED."""
         try:
             from .transaction_matching_service import TransactionMatchingService
 
             matching_service = TransactionMatchingService(self.company)
-            match_results = matching_service.match_statement(statement)
+            match_results = matching_service.match_statement(
+                statement,
+                progress_callback=lambda matched: self._update_match_progress(statement, matched)
+            )
 
             # Update statement matched_count
             statement.matched_count = match_results['matched_count']
-            statement.save()
 
             logger.info(
                 f"Transaction matching completed for statement {statement.id}: "
@@ -332,16 +530,58 @@ class BankStatementParserService:
             )
         except Exception as e:
             logger.error(f"Transaction matching failed for statement {statement.id}: {e}", exc_info=True)
-            # Don't fail the entire parsing if matching fails
-            pass
+            # Don't fail the entire parsing if matching fails - keep the transactions, report it
+            statement.parse_warnings = [*(statement.parse_warnings or []), f"Automatikus párosítás sikertelen: {e}"]
+
+        statement.status = 'PARSED'
+        statement.parse_completed_at = timezone.now()
+        with db_transaction.atomic():
+            self._check_claim(statement)
+            statement.save()
+
+    def _check_claim(self, statement: BankStatement):
+        """
+        Lock the statement row and make sure this run still owns it.
+
+        Runs inside the saving transaction. The claim is the parse_started_at
+        stamp set when the statement was claimed; a worker reclaiming a stale
+        statement sets a new one.
+
+        Raises:
+            StatementClaimLost: If the statement was reclaimed in the meantime
+        """
+        claimed_at = BankStatement.objects.select_for_update().filter(
+            pk=statement.pk
+        ).values_list('parse_started_at', flat=True).first()
+        if claimed_at != statement.parse_started_at:
+            raise StatementClaimLost(f"Statement {statement.pk} was reclaimed by another worker")
+
+    def resume_matching(self, statement: BankStatement) -> BankStatement:
+        """Finish a statement whose transactions were saved but not matched (worker died in MATCHING)"""
+        self._match_statement(statement, statement.total_transactions)
+        return statement
+
+    def _update_page_progress(self, statement: BankStatement, pages_done: int, pages_total: int):
+        """Persist page progress without touching other statement fields"""
+        statement.pages_processed = pages_done
+        statement.pages_total = pages_total
+        BankStatement.objects.filter(pk=statement.pk).update(
+            pages_processed=pages_done,
+            pages_total=pages_total
+        )
+
+    def _update_match_progress(self, statement: BankStatement, matched_count: int):
+        """Persist number of transactions matched so far"""
+        BankStatement.objects.filter(pk=statement.pk).update(matched_count=matched_count)
 
-    def _create_transaction(self, statement: BankStatement, trans_data) -> BankTransaction:
+    def _create_transaction(self, statement: BankStatement, trans_data, fingerprint: str = '') -> BankTransaction:
         """
         Create BankTransaction from normalized transaction data.
 
         Args:
             statement: BankStatement instance
             trans_data: NormalizedTransaction instance
+            fingerprint: Import fingerprint (see transaction_fingerprints)
 
         Returns:
             BankTransaction instance
@@ -362,6 +602,7 @@ class BankStatementParserService:
             # AFR/Transfer fields
             payment_id=trans_data.payment_id or '',
             transaction_id=trans_data.transaction_id or '',
+            fingerprint=fingerprint,
 
             payer_name=trans_data.payer_name or '',
             payer_iban=trans_data.payer_iban or '',
@@ -0,0 +1,150 @@
+"""
+Background worker for uploaded bank statements.
+
+Statements uploaded through the async upload endpoint are stored with UPLOADED
+status and processed on a process-local thread pool, so large statements do not
+block the HTTP request:
+
+    UPLOADED → PARSING → MATCHING → PARSED (or ERROR)
+
+Progress (pages, transactions, matches) is written to the BankStatement row and
+can be polled via GET /api/bank-statements/{id}/progress/.
+
+Statements left in UPLOADED status (e.g. after a worker restart) are picked up
+by the process_bank_statements management command, as are statements stuck in
+PARSING or MATCHING longer than BANK_STATEMENT_STALE_AFTER seconds (the worker
+processing them died). A reclaimed PARSING statement is parsed again (its
+transactions are only committed together with the MATCHING status); a
+reclaimed MATCHING statement only re-runs the matching.
+
+The parse_started_at stamp set by a claim identifies its owner. Saves check it
+under a row lock, so a slow worker whose statement was reclaimed gives up
+instead of saving the transactions a second time.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.db.models import Q
+from django.utils import timezone
+
+from ..bank_adapters import BankStatementParseError
+from ..models import BankStatement
+
+logger = logging.getLogger(__name__)
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the shared statement processing thread pool (created lazily)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BANK_STATEMENT_WORKERS', 4),
+                thread_name_prefix='bank-statement'
+            )
+    return _executor
+
+
+def _claimable(now=None) -> Q:
+    """Statements waiting for processing, or abandoned by a worker that died"""
+    cutoff = (now or timezone.now()) - timedelta(seconds=getattr(settings, 'BANK_STATEMENT_STALE_AFTER', 1800))
+    return Q(status='UPLOADED') | (
+        Q(status__in=['PARSING', 'MATCHING']) &
+        (Q(parse_started_at__isnull=True) | Q(parse_started_at__lt=cutoff))
+    )
+
+
+def claimable_statements():
+    """Queryset of statements the worker would claim now"""
+    return BankStatement.objects.filter(_claimable())
+
+
+def submit_statement(statement_id: int) -> Future:
+    """
+    Queue a stored statement for background processing.
+
+    Args:
+        statement_id: BankStatement ID in UPLOADED (or abandoned PARSING/MATCHING) status
+
+    Returns:
+        Future resolving to the processed BankStatement (or None if skipped)
+    """
+    return get_executor().submit(run_statement_job, statement_id)
+
+
+def run_statement_job(statement_id: int) -> Optional[BankStatement]:
+    """
+    Thread entry point: process one statement with its own database connection.
+    """
+    close_old_connections()
+    try:
+        return process_statement(statement_id)
+    except Exception as e:
+        logger.error(f"Background processing failed for statement {statement_id}: {e}", exc_info=True)
+        return None
+    finally:
+        # Worker threads must not leak connections
+        connections.close_all()
+
+
+def process_statement(statement_id: int) -> Optional[BankStatement]:
+    """
+    Parse and match a stored statement.
+
+    The statement is claimed atomically (status and parse_started_at are checked
+    and set in one UPDATE) so the same upload is never processed twice, even if
+    the management command runs alongside the pool.
+
+    Args:
+        statement_id: BankStatement ID
+
+    Returns:
+        Processed BankStatement, or None if it was already claimed (or was
+        reclaimed by another worker before this run saved it)
+    """
+    from .bank_statement_parser_service import BankStatementParserService, StatementClaimLost
+
+    now = timezone.now()
+    previous_status = BankStatement.objects.filter(
+        _claimable(now), id=statement_id
+    ).values_list('status', flat=True).first()
+
+    claimed = previous_status and BankStatement.objects.filter(
+        _claimable(now), id=statement_id, status=previous_status
+    ).update(
+        status='MATCHING' if previous_status == 'MATCHING' else 'PARSING',
+        parse_started_at=now
+    )
+
+    if not claimed:
+        logger.info(f"Statement {statement_id} is not waiting for processing, skipping")
+        return None
+
+    statement = BankStatement.objects.select_related('company', 'uploaded_by').get(id=statement_id)
+    service = BankStatementParserService(statement.company, statement.uploaded_by)
+
+    if previous_status != 'UPLOADED':
+        logger.warning(f"Reclaimed statement {statement_id} abandoned in {previous_status} status")
+
+    try:
+        if previous_status == 'MATCHING':
+            service.resume_matching(statement)
+        else:
+            service.process_stored_statement(statement)
+    except BankStatementParseError:
+        # Already marked as ERROR with parse_error by the service
+        pass
+    except StatementClaimLost:
+        logger.warning(f"Statement {statement_id} was reclaimed by another worker, dropping this run")
+        return None
+
+    return statement
@@ -0,0 +1,411 @@
+"""
+Base table CSV import service
+
+Streams supplier, customer and product price CSV rows and upserts them in chunks:
+rows are read lazily, supplier categories and types are resolved from a dict
+preloaded once per import, and each chunk is written with one preload query plus
+bulk_create/bulk_update. Rows whose values did not change are left untouched.
+If a chunk's bulk write fails, that chunk is retried row by row and the rows
+that still fail are reported as warnings.
+
+A dry run performs the same comparison without writing and returns the diff.
+
+    service = BaseTableImportService(company, 'prices', dry_run=True)
+    result = service.import_csv('/opt/data/BASE_table_CONMED_arak.csv', delimiter='\t')
+"""
+import csv
+import logging
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+
+from .. import caching
+from ..models import Supplier, SupplierCategory, SupplierType, Customer, ProductPrice
+
+logger = logging.getLogger(__name__)
+
+
+def detect_delimiter(file_path, sample_size=5):
+    """
+    Automatically detect CSV delimiter (comma or tab).
+    Reads first few lines and uses csv.Sniffer to detect delimiter.
+    """
+    with open(file_path, 'r', encoding='utf-8') as f:
+        # Read first few lines for detection
+        sample = ''.join([f.readline() for _ in range(sample_size)])
+
+        try:
+            # Use csv.Sniffer to detect delimiter
+            sniffer = csv.Sniffer()
+            delimiter = sniffer.sniff(sample).delimiter
+            return delimiter
+        except csv.Error:
+            # Fallback: count commas vs tabs in first line
+            first_line = sample.split('\n')[0]
+            comma_count = first_line.count(',')
+            tab_count = first_line.count('\t')
+
+            if tab_count > comma_count:
+                return '\t'
+            else:
+                return ','
+
+
+def iter_csv_rows(csv_path, delimiter=','):
+    """Yield (row number, row dict) pairs without loading the file; the header is row 1"""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        yield from enumerate(csv.DictReader(f, delimiter=delimiter), start=2)
+
+
+def _parse_date(value, date_format):
+    """Parse an optional date; returns (date or None, is_invalid)"""
+    value = (value or '').strip()
+    if not value:
+        return None, False
+    try:
+        return datetime.strptime(value, date_format).date(), False
+    except ValueError:
+        return None, True
+
+
+def _clean_currency(value):
+    """
+    Parse a price cell.
+
+    Handles both US format ($1,234.56) and European format (1 234,56 Ft).
+    """
+    if not value:
+        return None
+    # Remove currency symbols and trim
+    cleaned = value.replace('$', '').replace('Ft', '').strip()
+    # Remove both regular spaces AND non-breaking spaces (U+00A0) - European thousands separator
+    cleaned = cleaned.replace(' ', '').replace('\xa0', '')
+    # Convert comma to period (European decimal separator)
+    cleaned = cleaned.replace(',', '.')
+    try:
+        # Stored with 2 decimals; quantize so re-imports compare equal
+        return Decimal(cleaned).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+
+
+class BaseTableImportService:
+    """Chunked CSV upsert into the Supplier, Customer and ProductPrice base tables"""
+
+    CHUNK_SIZE = 1000
+
+    # csv_type -> (model, natural key field, updated fields)
+    TABLES = {
+        'suppliers': (Supplier, 'partner_name', ('category_id', 'type_id', 'valid_from', 'valid_to')),
+        'customers': (Customer, 'customer_name', ('cashflow_adjustment', 'valid_from', 'valid_to')),
+        'prices': (ProductPrice, 'product_value', (
+            'product_description', 'uom', 'uom_hun', 'purchase_price_usd', 'purchase_price_huf',
+            'markup', 'sales_price_huf', 'cap_disp', 'is_inventory_managed', 'valid_from', 'valid_to',
+        )),
+    }
+
+    def __init__(self, company, csv_type, dry_run=False, chunk_size=None):
+        if csv_type not in self.TABLES:
+            raise ValueError(f"Unknown base table type: {csv_type}")
+
+        self.company = company
+        self.csv_type = csv_type
+        self.dry_run = dry_run
+        self.chunk_size = chunk_size or self.CHUNK_SIZE
+        self.model, self.key_field, self.fields = self.TABLES[csv_type]
+
+        # Supplier category/type name -> id (dry run: placeholder for names not created yet)
+        self._lookups = {}
+        # Position of each category/type name in the file, used as display_order on create
+        self._display_orders = {SupplierCategory: {}, SupplierType: {}}
+
+        self.result = {
+            'rows': 0,
+            'created': 0,
+            'updated': 0,
+            'unchanged': 0,
+            'skipped': 0,
+            'categories_created': 0,
+            'types_created': 0,
+            'chunks': 0,
+            'elapsed_seconds': 0.0,
+            'rows_per_second': 0.0,
+            'warnings': [],
+            'diff': [],
+        }
+
+    def import_csv(self, csv_path, delimiter=','):
+        """Import a CSV file; see import_rows()"""
+        return self.import_rows(iter_csv_rows(csv_path, delimiter))
+
+    def import_rows(self, rows):
+        """
+        Import (row number, row dict) pairs chunk by chunk.
+
+        Every chunk is written in its own transaction, so a failing chunk does
+        not roll back the chunks before it; a chunk whose bulk write fails is
+        written row by row instead, so one bad row only skips itself.
+
+        Returns:
+            dict: created/updated/unchanged/skipped counts, categories_created and
+            types_created (suppliers), chunks, elapsed_seconds, rows_per_second,
+            warnings as (row number, message) and - for dry runs - the diff as
+            {'action': 'create'|'update', 'key': ..., 'changes': {field: (old, new)}}
+        """
+        started = time.monotonic()
+        if self.csv_type == 'suppliers':
+            self._preload_lookups()
+
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self._import_chunk(chunk)
+
+        if not self.dry_run:
+            # Bulk writes do not send the signals that refresh the validity index
+            caching.invalidate_company_namespace(self.company.id, caching.BASE_TABLES)
+
+        elapsed = time.monotonic() - started
+        self.result['elapsed_seconds'] = round(elapsed, 3)
+        self.result['rows_per_second'] = round(self.result['rows'] / elapsed, 1) if elapsed else 0.0
+        return self.result
+
+    def _warn(self, row_num, message):
+        self.result['warnings'].append((row_num, message))
+
+    # ------------------------------------------------------------------
+    # Row parsing
+    # ------------------------------------------------------------------
+
+    def _parse_dates(self, row_num, row, from_column, to_column, date_format):
+        valid_from, invalid_from = _parse_date(row.get(from_column), date_format)
+        valid_to, invalid_to = _parse_date(row.get(to_column), date_format)
+        if invalid_from:
+            self._warn(row_num, f"Invalid valid_from date format: {row.get(from_column).strip()}")
+        if invalid_to:
+            self._warn(row_num, f"Invalid valid_to date format: {row.get(to_column).strip()}")
+        return valid_from, valid_to
+
+    def _parse_supplier(self, row_num, row):
+        partner_name = row['Partner neve'].strip()
+        if not partner_name:
+            self._warn(row_num, "Empty partner name, skipping")
+            return None
+
+        valid_from, valid_to = self._parse_dates(row_num, row, 'Valid_from', 'Valid_to', '%Y-%m-%d')
+        return partner_name, {
+            'category_id': row['Category'].strip(),  # Name until resolved
+            'type_id': row['Type'].strip(),
+            'valid_from': valid_from,
+            'valid_to': valid_to,
+        }
+
+    def _parse_customer(self, row_num, row):
+        customer_name = row['Customer name'].strip()
+        if not customer_name:
+            self._warn(row_num, "Empty customer name, skipping")
+            return None
+
+        try:
+            cashflow_adjustment = int(row.get('Cashflow adjustment', '0').strip() or '0')
+        except ValueError:
+            cashflow_adjustment = 0
+
+        # Dates use the 2024/06/30 format ('Validf_from' is the column name in the source file)
+        valid_from, valid_to = self._parse_dates(row_num, row, 'Validf_from', 'Valid_to', '%Y/%m/%d')
+        return customer_name, {
+            'cashflow_adjustment': cashflow_adjustment,
+            'valid_from': valid_from,
+            'valid_to': valid_to,
+        }
+
+    def _parse_price(self, row_num, row):
+        product_value = row['Product Value'].strip()
+        if not product_value:
+            return None
+
+        valid_from, valid_to = self._parse_dates(row_num, row, 'Valid from', 'Valid to', '%Y/%m/%d')
+        return product_value, {
+            'product_description': row['Product Description'].strip(),
+            'uom': row.get('UOM', '').strip(),
+            'uom_hun': row.get('UOM_HUN', '').strip(),
+            'purchase_price_usd': _clean_currency(row.get(' PURCHASE PRICE USD ', '').strip()),
+            'purchase_price_huf': _clean_currency(row.get(' PURCHASE PRICE HUF ', '').strip()),
+            'markup': _clean_currency(row.get(' MARKUP', '').strip()),
+            'sales_price_huf': _clean_currency(row.get(' SALES PRICE HUF', '').strip()),
+            'cap_disp': row.get('Cap/Disp', '').strip(),
+            'is_inventory_managed': row.get('Készletkezelt termék', '').strip().lower() == 'y',
+            'valid_from': valid_from,
+            'valid_to': valid_to,
+        }
+
+    # ------------------------------------------------------------------
+    # Supplier category / type resolution
+    # ------------------------------------------------------------------
+
+    def _preload_lookups(self):
+        for model in (SupplierCategory, SupplierType):
+            self._lookups[model] = dict(
+                model.objects.filter(company=self.company).values_list('name', 'id')
+            )
+
+    def _resolve(self, model, names, result_key):
+        """Map category/type names to ids, creating the missing ones with one bulk insert"""
+        lookup = self._lookups[model]
+        display_orders = self._display_orders[model]
+        for name in names:
+            if name and name not in display_orders:
+                display_orders[name] = len(display_orders)
+
+        missing = [name for name in dict.fromkeys(names) if name and name not in lookup]
+        if not missing:
+            return
+
+        self.result[result_key] += len(missing)
+        if self.dry_run:
+            lookup.update({name: f"<new: {name}>" for name in missing})
+            return
+
+        model.objects.bulk_create([
+            model(company=self.company, name=name, display_order=display_orders[name])
+            for name in missing
+        ])
+        lookup.update(
+            model.objects.filter(company=self.company, name__in=missing).values_list('name', 'id')
+        )
+
+    # ------------------------------------------------------------------
+    # Chunk upsert
+    # ------------------------------------------------------------------
+
+    def _import_chunk(self, chunk):
+        parse_row = {
+            'suppliers': self._parse_supplier,
+            'customers': self._parse_customer,
+            'prices': self._parse_price,
+        }[self.csv_type]
+
+        records = {}  # natural key -> field values (a later row for the same key wins)
+        row_numbers = {}  # natural key -> row number, for warnings
+        for row_num, row in chunk:
+            self.result['rows'] += 1
+            try:
+                parsed = parse_row(row_num, row)
+            except Exception as e:
+                logger.error(f"Error importing {self.csv_type} row {row_num}: {e}", exc_info=True)
+                self._warn(row_num, f"Error - {str(e)}")
+                parsed = None
+            if parsed is None:
+                self.result['skipped'] += 1
+                continue
+            key, values = parsed
+            records[key] = values
+            row_numbers[key] = row_num
+
+        if self.csv_type == 'suppliers':
+            self._resolve(SupplierCategory, [values['category_id'] for values in records.values()],
+                          'categories_created')
+            self._resolve(SupplierType, [values['type_id'] for values in records.values()],
+                          'types_created')
+            categories = self._lookups[SupplierCategory]
+            types = self._lookups[SupplierType]
+            for values in records.values():
+                values['category_id'] = categories.get(values['category_id'])
+                values['type_id'] = types.get(values['type_id'])
+
+        existing = {}
+        duplicated = set()
+        for obj in self.model.objects.filter(
+            company=self.company, **{f'{self.key_field}__in': list(records)}
+        ):
+            key = getattr(obj, self.key_field)
+            if key in existing:
+                duplicated.add(key)
+            existing[key] = obj
+
+        to_create = []
+        to_update = []
+        for key, values in records.items():
+            if key in duplicated:
+                # Same ambiguity update_or_create() would reject
+                self._warn(None, f"{key}: multiple existing records, skipping")
+                self.result['skipped'] += 1
+                continue
+
+            obj = existing.get(key)
+            if obj is None:
+                to_create.append(self.model(company=self.company, **{self.key_field: key}, **values))
+                if self.dry_run:
+                    self.result['diff'].append({
+                        'action': 'create', 'key': key,
+                        'changes': {field: (None, value) for field, value in values.items()},
+                    })
+                continue
+
+            changes = {
+                field: (getattr(obj, field), value)
+                for field, value in values.items()
+                if getattr(obj, field) != value
+            }
+            if not changes:
+                self.result['unchanged'] += 1
+                continue
+
+            for field, (_, value) in changes.items():
+                setattr(obj, field, value)
+            to_update.append(obj)
+            if self.dry_run:
+                self.result['diff'].append({'action': 'update', 'key': key, 'changes': changes})
+
+        if not self.dry_run and (to_create or to_update):
+            to_create, to_update = self._write_chunk(to_create, to_update, row_numbers)
+
+        self.result['created'] += len(to_create)
+        self.result['updated'] += len(to_update)
+        self.result['chunks'] += 1
+
+    def _write_chunk(self, to_create, to_update, row_numbers):
+        """
+        Bulk write a chunk, falling back to one row at a time if the bulk write fails.
+
+        Returns:
+            tuple: the created and updated objects that were written
+        """
+        now = timezone.now()
+        for obj in to_update:
+            # bulk_update() does not run auto_now
+            obj.updated_at = now
+        try:
+            with transaction.atomic():
+                self.model.objects.bulk_create(to_create)
+                self.model.objects.bulk_update(to_update, list(self.fields) + ['updated_at'])
+            return to_create, to_update
+        except Exception as e:
+            logger.warning(
+                f"Bulk {self.csv_type} import failed for {self.company.name}, "
+                f"processing chunk row by row: {str(e)}"
+            )
+
+        written = ([], [])
+        for created, objs in ((True, to_create), (False, to_update)):
+            for obj in objs:
+                key = getattr(obj, self.key_field)
+                try:
+                    with transaction.atomic():
+                        if created:
+                            obj.save(force_insert=True)
+                        else:
+                            obj.save(update_fields=list(self.fields) + ['updated_at'])
+                except Exception as e:
+                    logger.error(f"Error importing {self.csv_type} row {row_numbers[key]}: {e}")
+                    self._warn(row_numbers[key], f"Error - {str(e)}")
+                    self.result['skipped'] += 1
+                    continue
+                written[0 if created else 1].append(obj)
+        return written
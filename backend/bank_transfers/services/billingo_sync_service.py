@@ -5,15 +5,19 @@ Handles invoice fetching from Billingo API with pagination,
 error handling, rate limit retry, and company-specific sync.
 """
 
+import hashlib
 import requests
 import json
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date
 from decimal import Decimal
 from typing import Dict, List, Optional, Tuple
 from django.utils import timezone
 from django.db import transaction
+from requests.adapters import HTTPAdapter
 
 from bank_transfers.models import (
     Company,
@@ -38,13 +42,47 @@ class BillingoRateLimitError(BillingoAPIError):
     pass
 
 
+class BillingoNotFoundError(BillingoAPIError):
+    """Raised when an API endpoint is not available for the account (404)."""
+    pass
+
+
+class BillingoRateLimiter:
+    """
+    Request pacing shared by the page fetching threads of one sync.
+
+    Requests are spaced at least `min_interval` seconds apart, and a Retry-After
+    received by any thread pauses every thread until it has elapsed.
+    """
+
+    def __init__(self, min_interval: float = 0.0):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def wait(self):
+        """Block until the caller may send its next request"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+    def pause(self, seconds: float):
+        """Hold back every request for `seconds` (Retry-After)"""
+        with self._lock:
+            self._next_slot = max(self._next_slot, time.monotonic() + seconds)
+
+
 class BillingoSyncService:
     """
     Service for synchronizing invoices from Billingo API.
 
     Supports:
-    - Pagination (max 100 per page)
-    - Rate limit handling with exponential backoff
+    - Pagination (max 100 per page), pages after the first fetched concurrently
+    - Pooled HTTP session per company sync
+    - Rate limit handling with Retry-After shared across page requests
     - Error recovery per company
     - Complete audit logging
     """
@@ -52,6 +90,9 @@ class BillingoSyncService:
     BASE_URL = "https://api.billingo.hu/v3"
     MAX_RETRIES = 3
     RETRY_DELAY = 5  # seconds
+    MAX_WORKERS = 4  # Concurrent page requests (and pooled connections)
+    MIN_REQUEST_INTERVAL = 0.2  # seconds between two page requests of a sync
+    PERSIST_PAGE_SIZE = 100  # Invoices written per bulk persistence round
 
     def __init__(self):
         self.credential_manager = CredentialManager()
@@ -246,111 +287,68 @@ class BillingoSyncService:
             else:
                 logger.info(f"Full sync for {company.name} (first sync)")
 
-            # Fetch all invoices with pagination
+            # Fetch all invoices with pagination over one pooled session
             all_invoices = []
             api_calls = 0
+            rate_limiter = BillingoRateLimiter(self.MIN_REQUEST_INTERVAL)
+
+            with self.create_session(api_key) as session:
+                if since_date:
+                    # Incremental sync: fetch both newly created AND modified invoices
+                    logger.info(f"Fetching newly created invoices (start_date >= {since_date.isoformat()})")
 
-            if since_date:
-                # Incremental sync: fetch both newly created AND modified invoices
-                logger.info(f"Fetching newly created invoices (start_date >= {since_date.isoformat()})")
-
-                # 1. Fetch invoices created since last sync (by invoice date)
-                page = 1
-                total_pages = 1
-                while page <= total_pages:
-                    invoices_data, pagination = self._fetch_documents_page(
-                        api_key=api_key,
-                        page=page,
-                        start_date=since_date,
-                        last_modified_date=None
+                    # 1. Fetch invoices created since last sync (by invoice date)
+                    invoices_data, calls = self._fetch_all_pages(
+                        session, rate_limiter, company,
+                        start_date=since_date, label=' (by start_date)'
                     )
-                    api_calls += 1
+                    api_calls += calls
                     all_invoices.extend(invoices_data)
-                    total_pages = pagination.get('last_page', 1)
-                    page += 1
-                    logger.info(
-                        f"Fetched page {page-1}/{total_pages} (by start_date) for {company.name} "
-                        f"({len(invoices_data)} invoices)"
-                    )
 
-                logger.info(f"Fetching modified invoices (last_modified_date >= {since_date.isoformat()})")
-
-                # 2. Fetch invoices modified since last sync
-                page = 1
-                total_pages = 1
-                while page <= total_pages:
-                    invoices_data, pagination = self._fetch_documents_page(
-                        api_key=api_key,
-                        page=page,
-                        start_date=None,
-                        last_modified_date=since_date
+                    logger.info(f"Fetching modified invoices (last_modified_date >= {since_date.isoformat()})")
+
+                    # 2. Fetch invoices modified since last sync
+                    invoices_data, calls = self._fetch_all_pages(
+                        session, rate_limiter, company,
+                        last_modified_date=since_date, label=' (by last_modified_date)'
                     )
-                    api_calls += 1
+                    api_calls += calls
                     all_invoices.extend(invoices_data)
-                    total_pages = pagination.get('last_page', 1)
-                    page += 1
-                    logger.info(
-                        f"Fetched page {page-1}/{total_pages} (by last_modified_date) for {company.name} "
-                        f"({len(invoices_data)} invoices)"
-                    )
 
-                # Deduplicate by invoice ID (in case invoice was both created AND modified)
-                seen_ids = set()
-                deduplicated_invoices = []
-                for invoice in all_invoices:
-                    invoice_id = invoice.get('id')
-                    if invoice_id not in seen_ids:
-                        seen_ids.add(invoice_id)
-                        deduplicated_invoices.append(invoice)
+                    # Deduplicate by invoice ID (in case invoice was both created AND modified)
+                    seen_ids = set()
+                    deduplicated_invoices = []
+                    for invoice in all_invoices:
+                        invoice_id = invoice.get('id')
+                        if invoice_id not in seen_ids:
+                            seen_ids.add(invoice_id)
+                            deduplicated_invoices.append(invoice)
 
-                duplicates_removed = len(all_invoices) - len(deduplicated_invoices)
-                if duplicates_removed > 0:
-                    logger.info(f"Removed {duplicates_removed} duplicate invoices")
+                    duplicates_removed = len(all_invoices) - len(deduplicated_invoices)
+                    if duplicates_removed > 0:
+                        logger.info(f"Removed {duplicates_removed} duplicate invoices")
 
-                all_invoices = deduplicated_invoices
-            else:
-                # Full sync: fetch all invoices
-                page = 1
-                total_pages = 1
-                while page <= total_pages:
-                    invoices_data, pagination = self._fetch_documents_page(
-                        api_key=api_key,
-                        page=page,
-                        start_date=None,
-                        last_modified_date=None
-                    )
-                    api_calls += 1
-                    all_invoices.extend(invoices_data)
-                    total_pages = pagination.get('last_page', 1)
-                    page += 1
-                    logger.info(
-                        f"Fetched page {page-1}/{total_pages} for {company.name} "
-                        f"({len(invoices_data)} invoices)"
-                    )
+                    all_invoices = deduplicated_invoices
+                else:
+                    # Full sync: fetch all invoices
+                    all_invoices, api_calls = self._fetch_all_pages(session, rate_limiter, company)
 
-            # Process invoices
+            # Persist invoices page by page
             created_count = 0
             updated_count = 0
+            unchanged_count = 0
             items_extracted = 0
             errors = []
 
-            for invoice_data in all_invoices:
-                try:
-                    created, item_count = self._process_invoice(company, invoice_data)
-                    if created:
-                        created_count += 1
-                    else:
-                        updated_count += 1
-                    items_extracted += item_count
-                except Exception as e:
-                    errors.append({
-                        'invoice_id': invoice_data.get('id'),
-                        'invoice_number': invoice_data.get('invoice_number'),
-                        'error': str(e)
-                    })
-                    logger.error(
-                        f"Error processing invoice {invoice_data.get('invoice_number')}: {str(e)}"
-                    )
+            for offset in range(0, len(all_invoices), self.PERSIST_PAGE_SIZE):
+                page_result = self._persist_page(
+                    company, all_invoices[offset:offset + self.PERSIST_PAGE_SIZE]
+                )
+                created_count += page_result['created']
+                updated_count += page_result['updated']
+                unchanged_count += page_result['unchanged']
+                items_extracted += page_result['items']
+                errors.extend(page_result['errors'])
 
             # Update sync log
             duration = int(time.time() - start_time)
@@ -374,13 +372,14 @@ class BillingoSyncService:
             logger.info(
                 f"Billingo sync completed for {company.name}: "
                 f"{created_count} created, {updated_count} updated, "
-                f"{len(errors)} errors in {duration}s"
+                f"{unchanged_count} unchanged, {len(errors)} errors in {duration}s"
             )
 
             return {
                 'invoices_processed': len(all_invoices),
                 'invoices_created': created_count,
                 'invoices_updated': updated_count,
+                'invoices_unchanged': unchanged_count,
                 'invoices_skipped': len(errors),
                 'items_extracted': items_extracted,
                 'api_calls': api_calls,
@@ -397,13 +396,155 @@ class BillingoSyncService:
             sync_log.save()
             raise
 
+    def create_session(self, api_key: str) -> requests.Session:
+        """
+        HTTP session for one company sync.
+
+        Keeps one connection per page worker alive, so pages reuse the TLS
+        connection instead of opening a new one per request.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_WORKERS)
+        session.mount('https://', adapter)
+        session.headers.update({
+            'X-API-KEY': api_key,
+            'Accept': 'application/json'
+        })
+        return session
+
+    def _fetch_all_pages(
+        self,
+        session: requests.Session,
+        rate_limiter: BillingoRateLimiter,
+        company: Company,
+        start_date: Optional[date] = None,
+        last_modified_date: Optional[date] = None,
+        label: str = ''
+    ) -> Tuple[List[Dict], int]:
+        """
+        Fetch every page of a document listing.
+
+        The first page tells the number of pages; the remaining pages are fetched
+        concurrently and returned in page order.
+
+        Returns:
+            tuple: (list of invoice data dicts, number of API calls)
+        """
+        def fetch(page):
+            invoices_data, pagination = self._fetch_documents_page(
+                api_key=None,
+                page=page,
+                start_date=start_date,
+                last_modified_date=last_modified_date,
+                session=session,
+                rate_limiter=rate_limiter
+            )
+            logger.info(
+                f"Fetched page {page}/{total_pages}{label} for {company.name} "
+                f"({len(invoices_data)} invoices)"
+            )
+            return invoices_data
+
+        first_page, pagination = self._fetch_documents_page(
+            api_key=None,
+            page=1,
+            start_date=start_date,
+            last_modified_date=last_modified_date,
+            session=session,
+            rate_limiter=rate_limiter
+        )
+        total_pages = pagination.get('last_page', 1)
+        logger.info(
+            f"Fetched page 1/{total_pages}{label} for {company.name} "
+            f"({len(first_page)} invoices)"
+        )
+
+        all_invoices = list(first_page)
+        remaining_pages = range(2, total_pages + 1)
+        for invoices_data in self.fetch_pages_concurrently(fetch, remaining_pages):
+            all_invoices.extend(invoices_data)
+
+        return all_invoices, 1 + len(remaining_pages)
+
+    def fetch_pages_concurrently(self, fetch_page, pages) -> List:
+        """
+        Call fetch_page(page) for every page on a small thread pool.
+
+        Results are returned in page order; the first failing page re-raises.
+        """
+        pages = list(pages)
+        if not pages:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.MAX_WORKERS, len(pages))) as executor:
+            return list(executor.map(fetch_page, pages))
+
+    def get_json(
+        self,
+        session: requests.Session,
+        rate_limiter: BillingoRateLimiter,
+        path: str,
+        params: Dict
+    ) -> Dict:
+        """
+        GET an API endpoint with retries.
+
+        A 429 pauses the shared rate limiter for Retry-After seconds before the
+        retry; other request failures are retried after RETRY_DELAY.
+
+        Raises:
+            BillingoNotFoundError: The endpoint returned 404 (not retried)
+            BillingoRateLimitError: Still rate limited after MAX_RETRIES attempts
+            BillingoAPIError: Request failed after MAX_RETRIES attempts
+        """
+        url = f"{self.BASE_URL}{path}"
+
+        for attempt in range(self.MAX_RETRIES):
+            try:
+                rate_limiter.wait()
+                response = session.get(url, params=params, timeout=30)
+
+                if response.status_code == 429:
+                    # Rate limit exceeded - hold back every page request of the sync
+                    retry_after = int(response.headers.get('Retry-After', self.RETRY_DELAY))
+                    if attempt < self.MAX_RETRIES - 1:
+                        logger.warning(
+                            f"Rate limit exceeded, retrying after {retry_after}s "
+                            f"(attempt {attempt + 1}/{self.MAX_RETRIES})"
+                        )
+                        rate_limiter.pause(retry_after)
+                        continue
+                    else:
+                        raise BillingoRateLimitError("Rate limit exceeded after max retries")
+
+                if response.status_code == 404:
+                    raise BillingoNotFoundError(f"Endpoint not found: {path}")
+
+                response.raise_for_status()
+                return response.json()
+
+            except requests.exceptions.RequestException as e:
+                if attempt < self.MAX_RETRIES - 1:
+                    logger.warning(
+                        f"API request failed, retrying in {self.RETRY_DELAY}s "
+                        f"(attempt {attempt + 1}/{self.MAX_RETRIES}): {str(e)}"
+                    )
+                    time.sleep(self.RETRY_DELAY)
+                else:
+                    raise BillingoAPIError(
+                        f"API request failed after {self.MAX_RETRIES} attempts: {str(e)}"
+                    )
+
+        raise BillingoAPIError(f"Unexpected error fetching {path}")
+
     def _fetch_documents_page(
         self,
         api_key: str,
         page: int = 1,
         per_page: int = 100,
         start_date: Optional[date] = None,
-        last_modified_date: Optional[date] = None
+        last_modified_date: Optional[date] = None,
+        session: Optional[requests.Session] = None,
+        rate_limiter: Optional[BillingoRateLimiter] = None
     ) -> Tuple[List[Dict], Dict]:
         """
         Fetch a single page of documents from Billingo API.
@@ -414,15 +555,16 @@ class BillingoSyncService:
             per_page: Results per page (max 100)
             start_date: Optional date to filter by invoice date (>= this date)
             last_modified_date: Optional date to filter by last modified date (>= this date)
+            session: Pooled session carrying the API key (api_key is then ignored)
+            rate_limiter: Limiter shared with the other page requests of the sync
 
         Returns:
             tuple: (list of invoice data dicts, pagination metadata)
         """
-        url = f"{self.BASE_URL}/documents"
-        headers = {
-            'X-API-KEY': api_key,
-            'Accept': 'application/json'
-        }
+        if session is None:
+            session = self.create_session(api_key)
+        if rate_limiter is None:
+            rate_limiter = BillingoRateLimiter()
         params = {
             'page': page,
             'per_page': min(per_page, 100)  # API limit
@@ -441,57 +583,213 @@ class BillingoSyncService:
             params['last_modified_date'] = since_datetime.strftime('%Y-%m-%d %H:%M:%S')
 
         # DEBUG: Log the full request URL and parameters
-        logger.info(f"Billingo API request: {url} with params: {params}")
+        logger.info(f"Billingo API request: {self.BASE_URL}/documents with params: {params}")
 
-        for attempt in range(self.MAX_RETRIES):
-            try:
-                response = requests.get(url, headers=headers, params=params, timeout=30)
+        data = self.get_json(session, rate_limiter, '/documents', params)
 
-                if response.status_code == 429:
-                    # Rate limit exceeded
-                    retry_after = int(response.headers.get('Retry-After', self.RETRY_DELAY))
-                    if attempt < self.MAX_RETRIES - 1:
-                        logger.warning(
-                            f"Rate limit exceeded, retrying after {retry_after}s "
-                            f"(attempt {attempt + 1}/{self.MAX_RETRIES})"
-                        )
-                        time.sleep(retry_after)
-                        continue
-                    else:
-                        raise BillingoRateLimitError("Rate limit exceeded after max retries")
+        # DEBUG: Log the response summary
+        logger.info(
+            f"Billingo API response: {len(data.get('data', []))} invoices on page {page}, "
+            f"total: {data.get('total', 0)}, last_page: {data.get('last_page', 1)}"
+        )
 
-                response.raise_for_status()
-                data = response.json()
+        return (
+            data.get('data', []),
+            {
+                'total': data.get('total', 0),
+                'per_page': data.get('per_page', per_page),
+                'current_page': data.get('current_page', page),
+                'last_page': data.get('last_page', 1)
+            }
+        )
 
-                # DEBUG: Log the response summary
-                logger.info(
-                    f"Billingo API response: {len(data.get('data', []))} invoices on page {page}, "
-                    f"total: {data.get('total', 0)}, last_page: {data.get('last_page', 1)}"
-                )
+    @staticmethod
+    def content_hash(invoice_data: Dict) -> str:
+        """SHA-256 of the API payload of an invoice (key order independent)"""
+        payload = json.dumps(invoice_data, sort_keys=True, separators=(',', ':'), default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
 
-                return (
-                    data.get('data', []),
-                    {
-                        'total': data.get('total', 0),
-                        'per_page': data.get('per_page', per_page),
-                        'current_page': data.get('current_page', page),
-                        'last_page': data.get('last_page', 1)
-                    }
-                )
+    def _invoice_fields(self, invoice_data: Dict) -> Dict:
+        """BillingoInvoice field values from the API payload of an invoice"""
+        # Extract organization data
+        org = invoice_data.get('organization', {})
+        org_bank = org.get('bank_account', {})
 
-            except requests.exceptions.RequestException as e:
-                if attempt < self.MAX_RETRIES - 1:
-                    logger.warning(
-                        f"API request failed, retrying in {self.RETRY_DELAY}s "
-                        f"(attempt {attempt + 1}/{self.MAX_RETRIES}): {str(e)}"
-                    )
-                    time.sleep(self.RETRY_DELAY)
-                else:
-                    raise BillingoAPIError(
-                        f"API request failed after {self.MAX_RETRIES} attempts: {str(e)}"
+        # Extract partner data
+        partner = invoice_data.get('partner', {}) or invoice_data.get('document_partner', {})
+
+        return {
+            'invoice_number': invoice_data.get('invoice_number', ''),
+            'type': invoice_data.get('type', ''),
+            'correction_type': invoice_data.get('correction_type', ''),
+            'cancelled': invoice_data.get('cancelled', False),
+            'block_id': invoice_data.get('block_id'),
+            'payment_status': invoice_data.get('payment_status', ''),
+            'payment_method': invoice_data.get('payment_method', ''),
+            'gross_total': Decimal(str(invoice_data.get('gross_total', 0))),
+            'net_total': Decimal(str(invoice_data.get('total', 0))) if invoice_data.get('total') else None,
+            'currency': invoice_data.get('currency', 'HUF'),
+            'conversion_rate': Decimal(str(invoice_data.get('conversion_rate', 1))),
+            'invoice_date': invoice_data.get('invoice_date'),
+            'fulfillment_date': invoice_data.get('fulfillment_date'),
+            'due_date': invoice_data.get('due_date'),
+            'paid_date': invoice_data.get('paid_date'),
+            'organization_name': org.get('name', ''),
+            'organization_tax_number': org.get('tax_number', ''),
+            'organization_bank_account_number': org_bank.get('account_number', ''),
+            'organization_bank_account_iban': org_bank.get('account_number_iban', ''),
+            'organization_swift': org_bank.get('swift', ''),
+            'partner_id': partner.get('id'),
+            'partner_name': partner.get('name', ''),
+            'partner_tax_number': partner.get('taxcode', '') or partner.get('tax_number', ''),
+            'partner_iban': partner.get('iban', ''),
+            'partner_swift': partner.get('swift', ''),
+            'partner_account_number': partner.get('account_number', ''),
+            'comment': invoice_data.get('comment', ''),
+            'online_szamla_status': invoice_data.get('online_szamla_status', ''),
+            'content_hash': self.content_hash(invoice_data),
+        }
+
+    def _invoice_children(
+        self,
+        invoice_id: int,
+        invoice_data: Dict
+    ) -> Tuple[List[BillingoInvoiceItem], List[BillingoRelatedDocument]]:
+        """Unsaved line items and related documents of an invoice"""
+        items = [
+            BillingoInvoiceItem(
+                invoice_id=invoice_id,
+                product_id=item_data.get('product_id'),
+                name=item_data.get('name', ''),
+                quantity=Decimal(str(item_data.get('quantity', 0))),
+                unit=item_data.get('unit', ''),
+                net_unit_price=Decimal(str(item_data.get('net_unit_price', 0))),
+                net_amount=Decimal(str(item_data.get('net_amount', 0))),
+                gross_amount=Decimal(str(item_data.get('gross_amount', 0))),
+                vat=item_data.get('vat', ''),
+                entitlement=item_data.get('entitlement', ''),
+            )
+            for item_data in invoice_data.get('items', [])
+        ]
+        related_documents = [
+            BillingoRelatedDocument(
+                invoice_id=invoice_id,
+                related_invoice_id=related_doc.get('id', 0),
+                related_invoice_number=related_doc.get('invoice_number', ''),
+            )
+            for related_doc in invoice_data.get('related_documents', [])
+        ]
+        return items, related_documents
+
+    @staticmethod
+    def _invoice_error(invoice_data: Dict, error: Exception) -> Dict:
+        logger.error(
+            f"Error processing invoice {invoice_data.get('invoice_number')}: {str(error)}"
+        )
+        return {
+            'invoice_id': invoice_data.get('id'),
+            'invoice_number': invoice_data.get('invoice_number'),
+            'error': str(error)
+        }
+
+    def _persist_page(self, company: Company, invoices_data: List[Dict]) -> Dict[str, any]:
+        """
+        Write one page of invoices with bulk queries.
+
+        New invoices are bulk inserted and changed ones bulk updated; the items and
+        related documents of both are replaced with one delete and one insert per
+        table. Invoices whose content hash matches the stored one are skipped.
+        If the bulk write fails, the page falls back to per-invoice processing so
+        a single bad invoice is reported instead of failing the whole page.
+
+        Returns:
+            dict: created, updated, unchanged and items counts plus per-invoice errors
+        """
+        result = {'created': 0, 'updated': 0, 'unchanged': 0, 'items': 0, 'errors': []}
+
+        # Build field values first; a malformed invoice only drops itself
+        prepared = {}
+        for invoice_data in invoices_data:
+            try:
+                invoice_id = invoice_data.get('id')
+                fields = self._invoice_fields(invoice_data)
+                items, related_documents = self._invoice_children(invoice_id, invoice_data)
+            except Exception as e:
+                result['errors'].append(self._invoice_error(invoice_data, e))
+                continue
+            prepared[invoice_id] = (invoice_data, fields, items, related_documents)
+
+        stored = {
+            invoice_id: (company_id, content_hash)
+            for invoice_id, company_id, content_hash in BillingoInvoice.objects.filter(
+                id__in=list(prepared)
+            ).values_list('id', 'company_id', 'content_hash')
+        }
+
+        to_create = []
+        to_update = []
+        children = []
+        for invoice_id, (invoice_data, fields, items, related_documents) in prepared.items():
+            if invoice_id in stored:
+                stored_company_id, stored_hash = stored[invoice_id]
+                if stored_company_id != company.id:
+                    result['errors'].append(self._invoice_error(
+                        invoice_data, BillingoAPIError("Invoice belongs to another company")
+                    ))
+                    continue
+                if stored_hash == fields['content_hash']:
+                    result['unchanged'] += 1
+                    continue
+                to_update.append(BillingoInvoice(id=invoice_id, company=company, **fields))
+            else:
+                to_create.append(BillingoInvoice(id=invoice_id, company=company, **fields))
+            children.append((items, related_documents))
+
+        if not to_create and not to_update:
+            return result
+
+        try:
+            with transaction.atomic():
+                BillingoInvoice.objects.bulk_create(to_create)
+
+                if to_update:
+                    now = timezone.now()
+                    for invoice in to_update:
+                        # bulk_update() does not run auto_now
+                        invoice.updated_at = now
+                        invoice.last_modified = now
+                    BillingoInvoice.objects.bulk_update(
+                        to_update, list(fields) + ['updated_at', 'last_modified']
                     )
+                    updated_ids = [invoice.id for invoice in to_update]
+                    BillingoInvoiceItem.objects.filter(invoice_id__in=updated_ids).delete()
+                    BillingoRelatedDocument.objects.filter(invoice_id__in=updated_ids).delete()
 
-        raise BillingoAPIError("Unexpected error in _fetch_documents_page")
+                BillingoInvoiceItem.objects.bulk_create(
+                    [item for items, _ in children for item in items]
+                )
+                BillingoRelatedDocument.objects.bulk_create(
+                    [document for _, related_documents in children for document in related_documents]
+                )
+        except Exception as e:
+            logger.warning(
+                f"Bulk persistence failed for {company.name}, processing page one by one: {str(e)}"
+            )
+            for invoice in to_create + to_update:
+                invoice_data = prepared[invoice.id][0]
+                try:
+                    created, item_count = self._process_invoice(company, invoice_data)
+                except Exception as error:
+                    result['errors'].append(self._invoice_error(invoice_data, error))
+                    continue
+                result['created' if created else 'updated'] += 1
+                result['items'] += item_count
+            return result
+
+        result['created'] = len(to_create)
+        result['updated'] = len(to_update)
+        result['items'] = sum(len(items) for items, _ in children)
+        return result
 
     @transaction.atomic
     def _process_invoice(
@@ -511,47 +809,11 @@ class BillingoSyncService:
         """
         invoice_id = invoice_data.get('id')
 
-        # Extract organization data
-        org = invoice_data.get('organization', {})
-        org_bank = org.get('bank_account', {})
-
-        # Extract partner data
-        partner = invoice_data.get('partner', {}) or invoice_data.get('document_partner', {})
-
         # Create or update invoice
         invoice, created = BillingoInvoice.objects.update_or_create(
             id=invoice_id,
             company=company,
-            defaults={
-                'invoice_number': invoice_data.get('invoice_number', ''),
-                'type': invoice_data.get('type', ''),
-                'correction_type': invoice_data.get('correction_type', ''),
-                'cancelled': invoice_data.get('cancelled', False),
-                'block_id': invoice_data.get('block_id'),
-                'payment_status': invoice_data.get('payment_status', ''),
-                'payment_method': invoice_data.get('payment_method', ''),
-                'gross_total': Decimal(str(invoice_data.get('gross_total', 0))),
-                'net_total': Decimal(str(invoice_data.get('total', 0))) if invoice_data.get('total') else None,
-                'currency': invoice_data.get('currency', 'HUF'),
-                'conversion_rate': Decimal(str(invoice_data.get('conversion_rate', 1))),
-                'invoice_date': invoice_data.get('invoice_date'),
-                'fulfillment_date': invoice_data.get('fulfillment_date'),
-                'due_date': invoice_data.get('due_date'),
-                'paid_date': invoice_data.get('paid_date'),
-                'organization_name': org.get('name', ''),
-                'organization_tax_number': org.get('tax_number', ''),
-                'organization_bank_account_number': org_bank.get('account_number', ''),
-                'organization_bank_account_iban': org_bank.get('account_number_iban', ''),
-                'organization_swift': org_bank.get('swift', ''),
-                'partner_id': partner.get('id'),
-                'partner_name': partner.get('name', ''),
-                'partner_tax_number': partner.get('taxcode', '') or partner.get('tax_number', ''),
-                'partner_iban': partner.get('iban', ''),
-                'partner_swift': partner.get('swift', ''),
-                'partner_account_number': partner.get('account_number', ''),
-                'comment': invoice_data.get('comment', ''),
-                'online_szamla_status': invoice_data.get('online_szamla_status', ''),
-            }
+            defaults=self._invoice_fields(invoice_data)
         )
 
         # Delete existing items and related documents if updating
@@ -559,32 +821,8 @@ class BillingoSyncService:
             invoice.items.all().delete()
             invoice.related_documents.all().delete()
 
-        # Create invoice items
-        items_data = invoice_data.get('items', [])
-        item_count = 0
-
-        for item_data in items_data:
-            BillingoInvoiceItem.objects.create(
-                invoice=invoice,
-                product_id=item_data.get('product_id'),
-                name=item_data.get('name', ''),
-                quantity=Decimal(str(item_data.get('quantity', 0))),
-                unit=item_data.get('unit', ''),
-                net_unit_price=Decimal(str(item_data.get('net_unit_price', 0))),
-                net_amount=Decimal(str(item_data.get('net_amount', 0))),
-                gross_amount=Decimal(str(item_data.get('gross_amount', 0))),
-                vat=item_data.get('vat', ''),
-                entitlement=item_data.get('entitlement', ''),
-            )
-            item_count += 1
-
-        # Create related documents
-        related_docs_data = invoice_data.get('related_documents', [])
-        for related_doc in related_docs_data:
-            BillingoRelatedDocument.objects.create(
-                invoice=invoice,
-                related_invoice_id=related_doc.get('id', 0),
-                related_invoice_number=related_doc.get('invoice_number', ''),
-            )
+        items, related_documents = self._invoice_children(invoice.id, invoice_data)
+        BillingoInvoiceItem.objects.bulk_create(items)
+        BillingoRelatedDocument.objects.bulk_create(related_documents)
 
-        return (created, item_count)
+        return (created, len(items))
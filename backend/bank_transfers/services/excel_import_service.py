@@ -1,104 +1,227 @@
 """
 Excel import service layer
 Handles business logic for Excel file processing and import
+
+Workbooks are opened once in openpyxl read-only mode and streamed row by row;
+new beneficiaries are checked against a preloaded (name, account number) index
+and written with bulk_create in batches, so memory stays bounded on large files.
+Field lengths are validated per row before a row is queued; if a batch is still
+rejected by the database it is retried row by row, so only the bad rows are
+reported as errors.
 """
+import logging
+from itertools import islice
+
 import openpyxl
+from django.core.exceptions import ValidationError
+from django.db import transaction
 from ..hungarian_account_validator import validate_and_format_hungarian_account_number
-from .beneficiary_service import BeneficiaryService
+from ..models import Beneficiary
+
+logger = logging.getLogger(__name__)
 
 
 class ExcelImportService:
     """Service for Excel import business logic"""
-    
+
+    BULK_BATCH_SIZE = 500
+    HEADER_KEYWORDS = ['név', 'name', 'számlaszám', 'account', 'összeg', 'amount']
+
     @staticmethod
-    def import_beneficiaries_from_excel(excel_file, company):
-        """Import beneficiaries from Excel file with proper validation and error handling"""
+    def load_workbook(excel_file):
+        """Open an uploaded Excel file in streaming (read-only) mode"""
         try:
-            workbook = openpyxl.load_workbook(excel_file)
-            worksheet = workbook.active
+            return openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
         except Exception as e:
             raise ValueError(f"Cannot read Excel file: {str(e)}")
-        
+
+    @staticmethod
+    def active_sheet(workbook):
+        """
+        Active worksheet, read through to its last row.
+
+        Read-only sheets take their size from the file's <dimension> tag, which
+        some writers set to just A1; rows past it would be silently dropped.
+        """
+        worksheet = workbook.active
+        if getattr(worksheet, 'reset_dimensions', None):
+            worksheet.reset_dimensions()
+        return worksheet
+
+    @staticmethod
+    def import_beneficiaries_from_excel(excel_file, company, workbook=None):
+        """
+        Import beneficiaries from Excel file with proper validation and error handling
+
+        Args:
+            excel_file: Uploaded .xlsx file
+            company: Company the beneficiaries belong to
+            workbook: Workbook already opened with load_workbook(); it is closed here
+
+        A sheet without data rows (fewer than 3 rows) imports nothing.
+        """
+        if workbook is None:
+            workbook = ExcelImportService.load_workbook(excel_file)
+
+        try:
+            return ExcelImportService._import_beneficiary_rows(ExcelImportService.active_sheet(workbook), company)
+        finally:
+            # Read-only workbooks keep the file open until closed
+            workbook.close()
+
+    @staticmethod
+    def _import_beneficiary_rows(worksheet, company):
         beneficiaries = []
+        pending = []
         errors = []
-        
-        # Detect header row and start from the row after headers
+
+        # Same match as the former get_or_create(name, account_number, company)
+        known_keys = set(
+            Beneficiary.objects.filter(company=company).values_list('name', 'account_number')
+        )
+
+        def flush():
+            beneficiaries.extend(ExcelImportService._create_batch(pending, errors))
+            pending.clear()
+
+        # Data starts at row 3; row 3 may be a header row
         start_row = 3
-        header_keywords = ['név', 'name', 'számlaszám', 'account', 'összeg', 'amount']
-        
-        # Check if row 3 contains headers and skip if so
-        if worksheet.max_row >= 3:
-            row_3_values = [str(cell.value or '').lower().strip() for cell in worksheet[3][:6]]
-            if any(keyword in ' '.join(row_3_values) for keyword in header_keywords):
-                start_row = 4  # Skip header row and start from row 4
-        
         for row_num, row in enumerate(worksheet.iter_rows(min_row=start_row, values_only=True), start=start_row):
-            if not any(row[:6]):
+            row = tuple(row[:6]) + (None,) * (6 - len(row[:6]))
+
+            if row_num == start_row:
+                row_3_values = ' '.join(str(value or '').lower().strip() for value in row)
+                if any(keyword in row_3_values for keyword in ExcelImportService.HEADER_KEYWORDS):
+                    continue  # Skip header row and start from row 4
+
+            if not any(row):
                 continue
-            
+
             try:
-                comment, name, account_number, amount, exec_date, remittance = row[:6]
-                
+                comment, name, account_number, amount, exec_date, remittance = row
+
                 # Convert to strings and strip whitespace
                 name = str(name or '').strip() if name is not None else ''
                 account_number = str(account_number or '').strip() if account_number is not None else ''
-                
+
                 # Skip if either name or account number is missing
                 if not name or not account_number:
                     if name or account_number:  # Only log if partially filled
                         errors.append(f'Row {row_num}: Missing name or account number')
                     continue
-                
+
                 # Skip obvious header rows
                 if name.lower() in ['név', 'name'] or account_number.lower() in ['számlaszám', 'account']:
                     continue
-                
+
                 # Validate and format Hungarian account number
                 validation_result = validate_and_format_hungarian_account_number(
                     account_number, validate_checksum=False
                 )
-                
+
                 if not validation_result.is_valid:
                     error_msg = f'Row {row_num}: Érvénytelen számlaszám "{account_number}": {validation_result.error}'
                     errors.append(error_msg)
                     continue
-                
+
                 # Use the properly formatted account number
                 formatted_account_number = validation_result.formatted
-                
-                # Create beneficiary using service
-                beneficiary, created = BeneficiaryService.find_or_create_from_excel_data(
+
+                key = (name, formatted_account_number)
+                if key in known_keys:
+                    continue
+
+                beneficiary = Beneficiary(
                     company=company,
                     name=name,
                     account_number=formatted_account_number,
                     description=str(comment or '').strip(),
-                    remittance_information=str(remittance or '').strip()
+                    remittance_information=str(remittance or '').strip(),
+                    is_active=True,
                 )
-                
-                if created:
-                    beneficiaries.append(beneficiary)
-                
+                # max_length is only enforced by some databases; check it here
+                beneficiary.clean_fields(exclude=['company'])
+
+            except ValidationError as e:
+                errors.append(f"Row {row_num}: {ExcelImportService._validation_message(e)}")
+                continue
             except Exception as e:
                 error_msg = f"Row {row_num}: {str(e)}"
                 errors.append(error_msg)
                 continue
-        
+
+            known_keys.add(key)
+            pending.append((row_num, beneficiary))
+            if len(pending) >= ExcelImportService.BULK_BATCH_SIZE:
+                flush()
+
+        if pending:
+            flush()
+
         return {
             'beneficiaries': beneficiaries,
             'errors': errors,
             'imported_count': len(beneficiaries)
         }
-    
+
+    @staticmethod
+    def _create_batch(pending, errors):
+        """
+        Bulk insert queued (row number, Beneficiary) pairs.
+
+        If the database rejects the batch it is rolled back and retried row by
+        row; rows that fail again are appended to `errors`.
+
+        Returns:
+            Created beneficiaries
+        """
+        try:
+            with transaction.atomic():
+                return Beneficiary.objects.bulk_create([beneficiary for _, beneficiary in pending])
+        except Exception as e:
+            logger.warning(f"Bulk beneficiary import failed, importing rows one by one: {str(e)}")
+
+        created = []
+        for row_num, beneficiary in pending:
+            try:
+                with transaction.atomic():
+                    beneficiary.save(force_insert=True)
+                created.append(beneficiary)
+            except Exception as e:
+                beneficiary.pk = None
+                errors.append(f"Row {row_num}: {str(e)}")
+        return created
+
+    @staticmethod
+    def _validation_message(error):
+        """Readable 'field: message' text of a model ValidationError"""
+        return '; '.join(
+            f"{field}: {' '.join(messages)}" for field, messages in error.message_dict.items()
+        )
+
     @staticmethod
     def validate_excel_file(excel_file):
-        """Validate Excel file format and structure"""
+        """
+        Validate Excel file format and structure
+
+        Accepts an uploaded file or a workbook opened with load_workbook(), so the
+        import can validate without loading the file a second time.
+        """
+        opened = not isinstance(excel_file, openpyxl.Workbook)
+        workbook = None
         try:
-            workbook = openpyxl.load_workbook(excel_file)
-            worksheet = workbook.active
-            
-            if worksheet.max_row < 3:
+            workbook = ExcelImportService.load_workbook(excel_file) if opened else excel_file
+            worksheet = ExcelImportService.active_sheet(workbook)
+
+            # Count the rows instead of trusting max_row (see active_sheet())
+            row_count = sum(1 for _ in islice(worksheet.iter_rows(values_only=True), 3))
+
+            if row_count < 3:
                 raise ValueError("Excel file must have at least 3 rows")
-            
+
             return True
         except Exception as e:
-            raise ValueError(f"Invalid Excel file: {str(e)}")
\ No newline at end of file
+            raise ValueError(f"Invalid Excel file: {str(e)}")
+        finally:
+            if opened and workbook is not None:
+                workbook.close()
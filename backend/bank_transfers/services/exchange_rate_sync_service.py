@@ -20,6 +20,7 @@ from ..schemas.exchange_rate import (
     ExchangeRateSyncInput,
     ExchangeRateSyncOutput,
 )
+from .exchange_rate_table import rate_table
 from .mnb_client import MNBClient, MNBClientError
 
 logger = logging.getLogger(__name__)
@@ -32,12 +33,18 @@ class ExchangeRateSyncService:
     Supports:
     - Current rate synchronization (for scheduled tasks)
     - Historical data backfill
-    - Rate lookups with caching
+    - Rate lookups from the in-process rate table
     - Currency conversion
     """
 
     DEFAULT_CURRENCIES = ['USD', 'EUR']
 
+    # Rows per bulk_create/bulk_update statement
+    BULK_BATCH_SIZE = 1000
+
+    # ExchangeRate.rate decimal places
+    RATE_PRECISION = Decimal('0.000001')
+
     def __init__(self):
         """Initialize the sync service"""
         self.client = MNBClient()
@@ -165,7 +172,6 @@ class ExchangeRateSyncService:
             currencies=currencies
         )
 
-    @transaction.atomic
     def sync_rates_for_date_range(
         self,
         start_date: date,
@@ -176,7 +182,9 @@ class ExchangeRateSyncService:
         Synchronize exchange rates for a specific date range.
 
         Creates or updates ExchangeRate records in the database.
-        All operations are wrapped in a database transaction.
+        The range is fetched in concurrent windows (MNBClient.iter_exchange_rate_windows);
+        each window is saved in its own transaction as soon as it arrives, so a
+        failed window does not discard the windows already stored.
 
         Args:
             start_date: Start date for sync
@@ -199,15 +207,18 @@ class ExchangeRateSyncService:
         )
 
         try:
-            # Fetch rates from MNB
-            rates_data = self.client.get_exchange_rates(
+            created_count = 0
+            updated_count = 0
+
+            # Fetch rates from MNB and save each window as it completes
+            for window_rates in self.client.iter_exchange_rate_windows(
                 start_date=start_date,
                 end_date=end_date,
                 currencies=currencies
-            )
-
-            # Process and save rates
-            created_count, updated_count = self._save_rates_to_database(rates_data)
+            ):
+                window_created, window_updated = self._save_rates_to_database(window_rates)
+                created_count += window_created
+                updated_count += window_updated
 
             # Update sync log with success
             sync_log.rates_created = created_count
@@ -252,7 +263,11 @@ class ExchangeRateSyncService:
         rates_data: Dict[str, Dict[str, Decimal]]
     ) -> Tuple[int, int]:
         """
-        Save exchange rates to database with upsert logic.
+        Save exchange rates to database with a set-based upsert.
+
+        Existing rows of the date range are loaded with one query; new rates are
+        inserted with bulk_create and changed rates written with bulk_update,
+        both in chunks of BULK_BATCH_SIZE.
 
         Args:
             rates_data: Nested dict {date_str: {currency: rate}}
@@ -260,9 +275,7 @@ class ExchangeRateSyncService:
         Returns:
             Tuple of (created_count, updated_count)
         """
-        created_count = 0
-        updated_count = 0
-
+        incoming = {}
         for date_str, day_rates in rates_data.items():
             # Parse date string
             try:
@@ -272,33 +285,50 @@ class ExchangeRateSyncService:
                 continue
 
             for currency, rate in day_rates.items():
-                # Get or create exchange rate
-                rate_obj, created = ExchangeRate.objects.get_or_create(
+                # Compare at the stored precision so unchanged rates are not rewritten
+                incoming[(rate_date, currency)] = Decimal(str(rate)).quantize(self.RATE_PRECISION)
+
+        if not incoming:
+            return 0, 0
+
+        dates = [key[0] for key in incoming]
+        existing = {
+            (rate_obj.rate_date, rate_obj.currency): rate_obj
+            for rate_obj in ExchangeRate.objects.filter(
+                rate_date__range=(min(dates), max(dates)),
+                currency__in={key[1] for key in incoming}
+            ).only('id', 'rate_date', 'currency', 'rate').iterator(chunk_size=self.BULK_BATCH_SIZE)
+        }
+
+        now = timezone.now()
+        to_create = []
+        to_update = []
+        for (rate_date, currency), rate in incoming.items():
+            rate_obj = existing.get((rate_date, currency))
+            if rate_obj is None:
+                to_create.append(ExchangeRate(
                     rate_date=rate_date,
                     currency=currency,
-                    defaults={
-                        'rate': rate,
-                        'unit': 1,
-                        'source': 'MNB'
-                    }
-                )
-
-                if created:
-                    created_count += 1
-                    logger.debug(
-                        f"Created rate: {currency} on {rate_date} = {rate} HUF"
-                    )
-                else:
-                    # Update existing rate if different
-                    if rate_obj.rate != rate:
-                        rate_obj.rate = rate
-                        rate_obj.save(update_fields=['rate', 'updated_at'])
-                        updated_count += 1
-                        logger.debug(
-                            f"Updated rate: {currency} on {rate_date} = {rate} HUF"
-                        )
-
-        return created_count, updated_count
+                    rate=rate,
+                    unit=1,
+                    source='MNB'
+                ))
+            elif rate_obj.rate != rate:
+                rate_obj.rate = rate
+                rate_obj.updated_at = now  # bulk_update skips auto_now
+                to_update.append(rate_obj)
+
+        with transaction.atomic():
+            ExchangeRate.objects.bulk_create(to_create, batch_size=self.BULK_BATCH_SIZE)
+            ExchangeRate.objects.bulk_update(
+                to_update, ['rate', 'updated_at'], batch_size=self.BULK_BATCH_SIZE
+            )
+
+        logger.debug(
+            f"Saved rates: {len(to_create)} created, {len(to_update)} updated, "
+            f"{len(incoming) - len(to_create) - len(to_update)} unchanged"
+        )
+        return len(to_create), len(to_update)
 
     @staticmethod
     def get_rate_for_date(
@@ -322,34 +352,22 @@ class ExchangeRateSyncService:
         Returns:
             Exchange rate as Decimal, or None if not available
         """
-        try:
-            # Try exact date match first
-            rate_obj = ExchangeRate.objects.get(
-                rate_date=target_date,
-                currency=currency
-            )
-            return rate_obj.rate
-
-        except ExchangeRate.DoesNotExist:
-            if fallback_to_latest:
-                # Fall back to latest rate before target date
-                rate_obj = ExchangeRate.objects.filter(
-                    rate_date__lte=target_date,
-                    currency=currency
-                ).order_by('-rate_date').first()
-
-                if rate_obj:
-                    logger.info(
-                        f"No exact rate for {currency} on {target_date}, "
-                        f"using rate from {rate_obj.rate_date}"
-                    )
-                    return rate_obj.rate
-
+        # Served from the process-local rate table (bisect, no query once loaded)
+        found = rate_table.lookup(currency, target_date, fallback_to_latest)
+        if found is None:
             logger.warning(
                 f"No exchange rate found for {currency} on {target_date}"
             )
             return None
 
+        rate_date, rate = found
+        if rate_date != target_date:
+            logger.info(
+                f"No exact rate for {currency} on {target_date}, "
+                f"using rate from {rate_date}"
+            )
+        return rate
+
     @staticmethod
     def convert_to_huf(
         amount: Decimal,
@@ -380,6 +398,23 @@ class ExchangeRateSyncService:
 
         return amount * rate
 
+    @staticmethod
+    def convert_many_to_huf(
+        items: List[Tuple[Decimal, str, date]],
+        fallback_to_latest: bool = True
+    ) -> List[Optional[Decimal]]:
+        """
+        Convert many (amount, currency, date) items to HUF with in-memory rate lookups.
+
+        Intended for reports converting thousands of invoices/transactions:
+        each currency is loaded once instead of querying per amount.
+        HUF amounts are returned unchanged.
+
+        Returns:
+            Amounts in HUF in input order (None where no rate is available)
+        """
+        return rate_table.convert_many(items, fallback_to_latest)
+
     def convert_currency(self, input_data: CurrencyConversionInput) -> CurrencyConversionOutput:
         """
         Convert currency with type-safe Pydantic input/output.
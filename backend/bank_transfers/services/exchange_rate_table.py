@@ -0,0 +1,125 @@
+"""
+Process-local exchange rate table
+
+Keeps the MNB rates of each currency in memory as two parallel sorted lists
+(dates, rates), so as-of lookups are a bisect instead of one or two queries:
+
+    rate_table.lookup('EUR', date(2025, 1, 4))   # -> (date(2025, 1, 3), Decimal('410.5'))
+    rate_table.convert_many([(Decimal('10'), 'EUR', date(2025, 1, 4)), ...])
+
+A currency is loaded with a single query on first use. The table reloads
+when the EXCHANGE_RATES cache namespace is invalidated (ExchangeRate
+save/delete and completed ExchangeRateSyncLog signals, see signals.py) and
+after TABLE_MAX_AGE seconds, so rates written by another process are picked
+up even with a process-local cache backend.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+from .. import caching
+from ..models import ExchangeRate
+
+# Amounts in the base currency are returned unchanged by convert_many()
+BASE_CURRENCY = 'HUF'
+
+# Seconds before a loaded table is re-read even without an invalidation
+TABLE_MAX_AGE = 300
+
+
+class ExchangeRateTable:
+    """Sorted per-currency rate arrays with bisect as-of lookups"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}  # currency -> (version, dates, rates)
+        self._version = None
+        self._loaded_at = 0.0
+
+    def invalidate(self):
+        """Drop every loaded currency (reloaded on next use)"""
+        with self._lock:
+            self._series = {}
+            self._version = None
+
+    def _check_version(self):
+        """Drop stale series; returns the namespace version read before any load"""
+        version = caching.namespace_version(caching.EXCHANGE_RATES)
+        with self._lock:
+            if version != self._version or time.monotonic() - self._loaded_at > TABLE_MAX_AGE:
+                self._series = {}
+                self._version = version
+                self._loaded_at = time.monotonic()
+        return version
+
+    def _get_series(self, currency: str, version) -> Tuple[List[date], List[Decimal]]:
+        entry = self._series.get(currency)
+        if entry is not None and entry[0] == version:
+            return entry[1], entry[2]
+
+        rows = list(
+            ExchangeRate.objects.filter(currency=currency)
+            .order_by('rate_date')
+            .values_list('rate_date', 'rate')
+        )
+        dates, rates = [row[0] for row in rows], [row[1] for row in rows]
+        with self._lock:
+            # Not kept if the table was invalidated while the rows were read
+            if self._version == version:
+                self._series[currency] = (version, dates, rates)
+        return dates, rates
+
+    def _lookup(self, currency: str, on_date: date, fallback_to_latest: bool,
+                version) -> Optional[Tuple[date, Decimal]]:
+        dates, rates = self._get_series(currency, version)
+        index = bisect_right(dates, on_date) - 1
+        if index < 0:
+            return None
+        if dates[index] != on_date and not fallback_to_latest:
+            return None
+        return dates[index], rates[index]
+
+    def lookup(self, currency: str, on_date: date, fallback_to_latest: bool = True) -> Optional[Tuple[date, Decimal]]:
+        """
+        Rate of `currency` on `on_date`.
+
+        Args:
+            currency: Currency code (USD or EUR)
+            on_date: Date to get the rate for
+            fallback_to_latest: If True, use the latest rate before the date when there is no exact match
+
+        Returns:
+            (rate_date, rate) tuple, or None if no rate is available
+        """
+        version = self._check_version()
+        return self._lookup(currency, on_date, fallback_to_latest, version)
+
+    def convert_many(
+        self,
+        items: Iterable[Tuple[Decimal, str, date]],
+        fallback_to_latest: bool = True
+    ) -> List[Optional[Decimal]]:
+        """
+        Convert (amount, currency, date) items to HUF in one call.
+
+        Returns:
+            HUF amounts in input order (None where no rate is available)
+        """
+        version = self._check_version()
+
+        results = []
+        for amount, currency, on_date in items:
+            if currency == BASE_CURRENCY:
+                results.append(amount)
+                continue
+            found = self._lookup(currency, on_date, fallback_to_latest, version)
+            results.append(amount * found[1] if found else None)
+        return results
+
+
+# Shared per-process table
+rate_table = ExchangeRateTable()
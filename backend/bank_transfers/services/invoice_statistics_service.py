@@ -0,0 +1,216 @@
+"""
+Invoice statistics service
+
+Computes the invoice dashboard statistics either with a single grouped
+aggregate over the invoice table or, when INVOICE_STATS_MATERIALIZED is
+enabled, from the incrementally maintained InvoiceStatistics buckets.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Greatest
+
+from ..models import Invoice, InvoiceStatistics
+
+
+class InvoiceStatisticsService:
+    """Service for invoice statistics"""
+
+    BUCKET_FIELDS = ('invoice_direction', 'currency_code', 'payment_status')
+
+    @staticmethod
+    def is_materialized():
+        return getattr(settings, 'INVOICE_STATS_MATERIALIZED', False)
+
+    @staticmethod
+    def bucket_rows(queryset):
+        """
+        Group invoices into (direction, currency, payment status) buckets with one query.
+
+        Returns:
+            List of dicts with the bucket fields, invoice_count, gross_amount and last_created_at
+        """
+        return list(
+            queryset.order_by().values(*InvoiceStatisticsService.BUCKET_FIELDS).annotate(
+                invoice_count=Count('id'),
+                gross_amount=Sum('invoice_gross_amount'),
+                last_created_at=Max('created_at'),
+            )
+        )
+
+    @staticmethod
+    def summarize(rows):
+        """Build the statistics response from bucket rows"""
+        stats = {
+            'total_count': 0,
+            'inbound_count': 0,
+            'outbound_count': 0,
+            'total_gross_amount': 0,
+            'currencies': [],
+            'recent_sync_date': None,
+            'payment_status_counts': {code: 0 for code, _ in Invoice.PAYMENT_STATUS_CHOICES},
+        }
+        currencies = set()
+
+        for row in rows:
+            count = row['invoice_count']
+            if not count:
+                continue
+
+            stats['total_count'] += count
+            if row['invoice_direction'] == 'INBOUND':
+                stats['inbound_count'] += count
+            elif row['invoice_direction'] == 'OUTBOUND':
+                stats['outbound_count'] += count
+            stats['total_gross_amount'] += row['gross_amount'] or Decimal('0')
+            stats['payment_status_counts'][row['payment_status']] = (
+                stats['payment_status_counts'].get(row['payment_status'], 0) + count
+            )
+            currencies.add(row['currency_code'])
+
+            last_created_at = row['last_created_at']
+            if last_created_at and (stats['recent_sync_date'] is None or last_created_at > stats['recent_sync_date']):
+                stats['recent_sync_date'] = last_created_at
+
+        stats['currencies'] = sorted(currencies)
+        return stats
+
+    @staticmethod
+    def get_company_stats(company):
+        """Invoice statistics of a company"""
+        if not InvoiceStatisticsService.is_materialized():
+            return InvoiceStatisticsService.summarize(
+                InvoiceStatisticsService.bucket_rows(Invoice.objects.filter(company=company))
+            )
+
+        rows = list(
+            InvoiceStatistics.objects.filter(company=company).values(
+                *InvoiceStatisticsService.BUCKET_FIELDS, 'invoice_count', 'gross_amount', 'last_created_at'
+            )
+        )
+        if not rows and Invoice.objects.filter(company=company).exists():
+            # First use after enabling the table
+            rows = InvoiceStatisticsService.rebuild(company)
+        return InvoiceStatisticsService.summarize(rows)
+
+    @staticmethod
+    def rebuild(company):
+        """Recompute the statistics buckets of a company from its invoices"""
+        rows = InvoiceStatisticsService.bucket_rows(Invoice.objects.filter(company=company))
+
+        with transaction.atomic():
+            InvoiceStatistics.objects.filter(company=company).delete()
+            InvoiceStatistics.objects.bulk_create([
+                InvoiceStatistics(company=company, **row) for row in rows
+            ])
+
+        return rows
+
+    @staticmethod
+    def _apply(company_id, invoice_direction, currency_code, payment_status,
+               count_delta, amount_delta, created_at=None):
+        """
+        Add deltas to one bucket with an atomic F() update.
+
+        Buckets are only created when adding invoices; removals from a missing
+        bucket (e.g. while the company itself is being deleted) are no-ops.
+        """
+        buckets = InvoiceStatistics.objects.filter(
+            company_id=company_id,
+            invoice_direction=invoice_direction,
+            currency_code=currency_code,
+            payment_status=payment_status,
+        )
+        updates = {
+            'invoice_count': F('invoice_count') + count_delta,
+            'gross_amount': F('gross_amount') + amount_delta,
+        }
+
+        if count_delta < 0:
+            buckets.update(**updates)
+            return
+
+        bucket, _ = InvoiceStatistics.objects.get_or_create(
+            company_id=company_id,
+            invoice_direction=invoice_direction,
+            currency_code=currency_code,
+            payment_status=payment_status,
+        )
+        if created_at is not None:
+            updates['last_created_at'] = (
+                Greatest('last_created_at', created_at) if bucket.last_created_at else created_at
+            )
+        buckets.update(**updates)
+
+    @staticmethod
+    def invoice_saving(invoice):
+        """
+        Load the stored bucket of an invoice saved without one (pre_save).
+
+        Instances built by hand or loaded with deferred fields have no state from
+        Invoice.from_db(); one values query by pk replaces a full recount.
+        """
+        if not InvoiceStatisticsService.is_materialized():
+            return
+        if invoice.pk is None or getattr(invoice, '_statistics_state', None) is not None:
+            return
+
+        invoice._statistics_state = Invoice.objects.filter(pk=invoice.pk).values_list(
+            *Invoice.STATISTICS_FIELDS
+        ).first()
+
+    @staticmethod
+    def invoice_saved(invoice, created):
+        """Move an invoice between buckets after save (post_save)"""
+        new_state = invoice.statistics_state()
+        old_state = getattr(invoice, '_statistics_state', None)
+        invoice._statistics_state = new_state
+
+        if not InvoiceStatisticsService.is_materialized() or old_state == new_state:
+            return
+
+        if old_state is not None:
+            InvoiceStatisticsService._apply(*old_state[:4], -1, -(old_state[4] or 0))
+        # A moved invoice also counts towards the latest creation time of its new bucket
+        InvoiceStatisticsService._apply(*new_state[:4], 1, new_state[4] or 0, created_at=invoice.created_at)
+
+    @staticmethod
+    def invoice_deleted(invoice):
+        """Remove an invoice from its bucket (post_delete)"""
+        if not InvoiceStatisticsService.is_materialized():
+            return
+
+        state = getattr(invoice, '_statistics_state', None) or invoice.statistics_state()
+        InvoiceStatisticsService._apply(*state[:4], -1, -(state[4] or 0))
+
+    @staticmethod
+    def payment_status_updated(queryset, payment_status):
+        """
+        Move invoices to another payment status bucket before a bulk queryset.update().
+
+        Must be called with the queryset that is about to be updated, inside the
+        same transaction.
+        """
+        if not InvoiceStatisticsService.is_materialized():
+            return
+
+        rows = queryset.exclude(payment_status=payment_status).order_by().values(
+            'company_id', *InvoiceStatisticsService.BUCKET_FIELDS
+        ).annotate(
+            invoice_count=Count('id'),
+            gross_amount=Sum('invoice_gross_amount'),
+            last_created_at=Max('created_at'),
+        )
+
+        for row in rows:
+            amount = row['gross_amount'] or 0
+            InvoiceStatisticsService._apply(
+                row['company_id'], row['invoice_direction'], row['currency_code'], row['payment_status'],
+                -row['invoice_count'], -amount
+            )
+            InvoiceStatisticsService._apply(
+                row['company_id'], row['invoice_direction'], row['currency_code'], payment_status,
+                row['invoice_count'], amount, created_at=row['last_created_at']
+            )
@@ -8,13 +8,17 @@ API Documentation: https://www.mnb.hu/arfolyam-letoltes
 WSDL: https://www.mnb.hu/arfolyamok.asmx?wsdl
 """
 
+import io
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import List, Dict, Optional, Tuple
+from typing import Iterator, List, Dict, Optional, Tuple
 import xml.etree.ElementTree as ET
 
 import requests
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
@@ -36,9 +40,19 @@ class MNBClient:
     SOAP_NAMESPACE = 'http://www.mnb.hu/webservices/'
     TIMEOUT = 10  # seconds
 
+    # Historical ranges are fetched in calendar windows ('year' or 'month')
+    HISTORY_WINDOW = 'year'
+    MAX_WORKERS = 4  # Concurrent window requests (and pooled connections)
+    WINDOW_RETRIES = 3  # Attempts per window
+    RETRY_BACKOFF = 1.0  # seconds, doubled after each failed attempt
+
     def __init__(self):
         """Initialize MNB client"""
         self.session = requests.Session()
+        # Keep one connection per worker alive between window requests
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.MAX_WORKERS)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
         self.session.headers.update({
             'Content-Type': 'text/xml; charset=utf-8',
             'Accept': 'application/xml'
@@ -96,10 +110,8 @@ class MNBClient:
             Inner XML content of the result tag
         """
         try:
-            root = ET.fromstring(response_xml)
-
-            # Find the result tag (strip namespaces for simplicity)
-            for elem in root.iter():
+            # Stream through the envelope (strip namespaces for simplicity)
+            for _, elem in ET.iterparse(io.BytesIO(response_xml.encode('utf-8'))):
                 if elem.tag.endswith(result_tag):
                     return elem.text or ''
 
@@ -207,6 +219,9 @@ class MNBClient:
         """
         Get historical exchange rates for specified date range and currencies.
 
+        Long ranges are fetched as concurrent calendar windows (see
+        iter_exchange_rate_windows) and merged.
+
         Args:
             start_date: Start date for rate history
             end_date: End date for rate history
@@ -220,9 +235,116 @@ class MNBClient:
                 '2025-01-16': {'USD': Decimal('386.1'), 'EUR': Decimal('411.0')}
             }
         """
+        rates_data = {}
+        for window_rates in self.iter_exchange_rate_windows(start_date, end_date, currencies):
+            rates_data.update(window_rates)
+        return rates_data
+
+    @classmethod
+    def split_date_range(cls, start_date: date, end_date: date, window: Optional[str] = None) -> List[Tuple[date, date]]:
+        """
+        Split a date range into calendar windows.
+
+        Args:
+            start_date: First day of the range
+            end_date: Last day of the range (inclusive)
+            window: 'year' or 'month' (default: HISTORY_WINDOW)
+
+        Returns:
+            List of (window_start, window_end) tuples covering the range
+            Example: 2023-11-15..2024-02-10 by year -> [(2023-11-15, 2023-12-31), (2024-01-01, 2024-02-10)]
+        """
+        window = window or cls.HISTORY_WINDOW
+        if window not in ('year', 'month'):
+            raise ValueError(f"Unknown window: {window}")
+
+        windows = []
+        current = start_date
+        while current <= end_date:
+            if window == 'year':
+                next_start = date(current.year + 1, 1, 1)
+            elif current.month == 12:
+                next_start = date(current.year + 1, 1, 1)
+            else:
+                next_start = date(current.year, current.month + 1, 1)
+            windows.append((current, min(end_date, next_start - timedelta(days=1))))
+            current = next_start
+        return windows
+
+    def iter_exchange_rate_windows(
+        self,
+        start_date: date,
+        end_date: date,
+        currencies: Optional[List[str]] = None,
+        window: Optional[str] = None
+    ) -> Iterator[Dict[str, Dict[str, Decimal]]]:
+        """
+        Fetch historical rates window by window, yielding each window as it completes.
+
+        Windows are requested concurrently (MAX_WORKERS) over the pooled session,
+        each with its own retries, so a long backfill is neither one huge request
+        nor lost entirely when a single window fails. Windows are yielded in
+        completion order.
+
+        Args:
+            start_date: Start date for rate history
+            end_date: End date for rate history
+            currencies: List of currency codes (default: ['USD', 'EUR'])
+            window: 'year' or 'month' (default: HISTORY_WINDOW)
+
+        Yields:
+            Nested dictionary per window: {date_str: {currency: rate}}
+
+        Raises:
+            MNBClientError: If a window still fails after WINDOW_RETRIES attempts
+        """
         if currencies is None:
             currencies = ['USD', 'EUR']
 
+        windows = self.split_date_range(start_date, end_date, window)
+        if not windows:
+            return
+        if len(windows) == 1:
+            yield self._fetch_window(windows[0][0], windows[0][1], currencies)
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=min(self.MAX_WORKERS, len(windows)),
+            thread_name_prefix='mnb-window'
+        ) as executor:
+            futures = [
+                executor.submit(self._fetch_window, window_start, window_end, currencies)
+                for window_start, window_end in windows
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def _fetch_window(self, start_date: date, end_date: date, currencies: List[str]) -> Dict[str, Dict[str, Decimal]]:
+        """Fetch one window of historical rates, retrying with backoff"""
+        for attempt in range(1, self.WINDOW_RETRIES + 1):
+            try:
+                return self._get_exchange_rates_once(start_date, end_date, currencies)
+            except MNBClientError as e:
+                if attempt == self.WINDOW_RETRIES:
+                    raise
+                delay = self.RETRY_BACKOFF * 2 ** (attempt - 1)
+                logger.warning(
+                    f"MNB window {start_date}..{end_date} failed (attempt {attempt}), "
+                    f"retrying in {delay:.0f}s: {str(e)}"
+                )
+                time.sleep(delay)
+
+    def _get_exchange_rates_once(
+        self,
+        start_date: date,
+        end_date: date,
+        currencies: List[str]
+    ) -> Dict[str, Dict[str, Decimal]]:
+        """Single GetExchangeRates request for a date range"""
         # Format dates for MNB API
         start_str = start_date.strftime('%Y-%m-%d')
         end_str = end_date.strftime('%Y-%m-%d')
@@ -273,12 +395,16 @@ class MNBClient:
             Nested dictionary: {date_str: {currency: rate}}
         """
         try:
-            root = ET.fromstring(xml_str)
             rates_by_date = {}
 
-            for day in root.findall('Day'):
+            # Day elements are handled and released one by one instead of building the whole tree
+            for _, day in ET.iterparse(io.BytesIO(xml_str.encode('utf-8'))):
+                if day.tag != 'Day':
+                    continue
+
                 date_str = day.get('date')
                 if not date_str:
+                    day.clear()
                     continue
 
                 day_rates = {}
@@ -309,6 +435,7 @@ class MNBClient:
 
                 if day_rates:
                     rates_by_date[date_str] = day_rates
+                day.clear()
 
             return rates_by_date
 
@@ -13,7 +13,7 @@ import logging
 from datetime import timedelta
 from decimal import Decimal
 from itertools import combinations
-from typing import Dict, Any, Optional, Tuple, List
+from typing import Callable, Dict, Any, Optional, Tuple, List
 from django.db.models import QuerySet, Q
 from django.utils import timezone
 from rapidfuzz import fuzz
@@ -60,12 +60,18 @@ class TransactionMatchingService:
         """
         self.company = company
 
-    def match_statement(self, statement: BankStatement) -> Dict[str, Any]:
+    def match_statement(
+        self,
+        statement: BankStatement,
+        progress_callback: Optional[Callable[[int], None]] = None
+    ) -> Dict[str, Any]:
         """
         Match all unmatched transactions in a bank statement.
 
         Args:
             statement: BankStatement instance
+            progress_callback: Optional callable receiving the number of new matches
+                found so far (used for background upload progress)
 
         Returns:
             Dictionary with matching statistics:
@@ -122,6 +128,9 @@ class TransactionMatchingService:
                 if result.get('auto_paid'):
                     auto_paid_count += 1
 
+                if progress_callback:
+                    progress_callback(matched_count)
+
         # Calculate TOTAL matched count (new matches + existing matches)
         total_transactions_in_statement = BankTransaction.objects.filter(
             bank_statement=statement
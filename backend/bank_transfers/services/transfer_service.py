@@ -2,11 +2,21 @@
 Transfer service layer
 Handles business logic for transfer and batch operations
 """
-from django.db import transaction, models
+import hashlib
+import io
+import tempfile
+import zipfile
+from contextlib import contextmanager
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction, models
 from django.utils import timezone
-from ..models import Transfer, TransferBatch
-from ..utils import generate_xml
+from ..caching import INVOICE_STATS, invalidate_company_namespace
+from ..models import Transfer, TransferBatch, BatchExportArtifact
+from ..utils import generate_xml, iter_xml, validate_transfers_for_xml
 from ..kh_export import KHBankExporter
+from .invoice_statistics_service import InvoiceStatisticsService
 
 
 class TransferService:
@@ -39,52 +49,50 @@ class TransferService:
     
     @staticmethod
     def bulk_create_transfers(transfers_data, batch_name=None):
-        """Create multiple transfers in a transaction with optional batch"""
+        """
+        Create multiple transfers in a transaction with optional batch
+        
+        Transfers are inserted with one bulk INSERT, linked NAV invoices are moved
+        to PREPARED with a single UPDATE and batch membership rows are inserted in
+        bulk, so the query count does not grow with the number of transfers.
+        """
+        from ..models import Invoice
+        
         with transaction.atomic():
-            transfers = []
-            nav_invoices_to_update = []
-            
-            for transfer_data in transfers_data:
-                # Handle nested data properly - if transfer_data contains instances, get the data
-                if hasattr(transfer_data, '__dict__'):
-                    # If it's a dict-like object, use it directly
-                    data_dict = transfer_data
-                else:
-                    data_dict = transfer_data
-                
-                # Debug: Log nav_invoice data
-                nav_invoice_value = data_dict.get('nav_invoice')
-                if nav_invoice_value:
-                    print(f"Creating transfer with nav_invoice: {nav_invoice_value}")
-                
-                transfer = Transfer.objects.create(**data_dict)
-                transfers.append(transfer)
-                
-                # Track NAV invoices that need status update
-                if transfer.nav_invoice_id:
-                    print(f"Transfer {transfer.id} linked to NAV invoice {transfer.nav_invoice_id}")
-                    nav_invoices_to_update.append(transfer.nav_invoice_id)
+            transfers = Transfer.objects.bulk_create(
+                [Transfer(**data_dict) for data_dict in transfers_data]
+            )
             
-            # Update linked NAV invoices to PREPARED status
-            if nav_invoices_to_update:
-                from ..models import Invoice
-                from django.utils import timezone
-                
+            # Update linked NAV invoices to PREPARED status (same fields as Invoice.mark_as_prepared)
+            nav_invoice_ids = {t.nav_invoice_id for t in transfers if t.nav_invoice_id}
+            if nav_invoice_ids:
                 invoices = Invoice.objects.filter(
-                    id__in=nav_invoices_to_update,
+                    id__in=nav_invoice_ids,
                     payment_status='UNPAID'  # Only update if currently unpaid
                 )
-                
-                for invoice in invoices:
-                    invoice.mark_as_prepared()
+                InvoiceStatisticsService.payment_status_updated(invoices, 'PREPARED')
+                invoices.update(
+                    payment_status='PREPARED',
+                    payment_status_date=timezone.now().date(),
+                    auto_marked_paid=False,
+                    updated_at=timezone.now()
+                )
+                # queryset.update() sends no signals
+                invalidate_company_namespace(transfers[0].originator_account.company_id, INVOICE_STATS)
             
             # Create batch if name provided
             batch = None
             if batch_name and transfers:
-                batch = TransferBatch.objects.create(name=batch_name)
-                batch.transfers.set(transfers)
-                batch.total_amount = sum(t.amount for t in transfers)
-                batch.save()
+                batch = TransferBatch.objects.create(
+                    name=batch_name,
+                    company_id=transfers[0].originator_account.company_id,
+                    total_amount=sum(t.amount for t in transfers)
+                )
+                through_model = TransferBatch.transfers.through
+                through_model.objects.bulk_create([
+                    through_model(transferbatch_id=batch.id, transfer_id=t.id)
+                    for t in transfers
+                ])
             
             return transfers, batch
     
@@ -110,15 +118,22 @@ class TransferService:
             
             # Get company from first transfer's originator account
             company = transfers.first().originator_account.company
-            
-            batch = TransferBatch.objects.create(
-                name=batch_name,
-                company=company,
-                xml_generated_at=timezone.now(),
-                total_amount=sum(t.amount for t in transfers),
-                order=max_order + 1
-            )
-            batch.transfers.set(transfers)
+
+            with TransferBatchService.atomic_with_export_files() as written_files:
+                batch = TransferBatch.objects.create(
+                    name=batch_name,
+                    company=company,
+                    xml_generated_at=timezone.now(),
+                    total_amount=sum(t.amount for t in transfers),
+                    order=max_order + 1
+                )
+                batch.transfers.set(transfers)
+
+                # Keep the generated file as the batch's export artifact
+                TransferBatchService.store_export_artifact(
+                    batch, TransferBatchService.export_content_key(batch), [xml_content.encode('utf-8')],
+                    written_files=written_files
+                )
         
         # Mark transfers as processed
         transfers.update(is_processed=True)
@@ -167,16 +182,23 @@ class TransferService:
             
             # Get company from first transfer's originator account
             company = transfers.first().originator_account.company
-            
-            batch = TransferBatch.objects.create(
-                name=f"{batch_name} (KH Export)",
-                company=company,
-                xml_generated_at=timezone.now(),
-                total_amount=sum(t.amount for t in transfers),
-                order=max_order + 1,
-                batch_format='KH_CSV'
-            )
-            batch.transfers.set(transfers)
+
+            with TransferBatchService.atomic_with_export_files() as written_files:
+                batch = TransferBatch.objects.create(
+                    name=f"{batch_name} (KH Export)",
+                    company=company,
+                    xml_generated_at=timezone.now(),
+                    total_amount=sum(t.amount for t in transfers),
+                    order=max_order + 1,
+                    batch_format='KH_CSV'
+                )
+                batch.transfers.set(transfers)
+
+                # Keep the generated file as the batch's export artifact
+                TransferBatchService.store_export_artifact(
+                    batch, TransferBatchService.export_content_key(batch), [kh_content_bytes],
+                    written_files=written_files
+                )
         
         # Mark transfers as processed
         transfers.update(is_processed=True)
@@ -203,6 +225,76 @@ class TransferService:
         }
 
 
+    @staticmethod
+    def generate_kh_export_zip(company, transfer_ids, batch_name=None):
+        """
+        Generate KH Bank exports split into files of at most 40 transfers.
+        
+        Every chunk is recorded as its own KH_CSV batch (with its file stored as
+        the batch's export artifact once the batches are committed) and all files
+        are returned in one ZIP archive. Only transfers of `company` are exported.
+        """
+        transfers = list(Transfer.objects.filter(
+            id__in=transfer_ids, originator_account__company=company
+        ).select_related(
+            'beneficiary', 'originator_account'
+        ).order_by('order', 'execution_date'))
+        
+        if not transfers:
+            raise ValueError("No transfers found")
+        
+        exporter = KHBankExporter()
+        chunks = exporter.partition_transfers(transfers)
+        # Encode every chunk before saving anything, so a validation error leaves no batches behind
+        chunk_contents = [exporter.generate_kh_export_encoded(chunk) for chunk in chunks]
+        
+        base_name = batch_name or exporter.get_filename().replace('.HUF.csv', '')
+        safe_name = "".join(c for c in base_name if c.isalnum() or c in (' ', '_', '-')).strip().replace(' ', '_')
+        generated_at = timezone.now()
+        
+        zip_buffer = io.BytesIO()
+        batches = []
+        with TransferBatchService.atomic_with_export_files() as written_files, \
+                zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            max_order = TransferBatch.objects.aggregate(
+                max_order=models.Max('order')
+            )['max_order'] or 0
+            
+            for index, (chunk, content) in enumerate(zip(chunks, chunk_contents), 1):
+                batch = TransferBatch.objects.create(
+                    name=f"{base_name} {index:02d}-{len(chunks):02d} (KH Export)",
+                    company=company,
+                    xml_generated_at=generated_at,
+                    total_amount=sum(t.amount for t in chunk),
+                    order=max_order + index,
+                    batch_format='KH_CSV'
+                )
+                batch.transfers.set(chunk)
+                TransferBatchService.store_export_artifact(
+                    batch, TransferBatchService.export_content_key(batch), [content],
+                    written_files=written_files
+                )
+                archive.writestr(batch.filename, content)
+                batches.append({
+                    'id': batch.id,
+                    'name': batch.name,
+                    'filename': batch.filename,
+                    'total_amount': str(batch.total_amount),
+                    'transfer_count': len(chunk),
+                })
+            
+            # Mark transfers as processed
+            Transfer.objects.filter(id__in=[t.id for t in transfers]).update(is_processed=True)
+        
+        return {
+            'content': zip_buffer.getvalue(),
+            'filename': f"{safe_name}.zip",
+            'transfer_count': len(transfers),
+            'total_amount': str(sum(t.amount for t in transfers)),
+            'batches': batches
+        }
+
+
 class TransferBatchService:
     """Service for transfer batch business logic"""
     
@@ -223,6 +315,177 @@ class TransferBatchService:
         
         return generate_xml(transfers)
     
+    @staticmethod
+    def stream_xml_for_batch(batch):
+        """
+        Validate a batch and return an iterator over its XML content.
+
+        Validation runs before the first chunk is produced, so errors are still
+        reported as a normal error response instead of a truncated download.
+        """
+        transfers = list(batch.transfers.select_related(
+            'beneficiary', 'originator_account'
+        ).order_by('order', 'execution_date'))
+        
+        if not transfers:
+            raise ValueError("No transfers in batch")
+        
+        validate_transfers_for_xml(transfers)
+        return iter_xml(transfers)
+    
+    # Bump when the XML or KH CSV generators change, so cached artifacts are rebuilt
+    EXPORT_ARTIFACT_VERSION = 1
+
+    # Transfer fields that end up in the exported file
+    EXPORT_KEY_FIELDS = (
+        'id', 'order', 'execution_date', 'amount', 'currency', 'remittance_info',
+        'beneficiary__name', 'beneficiary__account_number',
+        'originator_account__account_number',
+    )
+
+    EXPORT_CONTENT_TYPES = {
+        'XML': 'application/xml',
+        'KH_CSV': 'text/csv; charset=iso-8859-2',
+    }
+
+    @staticmethod
+    def export_content_key(batch):
+        """
+        Hash the export-relevant data of a batch.
+
+        Uses a single values query, so checking for a cached artifact is much cheaper
+        than regenerating the file. Any change to a transfer, its beneficiary or the
+        batch membership yields a different key.
+        """
+        rows = batch.transfers.order_by('order', 'execution_date').values_list(
+            *TransferBatchService.EXPORT_KEY_FIELDS
+        )
+
+        digest = hashlib.sha256(
+            f"{TransferBatchService.EXPORT_ARTIFACT_VERSION}|{batch.batch_format}\n".encode('utf-8')
+        )
+        row_count = 0
+        for row in rows:
+            digest.update(("\x1f".join(str(value) for value in row) + "\n").encode('utf-8'))
+            row_count += 1
+
+        if not row_count:
+            raise ValueError("No transfers in batch")
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def iter_export_content(batch):
+        """Validate a batch and return an iterator over its export file as bytes"""
+        if batch.batch_format == 'KH_CSV':
+            transfers = list(batch.transfers.select_related(
+                'beneficiary', 'originator_account'
+            ).order_by('order', 'execution_date'))
+            return iter([KHBankExporter().generate_kh_export_encoded(transfers)])
+
+        return (chunk.encode('utf-8') for chunk in TransferBatchService.stream_xml_for_batch(batch))
+
+    @staticmethod
+    def get_export_artifact(batch):
+        """
+        Return the stored export artifact for the current batch contents.
+
+        The file is generated and persisted on the first download only; later
+        downloads of an unchanged batch reuse it.
+
+        Raises:
+            ValueError: If the batch is empty or a transfer cannot be exported
+        """
+        content_key = TransferBatchService.export_content_key(batch)
+
+        artifact = batch.export_artifacts.filter(
+            batch_format=batch.batch_format,
+            content_key=content_key
+        ).first()
+        if artifact and default_storage.exists(artifact.file_path):
+            return artifact
+
+        return TransferBatchService.store_export_artifact(
+            batch, content_key, TransferBatchService.iter_export_content(batch), artifact
+        )
+
+    @staticmethod
+    @contextmanager
+    def atomic_with_export_files():
+        """
+        transaction.atomic() for creating batches with export artifacts.
+
+        Yields a list for store_export_artifact(written_files=...); the files
+        recorded in it are deleted again if the transaction rolls back, so no file
+        is left in storage without its artifact row.
+        """
+        written_files = []
+        try:
+            with transaction.atomic():
+                yield written_files
+        except BaseException:
+            for file_path in written_files:
+                default_storage.delete(file_path)
+            raise
+
+    @staticmethod
+    def store_export_artifact(batch, content_key, chunks, artifact=None, written_files=None):
+        """
+        Write generated export content to storage and record it as an artifact.
+
+        Args:
+            batch: TransferBatch the content belongs to
+            content_key: Result of export_content_key() for the batch
+            chunks: Iterable of bytes
+            artifact: Existing artifact whose file went missing (rewritten in place)
+            written_files: List from atomic_with_export_files() when called inside it
+        """
+        extension = 'csv' if batch.batch_format == 'KH_CSV' else 'xml'
+        file_path = f"batch_exports/{batch.company_id}/{batch.id}/{content_key}.{extension}"
+
+        digest = hashlib.sha256()
+        file_size = 0
+        with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as buffer:
+            for chunk in chunks:
+                buffer.write(chunk)
+                digest.update(chunk)
+                file_size += len(chunk)
+            buffer.seek(0)
+            stored_path = default_storage.save(file_path, File(buffer))
+
+        try:
+            if artifact is not None:
+                artifact.file_path = stored_path
+                artifact.file_size = file_size
+                artifact.file_hash = digest.hexdigest()
+                artifact.save(update_fields=['file_path', 'file_size', 'file_hash', 'updated_at'])
+            else:
+                with transaction.atomic():
+                    artifact = BatchExportArtifact.objects.create(
+                        batch=batch,
+                        batch_format=batch.batch_format,
+                        content_key=content_key,
+                        file_path=stored_path,
+                        file_size=file_size,
+                        file_hash=digest.hexdigest()
+                    )
+        except IntegrityError:
+            # A concurrent download stored the same content first
+            default_storage.delete(stored_path)
+            return BatchExportArtifact.objects.get(
+                batch=batch,
+                batch_format=batch.batch_format,
+                content_key=content_key
+            )
+        except BaseException:
+            # No artifact row refers to the file
+            default_storage.delete(stored_path)
+            raise
+
+        if written_files is not None:
+            written_files.append(stored_path)
+        return artifact
+
     @staticmethod
     def mark_batch_as_used(batch):
         """Mark batch as used in bank and auto-mark linked NAV invoices as paid"""
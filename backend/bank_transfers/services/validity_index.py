@@ -0,0 +1,152 @@
+"""
+Process-local validity index of the base tables
+
+Suppliers, customers and product prices carry a validity period
+(valid_from, valid_to; either may be empty). The index keeps every record of a
+company grouped by its folded partner name / product code, sorted by
+valid_from together with the running maximum of valid_to, so the record valid
+on a date is found with a bisect instead of a query per lookup:
+
+    validity_index.lookup(company.id, 'suppliers', 'Kovács Kft.', date(2025, 1, 15))
+    validity_index.lookup(company.id, 'prices', 'CM-100')   # valid today
+
+A company's table is loaded with a single query on first use. It reloads when
+the company's BASE_TABLES cache namespace is invalidated (record save/delete
+signals and the CSV importer, see signals.py) and after INDEX_MAX_AGE seconds.
+
+The base table ViewSets serve it as GET .../as-of/; list views use
+annotate_validity() instead, so is_valid is computed by the database for the
+whole page.
+"""
+
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from typing import Optional
+
+from django.db.models import BooleanField, Case, Q, Value, When
+
+from .. import caching
+from ..models import Customer, ProductPrice, Supplier
+from ..search import fold_search_text
+
+# Seconds before a loaded table is re-read even without an invalidation
+INDEX_MAX_AGE = 300
+
+# table -> (model, lookup key field, related objects loaded with the records)
+TABLES = {
+    'suppliers': (Supplier, 'partner_name', ('company', 'category', 'type')),
+    'customers': (Customer, 'customer_name', ('company',)),
+    'prices': (ProductPrice, 'product_value', ('company',)),
+}
+
+
+def valid_on(on_date: Optional[date] = None) -> Q:
+    """Filter for records valid on `on_date` (default: today)"""
+    on_date = on_date or date.today()
+    return (
+        (Q(valid_from__isnull=True) | Q(valid_from__lte=on_date)) &
+        (Q(valid_to__isnull=True) | Q(valid_to__gte=on_date))
+    )
+
+
+def annotate_validity(queryset, on_date: Optional[date] = None):
+    """Annotate `valid_today` (bool) on a base table queryset; read by the serializers"""
+    return queryset.annotate(
+        valid_today=Case(
+            When(valid_on(on_date), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        )
+    )
+
+
+def _normalize_key(value) -> str:
+    return ' '.join(fold_search_text(value).split())
+
+
+class ValidityIndex:
+    """Per-company interval lists with bisect as-of lookups"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}  # (company_id, table) -> (version, loaded_at, {key: (starts, ends, records)})
+
+    def invalidate(self):
+        """Drop every loaded table (reloaded on next use)"""
+        with self._lock:
+            self._tables = {}
+
+    def _load(self, company_id, table):
+        model, key_field, related = TABLES[table]
+        queryset = model.objects.filter(company_id=company_id).select_related(*related)
+
+        groups = defaultdict(list)
+        for record in queryset:
+            groups[_normalize_key(getattr(record, key_field))].append(record)
+
+        index = {}
+        for key, records in groups.items():
+            records.sort(key=lambda record: (record.valid_from or date.min, record.pk))
+            # ends[i]: latest valid_to among records[:i + 1], so a lookup can stop
+            # as soon as no earlier period reaches the date
+            ends = []
+            latest_end = date.min
+            for record in records:
+                latest_end = max(latest_end, record.valid_to or date.max)
+                ends.append(latest_end)
+            index[key] = ([record.valid_from or date.min for record in records], ends, records)
+        return index
+
+    def _get_table(self, company_id, table):
+        if table not in TABLES:
+            raise ValueError(f"Unknown base table: {table}")
+
+        version = caching.company_namespace_version(company_id, caching.BASE_TABLES)
+        entry = self._tables.get((company_id, table))
+        if entry is not None and entry[0] == version and time.monotonic() - entry[1] <= INDEX_MAX_AGE:
+            return entry[2]
+
+        index = self._load(company_id, table)
+        with self._lock:
+            self._tables[(company_id, table)] = (version, time.monotonic(), index)
+        return index
+
+    def lookup(self, company_id, table: str, key: str, on_date: Optional[date] = None):
+        """
+        Record of `table` valid on `on_date`.
+
+        Args:
+            company_id: Company the record belongs to
+            table: 'suppliers', 'customers' or 'prices'
+            key: Partner name (suppliers, customers) or product code (prices);
+                case, accent and whitespace insensitive
+            on_date: Date the record must be valid on (default: today)
+
+        Returns:
+            The record whose validity period contains the date (the latest
+            starting one if periods overlap), or None
+
+        O(log n) for non-overlapping histories; overlapping periods add one step
+        per overlapping record.
+        """
+        entry = self._get_table(company_id, table).get(_normalize_key(key))
+        if entry is None:
+            return None
+
+        on_date = on_date or date.today()
+        starts, ends, records = entry
+        # Periods starting after the date are skipped by the bisect
+        for position in range(bisect_right(starts, on_date) - 1, -1, -1):
+            if ends[position] < on_date:
+                break
+            record = records[position]
+            if record.valid_to is None or record.valid_to >= on_date:
+                return record
+        return None
+
+
+# Shared per-process index
+validity_index = ValidityIndex()
@@ -0,0 +1,88 @@
+"""
+Signal handlers for cache invalidation.
+
+Connected in BankTransfersConfig.ready().
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import caching
+from .models import (
+    Company, CompanyFeature, CompanyUser, Customer, ExchangeRate, ExchangeRateSyncLog,
+    FeatureTemplate, Invoice, ProductPrice, Supplier, SupplierCategory, SupplierType,
+    UserProfile,
+)
+from .permissions import CompanyContextResolver, FeatureChecker
+from .services.invoice_statistics_service import InvoiceStatisticsService
+
+
+@receiver([post_save, post_delete], sender=CompanyFeature)
+def invalidate_company_features(sender, instance, **kwargs):
+    """Feature enabled/disabled/removed for a company"""
+    FeatureChecker.invalidate_company(instance.company_id)
+
+
+@receiver([post_save, post_delete], sender=FeatureTemplate)
+def invalidate_feature_templates(sender, instance, **kwargs):
+    """System critical flag of a template affects every company"""
+    FeatureChecker.invalidate_all()
+
+
+@receiver([post_save, post_delete], sender=CompanyUser)
+def invalidate_membership_context(sender, instance, **kwargs):
+    """Role, permissions or active flag of a membership changed"""
+    CompanyContextResolver.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=UserProfile)
+def invalidate_profile_context(sender, instance, **kwargs):
+    """Last active company changed"""
+    CompanyContextResolver.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=Company)
+def invalidate_company_context(sender, instance, created, **kwargs):
+    """Cached contexts of the company's members hold a copy of the company"""
+    if created:
+        return
+    for user_id in CompanyUser.objects.filter(company=instance).values_list('user_id', flat=True):
+        CompanyContextResolver.invalidate_user(user_id)
+
+
+@receiver(pre_save, sender=Invoice)
+def load_invoice_stats_state(sender, instance, **kwargs):
+    InvoiceStatisticsService.invoice_saving(instance)
+
+
+@receiver(post_save, sender=Invoice)
+def update_invoice_stats_on_save(sender, instance, created, **kwargs):
+    InvoiceStatisticsService.invoice_saved(instance, created)
+    caching.invalidate_company_namespace(instance.company_id, caching.INVOICE_STATS)
+
+
+@receiver(post_delete, sender=Invoice)
+def update_invoice_stats_on_delete(sender, instance, **kwargs):
+    InvoiceStatisticsService.invoice_deleted(instance)
+    caching.invalidate_company_namespace(instance.company_id, caching.INVOICE_STATS)
+
+
+@receiver([post_save, post_delete], sender=ExchangeRate)
+def invalidate_exchange_rates(sender, instance, **kwargs):
+    caching.invalidate_namespace(caching.EXCHANGE_RATES)
+
+
+@receiver(post_save, sender=ExchangeRateSyncLog)
+def invalidate_exchange_rates_after_sync(sender, instance, **kwargs):
+    """Covers rates written in bulk by the sync service"""
+    if instance.sync_status != 'RUNNING':
+        caching.invalidate_namespace(caching.EXCHANGE_RATES)
+
+
+@receiver([post_save, post_delete], sender=Supplier)
+@receiver([post_save, post_delete], sender=Customer)
+@receiver([post_save, post_delete], sender=ProductPrice)
+@receiver([post_save, post_delete], sender=SupplierCategory)
+@receiver([post_save, post_delete], sender=SupplierType)
+def invalidate_base_tables(sender, instance, **kwargs):
+    """Validity index holds the records (suppliers with their category and type)"""
+    caching.invalidate_company_namespace(instance.company_id, caching.BASE_TABLES)
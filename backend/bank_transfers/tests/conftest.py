@@ -20,6 +20,16 @@ from bank_transfers.models import (
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Keep cached data (feature snapshots etc.) from leaking between tests."""
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
 # ============================================================================
 # User and Authentication Fixtures
 # ============================================================================
@@ -314,6 +324,73 @@ def bank_transaction(db, bank_statement):
     )
 
 
+REVOLUT_CSV_HEADER = (
+    'Date started (UTC),Date completed (UTC),ID,Type,State,Description,Reference,Payer,'
+    'Card number,Orig currency,Orig amount,Payment currency,Amount,Total amount,'
+    'Exchange rate,Fee,Fee currency,Balance,Account'
+)
+
+
+def build_revolut_csv(rows):
+    """
+    Build Revolut CSV bytes from (id, date, amount, description) tuples.
+
+    Rows are given newest first, like the real Revolut export.
+    """
+    lines = [REVOLUT_CSV_HEADER]
+    balance = Decimal('100000.00')
+    for transaction_id, booking_date, amount, description in rows:
+        lines.append(
+            f'{booking_date},{booking_date},{transaction_id},TRANSFER,COMPLETED,{description},'
+            f'REF-{transaction_id},Test Company Ltd.,,HUF,{amount},HUF,{amount},{amount},'
+            f',0.00,HUF,{balance},HUF Main'
+        )
+    return '\n'.join(lines).encode('utf-8')
+
+
+@pytest.fixture
+def revolut_csv_bytes():
+    """Minimal Revolut CSV export with two completed transfers."""
+    return build_revolut_csv([
+        ('tx-2', '2025-01-20', '-25000.00', 'To Test Supplier Ltd.'),
+        ('tx-1', '2025-01-10', '50000.00', 'From Test Customer Ltd.'),
+    ])
+
+
+def build_text_pdf(lines):
+    """
+    Build a minimal single-page PDF showing the given text lines.
+
+    Uses the standard Helvetica font with WinAnsi encoding, so Hungarian
+    accented characters (á, é, ...) are extracted correctly by pdfplumber.
+    """
+    def escape(text):
+        return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+    content = 'BT /F1 10 Tf 14 TL 40 800 Td ' + ' '.join(f'({escape(line)}) Tj T*' for line in lines) + ' ET'
+    stream = content.encode('cp1252')
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R '
+        b'/Resources << /Font << /F1 5 0 R >> >> >>',
+        b'<< /Length ' + str(len(stream)).encode() + b' >>\nstream\n' + stream + b'\nendstream',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+
+    pdf = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f'{number} 0 obj\n'.encode() + body + b'\nendobj\n'
+
+    xref_offset = len(pdf)
+    pdf += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    pdf += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    pdf += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n'.encode()
+    return pdf
+
+
 # ============================================================================
 # Exchange Rate Fixtures
 # ============================================================================
@@ -11,12 +11,13 @@ Tests cover:
 - IBAN/BIC extraction
 """
 
+import re
 import pytest
 from decimal import Decimal
 from datetime import date
 from pathlib import Path
 
-from bank_transfers.bank_adapters.granit_adapter import GranitBankAdapter
+from bank_transfers.bank_adapters.granit_adapter import GranitBankAdapter, GRANIT_LINE_CLASSIFIER
 from bank_transfers.bank_adapters.base import BankStatementParseError
 
 
@@ -318,3 +319,44 @@ class TestGranitEdgeCases:
 
         with pytest.raises((BankStatementParseError, Exception)):
             adapter.parse(b"%PDF-1.4\nCorrupted content")
+
+
+def _is_transaction_header_legacy(line):
+    """Header detection as previously implemented with separate regex calls."""
+    if not re.match(r'^\d{4}\.\d{2}\.\d{2}\s+', line):
+        return False
+    if re.search(r'\s[\d\-]+\s\d{3}$', line):
+        return True
+    if re.search(r'\s[\d\-]+$', line):
+        return not re.search(r'(jutalék|Beérkezés|Előjegyzett|Eredeti|Értéknap|Kártya):', line)
+    return False
+
+
+class TestGranitLineClassifier:
+    """Test transaction header detection."""
+
+    @pytest.mark.parametrize('line', [
+        '2025.01.14 POS vásárlás -361 250',
+        '2025.01.14 AFR jóváírás 10 260',
+        '2025.01.14 Kamat 15',
+        '2025.01.14 -1 000',
+        '2025.01.14 Előjegyzett jutalék: -723',
+        '2025.01.14 Előjegyzett jutalék: -1 723',
+        '2025.01.14 Értéknap: 2025.01.15',
+        '2025.01.14 Kártya: 123456******1234',
+        '2025.01.14 Beérkezés dátuma: 2025.01.14',
+        '2025.01.14 Átutalás',
+        '2025.01.14Kamat 15',
+        'Fizető fél: HU62116000060000000078175381, DANUBIUS EXPERT ZRT.',
+        'Közlemény: 2025/0012 10 260',
+        '',
+    ])
+    def test_classifier_matches_legacy_rules(self, line):
+        """Test combined classifier agrees with the original per-line checks."""
+        is_header = GRANIT_LINE_CLASSIFIER.classify(line) == 'transaction_header'
+        assert is_header == _is_transaction_header_legacy(line)
+
+    def test_detail_line_is_not_header(self):
+        """Test detail lines with small amounts do not start a transaction."""
+        assert GRANIT_LINE_CLASSIFIER.classify('2025.01.14 Előjegyzett jutalék: -723') is None
+        assert GRANIT_LINE_CLASSIFIER.classify('2025.01.14 POS vásárlás -361 250') == 'transaction_header'
@@ -17,7 +17,7 @@ from decimal import Decimal
 from datetime import date
 from pathlib import Path
 
-from bank_transfers.bank_adapters.kh_adapter import KHBankAdapter
+from bank_transfers.bank_adapters.kh_adapter import KHBankAdapter, KH_LINE_CLASSIFIER
 from bank_transfers.bank_adapters.base import BankStatementParseError
 
 
@@ -401,3 +401,59 @@ class TestKHPDFStructure:
             for tx in txs_with_payment_id:
                 assert isinstance(tx.payment_id, str)
                 assert len(tx.payment_id) > 0
+
+
+class TestKHLineClassifier:
+    """Test line classification used to split transaction blocks."""
+
+    @pytest.mark.parametrize('line,expected', [
+        ('2025.09.03 2025.09.03 Azonnali Forint átutalás bankon kívül - 212 309', 'transaction_start'),
+        ('Ref.: BNK25246BJHLCKHJ Szla.:', None),
+        ('Szolgáltató Kft. Közl.: SZA00456/2025 Hiv.:', None),
+        ('Könyvelt nyitóegyenleg: 1 000 000', 'summary'),
+        ('Jóváírás összesen: 212 309', 'summary'),
+        ('', None),
+    ])
+    def test_classify_lines(self, line, expected):
+        """Test transaction start and summary lines are recognised."""
+        assert KH_LINE_CLASSIFIER.classify(line) == expected
+
+    def test_transaction_start_wins_over_summary(self):
+        """Test date-prefixed line is a transaction start even if it mentions a summary."""
+        line = '2025.09.30 2025.09.30 Jóváírás összesen 1 000'
+        assert KH_LINE_CLASSIFIER.classify(line) == 'transaction_start'
+
+    def test_capturing_groups_rejected(self):
+        """Test classifier patterns with capturing groups are rejected."""
+        from bank_transfers.bank_adapters.base import LineClassifier
+
+        with pytest.raises(ValueError):
+            LineClassifier({'date': r'(\d{4})\.\d{2}\.\d{2}'})
+
+
+class TestKHDetailPatterns:
+    """Test detail extraction with the precompiled patterns."""
+
+    def test_original_amount_in_rate_currency(self):
+        """Test the original amount is taken in the currency of the exchange rate."""
+        from bank_transfers.bank_adapters.base import NormalizedTransaction
+
+        transaction = NormalizedTransaction(
+            transaction_type='TRANSFER_DEBIT',
+            booking_date=date(2025, 9, 3),
+            value_date=date(2025, 9, 3),
+            amount=Decimal('-39533'),
+            currency='HUF',
+            description='SEPA átutalás',
+        )
+        text = (
+            'Ref.: BNK25246BJHLCKHJ Árf.: 395,33 HUF/USD\n'
+            'Eredeti összeg: 90,00 EUR Eredeti összeg: 100,00 USD'
+        )
+
+        KHBankAdapter()._extract_transaction_details(text, transaction)
+
+        assert transaction.transaction_id == 'BNK25246BJHLCKHJ'
+        assert transaction.exchange_rate == Decimal('395.33')
+        assert transaction.original_amount == Decimal('-100.00')
+        assert transaction.original_currency == 'USD'
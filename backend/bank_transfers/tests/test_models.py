@@ -231,6 +231,15 @@ class TestInvoiceModel:
 
         assert 'INV-2025-123' in str(invoice)
 
+    def test_search_text_is_folded_and_follows_update_fields(self, nav_invoice):
+        """Test search_text is accent-folded and refreshed on partial saves."""
+        nav_invoice.supplier_name = 'Árvíztűrő Kft.'
+        nav_invoice.save(update_fields=['supplier_name'])
+
+        nav_invoice.refresh_from_db()
+        assert 'arvizturo kft.' in nav_invoice.search_text
+        assert 'teszt-2025-001' in nav_invoice.search_text
+
 
 # ============================================================================
 # Transfer Model Tests
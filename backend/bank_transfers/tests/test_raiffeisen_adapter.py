@@ -280,3 +280,26 @@ class TestPyPDF2Integration:
                 words = name.split()
                 if len(words) > 1:
                     assert ' ' in name, f"All-caps multi-word name should have spaces: '{name}'"
+
+
+class TestRaiffeisenCleanText:
+    """Test PDF encoding artifact cleanup."""
+
+    def test_clean_text_matches_sequential_replacement(self):
+        """Test translate table gives the same result as applying CHAR_FIXES in order."""
+        from bank_transfers.bank_adapters.raiffeisen_adapter import CHAR_FIXES
+
+        adapter = RaiffeisenBankAdapter()
+        text = 'Kényvel©s ¶tutalë neve: T£rsas£g Kft. Elìjegyzett d½j ïgyf©l ›rzés ûr Ё'
+
+        expected = text
+        for bad_char, good_char in CHAR_FIXES.items():
+            expected = expected.replace(bad_char, good_char)
+
+        assert adapter._clean_text(text) == expected
+
+    def test_clean_text_empty(self):
+        """Test empty input returns empty string."""
+        adapter = RaiffeisenBankAdapter()
+        assert adapter._clean_text(None) == ''
+        assert adapter._clean_text('') == ''
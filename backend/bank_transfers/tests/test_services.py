@@ -2,8 +2,23 @@
 Service Layer Tests
 
 Tests for business logic in the service layer:
-- BillingoSyncService: API synchronization and credential validation
+- BillingoSyncService: API synchronization, bulk page persistence and credential validation
+- Billingo spendings sync: incremental bulk upsert and reconciliation
 - BankStatementParserService: Bank statement parsing
+- PDFTransactionProcessor: Tax/salary PDF import
+- XML export: HUFTransactions writer
+- Batch export artifacts and chunked KH Bank export
+- TransferService: bulk transfer creation
+- FeatureChecker: cached feature snapshots
+- CompanyContextResolver: request company and membership resolution
+- Cache-aside helpers
+- InvoiceStatisticsService: grouped and materialised invoice statistics
+- ExchangeRateTable: in-process as-of rate lookups
+- ExchangeRateSyncService: bulk rate upsert
+- MNBClient: windowed historical rate fetch
+- BaseTableImportService: chunked base table CSV import
+- ValidityIndex: as-of base table lookups
+- ExcelImportService: streaming beneficiary import
 - TransactionMatchingService: Invoice matching algorithms
 - CredentialManager: Encryption/decryption
 """
@@ -12,10 +27,11 @@ import pytest
 from decimal import Decimal
 from datetime import date, timedelta
 from unittest.mock import Mock, patch, MagicMock
+from django.utils import timezone
 import responses
 
 from bank_transfers.services.billingo_sync_service import (
-    BillingoSyncService, BillingoAPIError, BillingoRateLimitError
+    BillingoSyncService, BillingoAPIError, BillingoRateLimitError, BillingoRateLimiter
 )
 from bank_transfers.services.credential_manager import CredentialManager
 
@@ -164,6 +180,232 @@ class TestBillingoSyncService:
         with pytest.raises(BillingoAPIError, match="Billingo sync is disabled"):
             service.sync_company(company)
 
+    @pytest.mark.django_db
+    @responses.activate
+    def test_fetch_all_pages_concurrently_in_page_order(self, company):
+        """Test pages after the first are fetched concurrently and kept in page order."""
+        service = BillingoSyncService()
+
+        def request_callback(request):
+            import json
+            assert request.headers['X-API-KEY'] == 'test-key'
+            page = int(request.params['page'])
+            body = {'data': [{'id': page * 10}, {'id': page * 10 + 1}], 'total': 6, 'last_page': 3}
+            return (200, {}, json.dumps(body))
+
+        responses.add_callback(
+            responses.GET, "https://api.billingo.hu/v3/documents", callback=request_callback
+        )
+
+        with service.create_session('test-key') as session:
+            invoices, api_calls = service._fetch_all_pages(session, BillingoRateLimiter(), company)
+
+        assert [invoice['id'] for invoice in invoices] == [10, 11, 20, 21, 30, 31]
+        assert api_calls == 3
+        assert sorted(call.request.params['page'] for call in responses.calls) == ['1', '2', '3']
+
+    @responses.activate
+    def test_fetch_page_honours_retry_after(self):
+        """Test a 429 pauses the shared rate limiter for Retry-After seconds."""
+        service = BillingoSyncService()
+        rate_limiter = BillingoRateLimiter()
+
+        responses.add(
+            responses.GET, "https://api.billingo.hu/v3/documents",
+            status=429, headers={'Retry-After': '7'}
+        )
+        responses.add(
+            responses.GET, "https://api.billingo.hu/v3/documents",
+            json={'data': [{'id': 1}], 'total': 1, 'last_page': 1}
+        )
+
+        with patch.object(rate_limiter, 'pause') as pause:
+            invoices, pagination = service._fetch_documents_page(
+                'test-key', page=1, rate_limiter=rate_limiter
+            )
+
+        pause.assert_called_once_with(7)
+        assert invoices == [{'id': 1}]
+        assert len(responses.calls) == 2
+
+    def test_rate_limiter_pause_holds_back_requests(self):
+        """Test waiting after a pause sleeps until the pause has elapsed."""
+        rate_limiter = BillingoRateLimiter()
+
+        with patch('bank_transfers.services.billingo_sync_service.time.sleep') as sleep:
+            rate_limiter.wait()
+            sleep.assert_not_called()
+
+            rate_limiter.pause(30)
+            rate_limiter.wait()
+
+        assert 29 < sleep.call_args[0][0] <= 30
+
+    @staticmethod
+    def make_invoice_data(invoice_id, item_count=2, gross_total=12700):
+        return {
+            'id': invoice_id,
+            'invoice_number': f'INV-{invoice_id}',
+            'type': 'invoice',
+            'payment_status': 'outstanding',
+            'gross_total': gross_total,
+            'currency': 'HUF',
+            'invoice_date': '2025-01-15',
+            'organization': {'name': 'Test Company Ltd.', 'tax_number': '12345678-2-42'},
+            'partner': {'id': 7, 'name': 'Partner Kft.', 'taxcode': '87654321-2-42'},
+            'items': [
+                {'name': f'Item {n}', 'quantity': 1, 'unit': 'db', 'net_unit_price': 5000,
+                 'net_amount': 5000, 'gross_amount': 6350, 'vat': '27%'}
+                for n in range(item_count)
+            ],
+            'related_documents': [{'id': 999, 'invoice_number': 'INV-999'}],
+        }
+
+    @pytest.mark.django_db
+    def test_persist_page_bulk_creates_invoices_and_children(self, company, django_assert_max_num_queries):
+        """Test a page of new invoices is written with a fixed number of queries."""
+        from bank_transfers.models import BillingoInvoice, BillingoInvoiceItem, BillingoRelatedDocument
+        service = BillingoSyncService()
+        page = [self.make_invoice_data(invoice_id) for invoice_id in range(1, 21)]
+
+        with django_assert_max_num_queries(8):
+            result = service._persist_page(company, page)
+
+        assert result == {'created': 20, 'updated': 0, 'unchanged': 0, 'items': 40, 'errors': []}
+        assert BillingoInvoice.objects.filter(company=company).count() == 20
+        assert BillingoInvoiceItem.objects.filter(invoice__company=company).count() == 40
+        assert BillingoRelatedDocument.objects.filter(invoice__company=company).count() == 20
+        assert BillingoInvoice.objects.get(id=1).content_hash == service.content_hash(page[0])
+
+    @pytest.mark.django_db
+    def test_persist_page_skips_unchanged_and_replaces_changed_children(self, company, django_assert_num_queries):
+        """Test unchanged invoices are skipped and changed ones get their children replaced."""
+        from bank_transfers.models import BillingoInvoice, BillingoInvoiceItem
+        service = BillingoSyncService()
+        service._persist_page(company, [self.make_invoice_data(1), self.make_invoice_data(2)])
+
+        with django_assert_num_queries(1):
+            result = service._persist_page(company, [self.make_invoice_data(1), self.make_invoice_data(2)])
+        assert result['unchanged'] == 2
+
+        result = service._persist_page(
+            company, [self.make_invoice_data(1), self.make_invoice_data(2, item_count=3, gross_total=19050)]
+        )
+
+        assert result == {'created': 0, 'updated': 1, 'unchanged': 1, 'items': 3, 'errors': []}
+        assert BillingoInvoice.objects.get(id=2).gross_total == Decimal('19050')
+        assert BillingoInvoiceItem.objects.filter(invoice_id=2).count() == 3
+        assert BillingoInvoiceItem.objects.filter(invoice_id=1).count() == 2
+
+    @pytest.mark.django_db
+    def test_persist_page_reports_malformed_invoice(self, company):
+        """Test a malformed invoice is reported while the rest of the page is saved."""
+        from bank_transfers.models import BillingoInvoice
+        service = BillingoSyncService()
+        broken = self.make_invoice_data(2, gross_total='not-a-number')
+
+        result = service._persist_page(company, [self.make_invoice_data(1), broken])
+
+        assert result['created'] == 1
+        assert [error['invoice_id'] for error in result['errors']] == [2]
+        assert list(BillingoInvoice.objects.values_list('id', flat=True)) == [1]
+
+
+# ============================================================================
+# Billingo Spendings Sync Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+@pytest.mark.django_db
+class TestBillingoSpendingsSync:
+    """Test cases for the incremental Billingo spendings sync."""
+
+    SPENDINGS_URL = "https://api.billingo.hu/v3/spendings"
+
+    @staticmethod
+    def make_spending_data(spending_id, total_gross=12700):
+        return {
+            'id': spending_id,
+            'organization_id': 1,
+            'category': 'service',
+            'fulfillment_date': '2025-01-10',
+            'invoice_number': f'SP-{spending_id}',
+            'total_gross': total_gross,
+            'total_gross_local': total_gross,
+            'total_vat_amount': 2700,
+            'total_vat_amount_local': 2700,
+            'invoice_date': '2025-01-10',
+            'due_date': '2025-01-18',
+            'payment_method': 'wire_transfer',
+            'partner': {'id': 3, 'name': 'Supplier Kft.', 'tax_code': '11111111-2-42'},
+        }
+
+    def add_pages(self, pages):
+        import json
+
+        def request_callback(request):
+            page = int(request.params['page'])
+            body = {'data': pages[page - 1], 'last_page': len(pages)}
+            return (200, {}, json.dumps(body))
+
+        responses.add_callback(responses.GET, self.SPENDINGS_URL, callback=request_callback)
+
+    def command(self):
+        from io import StringIO
+        from bank_transfers.management.commands.sync_billingo_spendings import Command
+        return Command(stdout=StringIO())
+
+    @responses.activate
+    def test_full_sync_upserts_and_reconciles_removed_spendings(self, company, billingo_settings):
+        """Test a full sync fetches all pages, skips unchanged rows and deletes removed ones."""
+        from bank_transfers.models import BillingoSpending
+        command = self.command()
+        command.upsert_spendings(company, [self.make_spending_data(1), self.make_spending_data(2)])
+        self.add_pages([
+            [self.make_spending_data(1), self.make_spending_data(3)],
+            [self.make_spending_data(4, total_gross=5000)],
+        ])
+
+        result = command.sync_company_spendings(company, full_sync=True)
+
+        assert result == {
+            'created': 2, 'updated': 0, 'unchanged': 1, 'deleted': 1, 'skipped': 0, 'error': None
+        }
+        assert sorted(BillingoSpending.objects.values_list('id', flat=True)) == [1, 3, 4]
+        assert sorted(call.request.params['page'] for call in responses.calls) == ['1', '2']
+
+    @responses.activate
+    def test_incremental_sync_updates_changed_and_keeps_others(self, company, billingo_settings):
+        """Test an incremental sync fetches from the high-water mark and never deletes."""
+        from bank_transfers.models import BillingoSpending
+        billingo_settings.last_billingo_spending_sync_date = date(2025, 3, 31)
+        billingo_settings.save()
+        command = self.command()
+        command.upsert_spendings(company, [self.make_spending_data(1), self.make_spending_data(2)])
+        self.add_pages([[self.make_spending_data(2, total_gross=19050)]])
+
+        result = command.sync_company_spendings(company)
+
+        assert (result['updated'], result['deleted']) == (1, 0)
+        assert responses.calls[0].request.params['start_date'] == '2025-03-01'
+        assert BillingoSpending.objects.get(id=2).total_gross == Decimal('19050')
+        assert BillingoSpending.objects.filter(company=company).count() == 2
+
+    @responses.activate
+    def test_unavailable_endpoint_does_not_reconcile(self, company, billingo_settings):
+        """Test a 404 from the spendings endpoint leaves local spendings untouched."""
+        from bank_transfers.models import BillingoSpending
+        command = self.command()
+        command.upsert_spendings(company, [self.make_spending_data(1)])
+        responses.add(responses.GET, self.SPENDINGS_URL, status=404)
+
+        result = command.sync_company_spendings(company, full_sync=True)
+
+        assert result['error'] is None
+        assert result['deleted'] == 0
+        assert BillingoSpending.objects.filter(company=company).count() == 1
+
 
 # ============================================================================
 # CredentialManager Tests
@@ -238,6 +480,1473 @@ class TestBankStatementParserService:
         # (Implementation-specific test - adjust based on actual behavior)
         assert service.company is None
 
+    @pytest.mark.django_db
+    def test_enqueue_stores_file_and_defers_processing(
+        self, company, user, revolut_csv_bytes, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        """Test that enqueue returns an UPLOADED statement and schedules the worker on commit."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+
+        settings.MEDIA_ROOT = tmp_path
+        service = BankStatementParserService(company, user)
+        uploaded = SimpleUploadedFile('revolut.csv', revolut_csv_bytes, content_type='text/csv')
+
+        with patch('bank_transfers.services.bank_statement_worker.submit_statement') as submit:
+            with django_capture_on_commit_callbacks(execute=True) as callbacks:
+                statement = service.enqueue(uploaded)
+
+        assert len(callbacks) == 1
+        submit.assert_called_once_with(statement.id)
+        assert statement.status == 'UPLOADED'
+        assert statement.bank_code == 'REVOLUT'
+        assert statement.transactions.count() == 0
+        assert (tmp_path / statement.file_path).read_bytes() == revolut_csv_bytes
+
+    @pytest.mark.django_db
+    def test_worker_processes_enqueued_statement(
+        self, company, user, revolut_csv_bytes, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        """Test the background worker drives a stored statement to PARSED with progress."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+        from bank_transfers.services.bank_statement_worker import process_statement
+
+        settings.MEDIA_ROOT = tmp_path
+        service = BankStatementParserService(company, user)
+        uploaded = SimpleUploadedFile('revolut.csv', revolut_csv_bytes, content_type='text/csv')
+
+        with django_capture_on_commit_callbacks(execute=False):
+            statement = service.enqueue(uploaded)
+
+        processed = process_statement(statement.id)
+
+        processed.refresh_from_db()
+        assert processed.status == 'PARSED'
+        assert processed.total_transactions == 2
+        assert processed.pages_total == 1
+        assert processed.pages_processed == 1
+        assert processed.parse_started_at is not None
+        assert processed.parse_completed_at is not None
+
+        # A statement that was already claimed is not processed twice
+        assert process_statement(statement.id) is None
+
+    @pytest.mark.django_db
+    def test_worker_reclaims_abandoned_statements(
+        self, company, user, revolut_csv_bytes, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        """Test statements stuck in PARSING/MATCHING are reclaimed only after the stale timeout."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.models import BankStatement
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+        from bank_transfers.services.bank_statement_worker import claimable_statements, process_statement
+
+        settings.MEDIA_ROOT = tmp_path
+        settings.BANK_STATEMENT_STALE_AFTER = 600
+        service = BankStatementParserService(company, user)
+        with django_capture_on_commit_callbacks(execute=False):
+            statement = service.enqueue(SimpleUploadedFile('revolut.csv', revolut_csv_bytes, content_type='text/csv'))
+
+        # Worker died while parsing: nothing was committed yet
+        BankStatement.objects.filter(id=statement.id).update(status='PARSING', parse_started_at=timezone.now())
+        assert process_statement(statement.id) is None
+        assert not claimable_statements().filter(id=statement.id).exists()
+
+        BankStatement.objects.filter(id=statement.id).update(
+            parse_started_at=timezone.now() - timedelta(seconds=601)
+        )
+        assert claimable_statements().filter(id=statement.id).exists()
+        assert process_statement(statement.id).status == 'PARSED'
+        assert statement.transactions.count() == 2
+
+        # Worker died while matching: the saved transactions are matched, not parsed again
+        BankStatement.objects.filter(id=statement.id).update(
+            status='MATCHING', parse_started_at=timezone.now() - timedelta(seconds=601)
+        )
+        with patch.object(BankStatementParserService, 'process_stored_statement') as reparse:
+            resumed = process_statement(statement.id)
+
+        reparse.assert_not_called()
+        assert resumed.status == 'PARSED'
+        assert statement.transactions.count() == 2
+
+    @pytest.mark.django_db
+    def test_worker_drops_run_reclaimed_while_parsing(
+        self, company, user, revolut_csv_bytes, settings, tmp_path, django_capture_on_commit_callbacks
+    ):
+        """Test a worker whose statement was reclaimed mid-parse saves nothing."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.models import BankStatement
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+        from bank_transfers.services.bank_statement_worker import process_statement
+
+        settings.MEDIA_ROOT = tmp_path
+        service = BankStatementParserService(company, user)
+        with django_capture_on_commit_callbacks(execute=False):
+            statement = service.enqueue(SimpleUploadedFile('revolut.csv', revolut_csv_bytes, content_type='text/csv'))
+
+        reclaimed_at = timezone.now() + timedelta(seconds=1)
+
+        def reclaim(service, statement, done, total):
+            # Another worker takes the statement over as stale
+            BankStatement.objects.filter(id=statement.id).update(parse_started_at=reclaimed_at)
+
+        with patch.object(BankStatementParserService, '_update_page_progress', autospec=True, side_effect=reclaim):
+            assert process_statement(statement.id) is None
+
+        statement.refresh_from_db()
+        assert statement.status == 'PARSING'
+        assert statement.parse_started_at == reclaimed_at
+        assert statement.transactions.count() == 0
+
+    @pytest.mark.django_db
+    def test_parse_and_save_statement_is_not_claimable(self, company, user, revolut_csv_bytes):
+        """Test a synchronously parsed statement is created claimed, out of the worker's reach."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+        from bank_transfers.services.bank_statement_worker import claimable_statements
+
+        states = []
+        original_parse = BankStatementParserService._parse_statement
+
+        def parse(service, statement, adapter, pdf_bytes):
+            states.append((statement.status, claimable_statements().filter(id=statement.id).exists()))
+            return original_parse(service, statement, adapter, pdf_bytes)
+
+        with patch.object(BankStatementParserService, '_parse_statement', autospec=True, side_effect=parse):
+            statement = BankStatementParserService(company, user).parse_and_save(
+                SimpleUploadedFile('revolut.csv', revolut_csv_bytes, content_type='text/csv')
+            )
+
+        assert states == [('PARSING', False)]
+        assert statement.status == 'PARSED'
+        assert statement.transactions.count() == 2
+
+    @pytest.mark.django_db
+    def test_matching_failure_keeps_transactions_with_warning(self, company, user, revolut_csv_bytes):
+        """Test a failing matcher leaves a PARSED statement with a parse warning."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+
+        service = BankStatementParserService(company, user)
+        with patch(
+            'bank_transfers.services.transaction_matching_service.TransactionMatchingService.match_statement',
+            side_effect=RuntimeError('matcher down')
+        ):
+            statement = service.parse_and_save(
+                SimpleUploadedFile('revolut.csv', revolut_csv_bytes, content_type='text/csv')
+            )
+
+        statement.refresh_from_db()
+        assert statement.status == 'PARSED'
+        assert statement.transactions.count() == 2
+        assert statement.parse_warnings == ['Automatikus párosítás sikertelen: matcher down']
+
+    @pytest.mark.django_db
+    def test_incremental_import_skips_already_imported_transactions(self, company, user):
+        """Test that an overlapping statement only imports (and matches) new rows."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+        from .conftest import build_revolut_csv
+
+        service = BankStatementParserService(company, user)
+        first = service.parse_and_save(SimpleUploadedFile('january.csv', build_revolut_csv([
+            ('tx-2', '2025-01-20', '-25000.00', 'To Test Supplier Ltd.'),
+            ('tx-1', '2025-01-10', '50000.00', 'From Test Customer Ltd.'),
+        ])))
+        second = service.parse_and_save(SimpleUploadedFile('overlap.csv', build_revolut_csv([
+            ('tx-3', '2025-02-05', '-12000.00', 'To Another Supplier Ltd.'),
+            ('tx-2', '2025-01-20', '-25000.00', 'To Test Supplier Ltd.'),
+        ])), incremental=True)
+
+        assert first.total_transactions == 2
+        assert second.status == 'PARSED'
+        assert second.incremental is True
+        assert second.total_transactions == 1
+        assert second.skipped_duplicates == 1
+        assert list(second.transactions.values_list('transaction_id', flat=True)) == ['tx-3']
+        assert second.debit_count == 1
+        assert second.total_debits == Decimal('12000.00')
+
+    @pytest.mark.django_db
+    def test_non_incremental_import_keeps_overlapping_rows(self, company, user):
+        """Test that the default mode still imports every row and stores fingerprints."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.services.bank_statement_parser_service import BankStatementParserService
+        from .conftest import build_revolut_csv
+
+        service = BankStatementParserService(company, user)
+        service.parse_and_save(SimpleUploadedFile('january.csv', build_revolut_csv([
+            ('tx-1', '2025-01-10', '50000.00', 'From Test Customer Ltd.'),
+        ])))
+        second = service.parse_and_save(SimpleUploadedFile('overlap.csv', build_revolut_csv([
+            ('tx-2', '2025-01-20', '-25000.00', 'To Test Supplier Ltd.'),
+            ('tx-1', '2025-01-10', '50000.00', 'From Test Customer Ltd.'),
+        ])))
+
+        assert second.total_transactions == 2
+        assert second.skipped_duplicates == 0
+        assert all(len(fp) == 64 for fp in second.transactions.values_list('fingerprint', flat=True))
+
+    def test_transaction_fingerprints_keep_repeated_rows_apart(self):
+        """Test identical rows in one file get distinct fingerprints, account formatting is ignored."""
+        from types import SimpleNamespace
+        from bank_transfers.services.bank_statement_parser_service import transaction_fingerprints
+
+        row = SimpleNamespace(
+            booking_date=date(2025, 1, 10), amount=Decimal('-1500'), currency='HUF',
+            transaction_id='', reference='CARD'
+        )
+
+        first, second = transaction_fingerprints('12100011-19014874', [row, row])
+        assert first != second
+        assert transaction_fingerprints('1210001119014874', [row]) == [first]
+
+
+# ============================================================================
+# PDFTransactionProcessor Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+class TestPDFTransactionProcessor:
+    """Test cases for tax/salary PDF import."""
+
+    @staticmethod
+    def _salary_pdf(name, employee, account):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from .conftest import build_text_pdf
+
+        return SimpleUploadedFile(name, build_text_pdf([
+            'TESZT Kft. (12345678-2-13)',
+            'Banki utalások 2025.01.10',
+            f'1. {employee} 8123456789 {account} 250,000',
+        ]), content_type='application/pdf')
+
+    @pytest.mark.django_db
+    def test_process_pdf_files_reads_each_pdf_once(self, company):
+        """Test company name detection and parsing share one text extraction per PDF."""
+        import pdfplumber
+        from bank_transfers.pdf_processor import PDFTransactionProcessor
+
+        pdf_files = [
+            self._salary_pdf('ber1.pdf', 'Kiss Anna', '12100011-11409520-00000000'),
+            self._salary_pdf('ber2.pdf', 'Nagy Béla', '11773016-11111018-00000000'),
+        ]
+
+        with patch('bank_transfers.pdf_processor.pdfplumber.open', wraps=pdfplumber.open) as pdf_open:
+            result = PDFTransactionProcessor().process_pdf_files(pdf_files, company=company)
+
+        assert pdf_open.call_count == 2
+        assert result['transactions_processed'] == 2
+        assert [t['beneficiary_name'] for t in result['preview']] == ['Kiss Anna', 'Nagy Béla']
+        assert result['template']['name'].startswith('TESZT Kft.')
+
+    def test_extract_pdf_texts_keeps_order(self):
+        """Test extraction returns texts in input order and isolates broken files."""
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from bank_transfers.pdf_processor import PDFTransactionProcessor
+
+        pdf_files = [
+            self._salary_pdf('ber1.pdf', 'Kiss Anna', '12100011-11409520-00000000'),
+            SimpleUploadedFile('broken.pdf', b'not a pdf', content_type='application/pdf'),
+            self._salary_pdf('ber3.pdf', 'Nagy Béla', '11773016-11111018-00000000'),
+        ]
+
+        texts = PDFTransactionProcessor().extract_pdf_texts(pdf_files)
+
+        assert 'Kiss Anna' in texts[0]
+        assert isinstance(texts[1], Exception)
+        assert 'Nagy Béla' in texts[2]
+
+    @pytest.mark.django_db
+    def test_beneficiary_matching_uses_single_query(self, company, django_assert_num_queries):
+        """Test account (2x8/3x8, any formatting) and VAT matching resolve from one lookup index."""
+        from bank_transfers.models import Beneficiary
+        from bank_transfers.pdf_processor import PDFTransactionProcessor
+
+        short_account = Beneficiary.objects.create(
+            company=company, name='Kiss Anna', account_number='12100011-11409520'
+        )
+        long_account = Beneficiary.objects.create(
+            company=company, name='Nagy Béla', account_number='117730161111101800000000'
+        )
+        vat_only = Beneficiary.objects.create(
+            company=company, name='Szabó Csaba', account_number=None, vat_number='8123456789',
+            remittance_information='munkabér'
+        )
+
+        transactions = [
+            {'beneficiary_name': 'Kiss Anna', 'account_number': '12100011-11409520-00000000',
+             'amount': 1000, 'remittance_info': 'jövedelem', 'execution_date': '2025-01-10'},
+            {'beneficiary_name': 'Nagy Béla', 'account_number': '11773016-11111018',
+             'amount': 2000, 'remittance_info': 'jövedelem', 'execution_date': '2025-01-10'},
+            {'beneficiary_name': 'Szabó Csaba', 'vat_number': '8123-456789',
+             'amount': 3000, 'remittance_info': '', 'execution_date': '2025-01-10'},
+            {'beneficiary_name': 'Új Dolgozó', 'account_number': '10700024-12345678-00000000',
+             'amount': 4000, 'remittance_info': 'jövedelem', 'execution_date': '2025-01-10'},
+        ]
+
+        processor = PDFTransactionProcessor()
+        with django_assert_num_queries(1):
+            matched, _ = processor.match_and_consolidate_beneficiaries(transactions, company)
+
+        assert [t['beneficiary_id'] for t in matched] == [short_account.id, long_account.id, vat_only.id, None]
+        assert matched[2]['remittance_info'] == 'munkabér'
+        assert matched[3]['created_beneficiary'] is True
+
+
+# ============================================================================
+# XML Export Tests
+# ============================================================================
+
+@pytest.mark.unit
+class TestXMLExport:
+    """Test cases for the HUFTransactions XML writer."""
+
+    @staticmethod
+    def _transfer(name, remittance, amount='1000', currency='HUF'):
+        from types import SimpleNamespace
+
+        return SimpleNamespace(
+            originator_account=SimpleNamespace(clean_account_number=lambda: '1177301611111018'),
+            beneficiary=SimpleNamespace(name=name, clean_account_number=lambda: '121000111140952000000000'),
+            amount=Decimal(amount),
+            currency=currency,
+            execution_date=date(2025, 1, 2),
+            remittance_info=remittance,
+        )
+
+    @staticmethod
+    def _reference_xml(transfers):
+        """Former ElementTree + minidom implementation"""
+        import xml.etree.ElementTree as ET
+        from xml.dom import minidom
+
+        root = ET.Element("HUFTransactions")
+        for transfer in transfers:
+            transaction = ET.SubElement(root, "Transaction")
+            account = ET.SubElement(ET.SubElement(transaction, "Originator"), "Account")
+            ET.SubElement(account, "AccountNumber").text = transfer.originator_account.clean_account_number()
+            beneficiary = ET.SubElement(transaction, "Beneficiary")
+            ET.SubElement(beneficiary, "Name").text = transfer.beneficiary.name
+            account = ET.SubElement(beneficiary, "Account")
+            ET.SubElement(account, "AccountNumber").text = transfer.beneficiary.clean_account_number()
+            ET.SubElement(transaction, "Amount", Currency=transfer.currency).text = f"{transfer.amount:.2f}"
+            ET.SubElement(transaction, "RequestedExecutionDate").text = transfer.execution_date.strftime("%Y-%m-%d")
+            ET.SubElement(ET.SubElement(transaction, "RemittanceInfo"), "Text").text = transfer.remittance_info
+
+        reparsed = minidom.parseString(ET.tostring(root, 'unicode'))
+        return reparsed.toprettyxml(indent="    ", encoding=None).replace(
+            '<?xml version="1.0" ?>\n',
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+        )
+
+    @pytest.mark.parametrize('transfers', [
+        [],
+        [('Test Beneficiary Ltd.', 'Számla 2025/001')],
+        [('A & B "Kft" <x>', "Díj 'x' > y"), ('', ''), ('  Ő ', '\tsor1\r\nsor2\rsor3\n')],
+    ])
+    def test_streamed_xml_matches_pretty_printed_tree(self, transfers):
+        """Test the streaming writer produces the same document as the former tree serialiser."""
+        from bank_transfers.utils import generate_xml, iter_xml
+
+        transfers = [self._transfer(name, remittance) for name, remittance in transfers]
+
+        expected = self._reference_xml(transfers)
+        assert generate_xml(transfers) == expected
+        assert ''.join(iter_xml(transfers)) == expected
+
+    def test_missing_beneficiary_account_raises(self):
+        """Test transfers to beneficiaries without account number are rejected."""
+        from bank_transfers.utils import generate_xml, validate_transfers_for_xml
+
+        transfer = self._transfer('No Account Kft.', 'x')
+        transfer.beneficiary.clean_account_number = lambda: ''
+
+        with pytest.raises(ValueError):
+            validate_transfers_for_xml([transfer])
+        with pytest.raises(ValueError):
+            generate_xml([transfer])
+
+
+# ============================================================================
+# Batch Export Artifact Tests
+# ============================================================================
+
+@pytest.mark.service
+class TestBatchExportArtifacts:
+    """Test cases for stored, content-addressed batch exports."""
+
+    @pytest.mark.django_db
+    def test_artifact_reused_until_transfer_changes(self, company, transfer, settings, tmp_path):
+        """Test an unchanged batch reuses its artifact and an edited transfer creates a new one."""
+        from django.core.files.storage import default_storage
+        from bank_transfers.models import TransferBatch
+        from bank_transfers.services.transfer_service import TransferBatchService
+        from bank_transfers.utils import generate_xml
+
+        settings.MEDIA_ROOT = tmp_path
+        batch = TransferBatch.objects.create(company=company, name='Artifact batch')
+        batch.transfers.add(transfer)
+
+        artifact = TransferBatchService.get_export_artifact(batch)
+        assert TransferBatchService.get_export_artifact(batch).pk == artifact.pk
+        with default_storage.open(artifact.file_path, 'rb') as stored:
+            assert stored.read().decode('utf-8') == generate_xml([transfer])
+
+        transfer.remittance_info = 'Módosított közlemény'
+        transfer.save()
+        updated = TransferBatchService.get_export_artifact(batch)
+
+        assert updated.pk != artifact.pk
+        assert updated.content_key != artifact.content_key
+        # The earlier file is kept as an audit copy
+        assert default_storage.exists(artifact.file_path)
+        assert batch.export_artifacts.count() == 2
+
+    @pytest.mark.django_db
+    def test_batch_creation_stores_generated_file(self, company, transfer, settings, tmp_path):
+        """Test the content returned when a batch is created is stored as its artifact."""
+        from django.core.files.storage import default_storage
+        from bank_transfers.models import TransferBatch
+        from bank_transfers.services.transfer_service import TransferService, TransferBatchService
+
+        settings.MEDIA_ROOT = tmp_path
+        result = TransferService.generate_xml_from_transfers([transfer.id], batch_name='Audit batch')
+
+        batch = TransferBatch.objects.get(id=result['batch']['id'])
+        artifact = batch.export_artifacts.get()
+        with default_storage.open(artifact.file_path, 'rb') as stored:
+            assert stored.read().decode('utf-8') == result['xml']
+        assert TransferBatchService.get_export_artifact(batch).pk == artifact.pk
+
+
+# ============================================================================
+# KH Bank Export Tests
+# ============================================================================
+
+@pytest.mark.service
+class TestKHChunkedExport:
+    """Test cases for splitting KH Bank exports above the 40 transfer limit."""
+
+    @pytest.mark.unit
+    def test_partition_keeps_execution_date_groups(self):
+        """Test chunks stay within the limit and only split date groups larger than it."""
+        from types import SimpleNamespace
+        from bank_transfers.kh_export import KHBankExporter
+
+        dates = [date(2025, 1, 1)] * 30 + [date(2025, 1, 2)] * 15 + [date(2025, 1, 3)] * 85
+        transfers = [SimpleNamespace(id=i, execution_date=d) for i, d in enumerate(dates)]
+
+        chunks = KHBankExporter().partition_transfers(transfers)
+
+        assert [len(chunk) for chunk in chunks] == [30, 15, 40, 40, 5]
+        assert [t.id for chunk in chunks for t in chunk] == list(range(len(transfers)))
+
+    @pytest.mark.django_db
+    def test_zip_export_records_batch_per_chunk(self, company, bank_account, beneficiary, settings, tmp_path):
+        """Test a large export is returned as a ZIP with one KH_CSV batch per file."""
+        import io
+        import zipfile
+        from bank_transfers.models import Transfer, TransferBatch
+        from bank_transfers.services.transfer_service import TransferService
+
+        settings.MEDIA_ROOT = tmp_path
+        transfers = [
+            Transfer.objects.create(
+                originator_account=bank_account,
+                beneficiary=beneficiary,
+                amount=Decimal('1000.00'),
+                currency='HUF',
+                execution_date=date(2025, 3, 1),
+                remittance_info=f'Bér {i}',
+                order=i
+            )
+            for i in range(45)
+        ]
+
+        result = TransferService.generate_kh_export_zip(company, [t.id for t in transfers], batch_name='Bérek március')
+
+        archive = zipfile.ZipFile(io.BytesIO(result['content']))
+        assert len(archive.namelist()) == 2
+        batches = TransferBatch.objects.filter(id__in=[b['id'] for b in result['batches']]).order_by('order')
+        assert [b.transfers.count() for b in batches] == [40, 5]
+        assert all(b.batch_format == 'KH_CSV' for b in batches)
+        for batch in batches:
+            rows = archive.read(batch.filename).decode('iso-8859-2').splitlines()
+            assert len(rows) == batch.transfers.count() + 1  # header row
+        assert not Transfer.objects.filter(id__in=[t.id for t in transfers], is_processed=False).exists()
+
+    @pytest.mark.django_db
+    def test_zip_export_validation_error_creates_no_batches(self, company, bank_account, beneficiary, settings, tmp_path):
+        """Test an invalid transfer aborts the export before any batch is saved."""
+        from bank_transfers.models import Transfer, TransferBatch
+        from bank_transfers.services.transfer_service import TransferService
+
+        settings.MEDIA_ROOT = tmp_path
+        transfer = Transfer.objects.create(
+            originator_account=bank_account,
+            beneficiary=beneficiary,
+            amount=Decimal('10.00'),
+            currency='EUR',
+            execution_date=date(2025, 3, 1),
+            remittance_info='EUR payment'
+        )
+
+        with pytest.raises(ValueError):
+            TransferService.generate_kh_export_zip(company, [transfer.id])
+        assert not TransferBatch.objects.exists()
+
+    @pytest.mark.django_db
+    def test_zip_export_ignores_other_company_transfers(self, transfer, settings, tmp_path):
+        """Test transfer ids of another company are not exported."""
+        from bank_transfers.models import Company, TransferBatch
+        from bank_transfers.services.transfer_service import TransferService
+
+        settings.MEDIA_ROOT = tmp_path
+        other_company = Company.objects.create(name='Other Company Ltd.', tax_id='87654321-1-42')
+
+        with pytest.raises(ValueError, match='No transfers found'):
+            TransferService.generate_kh_export_zip(other_company, [transfer.id])
+        assert not TransferBatch.objects.exists()
+        transfer.refresh_from_db()
+        assert not transfer.is_processed
+
+    @pytest.mark.django_db
+    def test_zip_export_failure_removes_stored_files(self, company, transfer, settings, tmp_path):
+        """Test a rolled back export leaves no artifact files behind."""
+        import zipfile
+        from bank_transfers.models import TransferBatch
+        from bank_transfers.services.transfer_service import TransferService
+
+        settings.MEDIA_ROOT = tmp_path
+        with patch.object(zipfile.ZipFile, 'writestr', side_effect=OSError('disk full')):
+            with pytest.raises(OSError):
+                TransferService.generate_kh_export_zip(company, [transfer.id])
+
+        assert not TransferBatch.objects.exists()
+        assert not [path for path in tmp_path.rglob('*') if path.is_file()]
+
+
+# ============================================================================
+# Transfer Service Tests
+# ============================================================================
+
+@pytest.mark.service
+class TestTransferBulkCreate:
+    """Test cases for TransferService.bulk_create_transfers."""
+
+    @staticmethod
+    def _transfer_data(bank_account, beneficiary, count, nav_invoice=None):
+        return [
+            {
+                'originator_account': bank_account,
+                'beneficiary': beneficiary,
+                'amount': Decimal('1000.00'),
+                'currency': 'HUF',
+                'execution_date': date(2025, 3, 1),
+                'remittance_info': f'Payment {i}',
+                'nav_invoice': nav_invoice if i == 0 else None,
+                'order': i + 1,
+            }
+            for i in range(count)
+        ]
+
+    @pytest.mark.django_db
+    def test_creates_transfers_batch_and_prepares_invoices(self, bank_account, beneficiary, nav_invoice):
+        """Test transfers, batch membership and PREPARED invoice status are saved."""
+        from bank_transfers.services.transfer_service import TransferService
+
+        transfers, batch = TransferService.bulk_create_transfers(
+            self._transfer_data(bank_account, beneficiary, 3, nav_invoice), batch_name='Bulk batch'
+        )
+
+        assert all(t.pk for t in transfers)
+        assert set(batch.transfers.values_list('id', flat=True)) == {t.id for t in transfers}
+        assert batch.company_id == bank_account.company_id
+        assert batch.total_amount == Decimal('3000.00')
+        nav_invoice.refresh_from_db()
+        assert nav_invoice.payment_status == 'PREPARED'
+        assert nav_invoice.payment_status_date == timezone.now().date()
+
+    @pytest.mark.django_db
+    def test_query_count_does_not_grow_with_transfers(self, bank_account, beneficiary, nav_invoice):
+        """Test a large bulk create needs no more queries than a small one."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from bank_transfers.services.transfer_service import TransferService
+
+        with CaptureQueriesContext(connection) as small:
+            TransferService.bulk_create_transfers(
+                self._transfer_data(bank_account, beneficiary, 2, nav_invoice), batch_name='Small'
+            )
+        with CaptureQueriesContext(connection) as large:
+            TransferService.bulk_create_transfers(
+                self._transfer_data(bank_account, beneficiary, 50, nav_invoice), batch_name='Large'
+            )
+
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+
+# ============================================================================
+# FeatureChecker Tests
+# ============================================================================
+
+@pytest.mark.service
+class TestFeatureChecker:
+    """Test cases for cached per-company feature snapshots."""
+
+    @staticmethod
+    def _feature(company, code, is_enabled, is_system_critical=False):
+        from bank_transfers.models import CompanyFeature, FeatureTemplate
+
+        template = FeatureTemplate.objects.create(
+            feature_code=code, display_name=code, is_system_critical=is_system_critical
+        )
+        if is_enabled is not None:
+            return CompanyFeature.objects.create(company=company, feature_template=template, is_enabled=is_enabled)
+        return None
+
+    @pytest.mark.django_db
+    def test_snapshot_semantics(self, company):
+        """Test explicit flags, implicit system critical features and unknown codes."""
+        from bank_transfers.permissions import FeatureChecker
+
+        self._feature(company, 'ENABLED_FEATURE', True)
+        self._feature(company, 'DISABLED_FEATURE', False)
+        self._feature(company, 'CRITICAL_DEFAULT', None, is_system_critical=True)
+        self._feature(company, 'CRITICAL_DISABLED', False, is_system_critical=True)
+
+        assert FeatureChecker.is_feature_enabled(company, 'ENABLED_FEATURE')
+        assert not FeatureChecker.is_feature_enabled(company, 'DISABLED_FEATURE')
+        assert FeatureChecker.is_feature_enabled(company, 'CRITICAL_DEFAULT')
+        assert not FeatureChecker.is_feature_enabled(company, 'CRITICAL_DISABLED')
+        assert not FeatureChecker.is_feature_enabled(company, 'UNKNOWN_FEATURE')
+        assert FeatureChecker.get_enabled_features_for_company(company) == ['ENABLED_FEATURE']
+
+    @pytest.mark.django_db
+    def test_snapshot_cached_and_invalidated_on_save(self, company, django_assert_num_queries):
+        """Test checks are served from cache until a CompanyFeature changes."""
+        from bank_transfers.models import Company
+        from bank_transfers.permissions import FeatureChecker
+
+        feature = self._feature(company, 'CACHED_FEATURE', True)
+        assert FeatureChecker.is_feature_enabled(Company.objects.get(pk=company.pk), 'CACHED_FEATURE')
+
+        fresh_company = Company.objects.get(pk=company.pk)
+        with django_assert_num_queries(0):
+            assert FeatureChecker.is_feature_enabled(fresh_company, 'CACHED_FEATURE')
+            assert not FeatureChecker.is_feature_enabled(fresh_company, 'OTHER_FEATURE')
+
+        feature.is_enabled = False
+        feature.save()
+        assert not FeatureChecker.is_feature_enabled(Company.objects.get(pk=company.pk), 'CACHED_FEATURE')
+
+        feature.delete()
+        self._feature(company, 'NEW_FEATURE', True)
+        assert FeatureChecker.get_enabled_features_for_company(
+            Company.objects.get(pk=company.pk)
+        ) == ['NEW_FEATURE']
+
+
+# ============================================================================
+# Company Context Tests
+# ============================================================================
+
+@pytest.mark.service
+class TestCompanyContextResolver:
+    """Test cases for resolving request.company and the user's membership."""
+
+    @staticmethod
+    def _request(user, company_id=None):
+        from django.test import RequestFactory
+
+        headers = {'HTTP_X_COMPANY_ID': str(company_id)} if company_id else {}
+        request = RequestFactory().get('/', **headers)
+        request.user = user
+        return request
+
+    @pytest.mark.django_db
+    def test_header_resolved_in_one_query_then_cached(self, user, company, company_user, django_assert_num_queries):
+        """Test the membership is loaded once and reused until it changes."""
+        from bank_transfers.permissions import CompanyContextResolver, IsCompanyAdmin
+
+        request = self._request(user, company.id)
+        with django_assert_num_queries(1):
+            context = CompanyContextResolver.resolve(request)
+            assert IsCompanyAdmin().has_permission(request, None)
+        assert request.company == company
+        assert context.role == 'ADMIN'
+
+        with django_assert_num_queries(0):
+            assert CompanyContextResolver.resolve(self._request(user, company.id)).role == 'ADMIN'
+
+        company_user.role = 'USER'
+        company_user.save()
+        assert CompanyContextResolver.resolve(self._request(user, company.id)).role == 'USER'
+
+    @pytest.mark.django_db
+    def test_fallback_to_last_active_then_first_membership(self, user, company, company_user):
+        """Test an unknown header falls back to the profile's company, then the first membership."""
+        from bank_transfers.models import Company, CompanyUser, UserProfile
+        from bank_transfers.permissions import CompanyContextResolver
+
+        other = Company.objects.create(name='Another Company Ltd.', tax_id='87654321-2-42')
+        CompanyUser.objects.create(company=other, user=user, role='USER')
+        foreign = Company.objects.create(name='Foreign Company Ltd.', tax_id='11111111-1-11')
+
+        # No profile yet: first membership by company name, remembered on the profile
+        context = CompanyContextResolver.resolve(self._request(user, foreign.id))
+        assert context.company == other
+        assert UserProfile.objects.get(user=user).last_active_company == other
+
+        UserProfile.objects.filter(user=user).update(last_active_company=company)
+        CompanyContextResolver.invalidate_user(user.id)
+        assert CompanyContextResolver.resolve(self._request(user)).company == company
+
+
+# ============================================================================
+# Cache Helper Tests
+# ============================================================================
+
+@pytest.mark.unit
+class TestCachingHelpers:
+    """Test cases for the cache-aside helpers."""
+
+    def test_company_namespaces_are_isolated_and_invalidated(self):
+        """Test values are computed once per company and recomputed after invalidation."""
+        from bank_transfers import caching
+
+        calls = []
+
+        def compute(company_id):
+            def _compute():
+                calls.append(company_id)
+                return {'company': company_id, 'call': len(calls)}
+            return _compute
+
+        assert caching.cached_for_company(1, caching.INVOICE_STATS, compute(1))['company'] == 1
+        assert caching.cached_for_company(2, caching.INVOICE_STATS, compute(2))['company'] == 2
+        assert caching.cached_for_company(1, caching.INVOICE_STATS, compute(1))['call'] == 1
+        assert calls == [1, 2]
+
+        caching.invalidate_company_namespace(1, caching.INVOICE_STATS)
+        assert caching.cached_for_company(1, caching.INVOICE_STATS, compute(1))['call'] == 3
+        assert caching.cached_for_company(2, caching.INVOICE_STATS, compute(2))['call'] == 2
+
+    def test_global_namespace_caches_falsy_values(self):
+        """Test empty results are cached too and keyed by the extra parts."""
+        from bank_transfers import caching
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {}
+
+        assert caching.cached(caching.EXCHANGE_RATES, compute, 'latest') == {}
+        assert caching.cached(caching.EXCHANGE_RATES, compute, 'latest') == {}
+        caching.cached(caching.EXCHANGE_RATES, compute, 'current', '2025-01-01')
+        assert len(calls) == 2
+
+        caching.invalidate_namespace(caching.EXCHANGE_RATES)
+        caching.cached(caching.EXCHANGE_RATES, compute, 'latest')
+        assert len(calls) == 3
+
+
+# ============================================================================
+# InvoiceStatisticsService Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+class TestInvoiceStatisticsService:
+    """Test cases for grouped and materialised invoice statistics."""
+
+    @staticmethod
+    def _create_invoice(company, number, **overrides):
+        from django.utils import timezone
+        from bank_transfers.models import Invoice
+
+        data = {
+            'company': company,
+            'nav_invoice_number': number,
+            'invoice_direction': 'INBOUND',
+            'supplier_name': 'Test Supplier Ltd.',
+            'customer_name': 'Test Company Ltd.',
+            'issue_date': date.today(),
+            'invoice_gross_amount': Decimal('1000.00'),
+            'invoice_net_amount': Decimal('800.00'),
+            'invoice_vat_amount': Decimal('200.00'),
+            'currency_code': 'HUF',
+            'original_request_version': '3.0',
+            'last_modified_date': timezone.now(),
+            'payment_status': 'UNPAID',
+        }
+        data.update(overrides)
+        return Invoice.objects.create(**data)
+
+    @pytest.mark.django_db
+    def test_stats_use_single_query(self, company):
+        """Test all statistics come from one grouped query."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from bank_transfers.services.invoice_statistics_service import InvoiceStatisticsService
+
+        self._create_invoice(company, 'INV-1')
+        self._create_invoice(company, 'INV-2', invoice_direction='OUTBOUND', currency_code='EUR',
+                             invoice_gross_amount=Decimal('50.00'))
+        self._create_invoice(company, 'INV-3', payment_status='PAID')
+
+        with CaptureQueriesContext(connection) as queries:
+            stats = InvoiceStatisticsService.get_company_stats(company)
+
+        assert len(queries.captured_queries) == 1
+        assert stats['total_count'] == 3
+        assert stats['inbound_count'] == 2
+        assert stats['outbound_count'] == 1
+        assert stats['total_gross_amount'] == Decimal('2050.00')
+        assert stats['currencies'] == ['EUR', 'HUF']
+        assert stats['payment_status_counts']['UNPAID'] == 2
+        assert stats['payment_status_counts']['PAID'] == 1
+        assert stats['recent_sync_date'] is not None
+
+    @pytest.mark.django_db
+    def test_materialized_buckets_follow_invoice_changes(self, company, settings):
+        """Test the maintained buckets match a full recount after create, update and delete."""
+        from bank_transfers.models import Invoice, InvoiceStatistics
+        from bank_transfers.services.invoice_statistics_service import InvoiceStatisticsService
+
+        settings.INVOICE_STATS_MATERIALIZED = True
+
+        first = self._create_invoice(company, 'INV-1')
+        self._create_invoice(company, 'INV-2', invoice_gross_amount=Decimal('250.00'))
+        eur = self._create_invoice(company, 'INV-3', currency_code='EUR')
+
+        invoice = Invoice.objects.get(id=first.id)
+        invoice.payment_status = 'PAID'
+        invoice.save()
+        eur.delete()
+
+        materialized = InvoiceStatisticsService.get_company_stats(company)
+        settings.INVOICE_STATS_MATERIALIZED = False
+        assert materialized == InvoiceStatisticsService.get_company_stats(company)
+        assert materialized['total_count'] == 2
+        assert materialized['payment_status_counts']['PAID'] == 1
+        assert materialized['currencies'] == ['HUF']
+        assert InvoiceStatistics.objects.get(
+            company=company, currency_code='EUR', payment_status='UNPAID'
+        ).invoice_count == 0
+
+    @pytest.mark.django_db
+    def test_save_without_loaded_state_applies_deltas(self, company, settings):
+        """Test saving a deferred or hand-built invoice moves its bucket without a full recount."""
+        from bank_transfers.models import Invoice
+        from bank_transfers.services.invoice_statistics_service import InvoiceStatisticsService
+
+        settings.INVOICE_STATS_MATERIALIZED = True
+        first = self._create_invoice(company, 'INV-1')
+        second = self._create_invoice(company, 'INV-2', invoice_gross_amount=Decimal('250.00'))
+
+        with patch.object(InvoiceStatisticsService, 'rebuild', side_effect=AssertionError('full recount')):
+            deferred = Invoice.objects.only('id', 'payment_status').get(id=first.id)
+            deferred.payment_status = 'PAID'
+            deferred.save(update_fields=['payment_status'])
+
+            rebuilt = Invoice.objects.get(id=second.id)
+            rebuilt._statistics_state = None
+            rebuilt.currency_code = 'EUR'
+            rebuilt.save()
+
+        materialized = InvoiceStatisticsService.get_company_stats(company)
+        settings.INVOICE_STATS_MATERIALIZED = False
+        assert materialized == InvoiceStatisticsService.get_company_stats(company)
+        assert materialized['payment_status_counts']['PAID'] == 1
+        assert materialized['currencies'] == ['EUR', 'HUF']
+
+    @pytest.mark.django_db
+    def test_bulk_transfer_creation_moves_invoices_to_prepared(self, company, bank_account, beneficiary,
+                                                               nav_invoice, settings):
+        """Test the bulk PREPARED update keeps the buckets in sync."""
+        from bank_transfers.models import InvoiceStatistics
+        from bank_transfers.services.invoice_statistics_service import InvoiceStatisticsService
+        from bank_transfers.services.transfer_service import TransferService
+
+        settings.INVOICE_STATS_MATERIALIZED = True
+        InvoiceStatisticsService.rebuild(company)
+
+        TransferService.bulk_create_transfers([{
+            'originator_account': bank_account,
+            'beneficiary': beneficiary,
+            'amount': Decimal('121000.00'),
+            'currency': 'HUF',
+            'execution_date': date(2025, 3, 1),
+            'remittance_info': 'TESZT-2025-001',
+            'nav_invoice': nav_invoice,
+        }])
+
+        buckets = {
+            row.payment_status: row
+            for row in InvoiceStatistics.objects.filter(company=company)
+        }
+        assert buckets['UNPAID'].invoice_count == 0
+        assert buckets['PREPARED'].invoice_count == 1
+        assert buckets['PREPARED'].gross_amount == Decimal('121000.00')
+
+
+# ============================================================================
+# ExchangeRateTable Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+class TestExchangeRateTable:
+    """Test cases for the in-process exchange rate table."""
+
+    @pytest.mark.django_db
+    def test_as_of_lookups_and_bulk_conversion(self, django_assert_num_queries):
+        """Test bisect lookups fall back to earlier rates and bulk conversion loads each currency once."""
+        from bank_transfers.models import ExchangeRate
+        from bank_transfers.services.exchange_rate_sync_service import ExchangeRateSyncService
+
+        ExchangeRate.objects.create(rate_date=date(2025, 1, 2), currency='EUR', rate=Decimal('410'))
+        ExchangeRate.objects.create(rate_date=date(2025, 1, 6), currency='EUR', rate=Decimal('412'))
+        ExchangeRate.objects.create(rate_date=date(2025, 1, 2), currency='USD', rate=Decimal('395'))
+
+        items = [
+            (Decimal('10'), 'EUR', date(2025, 1, 4)),
+            (Decimal('10'), 'EUR', date(2025, 1, 6)),
+            (Decimal('10'), 'USD', date(2025, 1, 1)),
+            (Decimal('10'), 'HUF', date(2025, 1, 1)),
+        ] * 50
+
+        with django_assert_num_queries(2):
+            converted = ExchangeRateSyncService.convert_many_to_huf(items)
+        with django_assert_num_queries(0):
+            assert ExchangeRateSyncService.get_rate_for_date(date(2025, 1, 5), 'EUR') == Decimal('410')
+            assert ExchangeRateSyncService.get_rate_for_date(
+                date(2025, 1, 5), 'EUR', fallback_to_latest=False
+            ) is None
+
+        assert converted[:4] == [Decimal('4100'), Decimal('4120'), None, Decimal('10')]
+
+    @pytest.mark.django_db
+    def test_reloads_after_sync_log_completes(self):
+        """Test rates written in bulk are visible once the sync log is closed."""
+        from django.utils import timezone
+        from bank_transfers.models import ExchangeRate, ExchangeRateSyncLog
+        from bank_transfers.services.exchange_rate_table import rate_table
+
+        assert rate_table.lookup('EUR', date(2025, 1, 2)) is None
+
+        sync_log = ExchangeRateSyncLog.objects.create(
+            sync_start_time=timezone.now(),
+            currencies_synced='EUR',
+            date_range_start=date(2025, 1, 2),
+            date_range_end=date(2025, 1, 2),
+        )
+        ExchangeRate.objects.bulk_create([
+            ExchangeRate(rate_date=date(2025, 1, 2), currency='EUR', rate=Decimal('410'))
+        ])
+        assert rate_table.lookup('EUR', date(2025, 1, 2)) is None
+
+        sync_log.sync_status = 'SUCCESS'
+        sync_log.save()
+
+        assert rate_table.lookup('EUR', date(2025, 1, 2)) == (date(2025, 1, 2), Decimal('410'))
+
+    @pytest.mark.django_db
+    def test_series_loaded_during_invalidation_is_not_kept(self):
+        """Test a series read before an invalidation is not served after it."""
+        from bank_transfers import caching
+        from bank_transfers.models import ExchangeRate
+        from bank_transfers.services.exchange_rate_table import ExchangeRateTable
+
+        table = ExchangeRateTable()
+        original_filter = ExchangeRate.objects.filter
+
+        def filter_then_write(*args, **kwargs):
+            rows = list(original_filter(*args, **kwargs))
+            # A sync completes while the rows are being read
+            ExchangeRate.objects.create(rate_date=date(2025, 1, 2), currency='EUR', rate=Decimal('410'))
+            caching.invalidate_namespace(caching.EXCHANGE_RATES)
+            # and another thread's lookup picks up the new version
+            table._check_version()
+            return original_filter(pk__in=[row.pk for row in rows])
+
+        with patch.object(ExchangeRate.objects, 'filter', side_effect=filter_then_write):
+            assert table.lookup('EUR', date(2025, 1, 2)) is None
+
+        assert table.lookup('EUR', date(2025, 1, 2)) == (date(2025, 1, 2), Decimal('410'))
+
+
+# ============================================================================
+# ExchangeRateSyncService Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+class TestExchangeRateSyncService:
+    """Test cases for MNB rate persistence."""
+
+    @pytest.mark.django_db
+    def test_sync_upserts_in_bulk_with_accurate_counts(self):
+        """Test the MNB sync inserts new rates, rewrites only changed ones and logs the counts."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from bank_transfers.models import ExchangeRate
+        from bank_transfers.services.exchange_rate_sync_service import ExchangeRateSyncService
+
+        ExchangeRate.objects.create(rate_date=date(2025, 1, 2), currency='EUR', rate=Decimal('410.5'))
+        ExchangeRate.objects.create(rate_date=date(2025, 1, 2), currency='USD', rate=Decimal('390'))
+
+        rates_data = {
+            (date(2025, 1, 2) + timedelta(days=i)).isoformat(): {
+                'EUR': Decimal('410.50') if i == 0 else Decimal('411') + i,
+                'USD': Decimal('395') + i,
+            }
+            for i in range(30)
+        }
+        service = ExchangeRateSyncService()
+        service.client = Mock()
+        dates = sorted(rates_data)
+        service.client.iter_exchange_rate_windows.return_value = iter([
+            {day: rates_data[day] for day in dates[15:]},
+            {day: rates_data[day] for day in dates[:15]},
+        ])
+
+        with CaptureQueriesContext(connection) as queries:
+            sync_log = service.sync_rates_for_date_range(date(2025, 1, 2), date(2025, 1, 31), ['EUR', 'USD'])
+
+        assert sync_log.sync_status == 'SUCCESS'
+        assert sync_log.rates_created == 58
+        assert sync_log.rates_updated == 1  # USD on 01-02; EUR 410.5 is unchanged
+        assert ExchangeRate.objects.get(rate_date=date(2025, 1, 2), currency='USD').rate == Decimal('395')
+        assert len(queries.captured_queries) < 15
+
+
+# ============================================================================
+# MNBClient Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+class TestMNBClient:
+    """Test cases for the windowed MNB historical rate fetch."""
+
+    @staticmethod
+    def _soap_response(request):
+        """GetExchangeRates envelope with one EUR rate per requested day"""
+        import re
+        from xml.sax.saxutils import escape
+
+        body = request.body.decode('utf-8')
+        start = date.fromisoformat(re.search(r'<web:startDate>(.*?)<', body).group(1))
+        end = date.fromisoformat(re.search(r'<web:endDate>(.*?)<', body).group(1))
+        days = ''.join(
+            f'<Day date="{start + timedelta(days=i)}"><Rate unit="100" curr="EUR">41050,00</Rate></Day>'
+            for i in range((end - start).days + 1)
+        )
+        result = escape(f'<MNBExchangeRates>{days}</MNBExchangeRates>')
+        return (200, {}, (
+            '<?xml version="1.0" encoding="utf-8"?>'
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+            '<GetExchangeRatesResponse xmlns="http://www.mnb.hu/webservices/">'
+            f'<GetExchangeRatesResult>{result}</GetExchangeRatesResult>'
+            '</GetExchangeRatesResponse></soap:Body></soap:Envelope>'
+        ))
+
+    def test_split_date_range_by_calendar_windows(self):
+        """Test ranges are split on year and month boundaries."""
+        from bank_transfers.services.mnb_client import MNBClient
+
+        assert MNBClient.split_date_range(date(2023, 11, 15), date(2025, 2, 10), 'year') == [
+            (date(2023, 11, 15), date(2023, 12, 31)),
+            (date(2024, 1, 1), date(2024, 12, 31)),
+            (date(2025, 1, 1), date(2025, 2, 10)),
+        ]
+        assert MNBClient.split_date_range(date(2024, 12, 20), date(2025, 1, 5), 'month') == [
+            (date(2024, 12, 20), date(2024, 12, 31)),
+            (date(2025, 1, 1), date(2025, 1, 5)),
+        ]
+        assert MNBClient.split_date_range(date(2025, 1, 2), date(2025, 1, 1)) == []
+
+    @responses.activate
+    def test_windows_are_fetched_concurrently_with_retries(self):
+        """Test every window is requested, a failing window is retried and rates are merged."""
+        from bank_transfers.services.mnb_client import MNBClient
+
+        responses.add(responses.POST, MNBClient.SOAP_URL, status=503)
+        responses.add_callback(responses.POST, MNBClient.SOAP_URL, callback=self._soap_response)
+
+        client = MNBClient()
+        client.RETRY_BACKOFF = 0
+        rates = client.get_exchange_rates(date(2024, 11, 30), date(2025, 1, 2), ['EUR'])
+
+        assert len(rates) == 34
+        assert rates['2024-12-31'] == {'EUR': Decimal('410.5')}
+        # Two windows plus one retried attempt
+        assert len(responses.calls) == 3
+
+
+# ============================================================================
+# BaseTableImportService Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+@pytest.mark.django_db
+class TestBaseTableImportService:
+    """Test cases for the chunked base table CSV importer."""
+
+    SUPPLIERS_CSV = (
+        "Partner neve,Category,Type,Valid_from,Valid_to\n"
+        "Alpha Kft.,Irodaszer,Anyag,2024-01-01,\n"
+        "Beta Zrt.,Szolgáltatás,Díj,,\n"
+        "Gamma Bt.,Irodaszer,Díj,not-a-date,\n"
+        ",Irodaszer,Anyag,,\n"
+    )
+
+    def write_csv(self, tmp_path, content, name='base.csv'):
+        path = tmp_path / name
+        path.write_text(content, encoding='utf-8')
+        return path
+
+    def test_import_suppliers_resolves_categories_and_types(self, company, tmp_path):
+        """Test suppliers are upserted with categories/types created once per name."""
+        from bank_transfers.models import Supplier, SupplierCategory, SupplierType
+        from bank_transfers.services.base_table_import_service import BaseTableImportService
+        SupplierCategory.objects.create(company=company, name='Irodaszer', display_order=5)
+        path = self.write_csv(tmp_path, self.SUPPLIERS_CSV)
+
+        result = BaseTableImportService(company, 'suppliers', chunk_size=2).import_csv(path)
+
+        assert (result['created'], result['skipped'], result['chunks']) == (3, 1, 2)
+        assert (result['categories_created'], result['types_created']) == (1, 2)
+        assert result['warnings'] == [
+            (4, 'Invalid valid_from date format: not-a-date'), (5, 'Empty partner name, skipping')
+        ]
+        alpha = Supplier.objects.get(company=company, partner_name='Alpha Kft.')
+        assert alpha.category.name == 'Irodaszer'
+        assert alpha.type.name == 'Anyag'
+        assert alpha.valid_from == date(2024, 1, 1)
+        assert SupplierCategory.objects.get(company=company, name='Szolgáltatás').display_order == 1
+        assert list(
+            SupplierType.objects.filter(company=company).order_by('display_order').values_list('name', flat=True)
+        ) == ['Anyag', 'Díj']
+
+        rerun = BaseTableImportService(company, 'suppliers').import_csv(path)
+        assert (rerun['created'], rerun['updated'], rerun['unchanged']) == (0, 0, 3)
+
+    def test_import_prices_in_bulk(self, company, tmp_path, django_assert_max_num_queries):
+        """Test a price list is written with a fixed number of queries per chunk."""
+        from bank_transfers.models import ProductPrice
+        from bank_transfers.services.base_table_import_service import BaseTableImportService
+        rows = ''.join(
+            f'P{n},Product {n},EA,,$1234.50,"1 234,50 Ft",,,,y,2024/06/30,\n' for n in range(300)
+        )
+        path = self.write_csv(
+            tmp_path,
+            'Product Value,Product Description,UOM,UOM_HUN, PURCHASE PRICE USD , PURCHASE PRICE HUF ,'
+            ' MARKUP, SALES PRICE HUF,Cap/Disp,Készletkezelt termék,Valid from,Valid to\n' + rows
+        )
+
+        with django_assert_max_num_queries(20):
+            result = BaseTableImportService(company, 'prices', chunk_size=100).import_csv(path)
+
+        assert (result['rows'], result['created'], result['chunks']) == (300, 300, 3)
+        assert result['rows_per_second'] > 0
+        price = ProductPrice.objects.get(company=company, product_value='P7')
+        assert price.purchase_price_usd == Decimal('1234.50')
+        assert price.purchase_price_huf == Decimal('1234.50')
+        assert price.uom_hun == ''
+        assert price.is_inventory_managed is True
+        assert price.valid_from == date(2024, 6, 30)
+
+    def test_failed_chunk_is_retried_per_row(self, company, tmp_path):
+        """Test a chunk the database rejects is written row by row, reporting the bad row."""
+        from bank_transfers.models import ProductPrice
+        from bank_transfers.services.base_table_import_service import BaseTableImportService
+        path = self.write_csv(
+            tmp_path,
+            'Product Value,Product Description, PURCHASE PRICE USD ,Valid from,Valid to\n'
+            'P1,Product 1,$10.00,2024/06/30,\n'
+            'P2,Product 2,$123456789012345678.00,,\n'  # over max_digits=15
+            'P3,Product 3,$30.00,30.06.2024,tomorrow\n'
+        )
+
+        result = BaseTableImportService(company, 'prices').import_csv(path)
+
+        assert (result['created'], result['skipped'], result['chunks']) == (2, 1, 1)
+        assert result['warnings'][:2] == [
+            (4, 'Invalid valid_from date format: 30.06.2024'), (4, 'Invalid valid_to date format: tomorrow')
+        ]
+        assert result['warnings'][2][0] == 3
+        assert result['warnings'][2][1].startswith('Error - ')
+        assert set(ProductPrice.objects.filter(company=company).values_list('product_value', flat=True)) == {
+            'P1', 'P3'
+        }
+
+    def test_dry_run_reports_diff_without_writing(self, company, tmp_path):
+        """Test a dry run returns created/changed records and leaves the database unchanged."""
+        from bank_transfers.models import Customer
+        from bank_transfers.services.base_table_import_service import BaseTableImportService
+        Customer.objects.create(company=company, customer_name='Vevő Kft.', cashflow_adjustment=0)
+        path = self.write_csv(
+            tmp_path,
+            "Customer name,Cashflow adjustment,Validf_from,Valid_to\n"
+            "Vevő Kft.,15,,\n"
+            "Új Vevő Zrt.,0,2024/01/01,\n"
+        )
+
+        result = BaseTableImportService(company, 'customers', dry_run=True).import_csv(path)
+
+        assert (result['created'], result['updated']) == (1, 1)
+        assert result['diff'][0] == {
+            'action': 'update', 'key': 'Vevő Kft.', 'changes': {'cashflow_adjustment': (0, 15)}
+        }
+        assert result['diff'][1]['action'] == 'create'
+        assert Customer.objects.filter(company=company).count() == 1
+        assert Customer.objects.get(company=company).cashflow_adjustment == 0
+
+
+# ============================================================================
+# ValidityIndex Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+@pytest.mark.django_db
+class TestValidityIndex:
+    """Test cases for the base table validity index."""
+
+    def test_as_of_lookup_and_refresh_on_write(self, company, django_assert_num_queries):
+        """Test bisect lookups pick the period containing the date and reload after a save."""
+        from bank_transfers.models import Supplier, SupplierCategory
+        from bank_transfers.services.validity_index import validity_index
+
+        category = SupplierCategory.objects.create(company=company, name='Irodaszer')
+        first = Supplier.objects.create(
+            company=company, partner_name='Kovács Kft.', category=category,
+            valid_from=date(2024, 1, 1), valid_to=date(2024, 12, 31)
+        )
+        second = Supplier.objects.create(
+            company=company, partner_name='Kovács Kft.', valid_from=date(2025, 1, 1)
+        )
+
+        assert validity_index.lookup(company.id, 'suppliers', 'kovacs  KFT.', date(2024, 6, 1)) == first
+        with django_assert_num_queries(0):
+            assert validity_index.lookup(company.id, 'suppliers', 'Kovács Kft.', date(2025, 3, 1)) == second
+            assert validity_index.lookup(company.id, 'suppliers', 'Kovács Kft.', date(2023, 6, 1)) is None
+            assert validity_index.lookup(company.id, 'suppliers', 'Ismeretlen Bt.', date(2025, 3, 1)) is None
+            assert validity_index.lookup(
+                company.id, 'suppliers', 'Kovács Kft.', date(2024, 6, 1)
+            ).category.name == 'Irodaszer'
+
+        second.valid_from = date(2025, 6, 1)
+        second.save()
+        assert validity_index.lookup(company.id, 'suppliers', 'Kovács Kft.', date(2025, 3, 1)) is None
+
+    def test_overlapping_periods_fall_back_to_the_enclosing_record(self, company):
+        """Test a short period nested in a long one does not hide the long one after it ends."""
+        from bank_transfers.models import ProductPrice
+        from bank_transfers.services.validity_index import validity_index
+
+        long_period = ProductPrice.objects.create(
+            company=company, product_value='CM-100', product_description='Éves ár',
+            valid_from=date(2024, 1, 1), valid_to=date(2025, 12, 31)
+        )
+        promotion = ProductPrice.objects.create(
+            company=company, product_value='CM-100', product_description='Akció',
+            valid_from=date(2024, 6, 1), valid_to=date(2024, 6, 30)
+        )
+
+        assert validity_index.lookup(company.id, 'prices', 'CM-100', date(2024, 6, 15)) == promotion
+        assert validity_index.lookup(company.id, 'prices', 'CM-100', date(2024, 8, 1)) == long_period
+        assert validity_index.lookup(company.id, 'prices', 'CM-100', date(2026, 1, 1)) is None
+
+    def test_csv_import_refreshes_index(self, company):
+        """Test records written in bulk by the importer are visible to lookups."""
+        from bank_transfers.services.base_table_import_service import BaseTableImportService
+        from bank_transfers.services.validity_index import validity_index
+
+        assert validity_index.lookup(company.id, 'prices', 'CM-100', date(2025, 3, 1)) is None
+
+        BaseTableImportService(company, 'prices').import_rows([
+            (2, {'Product Value': 'CM-100', 'Product Description': 'Teszt termék', 'Valid from': '2025/01/01'}),
+        ])
+
+        assert validity_index.lookup(company.id, 'prices', 'cm-100', date(2025, 3, 1)).product_value == 'CM-100'
+
+    def test_serializers_use_annotated_validity(self, company):
+        """Test list querysets carry is_valid and updates do not return the stale annotation."""
+        from bank_transfers.models import Customer
+        from bank_transfers.serializers import CustomerSerializer
+        from bank_transfers.services.validity_index import annotate_validity
+
+        today = date.today()
+        Customer.objects.create(company=company, customer_name='Aktív Kft.')
+        Customer.objects.create(
+            company=company, customer_name='Lejárt Kft.',
+            valid_from=today - timedelta(days=60), valid_to=today - timedelta(days=30)
+        )
+
+        customers = list(annotate_validity(Customer.objects.filter(company=company)).order_by('customer_name'))
+        with patch.object(Customer, 'is_valid', side_effect=AssertionError('computed per object')):
+            data = CustomerSerializer(customers, many=True).data
+        assert [row['is_valid'] for row in data] == [True, False]
+
+        serializer = CustomerSerializer(customers[1], data={'valid_to': None}, partial=True)
+        assert serializer.is_valid()
+        serializer.save()
+        assert serializer.data['is_valid'] is True
+
+
+# ============================================================================
+# ExcelImportService Tests
+# ============================================================================
+
+@pytest.mark.unit
+@pytest.mark.service
+@pytest.mark.django_db
+class TestExcelImportService:
+    """Test cases for the streaming Excel beneficiary import."""
+
+    @staticmethod
+    def make_workbook(rows):
+        import io
+        import openpyxl
+
+        workbook = openpyxl.Workbook()
+        worksheet = workbook.active
+        worksheet['A1'] = 'Kedvezményezettek'
+        # Data starts at row 3
+        for row_num, row in enumerate(rows, start=3):
+            for column, value in enumerate(row, start=1):
+                worksheet.cell(row=row_num, column=column, value=value)
+        excel_file = io.BytesIO()
+        workbook.save(excel_file)
+        excel_file.seek(0)
+        return excel_file
+
+    def test_import_skips_header_known_and_duplicate_rows(self, company, beneficiary):
+        """Test the import bulk-creates only new (name, account number) pairs."""
+        from bank_transfers.models import Beneficiary
+        from bank_transfers.services.excel_import_service import ExcelImportService
+        excel_file = self.make_workbook([
+            ['Megjegyzés', 'Név', 'Számlaszám', 'Összeg', 'Dátum', 'Közlemény'],
+            ['', beneficiary.name, beneficiary.account_number, 1000, None, ''],
+            ['Bérlet', 'Új Partner Kft.', '1177301611111018', 5000, None, 'Számla 1'],
+            ['', 'Új Partner Kft.', '11773016-11111018', 5000, None, ''],
+            ['', 'Hibás Kft.', '123', 100, None, ''],
+            ['', 'Csak név', None, None, None, None],
+        ])
+
+        result = ExcelImportService.import_beneficiaries_from_excel(excel_file, company)
+
+        assert result['imported_count'] == 1
+        created = result['beneficiaries'][0]
+        assert created.pk is not None
+        assert (created.name, created.account_number) == ('Új Partner Kft.', '11773016-11111018')
+        assert (created.description, created.remittance_information) == ('Bérlet', 'Számla 1')
+        assert [error.split(':')[0] for error in result['errors']] == ['Row 7', 'Row 8']
+        assert Beneficiary.objects.filter(company=company).count() == 2
+
+    def test_import_uses_bounded_queries(self, company, django_assert_max_num_queries):
+        """Test a large sheet is written in bulk batches, not per row."""
+        from bank_transfers.models import Beneficiary
+        from bank_transfers.services.excel_import_service import ExcelImportService
+        excel_file = self.make_workbook([
+            ['', f'Partner {n}', f'11773016{n:08d}', 100, None, ''] for n in range(1200)
+        ])
+
+        # 3 bulk batches, each in a savepoint; SQLite further splits each INSERT by its variable limit
+        with django_assert_max_num_queries(26):
+            result = ExcelImportService.import_beneficiaries_from_excel(excel_file, company)
+
+        assert result['imported_count'] == 1200
+        assert Beneficiary.objects.filter(company=company).count() == 1200
+
+    def test_import_reports_overlong_row_only(self, company):
+        """Test a row over the field lengths is reported without failing its batch."""
+        from bank_transfers.models import Beneficiary
+        from bank_transfers.services.excel_import_service import ExcelImportService
+        excel_file = self.make_workbook([
+            ['', 'Első Kft.', '1177301611111018', 100, None, ''],
+            ['x' * 250, 'Hosszú Kft.', '1177301622222018', 100, None, ''],
+            ['', 'Harmadik Kft.', '1177301633333018', 100, None, ''],
+        ])
+
+        result = ExcelImportService.import_beneficiaries_from_excel(excel_file, company)
+
+        assert result['imported_count'] == 2
+        assert len(result['errors']) == 1
+        assert result['errors'][0].startswith('Row 4: description:')
+        assert set(Beneficiary.objects.filter(company=company).values_list('name', flat=True)) == {
+            'Első Kft.', 'Harmadik Kft.'
+        }
+
+    def test_rejected_batch_is_retried_per_row(self, company):
+        """Test a batch the database rejects falls back to per-row inserts."""
+        from django.db import DatabaseError
+        from bank_transfers.models import Beneficiary
+        from bank_transfers.services.excel_import_service import ExcelImportService
+        excel_file = self.make_workbook([
+            ['', 'Első Kft.', '1177301611111018', 100, None, ''],
+            ['', 'Második Kft.', '1177301622222018', 100, None, ''],
+        ])
+
+        with patch.object(Beneficiary.objects, 'bulk_create', side_effect=DatabaseError('value too long')):
+            result = ExcelImportService.import_beneficiaries_from_excel(excel_file, company)
+
+        assert result['imported_count'] == 2
+        assert result['errors'] == []
+        assert all(beneficiary.pk for beneficiary in result['beneficiaries'])
+        assert Beneficiary.objects.filter(company=company).count() == 2
+
+    def test_validate_rejects_short_file(self):
+        """Test validation accepts a loaded workbook and rejects files under 3 rows."""
+        import io
+        import openpyxl
+        from bank_transfers.services.excel_import_service import ExcelImportService
+        workbook = openpyxl.Workbook()
+        workbook.active.append(['only one row'])
+        excel_file = io.BytesIO()
+        workbook.save(excel_file)
+        excel_file.seek(0)
+
+        with pytest.raises(ValueError, match='at least 3 rows'):
+            ExcelImportService.validate_excel_file(ExcelImportService.load_workbook(excel_file))
+
+        # The import itself keeps returning an empty result for such files
+        excel_file.seek(0)
+        assert ExcelImportService.import_beneficiaries_from_excel(excel_file, None)['imported_count'] == 0
+
+    def test_understated_dimension_is_ignored(self, company):
+        """Test a file whose <dimension> tag claims A1 is validated and imported by its actual rows."""
+        import io
+        import zipfile
+        from bank_transfers.services.excel_import_service import ExcelImportService
+        excel_file = self.make_workbook([['', 'Partner', '11773016-11111018', 100, None, '']])
+
+        patched = io.BytesIO()
+        with zipfile.ZipFile(excel_file) as source, zipfile.ZipFile(patched, 'w') as target:
+            for item in source.infolist():
+                data = source.read(item.filename)
+                if item.filename == 'xl/worksheets/sheet1.xml':
+                    data = data.replace(b'<dimension ref="A1:F3" />', b'<dimension ref="A1" />')
+                target.writestr(item, data)
+        patched.seek(0)
+
+        workbook = ExcelImportService.load_workbook(patched)
+        assert workbook.active.max_row == 1
+        assert ExcelImportService.validate_excel_file(workbook) is True
+
+        patched.seek(0)
+        assert ExcelImportService.import_beneficiaries_from_excel(patched, company)['imported_count'] == 1
+
 
 # ============================================================================
 # TransactionMatchingService Tests (Placeholder)
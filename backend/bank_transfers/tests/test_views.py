@@ -191,6 +191,108 @@ class TestNAVInvoiceAPI:
             else:
                 assert invoice['payment_status'] == 'UNPAID'
 
+    def test_stats_cached_until_invoice_changes(self, authenticated_client, nav_invoice, django_assert_num_queries):
+        """Test invoice stats are served from cache and refreshed when an invoice is saved."""
+        first = authenticated_client.get('/api/nav/invoices/stats/')
+        assert first.status_code == status.HTTP_200_OK
+        assert first.data['total_count'] == 1
+
+        # Only authentication queries remain once stats and permissions are cached
+        with django_assert_num_queries(1):
+            assert authenticated_client.get('/api/nav/invoices/stats/').data == first.data
+
+        nav_invoice.pk = None
+        nav_invoice.nav_invoice_number = 'TESZT-2025-002'
+        nav_invoice.save()
+
+        assert authenticated_client.get('/api/nav/invoices/stats/').data['total_count'] == 2
+
+    def test_cursor_pagination_walks_issue_date_keyset(self, authenticated_client, nav_invoice):
+        """Test cursor mode pages by (issue_date, id) without a COUNT query."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from bank_transfers.models import Invoice
+
+        for i in range(4):
+            nav_invoice.pk = None
+            nav_invoice.nav_invoice_number = f'TESZT-CURSOR-{i}'
+            nav_invoice.issue_date = date(2025, 1, 1) + timedelta(days=i // 2)  # shared dates
+            nav_invoice.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = authenticated_client.get('/api/nav/invoices/?pagination=cursor&page_size=2')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert 'count' not in response.data
+        assert response.data['previous'] is None
+        assert not any('COUNT(' in query['sql'] for query in queries.captured_queries)
+
+        seen = [row['id'] for row in response.data['results']]
+        while response.data['next']:
+            response = authenticated_client.get(response.data['next'])
+            seen.extend(row['id'] for row in response.data['results'])
+
+        expected = list(
+            Invoice.objects.filter(company=nav_invoice.company)
+            .order_by('-issue_date', '-id').values_list('id', flat=True)
+        )
+        assert seen == expected
+
+        # Last page holds one invoice; its previous page is the two before it
+        previous = authenticated_client.get(response.data['previous'])
+        assert [row['id'] for row in previous.data['results']] == expected[-3:-1]
+
+    def test_invalid_cursor_returns_404(self, authenticated_client, nav_invoice):
+        """Test a tampered cursor is rejected."""
+        response = authenticated_client.get('/api/nav/invoices/?cursor=not-a-cursor')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_invalid_cursor_returns_404_on_empty_result(self, authenticated_client, company):
+        """Test a tampered cursor is rejected even when no invoice matches."""
+        response = authenticated_client.get('/api/nav/invoices/?cursor=not-a-cursor')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_out_of_range_page_of_empty_result_is_empty(self, authenticated_client, company, django_assert_max_num_queries):
+        """Test a page past an empty result returns an empty list without counting again."""
+        authenticated_client.get('/api/nav/invoices/')  # warm the permission cache
+
+        with django_assert_max_num_queries(2):
+            response = authenticated_client.get('/api/nav/invoices/?page=3')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['count'] == 0
+        assert response.data['results'] == []
+
+    def test_cursor_pagination_rejects_other_ordering(self, authenticated_client, nav_invoice):
+        """Test cursor mode refuses an ordering it cannot page by."""
+        response = authenticated_client.get('/api/nav/invoices/?pagination=cursor&ordering=supplier_name')
+        descending = authenticated_client.get('/api/nav/invoices/?pagination=cursor&ordering=-issue_date')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'ordering' in response.data
+        assert descending.status_code == status.HTTP_200_OK
+
+    def test_search_is_accent_insensitive(self, authenticated_client, nav_invoice):
+        """Test search matches folded names and number prefixes, short terms included."""
+        nav_invoice.supplier_name = 'Kovács és Társa Kft.'
+        nav_invoice.save()
+
+        by_name = authenticated_client.get('/api/nav/invoices/?search=KOVACS es')
+        by_short_number = authenticated_client.get('/api/nav/invoices/?search=12')
+        by_short_name = authenticated_client.get('/api/nav/invoices/?search=Tá')
+        by_number_prefix = authenticated_client.get('/api/nav/invoices/?search=teszt-2025')
+        by_tax_prefix = authenticated_client.get('/api/nav/invoices/?search=87654321-2')
+        no_match = authenticated_client.get('/api/nav/invoices/?search=kovacs kft')
+
+        assert [row['id'] for row in by_name.data['results']] == [nav_invoice.id]
+        assert [row['id'] for row in by_short_number.data['results']] == [nav_invoice.id]
+        assert [row['id'] for row in by_short_name.data['results']] == [nav_invoice.id]
+        assert [row['id'] for row in by_number_prefix.data['results']] == [nav_invoice.id]
+        assert [row['id'] for row in by_tax_prefix.data['results']] == [nav_invoice.id]
+        assert no_match.data['results'] == []
+
 
 # ============================================================================
 # Bank Statement API Tests
@@ -216,6 +318,157 @@ class TestBankStatementAPI:
         assert response.data['id'] == bank_statement.id
         assert 'transactions' in response.data
 
+    def test_upload_async_accepts_multiple_files(
+        self, authenticated_client, revolut_csv_bytes, settings, tmp_path
+    ):
+        """Test async upload queues each file and reports duplicates per file."""
+        from unittest.mock import patch
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        settings.MEDIA_ROOT = tmp_path
+        files = [
+            SimpleUploadedFile('first.csv', revolut_csv_bytes, content_type='text/csv'),
+            SimpleUploadedFile('same_again.csv', revolut_csv_bytes, content_type='text/csv'),
+        ]
+
+        with patch('bank_transfers.services.bank_statement_worker.submit_statement'):
+            response = authenticated_client.post(
+                '/api/bank-statements/upload_async/', {'files': files}, format='multipart'
+            )
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert len(response.data['statements']) == 1
+        assert response.data['statements'][0]['status'] == 'UPLOADED'
+        assert response.data['errors'][0]['file_name'] == 'same_again.csv'
+
+    def test_progress_endpoint(self, authenticated_client, bank_statement):
+        """Test progress endpoint exposes processing counters."""
+        response = authenticated_client.get(f'/api/bank-statements/{bank_statement.id}/progress/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'PARSED'
+        assert response.data['is_finished'] is True
+        assert response.data['total_transactions'] == bank_statement.total_transactions
+        assert 'pages_processed' in response.data
+
+    def test_detail_query_count_does_not_grow_with_transactions(
+        self, authenticated_client, bank_statement, nav_invoice, transfer
+    ):
+        """Test statement detail loads the nested transactions in a fixed number of queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        create_matched_transactions(bank_statement, nav_invoice, transfer, 2)
+        authenticated_client.get(f'/api/bank-statements/{bank_statement.id}/')  # warm permission caches
+        with CaptureQueriesContext(connection) as small:
+            authenticated_client.get(f'/api/bank-statements/{bank_statement.id}/')
+
+        create_matched_transactions(bank_statement, nav_invoice, transfer, 10)
+        with CaptureQueriesContext(connection) as large:
+            response = authenticated_client.get(f'/api/bank-statements/{bank_statement.id}/')
+
+        assert len(response.data['transactions']) == 12
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+
+def create_matched_transactions(bank_statement, invoice, transfer, count):
+    """Create transactions using every relation BankTransactionSerializer renders."""
+    from bank_transfers.models import (
+        BankTransaction, BankTransactionInvoiceMatch, OtherCost, TransferBatch
+    )
+
+    if not transfer.transferbatch_set.exists():
+        TransferBatch.objects.create(company=bank_statement.company, name='Matched batch').transfers.add(transfer)
+
+    transactions = []
+    for i in range(count):
+        transaction = BankTransaction.objects.create(
+            company=bank_statement.company,
+            bank_statement=bank_statement,
+            transaction_type='TRANSFER',
+            booking_date=date(2025, 1, 15),
+            value_date=date(2025, 1, 15),
+            amount=Decimal('-121000.00'),
+            currency='HUF',
+            description=f'Matched payment {i}',
+            matched_invoice=invoice,
+            matched_transfer=transfer,
+        )
+        BankTransactionInvoiceMatch.objects.create(transaction=transaction, invoice=invoice)
+        OtherCost.objects.create(
+            company=bank_statement.company,
+            bank_transaction=transaction,
+            category='BANK_FEE',
+            amount=Decimal('100.00'),
+            date=date(2025, 1, 15),
+            description='Fee',
+        )
+        transactions.append(transaction)
+    return transactions
+
+
+# ============================================================================
+# Bank Transaction API Tests
+# ============================================================================
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestBankTransactionAPI:
+    """Test cases for Bank Transaction API endpoints."""
+
+    def test_list_query_count_does_not_grow_with_rows(
+        self, authenticated_client, bank_statement, nav_invoice, transfer
+    ):
+        """Test the list endpoint serializes every relation without per-row queries."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        create_matched_transactions(bank_statement, nav_invoice, transfer, 2)
+        authenticated_client.get('/api/bank-transactions/')  # warm permission caches
+        with CaptureQueriesContext(connection) as small:
+            authenticated_client.get('/api/bank-transactions/')
+
+        create_matched_transactions(bank_statement, nav_invoice, transfer, 10)
+        with CaptureQueriesContext(connection) as large:
+            response = authenticated_client.get('/api/bank-transactions/')
+
+        assert response.status_code == status.HTTP_200_OK
+        row = response.data['results'][0]
+        assert row['matched_invoices_details'][0]['id'] == nav_invoice.id
+        assert row['is_batch_match'] is False
+        assert row['total_matched_amount'] == '121000.00'
+        assert row['matched_transfer_batch'] == transfer.transferbatch_set.get().id
+        assert row['has_other_cost'] is True
+        assert row['other_cost_detail']['category'] == 'BANK_FEE'
+        assert len(large.captured_queries) == len(small.captured_queries)
+
+    def test_retrieve_query_count(self, authenticated_client, bank_statement, nav_invoice, transfer,
+                                  django_assert_max_num_queries):
+        """Test a single transaction is serialized without lazy relation queries."""
+        transaction = create_matched_transactions(bank_statement, nav_invoice, transfer, 1)[0]
+        authenticated_client.get(f'/api/bank-transactions/{transaction.id}/')  # warm permission caches
+
+        # Authentication, transaction (joined relations), invoice matches, transfer, batches
+        with django_assert_max_num_queries(5):
+            response = authenticated_client.get(f'/api/bank-transactions/{transaction.id}/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['statement_details']['id'] == bank_statement.id
+        assert response.data['matched_invoice_details']['id'] == nav_invoice.id
+
+    def test_cursor_pagination_ascending(self, authenticated_client, bank_statement, nav_invoice, transfer):
+        """Test ?ordering=booking_date pages the (booking_date, id) keyset ascending."""
+        transactions = create_matched_transactions(bank_statement, nav_invoice, transfer, 3)
+        transactions[0].booking_date = date(2025, 1, 20)
+        transactions[0].save()
+
+        first = authenticated_client.get('/api/bank-transactions/?pagination=cursor&ordering=booking_date&page_size=2')
+        second = authenticated_client.get(first.data['next'])
+
+        assert [row['id'] for row in first.data['results']] == [transactions[1].id, transactions[2].id]
+        assert [row['id'] for row in second.data['results']] == [transactions[0].id]
+        assert second.data['next'] is None
+
 
 # ============================================================================
 # Transfer API Tests
@@ -251,6 +504,107 @@ class TestTransferAPI:
         ]
 
 
+    def test_download_xml_streams_batch(self, authenticated_client, company, transfer, settings, tmp_path):
+        """Test batch XML download is streamed and matches generate_xml output."""
+        from bank_transfers.models import TransferBatch
+        from bank_transfers.utils import generate_xml
+
+        settings.MEDIA_ROOT = tmp_path
+        batch = TransferBatch.objects.create(company=company, name='Streaming batch')
+        batch.transfers.add(transfer)
+
+        response = authenticated_client.get(f'/api/batches/{batch.id}/download_xml/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.streaming
+        assert response['Content-Type'] == 'application/xml'
+        content = b''.join(response.streaming_content).decode('utf-8')
+        assert content == generate_xml([transfer])
+        transfer.refresh_from_db()
+        assert transfer.is_processed
+
+    def test_download_xml_reuses_stored_artifact(self, authenticated_client, company, transfer, settings, tmp_path):
+        """Test repeat downloads of an unchanged batch are served from one stored file."""
+        from bank_transfers.models import TransferBatch
+
+        settings.MEDIA_ROOT = tmp_path
+        batch = TransferBatch.objects.create(company=company, name='Cached batch', batch_format='KH_CSV')
+        batch.transfers.add(transfer)
+
+        first = authenticated_client.get(f'/api/batches/{batch.id}/download_xml/')
+        first_content = b''.join(first.streaming_content)
+        second = authenticated_client.get(f'/api/batches/{batch.id}/download_xml/')
+
+        assert first.status_code == status.HTTP_200_OK
+        assert first['Content-Type'] == 'text/csv; charset=iso-8859-2'
+        assert b''.join(second.streaming_content) == first_content
+        assert batch.export_artifacts.count() == 1
+
+    def test_download_xml_empty_batch_returns_404(self, authenticated_client, company):
+        """Test an empty batch is reported before streaming starts."""
+        from bank_transfers.models import TransferBatch
+
+        batch = TransferBatch.objects.create(company=company, name='Empty batch')
+
+        response = authenticated_client.get(f'/api/batches/{batch.id}/download_xml/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+# ============================================================================
+# Base Tables API Tests
+# ============================================================================
+
+@pytest.mark.api
+@pytest.mark.django_db
+class TestBaseTablesAPI:
+    """Test cases for the base table endpoints."""
+
+    @pytest.fixture
+    def base_tables_client(self, authenticated_client, company):
+        from bank_transfers.models import CompanyFeature, FeatureTemplate
+
+        template, _ = FeatureTemplate.objects.get_or_create(
+            feature_code='BASE_TABLES',
+            defaults={'display_name': 'Base Tables', 'description': 'Test feature: BASE_TABLES'}
+        )
+        CompanyFeature.objects.get_or_create(company=company, feature_template=template, defaults={'is_enabled': True})
+        return authenticated_client
+
+    def test_as_of_returns_record_valid_on_date(self, base_tables_client, company):
+        """Test the as-of endpoint resolves a partner name and date to one record."""
+        from bank_transfers.models import Supplier
+
+        old = Supplier.objects.create(
+            company=company, partner_name='Kovács Kft.', valid_from=date(2024, 1, 1), valid_to=date(2024, 12, 31)
+        )
+        Supplier.objects.create(company=company, partner_name='Kovács Kft.', valid_from=date(2025, 1, 1))
+
+        found = base_tables_client.get('/api/suppliers/as-of/?partner_name=kovacs kft.&date=2024-05-01')
+        missing = base_tables_client.get('/api/suppliers/as-of/?partner_name=Kovács Kft.&date=2023-05-01')
+        invalid = base_tables_client.get('/api/suppliers/as-of/?partner_name=Kovács Kft.&date=2024.05.01')
+
+        assert found.status_code == status.HTTP_200_OK
+        assert found.data['id'] == old.id
+        assert found.data['is_valid'] is False
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
+        assert invalid.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_list_is_valid_is_annotated(self, base_tables_client, company):
+        """Test list rows carry is_valid from the database annotation."""
+        from bank_transfers.models import Customer
+
+        Customer.objects.create(company=company, customer_name='Aktív Kft.')
+        Customer.objects.create(
+            company=company, customer_name='Lejárt Kft.', valid_to=date.today() - timedelta(days=1)
+        )
+
+        response = base_tables_client.get('/api/customers/?valid_only=false&ordering=customer_name')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [row['is_valid'] for row in response.data['results']] == [True, False]
+
+
 # ============================================================================
 # Health Check Tests
 # ============================================================================
@@ -1,48 +1,97 @@
-import xml.etree.ElementTree as ET
-from xml.dom import minidom
 from django.utils import timezone
 
-def generate_xml(transfers):
-    """Generate XML for bank transfers"""
-    root = ET.Element("HUFTransactions")
-    
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+XML_INDENT = "    "
+
+
+def _xml_text(value):
+    """
+    Escape text/attribute data exactly like the former minidom pretty-printer.
+
+    minidom escapes &, <, " and >; line breaks are normalised to \\n as they were
+    by the XML parser during the ElementTree -> minidom round trip.
+    """
+    value = str(value).replace("\r\n", "\n").replace("\r", "\n")
+    return (
+        value.replace("&", "&amp;")
+        .replace("<", "&lt;")
+        .replace("\"", "&quot;")
+        .replace(">", "&gt;")
+    )
+
+
+def _xml_element(depth, tag, text, attributes=""):
+    """Single pretty-printed leaf element line (empty text gives <Tag/>)"""
+    indent = XML_INDENT * depth
+    if not text:
+        return f"{indent}<{tag}{attributes}/>\n"
+    return f"{indent}<{tag}{attributes}>{_xml_text(text)}</{tag}>\n"
+
+
+def validate_transfers_for_xml(transfers):
+    """Raise ValueError if a transfer cannot be exported (beneficiary without account)"""
     for transfer in transfers:
-        transaction = ET.SubElement(root, "Transaction")
-        
+        if not transfer.beneficiary.clean_account_number():
+            raise ValueError(f"Beneficiary '{transfer.beneficiary.name}' has no account number. Please add an account number before generating XML.")
+
+
+def iter_xml(transfers):
+    """
+    Stream the HUFTransactions XML for bank transfers.
+
+    Yields the pretty-printed document one transaction at a time, so large batches
+    can be sent with a StreamingHttpResponse without building the document in
+    memory. Output is byte-for-byte identical to generate_xml().
+    """
+    transfers = iter(transfers)
+    first_transfer = next(transfers, None)
+    if first_transfer is None:
+        yield XML_HEADER + "<HUFTransactions/>\n"
+        return
+
+    yield XML_HEADER + "<HUFTransactions>\n"
+
+    yield _xml_transaction(first_transfer)
+    for transfer in transfers:
+        yield _xml_transaction(transfer)
+
+    yield "</HUFTransactions>\n"
+
+
+def _xml_transaction(transfer):
+    """Pretty-printed <Transaction> block for one transfer"""
+    clean_account = transfer.beneficiary.clean_account_number()
+    if not clean_account:
+        raise ValueError(f"Beneficiary '{transfer.beneficiary.name}' has no account number. Please add an account number before generating XML.")
+
+    currency = f' Currency="{_xml_text(transfer.currency)}"'
+    return "".join([
+        f"{XML_INDENT}<Transaction>\n",
         # Originator
-        originator = ET.SubElement(transaction, "Originator")
-        orig_account = ET.SubElement(originator, "Account")
-        orig_account_num = ET.SubElement(orig_account, "AccountNumber")
-        orig_account_num.text = transfer.originator_account.clean_account_number()
-        
+        f"{XML_INDENT * 2}<Originator>\n",
+        f"{XML_INDENT * 3}<Account>\n",
+        _xml_element(4, "AccountNumber", transfer.originator_account.clean_account_number()),
+        f"{XML_INDENT * 3}</Account>\n",
+        f"{XML_INDENT * 2}</Originator>\n",
         # Beneficiary
-        beneficiary = ET.SubElement(transaction, "Beneficiary")
-        name = ET.SubElement(beneficiary, "Name")
-        name.text = transfer.beneficiary.name
-        ben_account = ET.SubElement(beneficiary, "Account")
-        ben_account_num = ET.SubElement(ben_account, "AccountNumber")
-        clean_account = transfer.beneficiary.clean_account_number()
-        if not clean_account:
-            raise ValueError(f"Beneficiary '{transfer.beneficiary.name}' has no account number. Please add an account number before generating XML.")
-        ben_account_num.text = clean_account
-        
+        f"{XML_INDENT * 2}<Beneficiary>\n",
+        _xml_element(3, "Name", transfer.beneficiary.name),
+        f"{XML_INDENT * 3}<Account>\n",
+        _xml_element(4, "AccountNumber", clean_account),
+        f"{XML_INDENT * 3}</Account>\n",
+        f"{XML_INDENT * 2}</Beneficiary>\n",
         # Amount
-        amount = ET.SubElement(transaction, "Amount", Currency=transfer.currency)
-        amount.text = f"{transfer.amount:.2f}"
-        
+        _xml_element(2, "Amount", f"{transfer.amount:.2f}", currency),
         # Execution Date
-        exec_date = ET.SubElement(transaction, "RequestedExecutionDate")
-        exec_date.text = transfer.execution_date.strftime("%Y-%m-%d")
-        
+        _xml_element(2, "RequestedExecutionDate", transfer.execution_date.strftime("%Y-%m-%d")),
         # Remittance Info
-        remittance = ET.SubElement(transaction, "RemittanceInfo")
-        text = ET.SubElement(remittance, "Text")
-        text.text = transfer.remittance_info
-    
-    # Pretty format
-    rough_string = ET.tostring(root, 'unicode')
-    reparsed = minidom.parseString(rough_string)
-    return reparsed.toprettyxml(indent="    ", encoding=None).replace(
-        '<?xml version="1.0" ?>\n', 
-        '<?xml version="1.0" encoding="UTF-8"?>\n'
-    )
+        f"{XML_INDENT * 2}<RemittanceInfo>\n",
+        _xml_element(3, "Text", transfer.remittance_info),
+        f"{XML_INDENT * 2}</RemittanceInfo>\n",
+        f"{XML_INDENT}</Transaction>\n",
+    ])
+
+
+def generate_xml(transfers):
+    """Generate XML for bank transfers"""
+    return "".join(iter_xml(transfers))
@@ -19,6 +19,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models
+from django.db.models import Prefetch, prefetch_related_objects
 from django.utils import timezone
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
@@ -33,11 +34,14 @@ from ..models import (
 )
 from ..serializers import (
     BankStatementListSerializer, BankStatementDetailSerializer,
-    BankStatementUploadSerializer, BankTransactionSerializer,
+    BankStatementUploadSerializer, BankStatementAsyncUploadSerializer,
+    BankStatementProgressSerializer, BankTransactionSerializer,
     OtherCostSerializer, SupportedBanksSerializer
 )
 from ..permissions import IsCompanyMember, RequireBankStatementImport
+from ..caching import SUPPORTED_BANKS, cached
 from ..filters import BankTransactionFilterSet
+from ..pagination import KeysetPagination
 
 
 class BankStatementViewSet(viewsets.ModelViewSet):
@@ -48,6 +52,8 @@ class BankStatementViewSet(viewsets.ModelViewSet):
     - GET /api/bank-statements/ - Kivonatok listázása
     - GET /api/bank-statements/{id}/ - Kivonat részletei tranzakciókkal
     - POST /api/bank-statements/upload/ - PDF feltöltés
+    - POST /api/bank-statements/upload_async/ - Több fájl feltöltése háttérfeldolgozással
+    - GET /api/bank-statements/{id}/progress/ - Háttérfeldolgozás állapota
     - GET /api/bank-statements/supported_banks/ - Támogatott bankok listája
     - DELETE /api/bank-statements/{id}/ - Kivonat törlése
 
@@ -70,10 +76,12 @@ class BankStatementViewSet(viewsets.ModelViewSet):
 
         queryset = BankStatement.objects.filter(company=company).select_related(
             'uploaded_by'
-        ).prefetch_related(
-            'transactions'
         )
 
+        # Only the detail view serializes the transactions
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related(self._transactions_prefetch())
+
         # Filter by status
         status = self.request.query_params.get('status')
         if status:
@@ -94,12 +102,24 @@ class BankStatementViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @staticmethod
+    def _transactions_prefetch():
+        """Prefetch for the nested transactions of BankStatementDetailSerializer"""
+        return Prefetch(
+            'transactions',
+            queryset=BankTransactionSerializer.setup_eager_loading(BankTransaction.objects.all())
+        )
+
     def get_serializer_class(self):
         """Use different serializers for list vs detail"""
         if self.action == 'retrieve':
             return BankStatementDetailSerializer
         elif self.action == 'upload':
             return BankStatementUploadSerializer
+        elif self.action == 'upload_async':
+            return BankStatementAsyncUploadSerializer
+        elif self.action == 'progress':
+            return BankStatementProgressSerializer
         return BankStatementListSerializer
 
     @swagger_auto_schema(
@@ -120,6 +140,9 @@ class BankStatementViewSet(viewsets.ModelViewSet):
         - Feldolgozza a PDF-et
         - Létrehozza a tranzakciókat
         - Ellenőrzi a duplikációt
+
+        incremental=true esetén átfedő kivonatból csak a még nem importált
+        tranzakciók jönnek létre (és csak ezek kerülnek párosításra).
         """
         from ..services.bank_statement_parser_service import BankStatementParserService
 
@@ -139,9 +162,13 @@ class BankStatementViewSet(viewsets.ModelViewSet):
         # Parse and save
         try:
             parser_service = BankStatementParserService(company, request.user)
-            statement = parser_service.parse_and_save(uploaded_file)
+            statement = parser_service.parse_and_save(
+                uploaded_file,
+                incremental=serializer.validated_data['incremental']
+            )
 
             # Return detailed response
+            prefetch_related_objects([statement], self._transactions_prefetch())
             response_serializer = BankStatementDetailSerializer(statement)
             return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
@@ -157,6 +184,69 @@ class BankStatementViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    @swagger_auto_schema(
+        operation_description="Kivonatok feltöltése háttérfeldolgozással (több fájl egyszerre)",
+        request_body=BankStatementAsyncUploadSerializer,
+        responses={
+            202: BankStatementProgressSerializer(many=True),
+            400: "Validation error"
+        }
+    )
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser])
+    def upload_async(self, request):
+        """
+        Bank statement fájlok feltöltése háttérfeldolgozással
+
+        A fájlok azonnal eltárolódnak UPLOADED státusszal, a feldolgozás
+        (PARSING → MATCHING → PARSED) a háttérben, párhuzamosan fut.
+        Az állapot a progress végponton követhető.
+        """
+        from ..services.bank_statement_parser_service import BankStatementParserService
+        from ..bank_adapters import BankStatementParseError
+
+        company = getattr(request, 'company', None)
+        if not company:
+            return Response(
+                {'error': 'Nincs aktív cég kiválasztva'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = BankStatementAsyncUploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        parser_service = BankStatementParserService(company, request.user)
+        queued = []
+        errors = []
+
+        for uploaded_file in serializer.validated_data['files']:
+            try:
+                queued.append(parser_service.enqueue(
+                    uploaded_file,
+                    incremental=serializer.validated_data['incremental']
+                ))
+            except (ValueError, BankStatementParseError) as e:
+                errors.append({'file_name': uploaded_file.name, 'error': str(e)})
+            except Exception as e:
+                logger.error(f"Async upload failed for {uploaded_file.name}: {e}", exc_info=True)
+                errors.append({'file_name': uploaded_file.name, 'error': f'Feldolgozási hiba: {str(e)}'})
+
+        response_status = status.HTTP_202_ACCEPTED if queued else status.HTTP_400_BAD_REQUEST
+        return Response({
+            'statements': BankStatementProgressSerializer(queued, many=True).data,
+            'errors': errors
+        }, status=response_status)
+
+    @swagger_auto_schema(
+        operation_description="Kivonat háttérfeldolgozásának állapota",
+        responses={200: BankStatementProgressSerializer}
+    )
+    @action(detail=True, methods=['get'])
+    def progress(self, request, pk=None):
+        """Feldolgozási állapot: oldalak, létrehozott tranzakciók, párosítások"""
+        statement = self.get_object()
+        serializer = BankStatementProgressSerializer(statement)
+        return Response(serializer.data)
+
     @swagger_auto_schema(
         operation_description="Támogatott bankok listája",
         responses={200: SupportedBanksSerializer(many=True)}
@@ -166,7 +256,7 @@ class BankStatementViewSet(viewsets.ModelViewSet):
         """Támogatott bankok listája"""
         from ..services.bank_statement_parser_service import BankStatementParserService
 
-        banks = BankStatementParserService.get_supported_banks()
+        banks = cached(SUPPORTED_BANKS, BankStatementParserService.get_supported_banks)
         serializer = SupportedBanksSerializer(banks, many=True)
         return Response(serializer.data)
 
@@ -191,6 +281,8 @@ class BankTransactionViewSet(viewsets.ReadOnlyModelViewSet):
     search_fields = ['description', 'payer_name', 'beneficiary_name', 'reference', 'payment_id']
     ordering_fields = ['booking_date', 'value_date', 'amount']
     ordering = ['-booking_date']
+    pagination_class = KeysetPagination
+    keyset_fields = ('booking_date', 'id')  # ?pagination=cursor
 
     def get_queryset(self):
         """
@@ -202,10 +294,15 @@ class BankTransactionViewSet(viewsets.ReadOnlyModelViewSet):
         if not company:
             return BankTransaction.objects.none()
 
-        return BankTransaction.objects.filter(company=company).select_related(
-            'bank_statement',
-            'matched_invoice'
-        )
+        queryset = BankTransaction.objects.filter(company=company)
+
+        # Match actions modify the row - only serialized responses need the relations
+        if self.action in ('list', 'retrieve'):
+            queryset = BankTransactionSerializer.setup_eager_loading(queryset)
+        else:
+            queryset = queryset.select_related('bank_statement', 'matched_invoice')
+
+        return queryset
 
     def _update_statement_match_count(self, transaction):
         """
@@ -7,14 +7,17 @@ This module handles base table operations for suppliers, customers, and product
 - Customer master data with cashflow adjustments
 - Product price management (CONMED catalog)
 - Filtering by validity, category, and inventory management status
+- As-of lookups: the record valid on a given date (validity index)
 
 Domain: Base Tables Management (Suppliers, Customers, Products)
 """
 
 from rest_framework import viewsets, filters
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
 from django.db import models
-from datetime import date
+from datetime import date, datetime
 
 from ..models import SupplierCategory, SupplierType, Supplier, Customer, ProductPrice
 from ..serializers import (
@@ -22,6 +25,40 @@ from ..serializers import (
     CustomerSerializer, ProductPriceSerializer
 )
 from ..permissions import IsCompanyMember, RequireBaseTables
+from ..services.validity_index import annotate_validity, valid_on, validity_index
+
+
+class ValidityLookupMixin:
+    """
+    as-of action served by the process-local validity index
+
+    validity_table: validity index table ('suppliers', 'customers', 'prices')
+    validity_key_param: query parameter holding the partner name / product code
+    """
+    validity_table = None
+    validity_key_param = None
+
+    @action(detail=False, methods=['get'], url_path='as-of')
+    def as_of(self, request):
+        """
+        Adott napon érvényes rekord
+
+        GET /api/suppliers/as-of/?partner_name=...&date=YYYY-MM-DD (date: alapértelmezetten ma)
+        """
+        key = request.query_params.get(self.validity_key_param, '').strip()
+        if not key:
+            return Response({'error': f'{self.validity_key_param} kötelező'}, status=400)
+
+        date_str = request.query_params.get('date')
+        try:
+            on_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else date.today()
+        except ValueError:
+            return Response({'error': 'Érvénytelen dátum formátum. Használj YYYY-MM-DD formátumot.'}, status=400)
+
+        record = validity_index.lookup(request.company.id, self.validity_table, key, on_date)
+        if record is None:
+            return Response({'detail': 'Nincs a megadott napon érvényes rekord'}, status=404)
+        return Response(self.get_serializer(record).data)
 
 
 class SupplierCategoryViewSet(viewsets.ModelViewSet):
@@ -108,7 +145,7 @@ class SupplierTypeViewSet(viewsets.ModelViewSet):
             serializer.save(company=self.request.company)
 
 
-class SupplierViewSet(viewsets.ModelViewSet):
+class SupplierViewSet(ValidityLookupMixin, viewsets.ModelViewSet):
     """
     Beszállítók (Suppliers) kezelése
 
@@ -123,9 +160,14 @@ class SupplierViewSet(viewsets.ModelViewSet):
     Rendezés:
     - partner_name, category, type, valid_from, valid_to, created_at
 
+    Érvényes rekord adott napon:
+    - GET /api/suppliers/as-of/?partner_name=...&date=YYYY-MM-DD
+
     Hozzáférés: ADMIN only
     """
     serializer_class = SupplierSerializer
+    validity_table = 'suppliers'
+    validity_key_param = 'partner_name'
     permission_classes = [IsAuthenticated, IsCompanyMember, RequireBaseTables]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['partner_name', 'category__name', 'type__name']
@@ -138,16 +180,14 @@ class SupplierViewSet(viewsets.ModelViewSet):
         if not company:
             return Supplier.objects.none()
 
-        queryset = Supplier.objects.filter(company=company)
+        queryset = annotate_validity(
+            Supplier.objects.filter(company=company).select_related('company', 'category', 'type')
+        )
 
         # Filter by valid_only (default: true)
         valid_only = self.request.query_params.get('valid_only', 'true').lower() == 'true'
         if valid_only:
-            today = date.today()
-            queryset = queryset.filter(
-                models.Q(valid_from__isnull=True) | models.Q(valid_from__lte=today),
-                models.Q(valid_to__isnull=True) | models.Q(valid_to__gte=today)
-            )
+            queryset = queryset.filter(valid_on())
 
         # Filter by category
         category = self.request.query_params.get('category')
@@ -176,7 +216,7 @@ class SupplierViewSet(viewsets.ModelViewSet):
         serializer.save(company=self.request.company)
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ValidityLookupMixin, viewsets.ModelViewSet):
     """
     Vevők (Customers) kezelése
 
@@ -189,9 +229,14 @@ class CustomerViewSet(viewsets.ModelViewSet):
     Rendezés:
     - customer_name, cashflow_adjustment, valid_from, valid_to, created_at
 
+    Érvényes rekord adott napon:
+    - GET /api/customers/as-of/?customer_name=...&date=YYYY-MM-DD
+
     Hozzáférés: ADMIN only
     """
     serializer_class = CustomerSerializer
+    validity_table = 'customers'
+    validity_key_param = 'customer_name'
     permission_classes = [IsAuthenticated, IsCompanyMember, RequireBaseTables]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['customer_name']
@@ -204,16 +249,14 @@ class CustomerViewSet(viewsets.ModelViewSet):
         if not company:
             return Customer.objects.none()
 
-        queryset = Customer.objects.filter(company=company)
+        queryset = annotate_validity(
+            Customer.objects.filter(company=company).select_related('company')
+        )
 
         # Filter by valid_only (default: true)
         valid_only = self.request.query_params.get('valid_only', 'true').lower() == 'true'
         if valid_only:
-            today = date.today()
-            queryset = queryset.filter(
-                models.Q(valid_from__isnull=True) | models.Q(valid_from__lte=today),
-                models.Q(valid_to__isnull=True) | models.Q(valid_to__gte=today)
-            )
+            queryset = queryset.filter(valid_on())
 
         # Filter by valid_from date
         valid_from = self.request.query_params.get('valid_from')
@@ -232,7 +275,7 @@ class CustomerViewSet(viewsets.ModelViewSet):
         serializer.save(company=self.request.company)
 
 
-class ProductPriceViewSet(viewsets.ModelViewSet):
+class ProductPriceViewSet(ValidityLookupMixin, viewsets.ModelViewSet):
     """
     CONMED árak (Product Prices) kezelése
 
@@ -247,9 +290,14 @@ class ProductPriceViewSet(viewsets.ModelViewSet):
     - product_value, product_description, purchase_price_usd, purchase_price_huf,
       sales_price_huf, valid_from, valid_to, created_at
 
+    Érvényes rekord adott napon:
+    - GET /api/product-prices/as-of/?product_value=...&date=YYYY-MM-DD
+
     Hozzáférés: ADMIN only
     """
     serializer_class = ProductPriceSerializer
+    validity_table = 'prices'
+    validity_key_param = 'product_value'
     permission_classes = [IsAuthenticated, IsCompanyMember, RequireBaseTables]
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
     search_fields = ['product_value', 'product_description']
@@ -262,16 +310,14 @@ class ProductPriceViewSet(viewsets.ModelViewSet):
         if not company:
             return ProductPrice.objects.none()
 
-        queryset = ProductPrice.objects.filter(company=company)
+        queryset = annotate_validity(
+            ProductPrice.objects.filter(company=company).select_related('company')
+        )
 
         # Filter by valid_only (default: true)
         valid_only = self.request.query_params.get('valid_only', 'true').lower() == 'true'
         if valid_only:
-            today = date.today()
-            queryset = queryset.filter(
-                models.Q(valid_from__isnull=True) | models.Q(valid_from__lte=today),
-                models.Q(valid_to__isnull=True) | models.Q(valid_to__gte=today)
-            )
+            queryset = queryset.filter(valid_on())
 
         # Filter by is_inventory_managed
         is_inventory_managed = self.request.query_params.get('is_inventory_managed')
@@ -417,6 +417,8 @@ class BillingoSpendingViewSet(viewsets.ReadOnlyModelViewSet):
             'success': True,
             'spendings_created': result['created'],
             'spendings_updated': result['updated'],
+            'spendings_unchanged': result['unchanged'],
+            'spendings_deleted': result['deleted'],
             'spendings_skipped': result['skipped'],
-            'spendings_processed': result['created'] + result['updated']
+            'spendings_processed': result['created'] + result['updated'] + result['unchanged']
         })
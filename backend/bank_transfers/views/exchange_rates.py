@@ -26,6 +26,7 @@ from ..serializers import (
     CurrencyConversionSerializer
 )
 from ..permissions import IsCompanyMember, IsCompanyAdmin
+from ..caching import EXCHANGE_RATES, cached
 from ..services.exchange_rate_sync_service import ExchangeRateSyncService
 from ..schemas.exchange_rate import CurrencyConversionInput, CurrencyConversionOutput
 
@@ -95,22 +96,25 @@ class ExchangeRateViewSet(viewsets.ReadOnlyModelViewSet):
         today = date.today()
         currencies = ['USD', 'EUR']
 
-        rates_data = {}
-        for currency in currencies:
-            rate = ExchangeRateSyncService.get_rate_for_date(today, currency)
-            if rate:
-                rate_obj = ExchangeRate.objects.filter(
-                    rate_date=today,
-                    currency=currency
-                ).first()
-
-                if rate_obj:
-                    rates_data[currency] = {
-                        'rate': str(rate),
-                        'rate_date': rate_obj.rate_date.strftime('%Y-%m-%d')
-                    }
-
-        return Response(rates_data)
+        def compute_rates():
+            rates_data = {}
+            for currency in currencies:
+                rate = ExchangeRateSyncService.get_rate_for_date(today, currency)
+                if rate:
+                    rate_obj = ExchangeRate.objects.filter(
+                        rate_date=today,
+                        currency=currency
+                    ).first()
+
+                    if rate_obj:
+                        rates_data[currency] = {
+                            'rate': str(rate),
+                            'rate_date': rate_obj.rate_date.strftime('%Y-%m-%d')
+                        }
+            return rates_data
+
+        # Invalidated when rates are saved or a sync finishes
+        return Response(cached(EXCHANGE_RATES, compute_rates, 'current', today.isoformat()))
 
     @swagger_auto_schema(
         operation_description="Legutóbbi elérhető árfolyamok lekérdezése (ha ma nincs, akkor a legközelebbi korábbi)",
@@ -129,16 +133,18 @@ class ExchangeRateViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def latest(self, request):
         """Legutóbbi elérhető árfolyamok lekérdezése"""
-        latest_rates = ExchangeRateSyncService.get_latest_rates(['USD', 'EUR'])
-
-        rates_data = {}
-        for currency, (rate, rate_date) in latest_rates.items():
-            rates_data[currency] = {
-                'rate': str(rate),
-                'rate_date': rate_date.strftime('%Y-%m-%d')
-            }
+        def compute_rates():
+            latest_rates = ExchangeRateSyncService.get_latest_rates(['USD', 'EUR'])
+
+            rates_data = {}
+            for currency, (rate, rate_date) in latest_rates.items():
+                rates_data[currency] = {
+                    'rate': str(rate),
+                    'rate_date': rate_date.strftime('%Y-%m-%d')
+                }
+            return rates_data
 
-        return Response(rates_data)
+        return Response(cached(EXCHANGE_RATES, compute_rates, 'latest'))
 
     @swagger_auto_schema(
         operation_description="Deviza átváltás HUF-ra",
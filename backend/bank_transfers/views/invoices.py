@@ -13,11 +13,11 @@ Domain: NAV Integration
 
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from django.utils import timezone
-from django.db import models
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from datetime import date
@@ -29,7 +29,10 @@ from ..serializers import (
     TransferSerializer
 )
 from ..permissions import IsCompanyMember, RequireNavSync
+from ..caching import INVOICE_STATS, cached_for_company
+from ..services.invoice_statistics_service import InvoiceStatisticsService
 from ..filters import InvoiceFilterSet
+from ..pagination import KeysetPagination
 
 
 class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
@@ -46,6 +49,8 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
     permission_classes = [IsAuthenticated, IsCompanyMember, RequireNavSync]
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_class = InvoiceFilterSet
+    pagination_class = KeysetPagination
+    keyset_fields = ('issue_date', 'id')  # ?pagination=cursor
     ordering_fields = [
         'issue_date', 'fulfillment_date', 'payment_due_date', 'payment_date',
         'nav_invoice_number', 'invoice_gross_amount', 'invoice_net_amount',
@@ -90,25 +95,25 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
             openapi.Parameter('hide_storno_invoices', openapi.IN_QUERY, description="Hide both STORNO invoices and invoices that have been canceled by STORNO (true/false, default: true)", type=openapi.TYPE_BOOLEAN, default=True),
             openapi.Parameter('search', openapi.IN_QUERY, description="Search in invoice number, names, tax numbers, original invoice", type=openapi.TYPE_STRING),
             openapi.Parameter('ordering', openapi.IN_QUERY, description="Order by field (prefix with - for descending)", type=openapi.TYPE_STRING),
+            openapi.Parameter('pagination', openapi.IN_QUERY, description="'cursor' for keyset pagination on (issue_date, id) without total count", type=openapi.TYPE_STRING),
+            openapi.Parameter('cursor', openapi.IN_QUERY, description="Cursor from the next/previous link (cursor pagination)", type=openapi.TYPE_STRING),
         ]
     )
     def list(self, request, *args, **kwargs):
         """Override list to handle empty search results gracefully (return empty list instead of 404)"""
         try:
             return super().list(request, *args, **kwargs)
-        except Exception as e:
-            # If pagination raises 404 for invalid page on empty queryset, return empty results
-            if 'EmptyPage' in str(type(e).__name__) or 'NotFound' in str(type(e).__name__):
-                queryset = self.filter_queryset(self.get_queryset())
-                # If queryset is empty, return empty paginated response
-                if not queryset.exists():
-                    return Response({
-                        'count': 0,
-                        'next': None,
-                        'previous': None,
-                        'results': []
-                    })
-            raise
+        except NotFound:
+            # An out-of-range page of an empty result is an empty list; an invalid
+            # cursor or a page past the end of a non-empty result stays a 404
+            if not self.paginator.is_empty_result():
+                raise
+            return Response({
+                'count': 0,
+                'next': None,
+                'previous': None,
+                'results': []
+            })
 
     @swagger_auto_schema(
         operation_summary="NAV számla részletei",
@@ -120,16 +125,11 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get invoice statistics for the company"""
-        queryset = self.get_queryset()
-
-        stats = {
-            'total_count': queryset.count(),
-            'inbound_count': queryset.filter(invoice_direction='INBOUND').count(),
-            'outbound_count': queryset.filter(invoice_direction='OUTBOUND').count(),
-            'total_gross_amount': queryset.aggregate(total=models.Sum('invoice_gross_amount'))['total'] or 0,
-            'currencies': list(queryset.values_list('currency_code', flat=True).distinct()),
-            'recent_sync_date': queryset.aggregate(latest=models.Max('created_at'))['latest'],
-        }
+        # Invalidated by Invoice save/delete signals
+        stats = cached_for_company(
+            request.company.id, INVOICE_STATS,
+            lambda: InvoiceStatisticsService.get_company_stats(request.company)
+        )
 
         return Response(stats)
 
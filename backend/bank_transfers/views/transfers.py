@@ -4,13 +4,16 @@ Transfer ViewSets - Transfer and batch management endpoints
 Handles transfer templates, individual transfers, transfer batches, and Excel import functionality.
 """
 
+import io
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
-from django.http import HttpResponse
+from django.core.files.storage import default_storage
+from django.http import FileResponse
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -387,6 +390,43 @@ class TransferViewSet(viewsets.ModelViewSet):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+    @swagger_auto_schema(
+        operation_description="KH Bank export több fájlra bontva (max. 40 utalás fájlonként), ZIP archívumként",
+        request_body=XMLGenerateSerializer,
+        responses={
+            200: 'ZIP file',
+            404: 'No transfers found',
+            400: 'Export error'
+        }
+    )
+    @require_feature_api('EXPORT_CSV_KH')
+    @action(detail=False, methods=['post'])
+    def generate_kh_export_zip(self, request):
+        """KH Bank export 40 utalásnál nagyobb listákhoz - minden fájl külön kötegként mentve"""
+        serializer = XMLGenerateSerializer(data=request.data)
+
+        if serializer.is_valid():
+            transfer_ids = serializer.validated_data['transfer_ids']
+            batch_name = serializer.validated_data.get('batch_name')
+
+            try:
+                result = TransferService.generate_kh_export_zip(request.company, transfer_ids, batch_name)
+            except ValueError as e:
+                return Response({
+                    'detail': 'KH Bank export error',
+                    'error': str(e)
+                }, status=status.HTTP_400_BAD_REQUEST)
+
+            return FileResponse(
+                io.BytesIO(result['content']),
+                as_attachment=True,
+                filename=result['filename'],
+                content_type='application/zip'
+            )
+
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
 class TransferBatchViewSet(viewsets.ModelViewSet):
     """
     Utalási kötegek megtekintése
@@ -410,22 +450,16 @@ class TransferBatchViewSet(viewsets.ModelViewSet):
     )
     @action(detail=True, methods=['get'])
     def download_xml(self, request, pk=None):
-        """Fájl letöltése - regenerálja a fájlt a mentett adatokból (XML vagy CSV formátumban)"""
+        """Fájl letöltése - a köteg tárolt export fájlja (XML vagy CSV formátumban), változás esetén újragenerálva"""
         batch = self.get_object()
 
         try:
-            if batch.batch_format == 'KH_CSV':
-                # Generate KH Bank CSV content
-                from bank_transfers.kh_export import KHBankExporter
-                transfers = batch.transfers.all().select_related('beneficiary', 'originator_account').order_by('order', 'execution_date')
-                exporter = KHBankExporter()
-                content = exporter.generate_kh_export_encoded(transfers)
-                response = HttpResponse(content, content_type='text/csv; charset=iso-8859-2')
-            else:
-                # Generate SEPA XML content
-                transfers = batch.transfers.all().select_related('beneficiary', 'originator_account').order_by('order', 'execution_date')
-                content = TransferBatchService.regenerate_xml_for_batch(batch)
-                response = HttpResponse(content, content_type='application/xml')
+            # Served from the stored artifact; only generated when the batch changed
+            artifact = TransferBatchService.get_export_artifact(batch)
+            response = FileResponse(
+                default_storage.open(artifact.file_path, 'rb'),
+                content_type=TransferBatchService.EXPORT_CONTENT_TYPES[artifact.batch_format]
+            )
 
             # Mark transfers as processed when downloaded
             batch.transfers.filter(is_processed=False).update(is_processed=True)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for the precompiled patterns used by the PDF bank adapters.
+
+Compares the per-line cost of the original inline regex checks with the
+precompiled LineClassifier (K&H, GRÁNIT), and the per-block cost of the
+original inline detail searches with the module-level patterns (Raiffeisen,
+which splits blocks with one regex and has no per-line loop), on synthetic
+statement text. Both variants must give the same result for every input.
+
+Usage:
+    python benchmark_bank_adapters.py [--lines 50000] [--repeat 5]
+"""
+
+import argparse
+import re
+import timeit
+
+from bank_transfers.bank_adapters.kh_adapter import KH_LINE_CLASSIFIER
+from bank_transfers.bank_adapters.granit_adapter import GRANIT_LINE_CLASSIFIER
+from bank_transfers.bank_adapters import raiffeisen_adapter as raiffeisen
+
+KH_SAMPLE = [
+    '2025.09.03 2025.09.03 Azonnali Forint átutalás bankon kívül - 212 309',
+    'Ref.: BNK25246BJHLCKHJ Szla.:',
+    'HU60117200012248254300000000, ITMAN Számítástechnikai',
+    'Szolgáltató Kft. Közl.: SZA00456/2025 Hiv.:',
+    '00000000000000000000000000000000053',
+]
+
+GRANIT_SAMPLE = [
+    '2025.01.14 Átutalás (IG2) 1234567890123 -361 250',
+    '2025.01.14 Előjegyzett jutalék: -723',
+    'Kedvezményezett: ITMAN Számítástechnikai Szolgáltató Kft.',
+    'Kedvezményezett IBAN: HU60117200012248254300000000',
+    'Közlemény: SZA00456/2025',
+    '2025.01.15 Kamat 15',
+]
+
+RAIFFEISEN_SAMPLE = [
+    '5365333444 2025.12.05. Forint átutalás 1.080.000,00\n'
+    '2025.12.04. Referencia: AFB25L0000262483\n'
+    'Átutaló neve: ITCardigan Kft.\n'
+    'Átutaló számlaszáma: HU12 1040 5004 0000 0000 1234 5678\n'
+    'Közlemény: SZA00456/2025',
+    '5365333445 2025.12.06. Elektronikusforint£tutal£s 250.000,00\n'
+    '2025.12.06. Kedvezm©nyezettneve: Danubius Expert Consulting Z\nrt.\n'
+    'Kedvezményezett számlaszáma: HU60 1172 0001 2248 2543 0000 0000\n'
+    'Előjegyzett díj: 1.250,00 HUF',
+    '5365333446 2025.12.07. K£rtyatranzakcië 12.990,00\n'
+    '2025.12.05. 402115XXXXXX1446 Orsz£gkëd: HU',
+]
+
+# (inline pattern, flags) as used by the adapter before precompilation, and
+# the module-level constant that replaced it
+RAIFFEISEN_DETAIL_PATTERNS = [
+    (r'Referencia:\s*([^\n]+)', 0, raiffeisen.RAIFFEISEN_REFERENCE_RE),
+    (r'K[ézö]zlem[©é]ny:\s*([^\n]+)', 0, raiffeisen.RAIFFEISEN_KOZLEMENY_RE),
+    (
+        r'[¶Á]tutal[ëó]\s*neve:\s*(.+?)(?:[¶Á]tutal[ëó]\s*sz[£á]mlasz[£á]ma:|Kedvezm[©é]nyezett|Referencia:|'
+        r'K[ézö]zlem[©é]ny:|$)',
+        re.DOTALL, raiffeisen.RAIFFEISEN_PAYER_NAME_RE
+    ),
+    (r'Átutaló\s+számlaszáma:\s*([^\n]+)', 0, raiffeisen.RAIFFEISEN_PAYER_ACCOUNT_RE),
+    (
+        r'Kedvezm[©é]nyezett\s*neve:\s*(.+?)(?:Kedvezm[©é]nyezett\s*sz[£á]mlasz[£á]ma:|[¶Á]tutal[ëó]|'
+        r'Referencia:|K[ézö]zlem[©é]ny:|Elìjegyzett|$)',
+        re.DOTALL, raiffeisen.RAIFFEISEN_BENEFICIARY_NAME_RE
+    ),
+    (r'Kedvezményezett\s+számlaszáma:\s*([^\n]+)', 0, raiffeisen.RAIFFEISEN_BENEFICIARY_ACCOUNT_RE),
+    (r'Orsz£gkëd:\s*([A-Z]{2})', 0, raiffeisen.RAIFFEISEN_COUNTRY_CODE_RE),
+    (r'Előjegyzett\s+díj:\s*([\d\s.,]+)\s*HUF', 0, raiffeisen.RAIFFEISEN_FEE_RE),
+]
+
+
+def raiffeisen_legacy(block):
+    results = []
+    for pattern, flags, _compiled in RAIFFEISEN_DETAIL_PATTERNS:
+        m = re.search(pattern, block, flags)
+        results.append(m.groups() if m else None)
+    return results
+
+
+class RaiffeisenDetails:
+    """Precompiled detail searches, shaped like a classifier for bench()"""
+
+    @staticmethod
+    def classify(block):
+        results = []
+        for _pattern, _flags, compiled in RAIFFEISEN_DETAIL_PATTERNS:
+            m = compiled.search(block)
+            results.append(m.groups() if m else None)
+        return results
+
+
+def kh_legacy(line):
+    if re.match(r'^\d{4}\.\d{2}\.\d{2}', line):
+        return 'transaction_start'
+    if 'Könyvelt nyitóegyenleg' in line or 'Jóváírás összesen' in line:
+        return 'summary'
+    return None
+
+
+def granit_legacy(line):
+    if not re.match(r'^\d{4}\.\d{2}\.\d{2}\s+', line):
+        return None
+    if re.search(r'\s[\d\-]+\s\d{3}$', line):
+        return 'transaction_header'
+    if re.search(r'\s[\d\-]+$', line):
+        if not re.search(r'(jutalék|Beérkezés|Előjegyzett|Eredeti|Értéknap|Kártya):', line):
+            return 'transaction_header'
+    return None
+
+
+def bench(name, lines, legacy, classifier, repeat, unit='line'):
+    for line in lines:
+        assert legacy(line) == classifier.classify(line), f"{name}: mismatch on {line!r}"
+
+    before = min(timeit.repeat(lambda: [legacy(line) for line in lines], number=1, repeat=repeat))
+    after = min(timeit.repeat(lambda: [classifier.classify(line) for line in lines], number=1, repeat=repeat))
+
+    per_line = 1e9 / len(lines)
+    print(
+        f"{name:10s} before: {before * per_line:7.0f} ns/{unit:5s}  "
+        f"after: {after * per_line:7.0f} ns/{unit:5s}  speedup: {before / after:.2f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--lines', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for name, sample, legacy, classifier in (
+        ('K&H', KH_SAMPLE, kh_legacy, KH_LINE_CLASSIFIER),
+        ('GRÁNIT', GRANIT_SAMPLE, granit_legacy, GRANIT_LINE_CLASSIFIER),
+    ):
+        lines = (sample * (args.lines // len(sample) + 1))[:args.lines]
+        bench(name, lines, legacy, classifier, args.repeat)
+
+    # Raiffeisen runs its detail searches once per transaction block
+    block_count = max(args.lines // 10, len(RAIFFEISEN_SAMPLE))
+    blocks = (RAIFFEISEN_SAMPLE * (block_count // len(RAIFFEISEN_SAMPLE) + 1))[:block_count]
+    bench('Raiffeisen', blocks, raiffeisen_legacy, RaiffeisenDetails, args.repeat, unit='block')
+
+
+if __name__ == '__main__':
+    main()
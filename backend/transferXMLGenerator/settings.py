@@ -179,6 +179,35 @@ NAV_API_CONFIG = {
     }
 }
 
+# Bank statement background processing (upload_async endpoint)
+BANK_STATEMENT_WORKERS = config('BANK_STATEMENT_WORKERS', default=4, cast=int)
+# Seconds after which a statement still PARSING/MATCHING is reclaimed by process_bank_statements
+BANK_STATEMENT_STALE_AFTER = config('BANK_STATEMENT_STALE_AFTER', default=1800, cast=int)
+
+# Cache: local memory by default (single-process development server); set
+# CACHE_URL whenever several worker processes serve requests
+#   CACHE_URL=redis://host:6379/0     (Redis-compatible server, needs the redis package)
+#   CACHE_URL=file:///var/tmp/django_cache
+CACHE_URL = config('CACHE_URL', default='')
+if CACHE_URL.startswith(('redis://', 'rediss://')):
+    CACHE_BACKEND, CACHE_LOCATION = 'django.core.cache.backends.redis.RedisCache', CACHE_URL
+elif CACHE_URL.startswith('file://'):
+    CACHE_BACKEND, CACHE_LOCATION = 'django.core.cache.backends.filebased.FileBasedCache', CACHE_URL[len('file://'):]
+else:
+    CACHE_BACKEND, CACHE_LOCATION = 'django.core.cache.backends.locmem.LocMemCache', 'transferxml'
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'transferxml',
+    }
+}
+
+# Invoice statistics from incrementally maintained per-company buckets
+# (rebuild with: python manage.py rebuild_invoice_statistics)
+INVOICE_STATS_MATERIALIZED = config('INVOICE_STATS_MATERIALIZED', default=False, cast=bool)
+
 # Language and timezone
 LANGUAGE_CODE = 'hu-HU'
 USE_I18N = True
@@ -190,5 +219,9 @@ TIME_ZONE = 'Europe/Budapest'
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Media files (stored bank statement uploads)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
\ No newline at end of file
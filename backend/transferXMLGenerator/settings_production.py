@@ -2,6 +2,7 @@ import os
 import dj_database_url
 from pathlib import Path
 from decouple import config
+from django.core.exceptions import ImproperlyConfigured
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -170,6 +171,27 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache: must be shared by every worker process on every host. Feature snapshots
+# and company memberships are cached, and the signals invalidating them only run
+# in the process handling the write - a per-process or per-host cache (locmem,
+# file) would keep granting revoked access on the other workers and replicas.
+#   CACHE_URL=redis://host:6379/0   (Redis-compatible server, needs the redis package)
+CACHE_URL = config('CACHE_URL')
+if not CACHE_URL.startswith(('redis://', 'rediss://')):
+    raise ImproperlyConfigured('CACHE_URL must be a redis:// URL in production (shared between workers and hosts)')
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+        'KEY_PREFIX': 'transferxml',
+    }
+}
+
+# Invoice statistics from incrementally maintained per-company buckets
+# (rebuild with: python manage.py rebuild_invoice_statistics)
+INVOICE_STATS_MATERIALIZED = config('INVOICE_STATS_MATERIALIZED', default=False, cast=bool)
+
 # Security settings for production
 SECURE_SSL_REDIRECT = config('SECURE_SSL_REDIRECT', default=True, cast=bool)
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')